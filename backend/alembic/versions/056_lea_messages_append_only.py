@@ -0,0 +1,102 @@
+"""Add lea_messages table (append-only Léa conversation history)
+
+Revision ID: 056_lea_messages
+Revises: 055_pa_field_types
+Create Date: 2026-03-12
+
+Messages Léa en ajout seul (un enregistrement par message, numéroté par conversation) au lieu de
+réécrire la colonne JSON lea_conversations.messages à chaque tour. Ajoute message_count et
+summary (résumé glissant) sur lea_conversations. Les conversations existantes sont recopiées
+depuis la colonne JSON au premier nouveau message (app/services/lea_chat/message_store.py) ;
+la colonne JSON est conservée pour permettre le retour arrière : downgrade() y recopie les
+messages de lea_messages avant de supprimer la table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "056_lea_messages"
+down_revision: Union[str, None] = "055_pa_field_types"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    columns = {c["name"] for c in inspector.get_columns("lea_conversations")}
+    if "message_count" not in columns:
+        op.add_column(
+            "lea_conversations",
+            sa.Column("message_count", sa.Integer(), server_default="0", nullable=False),
+        )
+    if "summary" not in columns:
+        op.add_column("lea_conversations", sa.Column("summary", sa.Text(), nullable=True))
+    if inspector.has_table("lea_messages"):
+        return  # Table déjà créée (échec précédent après create, avant update version)
+    op.create_table(
+        "lea_messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("conversation_id", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(length=20), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("meta", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["conversation_id"], ["lea_conversations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("conversation_id", "seq", name="uq_lea_messages_conversation_seq"),
+    )
+    op.create_index("ix_lea_messages_id", "lea_messages", ["id"])
+    op.create_index("idx_lea_messages_created_at", "lea_messages", ["created_at"])
+
+
+def _restore_json_messages(conn) -> None:
+    """Recopie lea_messages dans lea_conversations.messages (conversations migrées)."""
+    conversations = sa.table(
+        "lea_conversations",
+        sa.column("id", sa.Integer),
+        sa.column("message_count", sa.Integer),
+        sa.column("messages", sa.JSON),
+    )
+    messages = sa.table(
+        "lea_messages",
+        sa.column("conversation_id", sa.Integer),
+        sa.column("seq", sa.Integer),
+        sa.column("role", sa.String),
+        sa.column("content", sa.Text),
+        sa.column("meta", sa.JSON),
+        sa.column("created_at", sa.DateTime),
+    )
+    migrated = conn.execute(
+        sa.select(conversations.c.id).where(conversations.c.message_count > 0)
+    ).scalars().all()
+    for conversation_id in migrated:
+        rows = conn.execute(
+            sa.select(messages.c.role, messages.c.content, messages.c.meta, messages.c.created_at)
+            .where(messages.c.conversation_id == conversation_id)
+            .order_by(messages.c.seq)
+        ).all()
+        history = []
+        for role, content, meta, created_at in rows:
+            message = {"role": role, "content": content or ""}
+            message.update(meta or {})
+            if "timestamp" not in message and created_at is not None:
+                message["timestamp"] = created_at.isoformat()
+            history.append(message)
+        conn.execute(
+            sa.update(conversations)
+            .where(conversations.c.id == conversation_id)
+            .values(messages=history)
+        )
+
+
+def downgrade() -> None:
+    _restore_json_messages(op.get_bind())
+    op.drop_index("idx_lea_messages_created_at", table_name="lea_messages")
+    op.drop_index("ix_lea_messages_id", table_name="lea_messages")
+    op.drop_table("lea_messages")
+    op.drop_column("lea_conversations", "summary")
+    op.drop_column("lea_conversations", "message_count")
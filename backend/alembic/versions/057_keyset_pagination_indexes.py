@@ -0,0 +1,48 @@
+"""Add composite indexes for keyset pagination of list endpoints
+
+Revision ID: 057_keyset_pagination_indexes
+Revises: 056_lea_messages
+Create Date: 2026-10-17
+
+The transaction, notification, contact and availability listings page with
+WHERE (sort key, id) < (:last_sort_key, :last_id) (app/core/keyset_pagination.py).
+Each index matches the listing's filter columns followed by its sort key and id,
+so every page is an index range scan regardless of its depth.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "057_keyset_pagination_indexes"
+down_revision: Union[str, None] = "056_lea_messages"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+KEYSET_INDEXES = [
+    ("idx_real_estate_transactions_user_created_id", "real_estate_transactions", ["user_id", "created_at", "id"]),
+    ("idx_notifications_user_created_id", "notifications", ["user_id", "created_at", "id"]),
+    ("idx_contacts_created_id", "contacts", ["created_at", "id"]),
+    ("idx_user_availabilities_user_day_start_id", "user_availabilities", ["user_id", "day_of_week", "start_time", "id"]),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    for name, table, columns in KEYSET_INDEXES:
+        if not inspector.has_table(table):
+            continue
+        if name in {i["name"] for i in inspector.get_indexes(table)}:
+            continue
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    for name, table, _ in reversed(KEYSET_INDEXES):
+        if inspector.has_table(table) and name in {i["name"] for i in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -5,15 +5,17 @@ Endpoints for administrative operations
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Header
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from pydantic import BaseModel, EmailStr, ValidationError
 import os
+from pathlib import Path
 
 from app.core.database import get_db
 from app.core.cache import cached, invalidate_cache_pattern
-from app.dependencies import get_current_user, require_superadmin, is_superadmin
+from app.dependencies import get_current_user, require_superadmin, is_superadmin, bypass_tenant_scope_for_superadmin
 from app.models.user import User
 from app.models.role import Role, UserRole
 from app.core.logging import logger
@@ -26,6 +28,8 @@ from app.core.tenancy import (
 )
 from app.core.tenant_database_manager import TenantDatabaseManager
 from app.core.tenancy_metrics import TenancyMetrics
+from app.core.query_instrumentation import query_stats_registry
+from app.core.index_advisor import get_index_report, next_revision, recommend_indexes, render_migration
 from app.services.rbac_service import RBACService
 from app.models import Permission, RolePermission
 
@@ -384,6 +388,86 @@ async def check_superadmin_status(
 # Tenancy Endpoints
 # ============================================================================
 
+@router.get(
+    "/query-stats",
+    response_model=dict,
+    tags=["admin"]
+)
+async def get_query_stats(
+    limit: int = Query(50, ge=1, le=500, description="Maximum statements / N+1 reports returned"),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(require_superadmin)
+):
+    """
+    Get SQL statement statistics of this worker: most expensive statement fingerprints
+    and recent requests flagged with N+1 candidates.
+    Requires superadmin authentication.
+    """
+    return query_stats_registry.snapshot(limit)
+
+
+@router.delete(
+    "/query-stats",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["admin"]
+)
+async def reset_query_stats(
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(require_superadmin)
+):
+    """
+    Reset SQL statement statistics of this worker.
+    Requires superadmin authentication.
+    """
+    query_stats_registry.reset()
+    return None
+
+
+@router.get(
+    "/index-advisor",
+    response_model=dict,
+    tags=["admin"]
+)
+async def get_index_advice(
+    min_calls: int = Query(20, ge=1, description="Ignore statements executed fewer times"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum recommendations returned"),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(require_superadmin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get missing composite / partial indexes for the observed query workload
+    (this worker's statement statistics and pg_stat_statements) and the indexes
+    PostgreSQL never used.
+    Requires superadmin authentication.
+    """
+    return await get_index_report(db, min_calls=min_calls, limit=limit)
+
+
+@router.get(
+    "/index-advisor/migration",
+    response_class=PlainTextResponse,
+    tags=["admin"]
+)
+async def get_index_advice_migration(
+    min_calls: int = Query(20, ge=1, description="Ignore statements executed fewer times"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum indexes in the migration"),
+    current_user: User = Depends(get_current_user),
+    _: None = Depends(require_superadmin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get an Alembic migration creating the recommended indexes, to review and
+    add to alembic/versions.
+    Requires superadmin authentication.
+    """
+    recommendations = await recommend_indexes(db, min_calls=min_calls, limit=limit)
+    if not recommendations:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No missing index for the observed workload")
+    revision, head = next_revision(Path(__file__).resolve().parents[4] / "alembic" / "versions")
+    return PlainTextResponse(render_migration(recommendations, revision, head))
+
+
 class TenancyConfigResponse(BaseModel):
     """Response model for tenancy configuration"""
     mode: str
@@ -599,7 +683,7 @@ async def get_tenancy_metrics(
     tenant_id: Optional[int] = Query(None, description="Specific tenant ID (optional)"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    _: None = Depends(require_superadmin)
+    _: None = Depends(bypass_tenant_scope_for_superadmin)
 ):
     """
     Get tenancy metrics and statistics.
@@ -622,7 +706,7 @@ async def get_tenant_statistics(
     tenant_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    _: None = Depends(require_superadmin)
+    _: None = Depends(bypass_tenant_scope_for_superadmin)
 ):
     """
     Get statistics for a specific tenant.
@@ -83,7 +83,6 @@ async def get_api_settings(
                         # Use model_validate to safely create the model
                         settings_obj = APISettingsData.model_validate(cleaned_value)
                         response = APISettingsResponse(settings=settings_obj)
-                        # Convert to JSONResponse for slowapi compatibility
                         return JSONResponse(
                             content=response.model_dump(),
                             status_code=200
@@ -100,7 +99,6 @@ async def get_api_settings(
         # Return default settings
         default_settings = APISettingsData()
         response = APISettingsResponse(settings=default_settings)
-        # Convert to JSONResponse for slowapi compatibility
         return JSONResponse(
             content=response.model_dump(),
             status_code=200
@@ -110,7 +108,6 @@ async def get_api_settings(
         # Return default settings on error
         default_settings = APISettingsData()
         response = APISettingsResponse(settings=default_settings)
-        # Convert to JSONResponse for slowapi compatibility
         return JSONResponse(
             content=response.model_dump(),
             status_code=200
@@ -156,7 +153,6 @@ async def update_api_settings(
                 # Use model_validate to safely create the model
                 settings_obj = APISettingsData.model_validate(cleaned_value)
                 response = APISettingsResponse(settings=settings_obj)
-                # Convert to JSONResponse for slowapi compatibility
                 return JSONResponse(
                     content=response.model_dump(),
                     status_code=200
@@ -165,7 +161,6 @@ async def update_api_settings(
                 logger.warning(f"Error parsing saved preference value, using provided settings: {e}")
                 # Fallback to provided settings if preference value is invalid
                 response = APISettingsResponse(settings=settings)
-                # Convert to JSONResponse for slowapi compatibility
                 return JSONResponse(
                     content=response.model_dump(),
                     status_code=200
@@ -173,7 +168,6 @@ async def update_api_settings(
         else:
             # Fallback to provided settings if preference value is invalid
             response = APISettingsResponse(settings=settings)
-            # Convert to JSONResponse for slowapi compatibility
             return JSONResponse(
                 content=response.model_dump(),
                 status_code=200
@@ -381,7 +381,7 @@ async def login(
                 metadata={"reason": "invalid_credentials"}
             )
             if audit_log:
-                logger.info(f"✅ Login failure audit log created successfully (ID: {audit_log.id})")
+                logger.info(f"✅ Login failure audit log {'created' if audit_log.id else 'queued'} (ID: {audit_log.id})")
             else:
                 logger.error("❌ Login failure audit log returned None - logging may have failed silently")
         except Exception as e:
@@ -441,7 +441,7 @@ async def login(
     )
 
     # Log successful login
-    # Note: log_authentication_event() commits internally, so we don't need to commit again
+    # Note: log_authentication_event() commits (or queues) the event itself, so we don't need to commit again
     try:
         await SecurityAuditLogger.log_authentication_event(
             db=db,
@@ -682,7 +682,7 @@ async def logout(
             success="success"
         )
         if audit_log:
-            logger.info(f"✅ Logout audit log created successfully (ID: {audit_log.id})")
+            logger.info(f"✅ Logout audit log {'created' if audit_log.id else 'queued'} (ID: {audit_log.id})")
         else:
             logger.error("❌ Logout audit log returned None - logging may have failed silently")
     except Exception as e:
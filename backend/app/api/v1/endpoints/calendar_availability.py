@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
 
 from app.core.database import get_db
+from app.core.keyset_pagination import keyset_paginate, page_total
 from app.dependencies import get_current_user
 from app.models.user import User
 from app.models.user_availability import UserAvailability, DayOfWeek
@@ -30,6 +31,7 @@ async def list_availabilities(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page)"),
 ):
     """Get list of user availabilities"""
     query = select(UserAvailability).where(UserAvailability.user_id == current_user.id)
@@ -40,6 +42,23 @@ async def list_availabilities(
     if is_active is not None:
         query = query.where(UserAvailability.is_active == is_active)
     
+    if skip == 0 or cursor:
+        # Keyset pagination on (day_of_week, start_time, id)
+        page = await keyset_paginate(
+            db,
+            query,
+            [UserAvailability.day_of_week, UserAvailability.start_time],
+            UserAvailability.id,
+            limit,
+            cursor=cursor,
+            descending=False,
+        )
+        return UserAvailabilityListResponse(
+            availabilities=[UserAvailabilityResponse.model_validate(av) for av in page.items],
+            total=await page_total(db, query, cursor),
+            next_cursor=page.next_cursor,
+        )
+    
     # Get total count
     count_query = select(func.count()).select_from(query.subquery())
     total_result = await db.execute(count_query)
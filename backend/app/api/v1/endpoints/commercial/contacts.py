@@ -4,7 +4,7 @@ API endpoints for managing commercial contacts
 """
 
 from typing import List, Optional, Dict
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, delete
@@ -21,6 +21,7 @@ from io import BytesIO
 
 from app.core.database import get_db
 from app.core.cache_enhanced import cache_query
+from app.core.keyset_pagination import keyset_paginate
 from app.dependencies import get_current_user
 from app.models.contact import Contact
 from app.models.company import Company
@@ -266,13 +267,15 @@ def _contact_to_schema(contact: Contact) -> ContactSchema:
 
 
 @router.get("/", response_model=List[ContactSchema])
-@cache_query(expire=60, tags=["contacts"])
+@cache_query(expire=60, tags=[Contact, Company, User])
 async def list_contacts(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     circle: Optional[str] = Query(None),
     company_id: Optional[int] = Query(None),
 ) -> List[ContactSchema]:
@@ -282,6 +285,7 @@ async def list_contacts(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
+        cursor: Keyset cursor from the X-Next-Cursor header of the previous page (replaces skip)
         circle: Optional circle filter
         company_id: Optional company filter
         current_user: Current authenticated user
@@ -300,11 +304,19 @@ async def list_contacts(
     query = query.options(
         selectinload(Contact.company),
         selectinload(Contact.employee)
-    ).order_by(Contact.created_at.desc()).offset(skip).limit(limit)
+    )
     
     try:
-        result = await db.execute(query)
-        contacts = result.scalars().all()
+        if skip == 0 or cursor:
+            page = await keyset_paginate(db, query, [Contact.created_at], Contact.id, limit, cursor=cursor)
+            contacts = page.items
+            if page.next_cursor:
+                response.headers["X-Next-Cursor"] = page.next_cursor
+        else:
+            result = await db.execute(query.order_by(Contact.created_at.desc()).offset(skip).limit(limit))
+            contacts = result.scalars().all()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Database error in list_contacts: {e}", exc_info=True)
         raise HTTPException(
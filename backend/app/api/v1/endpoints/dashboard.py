@@ -7,7 +7,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.db_routing import get_read_db
 from app.core.logging import logger
 from app.dependencies import get_current_user
 from app.models.user import User
@@ -20,7 +20,7 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 @router.get("/stats", response_model=BrokerDashboardStats)
 async def get_broker_dashboard_stats(
     current_user: User = Depends(get_current_user),
-    db: Annotated[AsyncSession, Depends(get_db)] = None,
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None,
 ) -> BrokerDashboardStats:
     """
     Récupère les statistiques du dashboard pour le courtier immobilier connecté
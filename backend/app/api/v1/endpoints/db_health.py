@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import text
 
 from app.core.database import AsyncSessionLocal
+from app.core.db_routing import replica_pool
 from app.core.config import settings
 
 router = APIRouter()
@@ -209,6 +210,18 @@ async def database_health_check() -> Dict[str, Any]:
                     "error": str(e)[:100]
                 }
             
+            # 6. Read replicas (lag measured by the background health check)
+            if replica_pool.enabled:
+                replicas = replica_pool.status()
+                healthy = sum(1 for r in replicas if r["healthy"])
+                health_status["checks"]["replicas"] = {
+                    "status": "ok" if healthy == len(replicas) else "warning",
+                    "healthy": healthy,
+                    "replicas": replicas,
+                }
+                if healthy < len(replicas):
+                    issues.append(f"{len(replicas) - healthy} read replica(s) unavailable, reads fall back to primary")
+            
             # Determine overall status
             if issues:
                 health_status["status"] = "warning" if len(issues) < 3 else "error"
@@ -7,8 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, Field
 
 from app.services.favorite_service import FavoriteService
-from app.models.user import User
-from app.dependencies import get_current_user
+from app.dependencies import UserPrincipal, get_current_principal
 from app.core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.logging import logger
@@ -45,7 +44,7 @@ class FavoriteResponse(BaseModel):
 @router.post("/favorites", response_model=FavoriteResponse, status_code=status.HTTP_201_CREATED, tags=["favorites"])
 async def add_favorite(
     favorite_data: FavoriteCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Add a favorite/bookmark"""
@@ -70,7 +69,7 @@ async def add_favorite(
 async def remove_favorite(
     entity_type: str,
     entity_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Remove a favorite/bookmark"""
@@ -93,7 +92,7 @@ async def get_favorites(
     entity_type: Optional[str] = Query(None, description="Filter by entity type"),
     limit: Optional[int] = Query(None, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Get all favorites for the current user"""
@@ -111,7 +110,7 @@ async def get_favorites(
 async def check_favorite(
     entity_type: str,
     entity_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Check if an entity is favorited"""
@@ -128,7 +127,7 @@ async def check_favorite(
 async def update_favorite(
     favorite_id: int,
     favorite_data: FavoriteUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Update favorite notes or tags"""
@@ -151,7 +150,7 @@ async def update_favorite(
 async def get_favorites_count(
     entity_type: str,
     entity_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Get total number of favorites for an entity"""
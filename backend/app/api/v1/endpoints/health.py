@@ -15,7 +15,7 @@ from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import text
 
 from app.core.database import AsyncSessionLocal, engine
-from app.core.cache import cache_backend
+from app.core.cache import cache_backend, get_cache_stats
 from app.core.config import settings
 from app.core.logging import logger
 
@@ -259,6 +259,7 @@ async def detailed_health_check() -> Dict[str, Any]:
                 cache_status["redis_version"] = info.get("redis_version", "unknown")
             except:
                 pass
+            cache_status["tiers"] = get_cache_stats()
         else:
             cache_status["configured"] = False
     except Exception as e:
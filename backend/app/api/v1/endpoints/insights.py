@@ -12,7 +12,8 @@ from datetime import datetime, timedelta
 
 from app.models.user import User
 from app.models.project import Project
-from app.dependencies import get_current_user, get_db
+from app.dependencies import get_current_user
+from app.core.db_routing import get_read_db
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
 from app.core.tenancy_helpers import apply_tenant_scope
 from fastapi import Request
@@ -43,7 +44,7 @@ class InsightsResponse(BaseModel):
 async def get_insights(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get dashboard insights including metrics, trends, and user growth"""
     
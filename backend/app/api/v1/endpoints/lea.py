@@ -5,7 +5,6 @@ Léa AI Assistant Endpoints
 import base64
 import asyncio
 import io
-import json
 from io import BytesIO
 import os
 import re
@@ -33,6 +32,7 @@ except ModuleNotFoundError:
 from app.database import get_db
 from app.services.lea_service import LeaService
 from app.services.ai_service import AIService, AIProvider
+from app.services.ai_clients import ai_client_registry, fake_provider_enabled
 from app.services.s3_service import S3Service
 from app.core.config import get_settings
 from app.core.logging import logger
@@ -43,6 +43,12 @@ from app.services.lea_chat.actions.session import (
     link_lea_session_to_transaction,
     get_or_create_lea_conversation,
 )
+from app.services.lea_chat.message_store import (
+    LeaHistory,
+    append_lea_messages,
+    load_all_lea_messages,
+    load_lea_history,
+)
 from app.services.lea_chat.actions.transaction import (
     maybe_create_transaction_from_lea,
     create_transaction_record,
@@ -57,8 +63,14 @@ from app.services.lea_chat.actions.transaction import (
     _wants_to_create_transaction,
 )
 from app.services.lea_chat.actions.purchase_offer import extract_pa_fields_llm as _extract_pa_fields_llm
-from app.services.lea_chat.orchestrator import run as run_lea_actions_from_orchestrator
+from app.services.lea_chat.orchestrator import (
+    route_turn as route_lea_turn,
+    run as run_lea_actions_from_orchestrator,
+)
+from app.services.lea_chat.pipeline import TurnPipeline, TurnResult, TurnStage
 from app.services.lea_chat.context_loader import load_active_conversation_context
+from app.services.lea_chat.user_context_cache import LeaContextLookup, lea_user_context_cache
+from app.services.lea_chat.sse import SSE_COMMENT_OK, SSE_STATUS_CONNECTING, SSEFrameWriter
 from app.services.lea_chat.knowledge import (
     load_lea_knowledge_async as load_lea_knowledge_from_module,
     LEA_KNOWLEDGE_FOLDER,
@@ -67,6 +79,9 @@ from app.services.lea_chat.knowledge import (
 )
 from app.services.lea_chat.prompts import LEA_SYSTEM_PROMPT
 from app.services.lea_chat.response_composer import build_context as build_lea_context
+from app.services.lea_chat.prompt_builder import log_prompt_budget, select_lea_knowledge
+from app.services.lea_chat.extraction import extract_message_entities
+from app.services.lea_chat.geocoding import lea_geocoder
 from app.services.lea_chat.heuristics import (
     _format_canadian_postal_code,
     _extract_transaction_ref_from_message,
@@ -210,6 +225,7 @@ class LeaContextResponse(BaseModel):
     session_id: str
     message_count: int
     messages: list
+    has_more: bool = False
 
 
 class LeaConversationItem(BaseModel):
@@ -275,7 +291,64 @@ async def get_lea_user_context(db: AsyncSession, user_id: int) -> str:
     """
     Récupère un résumé des transactions de l'utilisateur (dossiers immo + portail)
     pour l'injecter dans le contexte de Léa.
+    Servi depuis le snapshot par utilisateur (lea_chat.user_context_cache) tant qu'aucune
+    écriture sur les transactions/formulaires n'a incrémenté ses tampons de version.
+    """
+    lookup = await lea_user_context_cache.lookup(user_id)
+    if lookup.text is not None:
+        return lookup.text
+    text, complete = await _build_lea_user_context(db, user_id, lookup)
+    if text is None:
+        return "Données plateforme : temporairement indisponibles. (Dire à l'utilisateur de réessayer dans un instant.)"
+    if complete:
+        await lea_user_context_cache.store(lookup, text)
+    return text
+
+
+def _render_lea_transaction_line(t: RealEstateTransaction) -> str:
+    """Ligne de contexte Léa pour une transaction (adresse, statut, vendeurs/acheteurs)."""
+    prov = (getattr(t, "property_province", None) or "").strip().upper()
+    prov_display = "Québec" if prov == "QC" else ("Ontario" if prov == "ON" else (t.property_province or ""))
+    addr = _format_full_address_ca(
+        t.property_address or "",
+        t.property_city or "",
+        prov_display,
+        getattr(t, "property_postal_code", None) or "",
+    )
+    if not addr.strip():
+        addr = t.property_address or t.property_city or "Sans adresse"
+    num = t.dossier_number or f"#{t.id}"
+    # Pour chaque transaction : afficher vendeur(s)/acheteur(s) déjà enregistrés (singulier si 1, pluriel sinon)
+    detail = []
+    if t.sellers and isinstance(t.sellers, list) and len(t.sellers) > 0:
+        names_s = [e.get("name") for e in t.sellers if isinstance(e, dict) and e.get("name")]
+        if names_s:
+            label_s = "vendeur: " if len(names_s) == 1 else "vendeurs: "
+            detail.append(f"{label_s}{', '.join(names_s)}")
+        else:
+            detail.append("vendeurs: (aucun)")
+    else:
+        detail.append("vendeurs: (aucun)")
+    if t.buyers and isinstance(t.buyers, list) and len(t.buyers) > 0:
+        names_b = [e.get("name") for e in t.buyers if isinstance(e, dict) and e.get("name")]
+        if names_b:
+            label_b = "acheteur: " if len(names_b) == 1 else "acheteurs: "
+            detail.append(f"{label_b}{', '.join(names_b)}")
+        else:
+            detail.append("acheteurs: (aucun)")
+    else:
+        detail.append("acheteurs: (aucun)")
+    return f"  - {num}: {t.name} — {addr} — statut: {t.status} — {' ; '.join(detail)}"
+
+
+async def _build_lea_user_context(
+    db: AsyncSession, user_id: int, lookup: LeaContextLookup
+) -> Tuple[Optional[str], bool]:
     """
+    Reconstruit le contexte (requêtes SQL). Retourne (texte, complet) ; texte None en cas d'erreur.
+    complet=False si une section optionnelle a échoué : le texte n'est alors pas mis en cache.
+    """
+    complete = True
     lines = ["Données plateforme (transactions et dossiers de l'utilisateur connecté) :"]
     try:
         # Référentiel formulaires OACIQ disponibles (code, nom, catégorie, objectif si présent)
@@ -298,7 +371,7 @@ async def get_lea_user_context(db: AsyncSession, user_id: int) -> str:
                     ref_parts.append(part)
                 lines.append("Formulaires OACIQ disponibles : " + "; ".join(ref_parts) + ".")
         except Exception:
-            pass
+            complete = False
         # Transactions immobilières (dossiers du courtier)
         q_re = (
             select(RealEstateTransaction)
@@ -316,38 +389,7 @@ async def get_lea_user_context(db: AsyncSession, user_id: int) -> str:
             lines.append(f"  → Transaction la plus récente (à utiliser par défaut) : {ref_latest}.")
             lines.append("  → Ne jamais mentionner ou basculer vers une autre transaction sauf si l'utilisateur le demande explicitement par son numéro.")
             for t in re_list:
-                prov = (getattr(t, "property_province", None) or "").strip().upper()
-                prov_display = "Québec" if prov == "QC" else ("Ontario" if prov == "ON" else (t.property_province or ""))
-                addr = _format_full_address_ca(
-                    t.property_address or "",
-                    t.property_city or "",
-                    prov_display,
-                    getattr(t, "property_postal_code", None) or "",
-                )
-                if not addr.strip():
-                    addr = t.property_address or t.property_city or "Sans adresse"
-                num = t.dossier_number or f"#{t.id}"
-                # Pour chaque transaction : afficher vendeur(s)/acheteur(s) déjà enregistrés (singulier si 1, pluriel sinon)
-                detail = []
-                if t.sellers and isinstance(t.sellers, list) and len(t.sellers) > 0:
-                    names_s = [e.get("name") for e in t.sellers if isinstance(e, dict) and e.get("name")]
-                    if names_s:
-                        label_s = "vendeur: " if len(names_s) == 1 else "vendeurs: "
-                        detail.append(f"{label_s}{', '.join(names_s)}")
-                    else:
-                        detail.append("vendeurs: (aucun)")
-                else:
-                    detail.append("vendeurs: (aucun)")
-                if t.buyers and isinstance(t.buyers, list) and len(t.buyers) > 0:
-                    names_b = [e.get("name") for e in t.buyers if isinstance(e, dict) and e.get("name")]
-                    if names_b:
-                        label_b = "acheteur: " if len(names_b) == 1 else "acheteurs: "
-                        detail.append(f"{label_b}{', '.join(names_b)}")
-                    else:
-                        detail.append("acheteurs: (aucun)")
-                else:
-                    detail.append("acheteurs: (aucun)")
-                lines.append(f"  - {num}: {t.name} — {addr} — statut: {t.status} — {' ; '.join(detail)}")
+                lines.append(lookup.transaction_line(t, _render_lea_transaction_line))
             # Pour la transaction la plus récente : détail vendeurs/acheteurs/prix pour ne pas redemander
             latest = re_list[0]
             detail_parts = []
@@ -458,7 +500,7 @@ async def get_lea_user_context(db: AsyncSession, user_id: int) -> str:
                     else:
                         lines.append(f"  → Formulaires OACIQ pour cette transaction : {total} formulaire(s). Codes : {', '.join(codes)}.")
             except Exception:
-                pass
+                complete = False
         else:
             lines.append("Transactions immobilières : aucune pour le moment. (L'utilisateur n'a pas encore de dossier.)")
 
@@ -480,8 +522,8 @@ async def get_lea_user_context(db: AsyncSession, user_id: int) -> str:
             lines.append("Dossiers portail client : aucun pour le moment.")
     except Exception as e:
         logger.warning(f"get_lea_user_context: {e}", exc_info=True)
-        return "Données plateforme : temporairement indisponibles. (Dire à l'utilisateur de réessayer dans un instant.)"
-    return "\n".join(lines)
+        return None, False
+    return "\n".join(lines), complete
 
 
 async def get_user_latest_transaction(db: AsyncSession, user_id: int):
@@ -642,7 +684,8 @@ def _geocode_geopy_sync(addr: str, limit: int = 5) -> Optional[dict]:
         geolocator = Nominatim(user_agent="ImmoAssist-Lea/1.0 (contact@immoassist.com)", timeout=10)
         locations = geolocator.geocode(addr, addressdetails=True, exactly_one=False, limit=limit)
     except (GeocoderTimedOut, GeocoderServiceError, Exception) as e:
-        logger.debug("Lea geopy geocode failed for %s: %s", addr[:50], e)
+        lea_geocoder.note_failure()
+        logger.debug(f"Lea geopy geocode failed for {addr[:50]}: {e}")
         return None
     if not locations:
         return None
@@ -674,13 +717,20 @@ def _geocode_geopy_sync(addr: str, limit: int = 5) -> Optional[dict]:
 
 
 async def _geocode_geopy(addr: str) -> Optional[dict]:
-    """Géocodage via geopy (Nominatim) en async (exécution dans un thread)."""
+    """Géocodage via geopy (Nominatim) en async (exécution dans un thread), en cache par adresse."""
     if not addr or len(addr.strip()) < 5:
         return None
+    return await lea_geocoder.resolve("geopy", addr.strip(), lambda: _geocode_geopy_uncached(addr.strip()))
+
+
+async def _geocode_geopy_uncached(addr: str) -> Optional[dict]:
+    """Appel geopy dans un thread (sans cache)."""
     try:
+        await lea_geocoder.throttle("nominatim")
         return await asyncio.to_thread(_geocode_geopy_sync, addr, 5)
     except Exception as e:
-        logger.debug("Lea geopy async geocode failed: %s", e)
+        lea_geocoder.note_failure()
+        logger.debug(f"Lea geopy async geocode failed: {e}")
         return None
 
 
@@ -689,12 +739,19 @@ async def _geocode_geocoder_ca(addr: str) -> Optional[dict]:
     Géocodage via geocoder.ca (données Canada à jour, meilleur pour codes postaux).
     Utilisé en priorité si disponible ; requêtes avec no-cache pour données fraîches.
     Option : GEOCODER_CA_AUTH pour compte (gratuit 2500/jour ou payant).
+    Le résultat est mis en cache par adresse normalisée (lea_geocoder), comme la validation.
     Retourne un dict avec postcode, city, state, country_code ou None.
     """
     if not addr or len(addr.strip()) < 5:
         return None
-    addr = _normalize_address_for_geocode(addr.strip())
-    url = "https://geocoder.ca"
+    return await lea_geocoder.resolve(
+        "geocoder_ca", addr.strip(), lambda: _geocode_geocoder_ca_uncached(addr.strip())
+    )
+
+
+async def _geocode_geocoder_ca_uncached(addr: str) -> Optional[dict]:
+    """Appel geocoder.ca (sans cache)."""
+    addr = _normalize_address_for_geocode(addr)
     params = {
         "locate": addr,
         "geoit": "xml",
@@ -707,15 +764,10 @@ async def _geocode_geocoder_ca(addr: str) -> Optional[dict]:
     auth = os.environ.get("GEOCODER_CA_AUTH", "").strip()
     if auth:
         params["auth"] = auth
-    headers = {
-        "User-Agent": "ImmoAssist-Lea/1.0 (contact@immoassist.com)",
-        **_GEOCODE_NO_CACHE_HEADERS,
-    }
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(url, params=params, headers=headers)
-            r.raise_for_status()
-            data = r.json()
+        data = await lea_geocoder.get_json(
+            "geocoder_ca", lea_geocoder.geocoder_ca_url, params, _GEOCODE_NO_CACHE_HEADERS
+        )
     except Exception as e:
         logger.debug(f"Lea geocoder.ca request failed for {addr[:50]}: {e}")
         return None
@@ -775,11 +827,19 @@ async def _validate_address_via_geocode(addr: str) -> Optional[dict]:
     2) geopy / Nominatim (OpenStreetMap) — gratuit, sans clé
     3) Nominatim HTTP direct
     Sans clé geocoder.ca, seuls Nominatim (2 et 3) sont utilisés. Les requêtes envoient no-cache pour données fraîches.
+    Le résultat est mis en cache par adresse normalisée (lea_geocoder) ; les validations
+    concurrentes d'une même adresse partagent le même calcul.
     Retourne un dict avec postcode, city, state (province), country_code pour que Léa puisse confirmer à l'utilisateur.
     """
     if not addr or len(addr.strip()) < 5:
         return None
-    addr_clean = addr.strip()
+    return await lea_geocoder.resolve(
+        "validate", addr.strip(), lambda: _validate_address_via_geocode_uncached(addr.strip())
+    )
+
+
+async def _validate_address_via_geocode_uncached(addr_clean: str) -> Optional[dict]:
+    """Chaîne de fallback geocoder.ca → geopy → Nominatim HTTP (sans cache)."""
     addr_lower = addr_clean.lower()
     has_city = "," in addr_clean or "montréal" in addr_lower or "montreal" in addr_lower or "québec" in addr_lower
 
@@ -894,19 +954,23 @@ async def _geocode_one(addr: str, limit: int = 5) -> Optional[dict]:
     """
     Appel Nominatim. Retourne le meilleur résultat pour les adresses québécoises.
     Avec limit>1, sélectionne le résultat le plus pertinent (même numéro civique, Montréal, Canada).
+    Le résultat est mis en cache par adresse normalisée (lea_geocoder) : Nominatim limite à 1 requête/s.
     """
+    if not addr or not addr.strip():
+        return None
+    return await lea_geocoder.resolve(
+        f"nominatim:{limit}", addr.strip(), lambda: _geocode_one_uncached(addr.strip(), limit)
+    )
+
+
+async def _geocode_one_uncached(addr: str, limit: int = 5) -> Optional[dict]:
+    """Appel Nominatim HTTP (sans cache)."""
     addr = _normalize_address_for_geocode(addr)
-    url = "https://nominatim.openstreetmap.org/search"
     params = {"q": addr.strip(), "format": "json", "addressdetails": 1, "limit": limit}
-    headers = {
-        "User-Agent": "ImmoAssist-Lea/1.0 (contact@immoassist.com)",
-        **_GEOCODE_NO_CACHE_HEADERS,
-    }
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.get(url, params=params, headers=headers)
-            r.raise_for_status()
-            data = r.json()
+        data = await lea_geocoder.get_json(
+            "nominatim", lea_geocoder.nominatim_url, params, _GEOCODE_NO_CACHE_HEADERS
+        )
     except Exception as e:
         logger.warning(f"Lea geocode address failed: {e}", exc_info=False)
         return None
@@ -1748,6 +1812,13 @@ async def apply_lea_price_from_assistant_content(
     return content
 
 
+_LEA_VOICE_ARTIFACT_RE = re.compile(r"\s+(?:vocal|local|locales?)\s+terminé.*$", re.I)
+_LEA_SHORT_DATE_REPLY_RE = re.compile(
+    r"\d{1,2}\s*(?:/|\s)\s*(?:\d{1,2}|(?:janvier|février|fevrier|mars|avril|mai|juin|juillet|août|aout|septembre|octobre|novembre|décembre|decembre))\s*(?:/|\s)\s*\d{4}",
+    re.I,
+)
+
+
 def _parse_french_date_from_message(message: str, last_assistant_message: Optional[str] = None) -> Optional[date]:
     """
     Parse une date en français dans le message (ex: "le 15 mars 2026", "15 mars 2026").
@@ -1756,46 +1827,19 @@ def _parse_french_date_from_message(message: str, last_assistant_message: Option
     """
     if not message or len(message.strip()) < 5:
         return None
-    t = message.strip()
-    # Nettoyer artefacts vocaux
-    t = re.sub(r"\s+(?:vocal|local|locales?)\s+terminé.*$", "", t, flags=re.I).strip()
+    parsed = extract_message_entities(message).date
+    if parsed:
+        return parsed
+    t = _LEA_VOICE_ARTIFACT_RE.sub("", message.strip()).strip()
     if len(t) < 5:
         return None
-    # Mois en français (avec et sans accents)
-    months = {
-        "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5,
-        "juin": 6, "juillet": 7, "août": 8, "aout": 8, "septembre": 9,
-        "octobre": 10, "novembre": 11, "décembre": 12, "decembre": 12,
-    }
-    # Pattern: (le)? 15 mars 2026 ou 15/03/2026
-    m = re.search(
-        r"(?:le\s+)?(\d{1,2})\s+(" + "|".join(months.keys()) + r")\s+(\d{4})",
-        t,
-        re.I,
-    )
-    if m:
-        day, month_name, year = int(m.group(1)), months.get(m.group(2).lower()), int(m.group(3))
-        if month_name and 1 <= day <= 31 and 2000 <= year <= 2100:
-            try:
-                return date(year, month_name, day)
-            except ValueError:
-                return None
-    # Format court 15/03/2026
-    m = re.search(r"(?:le\s+)?(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})", t)
-    if m:
-        day, month, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        if 1 <= day <= 31 and 1 <= month <= 12 and 2000 <= year <= 2100:
-            try:
-                return date(year, month, day)
-            except ValueError:
-                return None
     # Réponse très courte après une question sur la date (ex: "le 15 mars 2026" seul)
     last_lower = (last_assistant_message or "").strip().lower()
     if last_assistant_message and (
         "date de clôture" in last_lower or "date d'écriture" in last_lower
         or "date d écriture" in last_lower or "clôture prévue" in last_lower
     ):
-        if len(t) <= 50 and re.search(r"\d{1,2}\s*(?:/|\s)\s*(?:\d{1,2}|(?:janvier|février|fevrier|mars|avril|mai|juin|juillet|août|aout|septembre|octobre|novembre|décembre|decembre))\s*(?:/|\s)\s*\d{4}", t, re.I):
+        if len(t) <= 50 and _LEA_SHORT_DATE_REPLY_RE.search(t):
             return _parse_french_date_from_message(t, None)
     return None
 
@@ -3940,7 +3984,7 @@ async def persist_lea_messages(
     assistant_content: str,
     meta: Optional[dict] = None,
 ) -> None:
-    """Enregistre le message utilisateur et la réponse assistant dans LeaConversation."""
+    """Ajoute le message utilisateur et la réponse assistant à la conversation (table lea_messages)."""
     if not session_id:
         return
     try:
@@ -3957,8 +4001,7 @@ async def persist_lea_messages(
                 asst_msg["provider"] = meta["provider"]
             if meta.get("usage"):
                 asst_msg["usage"] = meta["usage"]
-        conv.messages = (conv.messages or []) + [user_msg, asst_msg]
-        conv.updated_at = datetime.utcnow()
+        await append_lea_messages(db, conv.id, [user_msg, asst_msg])
         await db.commit()
     except Exception as e:
         logger.warning(f"Lea persist messages failed: {e}", exc_info=True)
@@ -3979,12 +4022,16 @@ async def _synthesize_tts(text: str, voice: str | None = None, speed: float | No
     voice_name = raw if raw.lower() in LEA_TTS_FEMALE_VOICES else "shimmer"
     speed_val = speed if speed is not None else getattr(settings, "LEA_TTS_SPEED", 1.35)
     speed_val = max(0.25, min(2.0, float(speed_val)))
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    resp = await client.audio.speech.create(
-        model=model,
-        voice=voice_name,
-        input=text,
-        speed=speed_val,
+    pool = ai_client_registry.get("fake" if fake_provider_enabled() else "openai")
+    resp = await ai_client_registry.call(
+        pool,
+        "audio.speech",
+        lambda: pool.client.audio.speech.create(
+            model=model,
+            voice=voice_name,
+            input=text,
+            speed=speed_val,
+        ),
     )
     return resp.content
 
@@ -4042,6 +4089,98 @@ async def _call_external_agent_chat(message: str, session_id: str | None, conver
             )
 
 
+async def _lea_stage_link_requested(db: AsyncSession, r: dict) -> None:
+    if r["transaction_id"] and r["session_id"]:
+        await link_lea_session_to_transaction(db, r["user_id"], r["session_id"], r["transaction_id"])
+
+
+async def _lea_stage_route(db: AsyncSession, r: dict) -> Optional[dict]:
+    return await route_lea_turn(
+        db, r["user_id"], r["message"], r["last_assistant_message"], r["session_id"]
+    )
+
+
+async def _lea_stage_history(db: AsyncSession, r: dict) -> LeaHistory:
+    return await load_lea_history(db, r["user_id"], r["session_id"])
+
+
+async def _lea_stage_knowledge(db: Optional[AsyncSession], r: dict) -> str:
+    return await _load_lea_knowledge_async()
+
+
+async def _lea_stage_actions(db: AsyncSession, r: dict) -> Tuple[list, Optional[RealEstateTransaction]]:
+    return await run_lea_actions_from_orchestrator(
+        db, r["user_id"], r["message"], r["last_assistant_message"],
+        session_id=r["session_id"], router_decision=r["route"], routed=True,
+    )
+
+
+async def _lea_stage_link_created(db: AsyncSession, r: dict) -> None:
+    # Ne lier la session qu'à une transaction créée dans ce tour ou à celle passée par le client.
+    # Ne jamais lier à get_user_latest_transaction() : cela ferait écraser une transaction existante
+    # quand l'utilisateur démarre une nouvelle conversation pour en créer une autre.
+    action_lines, created_tx = r["actions"]
+    sid, user_id, transaction_id = r["session_id"], r["user_id"], r["transaction_id"]
+    if not (sid and action_lines):
+        return
+    tx_to_link = created_tx
+    if not tx_to_link and transaction_id:
+        res = await db.execute(
+            select(RealEstateTransaction).where(
+                and_(
+                    RealEstateTransaction.id == transaction_id,
+                    RealEstateTransaction.user_id == user_id,
+                )
+            )
+        )
+        tx_to_link = res.scalar_one_or_none()
+    if tx_to_link:
+        await link_lea_session_to_transaction(db, user_id, sid, tx_to_link.id)
+
+
+async def _lea_stage_user_context(db: AsyncSession, r: dict) -> str:
+    action_lines, _ = r["actions"]
+    user_context = await get_lea_user_context(db, r["user_id"])
+    if action_lines:
+        user_context += "\n\n--- Action effectuée ---\n" + "\n".join(action_lines)
+    return user_context
+
+
+# Tour Léa intégré : route (LLM), historique et base de connaissance en parallèle sur des
+# sessions dédiées (l'historique, en lecture seule, sur un réplica) ; actions puis contexte
+# utilisateur sur la session de la requête.
+LEA_TURN_PIPELINE = TurnPipeline([
+    TurnStage("link_requested", _lea_stage_link_requested),
+    TurnStage("route", _lea_stage_route, requires=("link_requested",), session="own"),
+    TurnStage("history", _lea_stage_history, session="read"),
+    TurnStage("knowledge", _lea_stage_knowledge, session=None),
+    TurnStage("actions", _lea_stage_actions, requires=("route",)),
+    TurnStage("link_created", _lea_stage_link_created, requires=("actions",)),
+    TurnStage("user_context", _lea_stage_user_context, requires=("link_created",)),
+])
+
+
+async def _run_lea_turn(
+    db: AsyncSession,
+    user_id: int,
+    message: str,
+    last_assistant_message: Optional[str],
+    session_id: str,
+    transaction_id: Optional[int],
+) -> TurnResult:
+    """Exécute le pipeline de tour Léa (actions, contexte, historique, connaissance)."""
+    return await LEA_TURN_PIPELINE.execute(
+        db,
+        {
+            "user_id": user_id,
+            "message": message,
+            "last_assistant_message": last_assistant_message,
+            "session_id": session_id,
+            "transaction_id": transaction_id,
+        },
+    )
+
+
 async def _stream_lea_sse(
     message: str,
     session_id: str | None,
@@ -4054,42 +4193,22 @@ async def _stream_lea_sse(
     """
     Génère les événements SSE pour le chat Léa intégré (streaming).
     Envoie immédiatement un premier octet (": ok" + status connecting) pour réduire le TTFB,
-    puis exécute run_lea_actions, get_lea_user_context, get_or_create_lea_conversation dans le générateur.
+    puis exécute le pipeline de tour (LEA_TURN_PIPELINE : route, actions, contexte, historique,
+    base de connaissance) dans le générateur.
+    Les deltas (confirmations fixes et LLM) sont regroupés en trames par SSEFrameWriter.
     """
     sid = session_id or str(uuid.uuid4())
-    yield ": ok\n\n"
-    yield f"data: {json.dumps({'status': 'connecting'})}\n\n"
+    writer = SSEFrameWriter()
+    yield SSE_COMMENT_OK
+    yield SSE_STATUS_CONNECTING
     try:
-        if transaction_id and sid:
-            await link_lea_session_to_transaction(db, user_id, sid, transaction_id)
-        action_lines, created_tx = await run_lea_actions_from_orchestrator(
-            db, user_id, message, last_assistant_message, session_id=sid
-        )
-        # Ne lier la session qu'à une transaction créée dans ce tour ou à celle passée par le client.
-        # Ne jamais lier à get_user_latest_transaction() : cela ferait écraser une transaction existante
-        # quand l'utilisateur démarre une nouvelle conversation pour en créer une autre.
-        if sid and action_lines:
-            tx_to_link = created_tx
-            if not tx_to_link and transaction_id:
-                r = await db.execute(
-                    select(RealEstateTransaction).where(
-                        and_(
-                            RealEstateTransaction.id == transaction_id,
-                            RealEstateTransaction.user_id == user_id,
-                        )
-                    )
-                )
-                tx_to_link = r.scalar_one_or_none()
-            if tx_to_link:
-                await link_lea_session_to_transaction(db, user_id, sid, tx_to_link.id)
-        # Charger contexte + conversation (même session) en parallèle avec la base de connaissance (cache/session dédiée)
-        knowledge_task = asyncio.create_task(_load_lea_knowledge_async())
-        user_context = await get_lea_user_context(db, user_id)
-        conv, sid = await get_or_create_lea_conversation(db, user_id, session_id)
-        lea_knowledge = await knowledge_task
-        if action_lines:
-            user_context += "\n\n--- Action effectuée ---\n" + "\n".join(action_lines)
-        messages_for_llm = build_llm_messages_from_history(conv.messages or [], message)
+        turn = await _run_lea_turn(db, user_id, message, last_assistant_message, sid, transaction_id)
+        action_lines, created_tx = turn["actions"]
+        user_context = turn["user_context"]
+        lea_knowledge = turn["knowledge"]
+        history = turn["history"]
+        messages_for_llm = build_llm_messages_from_history(history.messages, message)
+        knowledge = select_lea_knowledge(lea_knowledge, turn["route"])
         confirmation_text = None
         if created_tx and action_lines:
             # Le backend indique « Ne pose AUCUNE question — le dossier est terminé » : ne pas ajouter de question.
@@ -4105,12 +4224,13 @@ async def _stream_lea_sse(
         if not confirmation_text and _action_lines_contain_pa_form_complete(action_lines):
             confirmation_text = _build_pa_form_complete_response(action_lines)
         if confirmation_text:
-            for i in range(0, len(confirmation_text), 1):
-                yield f"data: {json.dumps({'delta': confirmation_text[i]})}\n\n"
+            for frame in writer.text_frames(confirmation_text):
+                yield frame
             payload = {"done": True, "session_id": sid}
             if action_lines:
                 payload["actions"] = action_lines
-            yield f"data: {json.dumps(payload)}\n\n"
+            yield writer.event(payload)
+            writer.log_metrics(sid)
             if sid:
                 await persist_lea_messages(
                     db, user_id, sid,
@@ -4120,18 +4240,25 @@ async def _stream_lea_sse(
             return
         settings = get_settings()
         system, _, _ = build_lea_context(
-            user_context, action_lines or [], knowledge=lea_knowledge
+            user_context, action_lines or [], knowledge=knowledge.stable,
+            conversation_summary=history.summary, domain_knowledge=knowledge.domain,
         )
+        log_prompt_budget(sid, knowledge, messages_for_llm, history.summary, user_context, system)
         service = AIService(provider=AIProvider.AUTO)
         messages = messages_for_llm
         accumulated = []
-        async for delta in service.stream_chat_completion(
-            messages=messages,
-            system_prompt=system or "",
-            max_tokens=getattr(settings, "LEA_MAX_TOKENS", 256),
-        ):
-            accumulated.append(delta)
-            yield f"data: {json.dumps({'delta': delta})}\n\n"
+
+        async def _llm_deltas():
+            async for delta in service.stream_chat_completion(
+                messages=messages,
+                system_prompt=system or "",
+                max_tokens=getattr(settings, "LEA_MAX_TOKENS", 256),
+            ):
+                accumulated.append(delta)
+                yield delta
+
+        async for frame in writer.stream(_llm_deltas()):
+            yield frame
         content = "".join(accumulated)
         content = await apply_lea_price_from_assistant_content(db, user_id, content)
         payload = {"done": True, "session_id": sid}
@@ -4143,7 +4270,8 @@ async def _stream_lea_sse(
             payload["provider"] = provider.value if hasattr(provider, "value") else str(provider)
         if model is not None:
             payload["model"] = model
-        yield f"data: {json.dumps(payload)}\n\n"
+        yield writer.event(payload)
+        writer.log_metrics(sid)
         if sid:
             await persist_lea_messages(
                 db, user_id, sid,
@@ -4152,9 +4280,12 @@ async def _stream_lea_sse(
             )
     except Exception as e:
         logger.error(f"Léa stream error: {e}", exc_info=True)
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
-        payload = {"done": True, "session_id": sid}
-        yield f"data: {json.dumps(payload)}\n\n"
+        pending = writer.flush()
+        if pending:
+            yield pending
+        yield writer.event({"error": str(e)})
+        yield writer.event({"done": True, "session_id": sid})
+        writer.log_metrics(sid)
 
 
 @router.post("/chat/stream")
@@ -4210,30 +4341,11 @@ async def lea_chat(
     if _use_integrated_lea():
         try:
             sid = body.session_id or str(uuid.uuid4())
-            if body.transaction_id and sid:
-                await link_lea_session_to_transaction(db, current_user.id, sid, body.transaction_id)
-            action_lines, created_tx = await run_lea_actions_from_orchestrator(
-                db, current_user.id, body.message, body.last_assistant_message, session_id=sid
+            turn = await _run_lea_turn(
+                db, current_user.id, body.message, body.last_assistant_message, sid, body.transaction_id
             )
-            # Ne lier la session qu'à une transaction créée dans ce tour ou à celle passée par le client.
-            # Ne jamais lier à get_user_latest_transaction() pour éviter d'écraser une transaction existante.
-            if sid and action_lines:
-                tx_to_link = created_tx
-                if not tx_to_link and body.transaction_id:
-                    r = await db.execute(
-                        select(RealEstateTransaction).where(
-                            and_(
-                                RealEstateTransaction.id == body.transaction_id,
-                                RealEstateTransaction.user_id == current_user.id,
-                            )
-                        )
-                    )
-                    tx_to_link = r.scalar_one_or_none()
-                if tx_to_link:
-                    await link_lea_session_to_transaction(db, current_user.id, sid, tx_to_link.id)
-            user_context = await get_lea_user_context(db, current_user.id)
-            if action_lines:
-                user_context += "\n\n--- Action effectuée ---\n" + "\n".join(action_lines)
+            action_lines, created_tx = turn["actions"]
+            user_context = turn["user_context"]
             # Quand une transaction vient d'être créée, renvoyer une confirmation directe (sans appeler l'IA). Ne pas poser de question — le dossier est terminé.
             if created_tx and action_lines:
                 ref = created_tx.dossier_number or f"#{created_tx.id}"
@@ -4276,13 +4388,15 @@ async def lea_chat(
                     usage={},
                     actions=action_lines,
                 )
-            # Charger l'historique pour le LLM
-            conv, sid = await get_or_create_lea_conversation(db, current_user.id, body.session_id)
-            messages_for_llm = build_llm_messages_from_history(conv.messages or [], body.message)
-            lea_knowledge = await _get_lea_knowledge_for_prompt(db)
+            # Historique et base de connaissance chargés en parallèle par le pipeline de tour
+            history = turn["history"]
+            messages_for_llm = build_llm_messages_from_history(history.messages, body.message)
+            knowledge = select_lea_knowledge(turn["knowledge"], turn["route"])
             system_prompt, _, _ = build_lea_context(
-                user_context, action_lines or [], knowledge=lea_knowledge
+                user_context, action_lines or [], knowledge=knowledge.stable,
+                conversation_summary=history.summary, domain_knowledge=knowledge.domain,
             )
+            log_prompt_budget(sid, knowledge, messages_for_llm, history.summary, user_context, system_prompt)
             settings = get_settings()
             service = AIService(provider=AIProvider.AUTO)
             result = await service.chat_completion(
@@ -4610,20 +4724,34 @@ async def list_lea_conversations_by_transaction(
 @router.get("/context", response_model=LeaContextResponse)
 async def get_lea_context(
     session_id: Optional[str] = Query(None, description="Session ID of the conversation to load"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Most recent messages to return (default: whole history)"
+    ),
     current_user: User = Depends(get_lea_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get Léa conversation context (messages). Used by loadConversation on the frontend.
+    Returns the whole history, or the `limit` most recent messages when given; message_count
+    is the conversation total and has_more tells whether older messages were left out.
     """
     try:
         lea_service = LeaService(db=db, user_id=current_user.id)
         conversation = await lea_service.get_or_create_conversation(session_id)
-        
+        if limit is None:
+            messages = await load_all_lea_messages(db, conversation.id)
+            return LeaContextResponse(
+                session_id=conversation.session_id,
+                message_count=len(messages),
+                messages=messages,
+            )
+
+        history = await load_lea_history(db, current_user.id, conversation.session_id, limit=limit)
         return LeaContextResponse(
             session_id=conversation.session_id,
-            message_count=len(conversation.messages or []),
-            messages=conversation.messages or []
+            message_count=history.total,
+            messages=history.messages,
+            has_more=history.total > len(history.messages),
         )
         
     except Exception as e:
@@ -4645,7 +4773,7 @@ async def reset_lea_context(
     """
     try:
         from app.models.lea_conversation import LeaConversation
-        from sqlalchemy import select, delete
+        from sqlalchemy import delete
         
         if session_id:
             # Delete specific conversation
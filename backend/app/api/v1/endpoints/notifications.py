@@ -7,7 +7,6 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.notification_service import NotificationService
-from app.models.user import User
 from app.models.notification import NotificationType
 from app.schemas.notification import (
     NotificationCreate,
@@ -16,7 +15,7 @@ from app.schemas.notification import (
     NotificationListResponse,
     NotificationUnreadCountResponse
 )
-from app.dependencies import get_current_user
+from app.dependencies import UserPrincipal, get_current_principal
 from app.core.database import get_db
 from app.core.logging import logger
 
@@ -32,9 +31,10 @@ router = APIRouter()
 async def get_notifications(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page)"),
     read: Optional[bool] = Query(None, description="Filter by read status"),
     notification_type: Optional[NotificationType] = Query(None, description="Filter by notification type"),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> NotificationListResponse:
     """
@@ -44,16 +44,28 @@ async def get_notifications(
     - **limit**: Maximum number of records to return (1-1000)
     - **read**: Filter by read status (true/false)
     - **notification_type**: Filter by notification type (info/success/warning/error)
+    - **cursor**: next_cursor of the previous page (keyset pagination, replaces skip)
     """
     service = NotificationService(db)
     
-    notifications = await service.get_user_notifications(
-        user_id=current_user.id,
-        skip=skip,
-        limit=limit,
-        read=read,
-        notification_type=notification_type
-    )
+    next_cursor = None
+    if skip == 0 or cursor:
+        page = await service.get_user_notifications_page(
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            read=read,
+            notification_type=notification_type
+        )
+        notifications, next_cursor = page.items, page.next_cursor
+    else:
+        notifications = await service.get_user_notifications(
+            user_id=current_user.id,
+            skip=skip,
+            limit=limit,
+            read=read,
+            notification_type=notification_type
+        )
     
     unread_count = await service.get_unread_count(current_user.id)
     
@@ -68,7 +80,8 @@ async def get_notifications(
         total=len(notification_responses),
         unread_count=unread_count,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 
@@ -79,7 +92,7 @@ async def get_notifications(
     tags=["notifications"]
 )
 async def get_unread_count(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> NotificationUnreadCountResponse:
     """Get count of unread notifications for the current user"""
@@ -100,7 +113,7 @@ async def get_unread_count(
 )
 async def get_notification(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> NotificationResponse:
     """Get a specific notification by ID (only if it belongs to the current user)"""
@@ -128,7 +141,7 @@ async def get_notification(
 )
 async def mark_notification_as_read(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> NotificationResponse:
     """Mark a notification as read"""
@@ -154,7 +167,7 @@ async def mark_notification_as_read(
     tags=["notifications"]
 )
 async def mark_all_notifications_as_read(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Mark all notifications as read for the current user"""
@@ -175,7 +188,7 @@ async def mark_all_notifications_as_read(
 )
 async def delete_notification(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a notification (only if it belongs to the current user)"""
@@ -201,7 +214,7 @@ async def delete_notification(
 )
 async def create_notification(
     notification_data: NotificationCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> NotificationResponse:
     """
@@ -12,6 +12,7 @@ from sqlalchemy import select, func
 from app.models.report import Report
 from app.models.user import User
 from app.dependencies import get_current_user, get_db
+from app.core.db_routing import get_read_db
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
 from app.core.tenancy_helpers import apply_tenant_scope
 from fastapi import Request
@@ -77,7 +78,7 @@ async def list_reports(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List all reports for the current user"""
     query = select(Report).where(Report.user_id == current_user.id)
@@ -108,7 +109,7 @@ async def get_report(
     report_id: int,
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get a report by ID"""
     query = select(Report).where(
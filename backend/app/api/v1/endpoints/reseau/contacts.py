@@ -7,7 +7,7 @@ contacts logic to avoid code duplication while maintaining isolation.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, Request, UploadFile, File, Request
+from fastapi import APIRouter, Depends, Query, Request, Response, UploadFile, File, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -26,20 +26,24 @@ router = APIRouter(prefix="/reseau/contacts", tags=["reseau-contacts"])
 @router.get("/", response_model=List[ContactSchema])
 async def list_contacts(
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     circle: Optional[str] = Query(None),
     company_id: Optional[int] = Query(None),
 ):
     """Get list of contacts for network module"""
     return await commercial_contacts.list_contacts(
         request=request,
+        response=response,
         db=db,
         current_user=current_user,
         skip=skip,
         limit=limit,
+        cursor=cursor,
         circle=circle,
         company_id=company_id,
     )
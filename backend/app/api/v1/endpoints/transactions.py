@@ -14,6 +14,7 @@ from decimal import Decimal
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.keyset_pagination import keyset_paginate, page_total
 from app.dependencies import get_current_user
 from app.models import User, RealEstateTransaction, RealEstateContact, TransactionContact
 from app.models.contact import Contact
@@ -84,6 +85,7 @@ async def handle_database_error(e: Exception, operation: str = "operation", db:
 async def list_transactions(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor of the previous page); replaces skip"),
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by status"),
     transaction_kind: Optional[str] = Query(None, alias="transaction_kind", description="Filter by pipeline type: vente, achat"),
     search: Optional[str] = Query(None, description="Search in dossier number, address, city"),
@@ -93,6 +95,7 @@ async def list_transactions(
     """
     Get list of real estate transactions for the current user.
     Returns all matching transactions (up to limit); no single-transaction restriction.
+    Pass the returned next_cursor as `cursor` to fetch the following page.
     """
     try:
         query = select(RealEstateTransaction).where(
@@ -118,16 +121,29 @@ async def list_transactions(
                 )
             )
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
-        
-        # Apply pagination and ordering
-        query = query.order_by(RealEstateTransaction.created_at.desc()).offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        transactions = result.scalars().all()
+        next_cursor = None
+        if skip == 0 or cursor:
+            # Keyset pagination: every page seeks on (created_at, id)
+            page = await keyset_paginate(
+                db,
+                query,
+                [RealEstateTransaction.created_at],
+                RealEstateTransaction.id,
+                limit,
+                cursor=cursor,
+            )
+            transactions = page.items
+            next_cursor = page.next_cursor
+            total = await page_total(db, query, cursor)
+        else:
+            # Legacy offset pagination
+            count_query = select(func.count()).select_from(query.subquery())
+            total_result = await db.execute(count_query)
+            total = total_result.scalar() or 0
+            
+            query = query.order_by(RealEstateTransaction.created_at.desc()).offset(skip).limit(limit)
+            result = await db.execute(query)
+            transactions = result.scalars().all()
         
         return RealEstateTransactionListResponse(
             transactions=[
@@ -136,8 +152,11 @@ async def list_transactions(
             total=total,
             skip=skip,
             limit=limit,
+            next_cursor=next_cursor,
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         await handle_database_error(e, "listing transactions", db)
 
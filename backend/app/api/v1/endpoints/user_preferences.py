@@ -10,8 +10,7 @@ from pydantic import BaseModel
 from sqlalchemy.exc import ProgrammingError, OperationalError
 
 from app.services.user_preference_service import UserPreferenceService
-from app.models.user import User
-from app.dependencies import get_current_user
+from app.dependencies import UserPrincipal, get_current_principal
 from app.core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.logging import logger
@@ -72,7 +71,7 @@ class PreferencesDictResponse(BaseModel):
 
 @router.get("/preferences", tags=["user-preferences"])
 async def get_all_preferences(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Get all preferences for the current user"""
@@ -119,7 +118,7 @@ async def get_all_preferences(
 @router.get("/preferences/{key}", tags=["user-preferences"])
 async def get_preference(
     key: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Get a specific preference for the current user"""
@@ -153,7 +152,7 @@ async def get_preference(
 async def set_preference(
     key: str,
     preference_data: PreferenceUpdate = Body(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Set a preference for the current user"""
@@ -183,7 +182,7 @@ async def set_preference(
 @router.put("/preferences", tags=["user-preferences"])
 async def set_preferences(
     preferences: Dict[str, Any] = Body(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Set multiple preferences at once"""
@@ -207,7 +206,7 @@ async def set_preferences(
 @router.delete("/preferences/{key}", tags=["user-preferences"])
 async def delete_preference(
     key: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Delete a specific preference"""
@@ -227,7 +226,7 @@ async def delete_preference(
 
 @router.delete("/preferences", tags=["user-preferences"])
 async def delete_all_preferences(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Delete all preferences for the current user"""
@@ -242,7 +241,7 @@ async def delete_all_preferences(
 
 @router.get("/preferences/notifications", tags=["user-preferences"])
 async def get_notification_preferences(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Get notification preferences for the current user"""
@@ -305,7 +304,7 @@ async def get_notification_preferences(
 @router.put("/preferences/notifications", tags=["user-preferences"])
 async def update_notification_preferences(
     preference_data: PreferenceUpdate = Body(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ) -> Response:
     """Update notification preferences for the current user"""
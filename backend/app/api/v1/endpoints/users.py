@@ -12,6 +12,7 @@ from sqlalchemy import select, and_, or_
 import json
 
 from app.core.database import get_db
+from app.core.keyset_pagination import keyset_paginate, page_total
 from app.core.pagination import PaginationParams, paginate_query, PaginatedResponse, get_pagination_params
 from app.core.query_optimization import QueryOptimizer
 from app.core.cache_enhanced import cache_query
@@ -86,14 +87,26 @@ async def list_users(
     
     # Paginate query with separate count query to avoid issues with eager loading
     try:
-        # First, get the count
-        count_result = await db.execute(count_query)
-        total = count_result.scalar_one() or 0
-        
-        # Then, get the paginated items (without eager loading to avoid issues)
-        paginated_query = query.offset(pagination.offset).limit(pagination.limit)
-        result = await db.execute(paginated_query)
-        users = result.scalars().all()
+        next_cursor, has_next = None, None
+        if pagination.cursor or pagination.page == 1:
+            # Keyset pagination on (created_at, id); cursor pages use the planner estimate
+            page = await keyset_paginate(
+                db, query, [User.created_at], User.id, pagination.page_size, cursor=pagination.cursor
+            )
+            users, next_cursor, has_next = page.items, page.next_cursor, page.has_more
+            if pagination.cursor:
+                total = await page_total(db, query, pagination.cursor)
+            else:
+                total = (await db.execute(count_query)).scalar_one() or 0
+        else:
+            # First, get the count
+            count_result = await db.execute(count_query)
+            total = count_result.scalar_one() or 0
+            
+            # Then, get the paginated items (without eager loading to avoid issues)
+            paginated_query = query.offset(pagination.offset).limit(pagination.limit)
+            result = await db.execute(paginated_query)
+            users = result.scalars().all()
         
         # Convert SQLAlchemy User objects to UserResponse schemas
         user_responses = []
@@ -127,13 +140,17 @@ async def list_users(
             total=total,
             page=pagination.page,
             page_size=pagination.page_size,
+            next_cursor=next_cursor,
+            has_next=has_next,
+            cursor=pagination.cursor,
         )
-        # Convert to JSONResponse for slowapi compatibility
         # Use model_dump with mode='json' to ensure datetime serialization
         return JSONResponse(
             content=paginated_response.model_dump(mode='json'),
             status_code=200
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error paginating users query: {e}", exc_info=True)
         import traceback
@@ -143,7 +160,9 @@ async def list_users(
             query_fallback = select(User).order_by(User.created_at.desc())
             if filters:
                 query_fallback = query_fallback.where(and_(*filters))
-            paginated_result = await paginate_query(db, query_fallback, pagination, count_query=count_query)
+            paginated_result = await paginate_query(
+                db, query_fallback, pagination, count_query=count_query, keyset=[User.created_at, User.id]
+            )
             # Convert to UserResponse with individual error handling
             user_responses = []
             for user in paginated_result.items:
@@ -174,10 +193,12 @@ async def list_users(
             paginated_response = PaginatedResponse.create(
                 items=user_responses,
                 total=paginated_result.total,
-                page=paginated_result.page,
+                page=pagination.page,
                 page_size=paginated_result.page_size,
+                next_cursor=paginated_result.next_cursor,
+                has_next=paginated_result.has_next,
+                cursor=pagination.cursor,
             )
-            # Convert to JSONResponse for slowapi compatibility
             # Use model_dump with mode='json' to ensure datetime serialization
             return JSONResponse(
                 content=paginated_response.model_dump(mode='json'),
@@ -193,7 +214,6 @@ async def list_users(
                     page=pagination.page,
                     page_size=pagination.page_size,
                 )
-                # Convert to JSONResponse for slowapi compatibility
                 # Use model_dump with mode='json' to ensure datetime serialization
                 return JSONResponse(
                     content=paginated_response.model_dump(mode='json'),
@@ -415,7 +435,6 @@ async def update_current_user(
                 detail="Failed to update user profile",
             ) from serialize_err
 
-        # Return JSONResponse for slowapi compatibility (rate limit headers can be added)
         return JSONResponse(content=payload, media_type="application/json")
 
         
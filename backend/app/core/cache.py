@@ -1,12 +1,30 @@
 ﻿"""
 Redis Cache Configuration
 Cache backend pour améliorer les performances
-Utilise MessagePack pour sérialisation binaire rapide
+Utilise MessagePack pour sérialisation binaire rapide (codecs : app.core.cache_codecs)
+
+Deux niveaux : un cache L1 en mémoire du processus (LRU + TTL, borné en entrées et en octets)
+devant Redis (L2), pour les préfixes déclarés dans L1_PREFIX_POLICIES (thème actif, plans...).
+Les écritures et suppressions sont diffusées aux autres workers via Redis pub/sub
+(canal L1_INVALIDATION_CHANNEL) pour qu'ils évincent leur copie L1.
+
+Protection contre l'effet de meute (get_or_compute, utilisé par @cached) : un seul calcul
+par clé et par processus, un verrou Redis entre processus, expiration anticipée
+probabiliste (XFetch) et mode stale-while-revalidate optionnel.
+
+Index de tags : un ensemble Redis « tagset:<tag> » par tag contient les clés qui en dépendent ;
+ajout et invalidation sont atomiques (scripts Lua), voir tag_keys / invalidate_tags.
 """
 
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
 from typing import Optional, Any
-import json
-import zlib
+import asyncio
+import math
+import random
+import time
+import uuid
 from functools import wraps
 import hashlib
 
@@ -17,24 +35,192 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
-try:
-    import msgpack
-    MSGPACK_AVAILABLE = True
-except ImportError:
-    MSGPACK_AVAILABLE = False
-    msgpack = None
-
+from app.core import cache_codecs
+from app.core.cache_codecs import MSGPACK_AVAILABLE
 from app.core.config import settings
 from app.core.logging import logger
 
+L1_INVALIDATION_CHANNEL = "cache:l1:invalidate"
+
+# Libère le verrou seulement s'il appartient encore à ce détenteur
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+TAG_KEY_PREFIX = "tagset:"
+
+# KEYS = ensembles de tags, ARGV[1] = clé mise en cache, ARGV[2] = TTL (s).
+# Le TTL de l'ensemble est prolongé pour couvrir celui de la clé la plus récente.
+_TAG_ADD_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+for _, tag in ipairs(KEYS) do
+    redis.call("sadd", tag, ARGV[1])
+    if redis.call("ttl", tag) < ttl then
+        redis.call("expire", tag, ttl)
+    end
+end
+return #KEYS
+"""
+
+# KEYS = ensembles de tags. Supprime les clés membres puis les ensembles ;
+# retourne {nombre de clés supprimées, membres}.
+_TAG_INVALIDATE_SCRIPT = """
+local deleted = 0
+local members = {}
+for _, tag in ipairs(KEYS) do
+    local keys = redis.call("smembers", tag)
+    for i = 1, #keys, 500 do
+        deleted = deleted + redis.call("del", unpack(keys, i, math.min(i + 499, #keys)))
+    end
+    for _, key in ipairs(keys) do
+        members[#members + 1] = key
+    end
+    redis.call("del", tag)
+end
+return {deleted, members}
+"""
+
+
+@dataclass(frozen=True)
+class L1Policy:
+    """
+    Politique L1 d'un préfixe de clé.
+    ttl : durée max en mémoire (bornée aussi par le TTL Redis restant).
+    shared : l'objet décodé est partagé entre appelants (valeurs en lecture seule) ;
+    sinon L1 garde la charge utile sérialisée non compressée et chaque lecture la décode.
+    """
+
+    ttl: int
+    shared: bool = False
+
+
+# Préfixes éligibles au cache L1 (le plus long préfixe correspondant l'emporte)
+L1_PREFIX_POLICIES: dict[str, L1Policy] = {
+    "theme:": L1Policy(ttl=60, shared=True),
+    "themes:": L1Policy(ttl=60, shared=True),
+    "plans:": L1Policy(ttl=300, shared=True),
+}
+
+# Compteurs par niveau (L1 mémoire, L2 Redis)
+CACHE_STATS: dict[str, int] = {
+    "l1_hits": 0,
+    "l1_misses": 0,
+    "l2_hits": 0,
+    "l2_misses": 0,
+    "l1_evictions": 0,
+    "l1_invalidations": 0,
+    "coalesced": 0,
+    "lock_waits": 0,
+    "early_refreshes": 0,
+    "stale_served": 0,
+}
+
+
+def get_cache_stats() -> dict[str, Any]:
+    """Compteurs et taux de succès par niveau, occupation du L1."""
+    stats: dict[str, Any] = dict(CACHE_STATS)
+    for tier in ("l1", "l2"):
+        lookups = CACHE_STATS[f"{tier}_hits"] + CACHE_STATS[f"{tier}_misses"]
+        stats[f"{tier}_hit_ratio"] = round(CACHE_STATS[f"{tier}_hits"] / lookups, 4) if lookups else None
+    l1 = cache_backend.l1
+    stats["l1_entries"] = len(l1) if l1 is not None else 0
+    stats["l1_bytes"] = l1.size_bytes if l1 is not None else 0
+    return stats
+
+
+def register_l1_prefix(prefix: str, ttl: int, shared: bool = False) -> None:
+    """Déclare un préfixe de clé éligible au cache L1."""
+    L1_PREFIX_POLICIES[prefix] = L1Policy(ttl=ttl, shared=shared)
+
+
+def l1_policy_for(key: str) -> Optional[L1Policy]:
+    """Politique L1 de la clé (préfixe le plus long), None si non éligible."""
+    best: Optional[str] = None
+    for prefix in L1_PREFIX_POLICIES:
+        if key.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return L1_PREFIX_POLICIES[best] if best is not None else None
+
+
+class L1Cache:
+    """Cache en mémoire du processus : LRU + TTL, borné en nombre d'entrées et en octets."""
+
+    def __init__(self, max_entries: int, max_bytes: int, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        # clé -> (expiration, taille, valeur, partagée)
+        self._entries: "OrderedDict[str, tuple[float, int, Any, bool]]" = OrderedDict()
+        self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[tuple[Any, bool]]:
+        """(valeur ou charge utile, partagée) si présente et non expirée."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value, shared = entry
+        if expires_at <= self._clock():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value, shared
+
+    def set(self, key: str, value: Any, size: int, ttl: float, shared: bool) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            self.delete(key)
+            return
+        self._drop(key)
+        self._entries[key] = (self._clock() + ttl, size, value, shared)
+        self.size_bytes += size
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            CACHE_STATS["l1_evictions"] += 1
+
+    def delete(self, key: str) -> bool:
+        return self._drop(key)
+
+    def delete_matching(self, pattern: str) -> int:
+        """Supprime les clés correspondant au pattern glob (même syntaxe que SCAN MATCH)."""
+        keys = [k for k in self._entries if fnmatchcase(k, pattern)]
+        for k in keys:
+            self._drop(k)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size_bytes -= entry[1]
+        return True
+
 
 class CacheBackend:
     """Backend de cache abstrait"""
     
-    def __init__(self):
+    def __init__(self, l1: Optional[L1Cache] = None):
         self.redis_client: Optional[redis.Redis] = None
         self.use_redis = REDIS_AVAILABLE and hasattr(settings, 'REDIS_URL')
         self.use_msgpack = MSGPACK_AVAILABLE
+        self.serializer = "msgpack" if self.use_msgpack else "json"
+        self.compressor = cache_codecs.resolve_compressor(settings.CACHE_COMPRESSOR)
+        if settings.CACHE_ZSTD_DICTIONARY_PATH and self.compressor == "zstd":
+            cache_codecs.load_zstd_dictionary(settings.CACHE_ZSTD_DICTIONARY_PATH)
+        if l1 is None and settings.CACHE_L1_ENABLED:
+            l1 = L1Cache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_MAX_BYTES)
+        self.l1 = l1
+        self.instance_id = uuid.uuid4().hex
+        self._l1_listener: Optional[asyncio.Task] = None
         
         if self.use_redis and settings.REDIS_URL:
             try:
@@ -49,32 +235,68 @@ class CacheBackend:
                 logger.warning(f"Failed to initialize Redis: {e}")
                 self.use_redis = False
     
+    def _serialize(self, value: Any) -> bytes:
+        """Charge utile non compressée (en-tête codec + corps)."""
+        return cache_codecs.encode(value, self.serializer, "none")[0]
+
+    def _deserialize(self, payload: bytes) -> Any:
+        return cache_codecs.decode(payload)
+
+    def _encode(self, key: str, value: Any, compress: bool) -> tuple[bytes, bytes]:
+        """(charge utile non compressée, valeur stockée dans Redis éventuellement compressée)"""
+        payload, stored = cache_codecs.encode(
+            value,
+            self.serializer,
+            self.compressor if compress else "none",
+            settings.CACHE_COMPRESS_MIN_BYTES,
+        )
+        if stored is not payload:
+            logger.debug(f"Cache compressed ({self.compressor}): {key}, original: {len(payload)}, compressed: {len(stored)}")
+        return payload, stored
+
+    @staticmethod
+    def _payload(value: bytes) -> bytes:
+        """Charge utile non compressée (valeurs historiques « zlib: » comprises)."""
+        return cache_codecs.decompress(value)
+
+    def _l1_store(self, key: str, policy: L1Policy, payload: bytes, value: Any, ttl: float) -> None:
+        if self.l1 is not None:
+            self.l1.set(key, value if policy.shared else payload, len(payload), ttl, policy.shared)
+
     async def get(self, key: str) -> Optional[Any]:
-        """Récupérer une valeur du cache avec décompression automatique"""
+        """Récupérer une valeur du cache (L1 mémoire puis Redis) avec décompression automatique"""
         if not self.use_redis or not self.redis_client:
             return None
         
+        policy = l1_policy_for(key) if self.l1 is not None else None
+        if policy is not None:
+            entry = self.l1.get(key)
+            if entry is not None:
+                CACHE_STATS["l1_hits"] += 1
+                value, shared = entry
+                return value if shared else self._deserialize(value)
+            CACHE_STATS["l1_misses"] += 1
+
         try:
-            value = await self.redis_client.get(key)
+            if policy is not None:
+                # Valeur et TTL restant en un aller-retour : la copie L1 n'expire jamais après Redis
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                value, pttl = await pipe.execute()
+            else:
+                value = await self.redis_client.get(key)
             if not value:
+                CACHE_STATS["l2_misses"] += 1
                 return None
+            CACHE_STATS["l2_hits"] += 1
             
-            # Vérifier si compressé (préfixe binaire)
-            if value.startswith(b"zlib:"):
-                # DÃ©compresser
-                compressed = value[len(b"zlib:"):]
-                decompressed = zlib.decompress(compressed)
-                # Désérialiser avec MessagePack ou JSON
-                if self.use_msgpack:
-                    return msgpack.unpackb(decompressed, raw=False)
-                else:
-                    return json.loads(decompressed.decode('utf-8'))
-            else:
-                # Non compressé, désérialiser directement
-                if self.use_msgpack:
-                    return msgpack.unpackb(value, raw=False)
-                else:
-                    return json.loads(value.decode('utf-8'))
+            payload = self._payload(value)
+            result = self._deserialize(payload)
+            if policy is not None:
+                ttl = policy.ttl if pttl is None or pttl < 0 else min(policy.ttl, pttl / 1000)
+                self._l1_store(key, policy, payload, result, ttl)
+            return result
         except Exception as e:
             logger.error(f"Cache get error: {e}")
         return None
@@ -85,22 +307,14 @@ class CacheBackend:
             return False
         
         try:
-            # Sérialiser avec MessagePack (plus rapide) ou JSON (fallback)
-            if self.use_msgpack:
-                serialized = msgpack.packb(value, default=str, use_bin_type=True)
-            else:
-                serialized = json.dumps(value, default=str).encode('utf-8')
-            
-            # Compresser si activé et si la valeur est grande (>1KB)
-            if compress and len(serialized) > 1024:
-                compressed = zlib.compress(serialized)
-                # Ajouter un préfixe binaire pour indiquer la compression
-                final_value = b"zlib:" + compressed
-                logger.debug(f"Cache compressed: {key}, original: {len(serialized)}, compressed: {len(compressed)}")
-            else:
-                final_value = serialized
-            
+            serialized, final_value = self._encode(key, value, compress)
             await self.redis_client.setex(key, expire, final_value)
+            policy = l1_policy_for(key) if self.l1 is not None else None
+            if policy is not None:
+                # Copie L1 (objet décodé seulement pour les préfixes partagés)
+                shared_value = self._deserialize(serialized) if policy.shared else None
+                self._l1_store(key, policy, serialized, shared_value, min(policy.ttl, expire))
+                await self._publish_invalidation("k", key)
             return True
         except Exception as e:
             logger.error(f"Cache set error: {e}")
@@ -112,14 +326,200 @@ class CacheBackend:
             return False
         
         try:
+            if self.l1 is not None and self.l1.delete(key):
+                CACHE_STATS["l1_invalidations"] += 1
             await self.redis_client.delete(key)
+            if self.l1 is not None and l1_policy_for(key) is not None:
+                await self._publish_invalidation("k", key)
             return True
         except Exception as e:
             logger.error(f"Cache delete error: {e}")
             return False
     
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """
+        Récupérer plusieurs clés en un aller-retour Redis (MGET, + PTTL des clés éligibles L1).
+        Retourne {clé: valeur} pour les seules clés trouvées.
+        """
+        if not self.use_redis or not self.redis_client or not keys:
+            return {}
+
+        found: dict[str, Any] = {}
+        policies: dict[str, L1Policy] = {}
+        remaining: list[str] = []
+        for key in dict.fromkeys(keys):
+            policy = l1_policy_for(key) if self.l1 is not None else None
+            if policy is not None:
+                entry = self.l1.get(key)
+                if entry is not None:
+                    CACHE_STATS["l1_hits"] += 1
+                    value, shared = entry
+                    found[key] = value if shared else self._deserialize(value)
+                    continue
+                CACHE_STATS["l1_misses"] += 1
+                policies[key] = policy
+            remaining.append(key)
+        if not remaining:
+            return found
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.mget(remaining)
+            eligible = [key for key in remaining if key in policies]
+            for key in eligible:
+                pipe.pttl(key)
+            values, *pttls = await pipe.execute()
+            ttls = dict(zip(eligible, pttls))
+
+            for key, raw in zip(remaining, values):
+                if not raw:
+                    CACHE_STATS["l2_misses"] += 1
+                    continue
+                CACHE_STATS["l2_hits"] += 1
+                payload = self._payload(raw)
+                found[key] = self._deserialize(payload)
+                policy = policies.get(key)
+                if policy is not None:
+                    pttl = ttls.get(key)
+                    ttl = policy.ttl if pttl is None or pttl < 0 else min(policy.ttl, pttl / 1000)
+                    self._l1_store(key, policy, payload, found[key], ttl)
+        except Exception as e:
+            logger.error(f"Cache get_many error: {e}")
+        return found
+
+    async def set_many(self, mapping: dict[str, Any], expire: int = 300, compress: bool = True) -> bool:
+        """Stocker plusieurs valeurs en un aller-retour Redis (pipeline SETEX)."""
+        if not self.use_redis or not self.redis_client or not mapping:
+            return False
+
+        try:
+            encoded = {key: self._encode(key, value, compress) for key, value in mapping.items()}
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, (_, final_value) in encoded.items():
+                pipe.setex(key, expire, final_value)
+            policies = {}
+            if self.l1 is not None:
+                policies = {key: l1_policy_for(key) for key in encoded}
+                policies = {key: policy for key, policy in policies.items() if policy is not None}
+            # Invalidations L1 des autres workers dans le même pipeline
+            for key in policies:
+                pipe.publish(L1_INVALIDATION_CHANNEL, f"{self.instance_id}|k|{key}")
+            await pipe.execute()
+            for key, policy in policies.items():
+                serialized = encoded[key][0]
+                shared_value = self._deserialize(serialized) if policy.shared else None
+                self._l1_store(key, policy, serialized, shared_value, min(policy.ttl, expire))
+            return True
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            return False
+
+    async def delete_many(self, keys: list[str]) -> int:
+        """Supprimer plusieurs clés en un aller-retour (UNLINK, libération mémoire non bloquante)."""
+        if not self.use_redis or not self.redis_client or not keys:
+            return 0
+
+        try:
+            keys = list(dict.fromkeys(keys))
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.unlink(*keys)
+            if self.l1 is not None:
+                for key in keys:
+                    if self.l1.delete(key):
+                        CACHE_STATS["l1_invalidations"] += 1
+                    if l1_policy_for(key) is not None:
+                        pipe.publish(L1_INVALIDATION_CHANNEL, f"{self.instance_id}|k|{key}")
+            deleted, *_ = await pipe.execute()
+            return int(deleted)
+        except Exception as e:
+            logger.error(f"Cache delete_many error: {e}")
+            return 0
+
+    async def incr(self, key: str) -> Optional[int]:
+        """Incrémenter un compteur entier (tampon de version). None si Redis indisponible."""
+        if not self.use_redis or not self.redis_client:
+            return None
+
+        try:
+            return int(await self.redis_client.incr(key))
+        except Exception as e:
+            logger.error(f"Cache incr error: {e}")
+            return None
+
+    async def get_counters(self, *keys: str) -> Optional[list[int]]:
+        """Lire plusieurs compteurs entiers en un aller-retour (0 si absent). None si Redis indisponible."""
+        if not self.use_redis or not self.redis_client:
+            return None
+
+        try:
+            values = await self.redis_client.mget(keys)
+            return [int(v) if v else 0 for v in values]
+        except Exception as e:
+            logger.error(f"Cache get_counters error: {e}")
+            return None
+
+    async def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """
+        Verrou distribué « lock:<key> » (SET NX PX).
+        Retourne un jeton si acquis, None s'il est détenu ailleurs.
+        Sans Redis (ou Redis en erreur), le verrou est considéré acquis pour ne pas bloquer le calcul.
+        """
+        token = uuid.uuid4().hex
+        if not self.use_redis or not self.redis_client:
+            return token
+
+        try:
+            acquired = await self.redis_client.set(f"lock:{key}", token, nx=True, px=int(ttl * 1000))
+            return token if acquired else None
+        except Exception as e:
+            logger.warning(f"Cache lock error: {e}")
+            return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Libérer un verrou acquis par acquire_lock (sans effet s'il a expiré et changé de main)."""
+        if not self.use_redis or not self.redis_client:
+            return
+
+        try:
+            await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+        except Exception as e:
+            logger.warning(f"Cache unlock error: {e}")
+
+    async def tag_keys(self, key: str, tags: list[str], expire: int) -> bool:
+        """Rattacher une clé à des tags (ensembles Redis, ajout atomique en un aller-retour)."""
+        if not self.use_redis or not self.redis_client or not tags:
+            return False
+
+        try:
+            tag_keys = [TAG_KEY_PREFIX + tag for tag in dict.fromkeys(tags)]
+            await self.redis_client.eval(_TAG_ADD_SCRIPT, len(tag_keys), *tag_keys, key, int(expire))
+            return True
+        except Exception as e:
+            logger.error(f"Cache tag error: {e}")
+            return False
+
+    async def invalidate_tags(self, tags: list[str]) -> int:
+        """Supprimer toutes les clés rattachées à ces tags (atomique). Retourne le nombre de clés supprimées."""
+        if not self.use_redis or not self.redis_client or not tags:
+            return 0
+
+        try:
+            tag_keys = [TAG_KEY_PREFIX + tag for tag in dict.fromkeys(tags)]
+            deleted, members = await self.redis_client.eval(_TAG_INVALIDATE_SCRIPT, len(tag_keys), *tag_keys)
+            if self.l1 is not None:
+                for member in members:
+                    key = member.decode("utf-8") if isinstance(member, bytes) else member
+                    if l1_policy_for(key) is not None:
+                        if self.l1.delete(key):
+                            CACHE_STATS["l1_invalidations"] += 1
+                        await self._publish_invalidation("k", key)
+            return int(deleted)
+        except Exception as e:
+            logger.error(f"Cache invalidate_tags error: {e}")
+            return 0
+
     async def clear_pattern(self, pattern: str) -> int:
-        """Supprimer toutes les clés correspondant à un pattern (non-bloquant avec SCAN)"""
+        """Supprimer toutes les clés correspondant à un pattern (non-bloquant : SCAN + UNLINK par lots)"""
         if not self.use_redis or not self.redis_client:
             return 0
         
@@ -132,35 +532,271 @@ class CacheBackend:
                 cursor, keys = await self.redis_client.scan(
                     cursor=cursor,
                     match=pattern,
-                    count=100  # Traiter par batch de 100
+                    count=500  # Traiter par batch de 500
                 )
                 
                 if keys:
-                    deleted_count += await self.redis_client.delete(*keys)
+                    # UNLINK : la mémoire est libérée en arrière-plan par Redis
+                    deleted_count += await self.redis_client.unlink(*keys)
                 
                 if cursor == 0:  # SCAN terminé
                     break
             
+            # L1 vidé après Redis : une relecture concurrente ne peut plus y remettre l'ancienne valeur
+            if self.l1 is not None:
+                CACHE_STATS["l1_invalidations"] += self.l1.delete_matching(pattern)
+                await self._publish_invalidation("p", pattern)
             return deleted_count
         except Exception as e:
             logger.error(f"Cache clear_pattern error: {e}")
         return 0
 
+    # --- Invalidation L1 entre workers (Redis pub/sub) ---
+
+    async def _publish_invalidation(self, kind: str, target: str) -> None:
+        """Diffuse « k » (clé) ou « p » (pattern) aux autres processus."""
+        try:
+            await self.redis_client.publish(
+                L1_INVALIDATION_CHANNEL, f"{self.instance_id}|{kind}|{target}"
+            )
+        except Exception as e:
+            logger.warning(f"Cache L1 invalidation publish error: {e}")
+
+    def apply_invalidation(self, message: Any) -> None:
+        """Applique un message d'invalidation reçu (ignore ceux émis par ce processus)."""
+        if self.l1 is None:
+            return
+        if isinstance(message, bytes):
+            message = message.decode("utf-8", errors="replace")
+        origin, _, rest = str(message).partition("|")
+        kind, _, target = rest.partition("|")
+        if origin == self.instance_id or not target:
+            return
+        if kind == "k":
+            removed = int(self.l1.delete(target))
+        elif kind == "p":
+            removed = self.l1.delete_matching(target)
+        else:
+            return
+        CACHE_STATS["l1_invalidations"] += removed
+
+    async def _listen_invalidations(self) -> None:
+        delay = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.redis_client.pubsub()
+                await pubsub.subscribe(L1_INVALIDATION_CHANNEL)
+                # Des messages ont pu être perdus pendant la (re)connexion
+                self.l1.clear()
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.apply_invalidation(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache L1 invalidation listener error: {e}")
+                self.l1.clear()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        close = getattr(pubsub, "aclose", None) or pubsub.close
+                        await close()
+                    except Exception:
+                        pass
+
+    def start_l1_invalidation_listener(self) -> None:
+        """Démarre l'abonnement aux invalidations L1 (sans effet sans Redis ou sans L1)."""
+        if self.l1 is None or not self.use_redis or not self.redis_client:
+            return
+        if self._l1_listener is None or self._l1_listener.done():
+            self._l1_listener = asyncio.create_task(
+                self._listen_invalidations(), name="cache:l1:invalidations"
+            )
+
+    async def stop_l1_invalidation_listener(self) -> None:
+        task, self._l1_listener = self._l1_listener, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
 
 # Instance globale
 cache_backend = CacheBackend()
 
 
+# --- Protection contre l'effet de meute (cache stampede) ---
+
+STAMPEDE_LOCK_TTL = 30  # Durée max du verrou Redis de recalcul (secondes)
+STAMPEDE_WAIT_TIMEOUT = 5.0  # Attente max du calcul d'un autre processus avant de recalculer soi-même
+STAMPEDE_POLL_INTERVAL = 0.05
+
+# Enveloppe stockée quand l'expiration anticipée ou le SWR est actif :
+# v = valeur, d = durée du calcul (s), x = fin de fraîcheur (epoch)
+_ENVELOPE_MARK = "__swr__"
+
+_inflight: dict[str, asyncio.Task] = {}
+_background_refreshes: set[asyncio.Task] = set()
+
+
+def _unwrap(raw: Any) -> tuple[Any, Optional[float], Optional[float]]:
+    if isinstance(raw, dict) and raw.get(_ENVELOPE_MARK) == 1:
+        return raw.get("v"), raw.get("d"), raw.get("x")
+    return raw, None, None
+
+
+def _start_flight(key: str, factory) -> asyncio.Task:
+    """Calcul unique par clé dans ce processus (les appels concurrents partagent la tâche)."""
+    task = _inflight.get(key)
+    if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+        CACHE_STATS["coalesced"] += 1
+        return task
+    task = asyncio.ensure_future(factory())
+    _inflight[key] = task
+
+    def _done(t: asyncio.Task) -> None:
+        if _inflight.get(key) is t:
+            del _inflight[key]
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def _compute_and_store(
+    backend: CacheBackend,
+    key: str,
+    compute,
+    expire: int,
+    compress: bool,
+    stale_ttl: int,
+    envelope: bool,
+    wait: bool,
+    lock_timeout: float,
+) -> Any:
+    token = await backend.acquire_lock(key, STAMPEDE_LOCK_TTL)
+    if token is None:
+        if not wait:
+            # Rafraîchissement déjà en cours dans un autre processus
+            return None
+        CACHE_STATS["lock_waits"] += 1
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(STAMPEDE_POLL_INTERVAL)
+            raw = await backend.get(key)
+            if raw is not None:
+                return _unwrap(raw)[0]
+        # Détenteur lent ou disparu : calculer sans verrou
+        logger.warning(f"Cache lock wait timed out: {key}")
+
+    try:
+        started = time.perf_counter()
+        value = await compute()
+        if envelope:
+            wrapped = {
+                _ENVELOPE_MARK: 1,
+                "v": value,
+                "d": round(time.perf_counter() - started, 4),
+                "x": time.time() + expire,
+            }
+            await backend.set(key, wrapped, expire + stale_ttl, compress)
+        else:
+            await backend.set(key, value, expire, compress)
+        return value
+    finally:
+        if token is not None:
+            await backend.release_lock(key, token)
+
+
+def _log_refresh_result(task: asyncio.Task) -> None:
+    _background_refreshes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Cache background refresh error: {task.exception()}")
+
+
+async def get_or_compute(
+    key: str,
+    compute,
+    expire: int = 300,
+    *,
+    backend: Optional[CacheBackend] = None,
+    compress: bool = True,
+    beta: float = 0.0,
+    stale_ttl: int = 0,
+    lock_timeout: float = STAMPEDE_WAIT_TIMEOUT,
+) -> Any:
+    """
+    Lire une clé ou la calculer une seule fois (compute : fonction async sans argument).
+
+    - Les ratés concurrents d'un même processus partagent un seul calcul ;
+      entre processus, un verrou Redis désigne le calculateur et les autres attendent sa valeur.
+    - beta > 0 : expiration anticipée probabiliste (XFetch) ; plus le calcul est long et
+      l'échéance proche, plus un appelant a de chances de recalculer avant expiration.
+    - stale_ttl > 0 : stale-while-revalidate ; la valeur reste servie stale_ttl secondes après
+      expiration pendant qu'une tâche de fond la recalcule. compute s'exécute alors hors de la
+      requête : il ne doit pas dépendre de ressources liées à la requête (session DB injectée...).
+    Sans beta ni stale_ttl, la valeur est stockée telle quelle (format historique).
+    """
+    if backend is None:
+        backend = cache_backend
+    envelope = beta > 0 or stale_ttl > 0
+
+    def _flight(wait: bool):
+        return lambda: _compute_and_store(
+            backend, key, compute, expire, compress, stale_ttl, envelope, wait, lock_timeout
+        )
+
+    raw = await backend.get(key)
+    if raw is not None:
+        value, delta, fresh_until = _unwrap(raw)
+        if fresh_until is None:
+            return value
+        now = time.time()
+        if now >= fresh_until:
+            # Valeur périmée mais encore tolérée (SWR) : servir et rafraîchir en arrière-plan
+            CACHE_STATS["stale_served"] += 1
+            if key not in _inflight:
+                task = _start_flight(key, _flight(wait=False))
+                _background_refreshes.add(task)
+                task.add_done_callback(_log_refresh_result)
+            return value
+        if beta > 0 and delta and now - delta * beta * math.log(1.0 - random.random()) >= fresh_until:
+            CACHE_STATS["early_refreshes"] += 1
+            if stale_ttl > 0:
+                if key not in _inflight:
+                    task = _start_flight(key, _flight(wait=False))
+                    _background_refreshes.add(task)
+                    task.add_done_callback(_log_refresh_result)
+                return value
+            # Recalcul dans la requête ; si un autre processus s'en charge, garder la valeur courante
+            refreshed = await asyncio.shield(_start_flight(key, _flight(wait=False)))
+            return value if refreshed is None else refreshed
+        return value
+
+    return await asyncio.shield(_start_flight(key, _flight(wait=True)))
+
+
 def cache_key(*args, **kwargs) -> str:
     """Générer une clé de cache à partir d'arguments"""
     key_data = f"{args}:{sorted(kwargs.items())}"
     return hashlib.md5(key_data.encode()).hexdigest()
 
 
-def cached(expire: int = 300, key_prefix: str = ""):
+def cached(expire: int = 300, key_prefix: str = "", beta: float = 0.0, stale_ttl: int = 0):
     """
     Décorateur pour mettre en cache le résultat d'une fonction
     
+    Les ratés concurrents sont regroupés (un seul calcul). beta > 0 recalcule la
+    valeur un peu avant expiration et stale_ttl active le stale-while-revalidate
+    (réservé aux fonctions sans session DB de requête), voir get_or_compute. Les
+    deux sont opt-in : ils stockent une enveloppe que les versions déjà déployées
+    ne savent pas lire ; par défaut la valeur est stockée telle quelle.
+    
     Usage:
         @cached(expire=600, key_prefix="users")
         async def get_users():
@@ -172,20 +808,19 @@ def cached(expire: int = 300, key_prefix: str = ""):
             # Générer la clé de cache
             cache_key_str = f"{key_prefix}:{func.__name__}:{cache_key(*args, **kwargs)}"
             
-            # VÃ©rifier le cache
-            cached_value = await cache_backend.get(cache_key_str)
-            if cached_value is not None:
-                logger.debug(f"Cache hit: {cache_key_str}")
-                return cached_value
-            
-            # Exécuter la fonction
-            logger.debug(f"Cache miss: {cache_key_str}")
-            result = await func(*args, **kwargs)
+            async def compute():
+                logger.debug(f"Cache miss: {cache_key_str}")
+                return await func(*args, **kwargs)
             
             # Mettre en cache (compression automatique si > 1KB)
-            await cache_backend.set(cache_key_str, result, expire, compress=True)
-            
-            return result
+            return await get_or_compute(
+                cache_key_str,
+                compute,
+                expire,
+                backend=cache_backend,
+                beta=beta,
+                stale_ttl=stale_ttl,
+            )
         
         # Ajouter mÃ©thode d'invalidation
         async def invalidate(*args, **kwargs):
@@ -237,6 +872,7 @@ async def invalidate_cache_pattern_async(pattern: str) -> int:
 async def init_cache():
     """Initialiser le cache"""
     if cache_backend.use_redis:
+        cache_backend.start_l1_invalidation_listener()
         logger.info("Cache backend ready")
     else:
         logger.warning("Cache backend not available (Redis not configured)")
@@ -244,6 +880,7 @@ async def init_cache():
 
 async def close_cache():
     """Fermer les connexions cache"""
+    await cache_backend.stop_l1_invalidation_listener()
     if cache_backend.redis_client:
         await cache_backend.redis_client.close()
         logger.info("Cache connections closed")
@@ -0,0 +1,274 @@
+"""
+Codecs des valeurs du cache (sérialisation + compression)
+
+Format stocké : en-tête de 4 octets puis le corps.
+    0xC1 | version | id sérialiseur | id compresseur | [id dictionnaire (4 octets)] | corps
+0xC1 n'est jamais émis par MessagePack et n'est pas un caractère JSON : les valeurs
+écrites avant les codecs (MessagePack ou JSON brut, préfixe « zlib: ») restent lisibles.
+
+Sérialiseurs : « msgpack » (types étendus datetime/date/time/Decimal/UUID restitués tels quels)
+et « json » (repli sans msgpack, types non JSON convertis en texte).
+Compresseurs : « none », « zlib », « zstd » et « lz4 » si les paquets optionnels
+zstandard / lz4 sont installés ; zstd accepte un dictionnaire entraîné sur des valeurs types
+(register_zstd_dictionary) pour les petits JSON répétitifs.
+"""
+
+import json
+import struct
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+    lz4_frame = None
+
+from app.core.logging import logger
+
+CODEC_MARKER = 0xC1
+CODEC_VERSION = 1
+_HEADER = struct.Struct(">BBBB")
+_DICT_ID = struct.Struct(">I")
+_LEGACY_ZLIB_PREFIX = b"zlib:"
+
+
+class CodecError(ValueError):
+    """Valeur de cache illisible (codec inconnu, dictionnaire absent, en-tête invalide)."""
+
+
+@dataclass(frozen=True)
+class Serializer:
+    id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+@dataclass(frozen=True)
+class Compressor:
+    id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+SERIALIZERS: dict[str, Serializer] = {}
+COMPRESSORS: dict[str, Compressor] = {}
+_SERIALIZERS_BY_ID: dict[int, Serializer] = {}
+_COMPRESSORS_BY_ID: dict[int, Compressor] = {}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    SERIALIZERS[serializer.name] = serializer
+    _SERIALIZERS_BY_ID[serializer.id] = serializer
+
+
+def register_compressor(compressor: Compressor) -> None:
+    COMPRESSORS[compressor.name] = compressor
+    _COMPRESSORS_BY_ID[compressor.id] = compressor
+
+
+# --- Sérialiseurs ---
+
+# Types étendus MessagePack
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_TIME = 3
+_EXT_DECIMAL = 4
+_EXT_UUID = 5
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, time):
+        return msgpack.ExtType(_EXT_TIME, obj.isoformat().encode())
+    if isinstance(obj, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(obj).encode())
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    # Comportement historique pour les autres types (Enum, objets...) : texte
+    return str(obj)
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_TIME:
+        return time.fromisoformat(data.decode())
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(payload: bytes) -> Any:
+    return json.loads(payload.decode("utf-8"))
+
+
+register_serializer(Serializer(2, "json", _json_dumps, _json_loads))
+if MSGPACK_AVAILABLE:
+    register_serializer(Serializer(
+        1,
+        "msgpack",
+        lambda value: msgpack.packb(value, default=_msgpack_default, use_bin_type=True),
+        lambda payload: msgpack.unpackb(payload, raw=False, ext_hook=_msgpack_ext_hook),
+    ))
+
+
+# --- Compresseurs ---
+
+register_compressor(Compressor(0, "none", lambda data: data, lambda data: data))
+register_compressor(Compressor(1, "zlib", zlib.compress, zlib.decompress))
+if ZSTD_AVAILABLE:
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+    register_compressor(Compressor(2, "zstd", _zstd_compressor.compress, _zstd_decompressor.decompress))
+if LZ4_AVAILABLE:
+    register_compressor(Compressor(3, "lz4", lz4_frame.compress, lz4_frame.decompress))
+
+# zstd avec dictionnaire : l'id du dictionnaire suit l'en-tête
+_ZSTD_DICT_COMPRESSOR_ID = 4
+ZSTD_DICTIONARIES: dict[int, tuple[Any, Any]] = {}  # id -> (compresseur, décompresseur)
+_active_zstd_dictionary: Optional[int] = None
+
+
+def train_zstd_dictionary(samples: list[bytes], dict_size: int = 16 * 1024) -> bytes:
+    """Entraîne un dictionnaire zstd sur des charges utiles sérialisées représentatives."""
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard is not installed")
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+
+def register_zstd_dictionary(dictionary: bytes, activate: bool = True) -> int:
+    """
+    Charge un dictionnaire zstd (tous les workers doivent charger les mêmes pour relire les valeurs).
+    activate : les prochaines valeurs compressées en zstd utilisent ce dictionnaire.
+    """
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard is not installed")
+    global _active_zstd_dictionary
+    zdict = zstandard.ZstdCompressionDict(dictionary)
+    dict_id = zdict.dict_id()
+    ZSTD_DICTIONARIES[dict_id] = (
+        zstandard.ZstdCompressor(level=3, dict_data=zdict),
+        zstandard.ZstdDecompressor(dict_data=zdict),
+    )
+    if activate:
+        _active_zstd_dictionary = dict_id
+    return dict_id
+
+
+def load_zstd_dictionary(path: str) -> Optional[int]:
+    """Charge le dictionnaire configuré (CACHE_ZSTD_DICTIONARY_PATH) ; None si indisponible."""
+    try:
+        with open(path, "rb") as f:
+            return register_zstd_dictionary(f.read())
+    except Exception as e:
+        logger.warning(f"Cache zstd dictionary not loaded ({path}): {e}")
+        return None
+
+
+# --- Encodage / décodage ---
+
+def resolve_compressor(name: str) -> str:
+    """Nom de compresseur utilisable (repli sur zlib si le paquet optionnel manque)."""
+    if name in COMPRESSORS:
+        return name
+    logger.warning(f"Cache compressor '{name}' unavailable, falling back to zlib")
+    return "zlib"
+
+
+def encode(
+    value: Any,
+    serializer: str = "msgpack",
+    compressor: str = "zlib",
+    min_size: int = 1024,
+) -> tuple[bytes, bytes]:
+    """
+    Encode une valeur. Retourne (charge utile non compressée, valeur à stocker).
+    La charge utile (en-tête sans compression) est celle que garde le cache L1.
+    """
+    codec = SERIALIZERS.get(serializer) or SERIALIZERS["json"]
+    body = codec.dumps(value)
+    payload = _HEADER.pack(CODEC_MARKER, CODEC_VERSION, codec.id, 0) + body
+    if compressor == "none" or len(body) <= min_size:
+        return payload, payload
+    if compressor == "zstd" and _active_zstd_dictionary is not None:
+        zstd_compressor, _ = ZSTD_DICTIONARIES[_active_zstd_dictionary]
+        header = _HEADER.pack(CODEC_MARKER, CODEC_VERSION, codec.id, _ZSTD_DICT_COMPRESSOR_ID)
+        return payload, header + _DICT_ID.pack(_active_zstd_dictionary) + zstd_compressor.compress(body)
+    comp = COMPRESSORS[compressor]
+    return payload, _HEADER.pack(CODEC_MARKER, CODEC_VERSION, codec.id, comp.id) + comp.compress(body)
+
+
+def decompress(stored: bytes) -> bytes:
+    """Valeur stockée -> charge utile non compressée (format historique conservé tel quel)."""
+    if not stored or stored[0] != CODEC_MARKER:
+        if stored.startswith(_LEGACY_ZLIB_PREFIX):
+            return zlib.decompress(stored[len(_LEGACY_ZLIB_PREFIX):])
+        return stored
+    if len(stored) < _HEADER.size:
+        raise CodecError("Truncated cache header")
+    _, version, serializer_id, compressor_id = _HEADER.unpack_from(stored)
+    if version != CODEC_VERSION:
+        raise CodecError(f"Unsupported cache codec version {version}")
+    if compressor_id == 0:
+        return stored
+    body = stored[_HEADER.size:]
+    if compressor_id == _ZSTD_DICT_COMPRESSOR_ID:
+        (dict_id,) = _DICT_ID.unpack_from(body)
+        if dict_id not in ZSTD_DICTIONARIES:
+            raise CodecError(f"Unknown zstd dictionary {dict_id}")
+        body = ZSTD_DICTIONARIES[dict_id][1].decompress(body[_DICT_ID.size:])
+    else:
+        comp = _COMPRESSORS_BY_ID.get(compressor_id)
+        if comp is None:
+            raise CodecError(f"Unknown cache compressor id {compressor_id}")
+        body = comp.decompress(body)
+    return _HEADER.pack(CODEC_MARKER, CODEC_VERSION, serializer_id, 0) + body
+
+
+def decode(payload: bytes) -> Any:
+    """Charge utile non compressée -> valeur."""
+    if payload and payload[0] == CODEC_MARKER:
+        codec = _SERIALIZERS_BY_ID.get(payload[2])
+        if codec is None:
+            raise CodecError(f"Unknown cache serializer id {payload[2]}")
+        return codec.loads(payload[_HEADER.size:])
+    # Valeurs historiques : MessagePack brut, ou JSON si msgpack était absent à l'écriture
+    if MSGPACK_AVAILABLE:
+        try:
+            return msgpack.unpackb(payload, raw=False)
+        except Exception:
+            pass
+    return _json_loads(payload)
@@ -9,7 +9,10 @@ import hashlib
 import json
 import asyncio
 
-from app.core.cache import cache_backend, CacheBackend
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache_backend, CacheBackend, get_or_compute
+from app.core.commit_hooks import CommitHook, register_commit_hook, run_in_background
 from app.core.logging import logger
 
 
@@ -26,38 +29,44 @@ class EnhancedCache:
         expire: int = 300,
         compress: bool = True,
         *args,
+        beta: float = 0.0,
+        stale_ttl: int = 0,
         **kwargs
     ) -> Any:
         """
         Get value from cache or set it using callable
         
+        Concurrent misses for the same key share a single computation in this
+        process and a Redis lock elects one computing process across workers.
+        
         Args:
             key: Cache key
             callable_fn: Function to call if cache miss
             expire: Cache expiration in seconds
             compress: Whether to compress large values
+            beta: Probabilistic early expiration factor (0 disables it)
+            stale_ttl: Seconds a stale value may still be served while it is
+                refreshed in the background (0 disables stale-while-revalidate)
             *args, **kwargs: Arguments to pass to callable_fn
         
         Returns:
             Cached or computed value
         """
-        # Try to get from cache
-        cached_value = await self.cache.get(key)
-        if cached_value is not None:
-            logger.debug(f"Cache hit: {key}")
-            return cached_value
-        
-        # Cache miss - compute value
-        logger.debug(f"Cache miss: {key}")
-        if asyncio.iscoroutinefunction(callable_fn):
-            value = await callable_fn(*args, **kwargs)
-        else:
-            value = callable_fn(*args, **kwargs) if args or kwargs else callable_fn()
-        
-        # Store in cache
-        await self.cache.set(key, value, expire, compress)
-        
-        return value
+        async def compute():
+            logger.debug(f"Cache miss: {key}")
+            if asyncio.iscoroutinefunction(callable_fn):
+                return await callable_fn(*args, **kwargs)
+            return callable_fn(*args, **kwargs) if args or kwargs else callable_fn()
+        
+        return await get_or_compute(
+            key,
+            compute,
+            expire,
+            backend=self.cache,
+            compress=compress,
+            beta=beta,
+            stale_ttl=stale_ttl,
+        )
     
     async def cache_query_result(
         self,
@@ -69,6 +78,9 @@ class EnhancedCache:
         """
         Cache database query result with tags for invalidation
         
+        Tag membership is kept in Redis sets (one per tag) updated atomically,
+        so concurrent writers never lose each other's entries.
+        
         Args:
             query_hash: Hash of the query
             result: Query result to cache
@@ -82,13 +94,10 @@ class EnhancedCache:
         success = await self.cache.set(f"query:{query_hash}", result, expire)
         
         # Store tags for invalidation
+        if tags:
+            QUERY_CACHE_TAGS.update(tags)
         if tags and success:
-            for tag in tags:
-                tag_key = f"tag:{tag}"
-                existing_queries = await self.cache.get(tag_key) or []
-                if query_hash not in existing_queries:
-                    existing_queries.append(query_hash)
-                    await self.cache.set(tag_key, existing_queries, expire=86400)  # 24h
+            await self.cache.tag_keys(f"query:{query_hash}", tags, expire)
         
         return success
     
@@ -102,8 +111,10 @@ class EnhancedCache:
         Returns:
             Number of cache entries invalidated
         """
-        invalidated = 0
+        invalidated = await self.cache.invalidate_tags(tags)
         
+        # Legacy list-based indexes ("tag:<name>", msgpack list of hashes) written
+        # by previous releases; they expire after 24h and can then be dropped
         for tag in tags:
             tag_key = f"tag:{tag}"
             query_hashes = await self.cache.get(tag_key) or []
@@ -112,8 +123,8 @@ class EnhancedCache:
                 if await self.cache.delete(f"query:{query_hash}"):
                     invalidated += 1
             
-            # Clear tag
-            await self.cache.delete(tag_key)
+            if query_hashes:
+                await self.cache.delete(tag_key)
         
         return invalidated
     
@@ -151,13 +162,19 @@ def cache_query(expire: int = 300, tags: Optional[list[str]] = None):
     
     Args:
         expire: Cache expiration in seconds
-        tags: Optional tags for cache invalidation
+        tags: Optional tags for cache invalidation; model classes are
+            replaced by their table name and invalidated automatically
+            when rows of that model are committed
     
     Usage:
         @cache_query(expire=600, tags=["users"])
+        @cache_query(expire=60, tags=[Contact, Company])
         async def get_users():
             ...
     """
+    resolved_tags = resolve_tags(tags)
+    QUERY_CACHE_TAGS.update(resolved_tags)
+    
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -179,7 +196,7 @@ def cache_query(expire: int = 300, tags: Optional[list[str]] = None):
                 query_hash,
                 result,
                 expire,
-                tags,
+                resolved_tags,
             )
             
             return result
@@ -195,3 +212,80 @@ def cache_query(expire: int = 300, tags: Optional[list[str]] = None):
         return wrapper
     return decorator
 
+
+
+# --- Model-level auto-tagging ---
+#
+# Every ORM model is tagged with its table name. Inserts, updates and deletes
+# committed through a Session invalidate the cached queries tagged with the
+# tables they touched (e.g. @cache_query(tags=[Contact]) -> "contacts").
+# Only tags some cached query uses are invalidated (declared when @cache_query
+# decorates its function, i.e. at import in every worker): commits touching
+# no cached table schedule no Redis round trip.
+
+# Extra tags invalidated on writes to a model (in addition to its table name)
+MODEL_CACHE_TAGS: dict[type, tuple[str, ...]] = {}
+
+# Tags attached to cached queries (or registered for a model) in this process
+QUERY_CACHE_TAGS: set[str] = set()
+
+_background_invalidations: set[asyncio.Task] = set()
+
+
+def register_model_tags(model: type, *tags: str) -> None:
+    """Declare extra cache tags invalidated when rows of `model` are written"""
+    MODEL_CACHE_TAGS[model] = MODEL_CACHE_TAGS.get(model, ()) + tags
+    QUERY_CACHE_TAGS.update(tags)
+
+
+def model_cache_tags(model: type) -> set[str]:
+    """Cache tags of a model: its table name plus registered extra tags"""
+    tags = set()
+    table = getattr(model, "__tablename__", None)
+    if table:
+        tags.add(table)
+    for cls in model.__mro__:
+        tags.update(MODEL_CACHE_TAGS.get(cls, ()))
+    return tags
+
+
+def resolve_tags(tags: Optional[list]) -> list[str]:
+    """Normalize tags given as strings or model classes"""
+    resolved: list[str] = []
+    for tag in tags or []:
+        resolved.extend(sorted(model_cache_tags(tag)) if isinstance(tag, type) else [tag])
+    return list(dict.fromkeys(resolved))
+
+
+def _collect_model_cache_tags(session: Session, obj: Any, is_new: bool) -> set[str]:
+    return model_cache_tags(type(obj)) & QUERY_CACHE_TAGS
+
+
+def _collect_bulk_write_cache_tags(orm_execute_state: Any) -> set[str]:
+    # ORM-enabled insert()/update()/delete() statements bypass the unit of work
+    if orm_execute_state.bind_mapper is None:
+        return set()
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        return model_cache_tags(orm_execute_state.bind_mapper.class_) & QUERY_CACHE_TAGS
+    return set()
+
+
+async def _invalidate_tags_in_background(tags: list[str]) -> None:
+    try:
+        await enhanced_cache.cache.invalidate_tags(tags)
+    except Exception as e:
+        # Nobody awaits this task: log instead of losing the error
+        logger.error(f"Model cache tag invalidation failed: {e}", context={"tags": tags})
+
+
+def _invalidate_model_cache_tags(session: Session, tags: set[str]) -> None:
+    if tags and enhanced_cache.cache.use_redis:
+        run_in_background(_background_invalidations, _invalidate_tags_in_background, sorted(tags))
+
+
+register_commit_hook(CommitHook(
+    name="model_cache_tags",
+    collect=_collect_model_cache_tags,
+    collect_statement=_collect_bulk_write_cache_tags,
+    on_commit=_invalidate_model_cache_tags,
+))
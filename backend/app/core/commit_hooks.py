@@ -0,0 +1,144 @@
+"""
+Session commit hooks
+
+Several caches derive state from the rows a transaction writes: model cache tags
+(cache_enhanced), RBAC permission versions (permission_cache), authenticated
+principals (principal_cache), the Léa user context (lea_chat.user_context_cache)
+and the read-your-writes window of replica routing (db_routing).
+
+Instead of each of them listening to every Session event, this module registers
+one set of listeners:
+- after_flush: walks session.new / dirty / deleted once and asks every hook
+  what the touched objects mean for it;
+- do_orm_execute: forwards ORM insert()/update()/delete() statements (which
+  bypass the unit of work) to the hooks;
+- after_commit: hands each hook the items it collected during the transaction;
+- after_rollback: discards them.
+
+Collected items live in session.info until the transaction ends.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+
+_PENDING_INFO_KEY = "commit_hooks_pending"
+
+
+@dataclass(frozen=True, eq=False)
+class CommitHook:
+    """Reaction of one cache to the writes of a transaction"""
+
+    name: str
+    # (session, obj, is_new) -> items to remember for this transaction
+    collect: Callable[[Session, Any, bool], Iterable[Any]]
+    # (session, items) -> None, after commit when items were collected
+    on_commit: Callable[[Session, set], None]
+    # ORM write statement (insert/update/delete) -> items to remember
+    collect_statement: Optional[Callable[[Any], Iterable[Any]]] = None
+    # (session) -> None, each time new items were collected
+    on_collect: Optional[Callable[[Session], None]] = None
+    # (session, items) -> None, after rollback when items were collected
+    on_rollback: Optional[Callable[[Session, set], None]] = None
+
+
+_hooks: list[CommitHook] = []
+
+
+def register_commit_hook(hook: CommitHook) -> CommitHook:
+    """Register `hook` (a later registration under the same name replaces it)"""
+    _hooks[:] = [h for h in _hooks if h.name != hook.name]
+    _hooks.append(hook)
+    return hook
+
+
+def pending_items(session: Any, name: str) -> set:
+    """Items collected by hook `name` in the session's current transaction"""
+    return session.info.get(_PENDING_INFO_KEY, {}).get(name, set())
+
+
+def run_in_background(
+    tasks: set[asyncio.Task], func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+) -> Optional[asyncio.Task]:
+    """Schedule func(*args, **kwargs) from a synchronous Session event; no-op without a running loop"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    task = loop.create_task(func(*args, **kwargs))
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return task
+
+
+def _add_pending(session: Session, collected: dict[CommitHook, set]) -> None:
+    pending: dict[str, set] = session.info.setdefault(_PENDING_INFO_KEY, {})
+    for hook, items in collected.items():
+        pending.setdefault(hook.name, set()).update(items)
+        if hook.on_collect is not None:
+            hook.on_collect(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_objects(session: Session, flush_context: Any) -> None:
+    if not _hooks:
+        return
+    touched = [(obj, True) for obj in session.new]
+    touched += [(obj, False) for obj in (*session.dirty, *session.deleted)]
+    collected: dict[CommitHook, set] = {}
+    for hook in _hooks:
+        items: set = set()
+        for obj, is_new in touched:
+            items.update(hook.collect(session, obj, is_new))
+        if items:
+            collected[hook] = items
+    _add_pending(session, collected)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_write_statement(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_select:
+        return
+    collected: dict[CommitHook, set] = {}
+    for hook in _hooks:
+        if hook.collect_statement is None:
+            continue
+        items = set(hook.collect_statement(orm_execute_state))
+        if items:
+            collected[hook] = items
+    _add_pending(orm_execute_state.session, collected)
+
+
+def _dispatch(session: Session, pending: dict[str, set], committed: bool) -> None:
+    for hook in list(_hooks):
+        items = pending.get(hook.name)
+        callback = hook.on_commit if committed else hook.on_rollback
+        if not items or callback is None:
+            continue
+        try:
+            callback(session, items)
+        except Exception as e:
+            # The transaction is over: one failing cache must not starve the others
+            logger.error(
+                f"Commit hook failed: {e}",
+                context={"hook": hook.name, "committed": committed},
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INFO_KEY, None)
+    if pending:
+        _dispatch(session, pending, committed=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _run_rollback_hooks(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INFO_KEY, None)
+    if pending:
+        _dispatch(session, pending, committed=False)
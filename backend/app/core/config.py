@@ -175,6 +175,84 @@ class Settings(BaseSettings):
         default="",
         description="Redis connection URL for caching",
     )
+    CACHE_L1_ENABLED: bool = Field(
+        default=True,
+        description="In-process L1 cache in front of Redis (prefixes listed in L1_PREFIX_POLICIES)",
+    )
+    CACHE_L1_MAX_ENTRIES: int = Field(
+        default=2048,
+        ge=1,
+        le=1_000_000,
+        description="Maximum number of L1 cache entries (LRU)",
+    )
+    CACHE_L1_MAX_BYTES: int = Field(
+        default=16 * 1024 * 1024,
+        ge=1024,
+        description="Maximum L1 cache size in bytes (serialized payloads)",
+    )
+    CACHE_COMPRESSOR: str = Field(
+        default="zlib",
+        description="Compressor for large cached values: none, zlib, zstd or lz4 (zstd/lz4 need the optional zstandard/lz4 packages)",
+    )
+    CACHE_COMPRESS_MIN_BYTES: int = Field(
+        default=1024,
+        ge=0,
+        description="Cached values larger than this (serialized) are compressed",
+    )
+    CACHE_ZSTD_DICTIONARY_PATH: Optional[str] = Field(
+        default=None,
+        description="Trained zstd dictionary loaded at startup when CACHE_COMPRESSOR=zstd (see tests/performance/cache_codec_benchmark.py)",
+    )
+    AUTH_PRINCIPAL_CACHE_TTL_SEC: int = Field(
+        default=60,
+        ge=1,
+        le=3600,
+        description="TTL of cached authenticated-user principals (get_current_principal)",
+    )
+    RBAC_PERMISSION_CACHE_TTL_SEC: int = Field(
+        default=300,
+        ge=1,
+        le=86400,
+        description="TTL of cached compiled RBAC permission sets (invalidated by version stamps on RBAC writes)",
+    )
+
+    # Rate Limiting
+    RATE_LIMIT_GLOBAL_LIMITS: bool = Field(
+        default=False,
+        description="Apply the per-IP (anonymous) and per-user tier limits to every API route, not only to rate_limit_decorator endpoints (health checks and webhooks are exempt)",
+    )
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = Field(
+        default=100_000,
+        ge=100,
+        description="Maximum token buckets kept by the in-memory rate limiter (used when Redis is unavailable)",
+    )
+
+    # Security Audit Log
+    AUDIT_LOG_ASYNC: bool = Field(
+        default=True,
+        description="Queue security audit events and write them in batches from a background worker (critical events stay synchronous)",
+    )
+    AUDIT_LOG_QUEUE_SIZE: int = Field(
+        default=10_000,
+        ge=1,
+        description="Maximum queued security audit events; events beyond it are spilled to AUDIT_LOG_SPILL_PATH",
+    )
+    AUDIT_LOG_BATCH_SIZE: int = Field(
+        default=500,
+        ge=1,
+        le=5_000,
+        description="Maximum security audit events written per multi-row INSERT",
+    )
+    AUDIT_LOG_FLUSH_INTERVAL_SEC: float = Field(
+        default=0.5,
+        ge=0,
+        le=60,
+        description="How long the audit writer waits to fill a batch before flushing",
+    )
+    AUDIT_LOG_SPILL_PATH: Optional[str] = Field(
+        default=None,
+        description="JSONL file receiving audit events the database could not take (replayed on the next successful flush); defaults to the temp directory",
+    )
 
     # SendGrid Email Configuration
     SENDGRID_API_KEY: str = Field(
@@ -214,6 +292,29 @@ class Settings(BaseSettings):
         
         return v
 
+    DATABASE_REPLICA_URLS: str = Field(
+        default="",
+        description="Comma-separated read replica URLs used by get_read_db (empty: reads stay on DATABASE_URL)",
+    )
+    DB_REPLICA_MAX_LAG_SEC: float = Field(
+        default=5.0,
+        ge=0.1,
+        le=300.0,
+        description="Replication lag above which a replica is skipped (reads fall back to the primary)",
+    )
+    DB_REPLICA_HEALTH_INTERVAL_SEC: float = Field(
+        default=10.0,
+        ge=1.0,
+        le=300.0,
+        description="Interval between read replica lag checks (seconds)",
+    )
+    DB_READ_YOUR_WRITES_SEC: float = Field(
+        default=5.0,
+        ge=0.0,
+        le=300.0,
+        description="After a user's commit, their reads stay on the primary for this long (seconds)",
+    )
+
     # Database Connection Pool Configuration
     DB_POOL_SIZE: int = Field(
         default=10,
@@ -245,6 +346,16 @@ class Settings(BaseSettings):
         le=10.0,
         description="Threshold in seconds to log slow queries",
     )
+    DB_QUERY_INSTRUMENTATION: bool = Field(
+        default_factory=lambda: os.getenv("ENVIRONMENT", "development").lower() == "development",
+        description="Record per-request statement count, DB time and fingerprints (N+1 detection, admin query stats); on by default in development only",
+    )
+    DB_N_PLUS_ONE_THRESHOLD: int = Field(
+        default=5,
+        ge=2,
+        le=1000,
+        description="Executions of the same SELECT fingerprint within one request flagged as an N+1 candidate",
+    )
 
     # Multi-Tenancy Configuration
     TENANCY_MODE: str = Field(
@@ -259,6 +370,40 @@ class Settings(BaseSettings):
         default=None,
         description="Base database URL for tenant databases (used in separate_db mode for pattern-based DB creation)",
     )
+    TENANT_AUTO_SCOPING: bool = Field(
+        default=True,
+        description="Add the current tenant's team_id criteria to every ORM statement on TenantMixin models",
+    )
+    TENANT_ENGINE_MAX: int = Field(
+        default=50,
+        ge=1,
+        le=10_000,
+        description="Tenant engines kept open at once in separate_db mode (least recently used are disposed)",
+    )
+    TENANT_ENGINE_IDLE_TIMEOUT_SEC: int = Field(
+        default=600,
+        ge=10,
+        le=86_400,
+        description="Tenant engines unused for this long are disposed (seconds)",
+    )
+    TENANT_DB_CONNECTION_BUDGET: int = Field(
+        default=100,
+        ge=1,
+        le=10_000,
+        description="Connections shared by tenant pools; a new engine gets the budget divided by the engines open at that moment",
+    )
+    TENANT_ENGINE_MIN_CONNECTIONS: int = Field(
+        default=5,
+        ge=1,
+        le=1_000,
+        description="Connections (pool_size + max_overflow) every tenant engine gets, whatever the budget share",
+    )
+    TENANT_ENGINE_WARMUP_COUNT: int = Field(
+        default=10,
+        ge=0,
+        le=1_000,
+        description="Most active tenants whose engines are opened at startup",
+    )
 
     # Stripe Configuration
     STRIPE_SECRET_KEY: str = Field(
@@ -338,6 +483,52 @@ class Settings(BaseSettings):
         le=1.0,
         description="Temperature for Anthropic responses",
     )
+    AI_OPENAI_MAX_CONCURRENCY: int = Field(
+        default=16,
+        ge=1,
+        le=256,
+        description="Maximum concurrent OpenAI calls per process (shared client pool)",
+    )
+    AI_ANTHROPIC_MAX_CONCURRENCY: int = Field(
+        default=8,
+        ge=1,
+        le=256,
+        description="Maximum concurrent Anthropic calls per process (shared client pool)",
+    )
+    AI_MAX_RETRIES: int = Field(
+        default=3,
+        ge=0,
+        le=10,
+        description="Retries for transient AI provider errors (429, 5xx, timeouts)",
+    )
+    AI_RETRY_BASE_DELAY_SEC: float = Field(
+        default=0.5,
+        ge=0.0,
+        le=30.0,
+        description="Base delay for AI retries (exponential backoff with full jitter)",
+    )
+    AI_RETRY_MAX_DELAY_SEC: float = Field(
+        default=8.0,
+        ge=0.0,
+        le=120.0,
+        description="Maximum delay between AI retries",
+    )
+    AI_REQUEST_TIMEOUT_SEC: float = Field(
+        default=60.0,
+        ge=1.0,
+        le=600.0,
+        description="HTTP timeout for AI provider calls",
+    )
+    AI_FAKE_PROVIDER: bool = Field(
+        default=False,
+        description="Answer AI calls with the offline fake provider (benchmarks, load tests)",
+    )
+    AI_FAKE_LATENCY_MS: int = Field(
+        default=0,
+        ge=0,
+        le=60000,
+        description="Simulated latency of the fake AI provider",
+    )
 
     # Agent API externe (immoassist Django)
     AGENT_API_URL: str = Field(
@@ -374,6 +565,48 @@ class Settings(BaseSettings):
         le=1024,
         description="Nombre max de tokens pour les réponses de Léa (réponses courtes = 200–300)",
     )
+    LEA_SSE_COALESCE_BYTES: int = Field(
+        default=32,
+        ge=1,
+        le=4096,
+        description="Streaming Léa : taille (octets UTF-8) à partir de laquelle les deltas regroupés sont envoyés dans un événement SSE",
+    )
+    LEA_SSE_COALESCE_MS: int = Field(
+        default=15,
+        ge=0,
+        le=1000,
+        description="Streaming Léa : délai max (ms) avant l'envoi des deltas en attente dans un événement SSE",
+    )
+    LEA_KNOWLEDGE_TOKEN_BUDGET: int = Field(
+        default=3500,
+        ge=0,
+        le=100000,
+        description="Prompt Léa : budget (tokens estimés) de la base de connaissance ; les sections core sont toujours incluses",
+    )
+    LEA_NOMINATIM_URL: str = Field(
+        default="https://nominatim.openstreetmap.org/search",
+        description="Géocodage Léa : URL de recherche Nominatim (serveur local possible pour les tests)",
+    )
+    LEA_GEOCODER_CA_URL: str = Field(
+        default="https://geocoder.ca",
+        description="Géocodage Léa : URL de geocoder.ca",
+    )
+    LEA_NOMINATIM_MAX_RPS: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=50.0,
+        description="Géocodage Léa : requêtes max par seconde vers Nominatim (politique d'usage : 1/s ; 0 = sans limite)",
+    )
+    LEA_GEOCODE_CACHE_TTL_SEC: int = Field(
+        default=86400,
+        ge=1,
+        description="Géocodage Léa : durée de vie (s) d'un résultat d'adresse en cache",
+    )
+    LEA_GEOCODE_NEGATIVE_TTL_SEC: int = Field(
+        default=600,
+        ge=1,
+        description="Géocodage Léa : durée de vie (s) d'une adresse introuvable en cache",
+    )
 
     # Léa demo mode (public test page without login – uses this account's data)
     LEA_DEMO_TOKEN: Optional[str] = Field(
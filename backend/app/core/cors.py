@@ -102,6 +102,7 @@ def setup_cors(app: FastAPI) -> None:
         "X-RateLimit-Limit",
         "X-RateLimit-Remaining",
         "X-RateLimit-Reset",
+        "X-Next-Cursor",  # Keyset pagination of list endpoints returning bare arrays
     ]
     
     # Use CORSMiddleware - it handles OPTIONS requests automatically
@@ -7,6 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.core.query_instrumentation import instrument_engine
+from app.core import tenant_scoping  # noqa: F401  (registers the automatic tenant scoping hook)
 
 # Create async engine with optimized connection pooling
 # Enhanced pool configuration for better performance
@@ -36,6 +38,9 @@ engine = create_async_engine(
     },
 )
 
+if settings.DB_QUERY_INSTRUMENTATION:
+    instrument_engine(engine)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -0,0 +1,330 @@
+"""
+Read Replica Routing
+Routes read-only statements of "read" sessions to healthy replicas
+
+get_read_db yields an AsyncSession whose statements are bound per execution:
+- SELECT statements go to a healthy replica (round robin);
+- writes, SELECT ... FOR UPDATE and everything after the session's first write
+  go to the primary;
+- the whole session stays on the primary during the read-your-writes window
+  that follows a commit by the same user (DB_READ_YOUR_WRITES_SEC), tracked
+  in process and in Redis so other workers honour it too.
+
+Replicas are health-checked in the background (DB_REPLICA_HEALTH_INTERVAL_SEC):
+a replica that cannot be reached or lags more than DB_REPLICA_MAX_LAG_SEC is
+skipped, and reads fall back to the primary when none is healthy.
+
+Without DATABASE_REPLICA_URLS, get_read_db behaves like get_db.
+"""
+
+import asyncio
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.cache import cache_backend
+from app.core.commit_hooks import CommitHook, register_commit_hook, run_in_background
+from app.core.config import settings
+from app.core.database import engine as primary_engine
+from app.core.logging import logger
+from app.core.query_instrumentation import instrument_engine
+
+STICKY_KEY_PREFIX = "db:sticky:"
+MAX_STICKY_SUBJECTS = 10_000
+
+_PRIMARY_INFO_KEY = "db_routing_primary"
+
+# Replication delay: 0 on a primary or when every received WAL record has been replayed
+_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_request_subject: ContextVar[Optional[str]] = ContextVar("db_routing_subject", default=None)
+
+
+def set_request_subject(subject: Optional[str]) -> None:
+    """Remember the authenticated subject of the request (read-your-writes key)"""
+    _request_subject.set(subject)
+
+
+def parse_replica_urls(value: str) -> List[str]:
+    """Comma-separated replica URLs, normalized to the asyncpg driver like DATABASE_URL"""
+    urls = []
+    for url in (part.strip() for part in (value or "").split(",")):
+        if not url:
+            continue
+        if url.startswith("postgresql://"):
+            url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        urls.append(url)
+    return urls
+
+
+class ReadYourWrites:
+    """Subjects that committed recently and must read from the primary"""
+
+    def __init__(self, backend: Any = cache_backend):
+        self.backend = backend
+        self._deadlines: dict[str, float] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+
+    @property
+    def window(self) -> float:
+        return settings.DB_READ_YOUR_WRITES_SEC
+
+    def mark(self, subject: str) -> None:
+        """Start the window for `subject` (in memory now, in Redis as a background task)"""
+        now = time.monotonic()
+        if len(self._deadlines) >= MAX_STICKY_SUBJECTS:
+            self._deadlines = {s: d for s, d in self._deadlines.items() if d > now}
+        self._deadlines[subject] = now + self.window
+        if self.backend.use_redis:
+            run_in_background(
+                self._background_tasks,
+                self.backend.set,
+                STICKY_KEY_PREFIX + subject,
+                1,
+                expire=max(1, math.ceil(self.window)),
+                compress=False,
+            )
+
+    async def is_sticky(self, subject: str) -> bool:
+        deadline = self._deadlines.get(subject)
+        if deadline is not None:
+            if deadline > time.monotonic():
+                return True
+            del self._deadlines[subject]
+        if self.backend.use_redis:
+            return await self.backend.get(STICKY_KEY_PREFIX + subject) is not None
+        return False
+
+
+@dataclass
+class Replica:
+    """A replica engine and its last health check"""
+
+    name: str
+    engine: AsyncEngine
+    healthy: bool = False
+    lag_sec: Optional[float] = None
+    checked_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ReplicaPool:
+    """Read replica engines with lag health checks"""
+
+    def __init__(self, engines: Optional[List[AsyncEngine]] = None):
+        self.replicas: List[Replica] = [
+            Replica(name=f"replica-{i}", engine=e) for i, e in enumerate(engines or [])
+        ]
+        self._cycle = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "ReplicaPool":
+        engines = []
+        for url in parse_replica_urls(settings.DATABASE_REPLICA_URLS):
+            replica_engine = create_async_engine(
+                url,
+                pool_pre_ping=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_recycle=3600,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                connect_args={
+                    "server_settings": {"application_name": "modele_backend_read", "jit": "off"},
+                    "command_timeout": settings.DB_QUERY_TIMEOUT,
+                },
+            )
+            if settings.DB_QUERY_INSTRUMENTATION:
+                instrument_engine(replica_engine)
+            engines.append(replica_engine)
+        return cls(engines)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Replica]:
+        """Next healthy replica (round robin), None when reads must go to the primary"""
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._cycle) % len(healthy)]
+
+    async def _measure_lag(self, replica: Replica) -> float:
+        async with replica.engine.connect() as conn:
+            if replica.engine.dialect.name != "postgresql":
+                await conn.execute(text("SELECT 1"))
+                return 0.0
+            return float((await conn.execute(_LAG_QUERY)).scalar() or 0.0)
+
+    async def check_health(self) -> None:
+        """Measure the lag of every replica and update its health"""
+        max_lag = settings.DB_REPLICA_MAX_LAG_SEC
+        for replica in self.replicas:
+            was_healthy = replica.healthy
+            try:
+                lag = await asyncio.wait_for(self._measure_lag(replica), timeout=max(1.0, max_lag))
+                replica.lag_sec, replica.error = lag, None
+                replica.healthy = lag <= max_lag
+            except Exception as e:
+                replica.lag_sec, replica.error = None, str(e)
+                replica.healthy = False
+            replica.checked_at = time.time()
+            if was_healthy != replica.healthy:
+                logger.warning(
+                    f"Read replica {replica.name} is now {'healthy' if replica.healthy else 'unavailable'}",
+                    context={"lag_sec": replica.lag_sec, "error": replica.error},
+                )
+
+    async def _health_loop(self) -> None:
+        while True:
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Read replica health check failed: {e}")
+            await asyncio.sleep(settings.DB_REPLICA_HEALTH_INTERVAL_SEC)
+
+    async def start(self) -> None:
+        """Run a first check, then keep checking in the background"""
+        if not self.enabled or self._health_task is not None:
+            return
+        await self.check_health()
+        self._health_task = asyncio.create_task(self._health_loop(), name="db-replica-health")
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def status(self) -> List[dict]:
+        return [
+            {
+                "name": r.name,
+                "healthy": r.healthy,
+                "lag_sec": r.lag_sec,
+                "checked_at": r.checked_at,
+                "error": r.error,
+            }
+            for r in self.replicas
+        ]
+
+
+replica_pool = ReplicaPool.from_settings()
+read_your_writes = ReadYourWrites()
+
+
+def _is_read_only(clause: Any) -> bool:
+    if isinstance(clause, Select):
+        return clause._for_update_arg is None
+    if isinstance(clause, TextClause):
+        sql = clause.text.lstrip().upper()
+        return sql.startswith(("SELECT", "WITH")) and "FOR UPDATE" not in sql and "FOR SHARE" not in sql
+    return False
+
+
+class RoutingSession(Session):
+    """Session binding read-only statements to a replica (see module docstring)"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self._flushing and replica_pool.enabled and not self.info.get(_PRIMARY_INFO_KEY):
+            if _is_read_only(clause):
+                replica = replica_pool.pick()
+                if replica is not None:
+                    return replica.engine.sync_engine
+            elif clause is not None:
+                # Later reads of this session must see its own writes
+                self.info[_PRIMARY_INFO_KEY] = True
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+ReadSessionLocal = async_sessionmaker(
+    primary_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+
+def _bearer_subject(request: Request) -> Optional[str]:
+    from app.core.security import decode_token
+
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token, token_type="access")
+    return payload.get("sub") if payload else None
+
+
+@asynccontextmanager
+async def read_session(subject: Optional[str] = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Routed read session. `subject` defaults to the request's authenticated subject;
+    it pins the session to the primary during its read-your-writes window.
+    """
+    async with ReadSessionLocal() as session:
+        subject = subject or _request_subject.get()
+        if replica_pool.enabled and subject and await read_your_writes.is_sticky(subject):
+            session.info[_PRIMARY_INFO_KEY] = True
+        yield session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for read-mostly endpoints (dashboards, reports, insights, analytics)"""
+    # Resolved before get_current_user may have run: read the subject from the token
+    subject = _bearer_subject(request) if replica_pool.enabled else None
+    async with read_session(subject) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def _note_write(session: Session, obj: Any, is_new: bool) -> set[bool]:
+    return {True}
+
+
+def _note_statement_write(orm_execute_state: Any) -> set[bool]:
+    return set() if _is_read_only(orm_execute_state.statement) else {True}
+
+
+def _pin_to_primary(session: Session) -> None:
+    session.info[_PRIMARY_INFO_KEY] = True
+
+
+def _start_read_your_writes(session: Session, writes: set[bool]) -> None:
+    if replica_pool.enabled:
+        subject = _request_subject.get()
+        if subject:
+            read_your_writes.mark(subject)
+
+
+register_commit_hook(CommitHook(
+    name="db_routing_writes",
+    collect=_note_write,
+    collect_statement=_note_statement_write,
+    on_collect=_pin_to_primary,
+    on_commit=_start_read_your_writes,
+))
@@ -0,0 +1,575 @@
+"""
+Index Advisor
+Composite / partial index recommendations driven by the live query workload
+
+The workload comes from the statement fingerprints collected by
+app.core.query_instrumentation (this worker) and, on PostgreSQL, from
+pg_stat_statements when the extension is enabled. For every SELECT / UPDATE /
+DELETE fingerprint the advisor extracts, per table:
+- equality columns of the WHERE clause (col = ?, col IN (...), col = ANY(?));
+- the first range column (<, >, <=, >=, BETWEEN);
+- the ORDER BY columns;
+- constant conditions (col IS NULL, col = true, ...) which become the WHERE
+  clause of a partial index.
+
+The candidate index is the equality columns followed by the sort columns (or the
+range column), the usual order for a btree serving both the filter and the sort.
+Candidates already served by an existing index (same leading columns) are
+dropped; the rest are ranked by the time spent in the statements they would
+serve, and can be rendered as an Alembic migration (render_migration).
+
+find_unused_indexes reports non-unique indexes PostgreSQL never scanned since
+its statistics were last reset.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.core.query_instrumentation import QueryStatsRegistry, fingerprint_statement, query_stats_registry
+
+# Fingerprints executed fewer times than this are not worth an index
+DEFAULT_MIN_CALLS = 20
+MAX_INDEX_COLUMNS = 4
+MAX_SAMPLE_FINGERPRINTS = 3
+_POSTGRES_IDENTIFIER_MAX = 63
+_FINGERPRINT_PREVIEW = 300
+
+_IDENT = r"[A-Za-z_][A-Za-z0-9_]*"
+_REF = rf"(?:({_IDENT})\.)?({_IDENT})"
+_CLAUSE_END = r"\b(?:GROUP BY|ORDER BY|LIMIT|OFFSET|FOR UPDATE|FOR SHARE|RETURNING|HAVING|UNION)\b"
+_TABLE_REFERENCE = re.compile(
+    rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+({_IDENT}(?:\.{_IDENT})?)(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|LEFT|RIGHT|INNER|OUTER|FULL|CROSS|ON|SET|ORDER|GROUP|LIMIT|OFFSET|USING|RETURNING|FOR)\b)({_IDENT}))?",
+    re.IGNORECASE,
+)
+_WHERE = re.compile(rf"\bWHERE\b(.*?)(?={_CLAUSE_END}|$)", re.IGNORECASE | re.DOTALL)
+_ORDER_BY = re.compile(r"\bORDER BY\b(.*?)(?=\b(?:LIMIT|OFFSET|FOR UPDATE|FOR SHARE)\b|$)", re.IGNORECASE | re.DOTALL)
+_BETWEEN = re.compile(r"\bBETWEEN\s+\?(?:::[\w ]+?)?\s+AND\s+\?", re.IGNORECASE)
+_AND = re.compile(r"\s+AND\s+", re.IGNORECASE)
+_SELECT = re.compile(r"\bSELECT\b", re.IGNORECASE)
+
+_EQUALITY = re.compile(rf"^{_REF}\s*(?:=\s*(?:\?|ANY\s*\()|IN\s*\()", re.IGNORECASE)
+_RANGE = re.compile(rf"^{_REF}\s*(?:<=|>=|<|>|BETWEEN\b)\s*\?", re.IGNORECASE)
+_CONSTANT = re.compile(rf"^(NOT\s+)?{_REF}(?:\s+(IS(?:\s+NOT)?\s+(?:NULL|TRUE|FALSE)|=\s*(?:true|false)))?$", re.IGNORECASE)
+_ORDER_TERM = re.compile(rf"^{_REF}(?:\s+(ASC|DESC))?(?:\s+NULLS\s+(?:FIRST|LAST))?$", re.IGNORECASE)
+
+_SQL_KEYWORDS = {"null", "true", "false", "not", "and", "or", "exists", "select"}
+
+
+@dataclass
+class QueryShape:
+    """Index-relevant predicates of one statement on one table"""
+
+    table: str
+    equality: List[str] = field(default_factory=list)
+    ranges: List[str] = field(default_factory=list)
+    order_by: List[str] = field(default_factory=list)
+    conditions: List[str] = field(default_factory=list)
+
+    def index_columns(self, max_columns: int = MAX_INDEX_COLUMNS) -> List[str]:
+        """Equality columns first, then the sort columns (or the first range column)"""
+        columns = list(self.equality)
+        trailing = self.order_by
+        if not trailing or (self.ranges and self.ranges[0] != trailing[0]):
+            trailing = self.ranges[:1]
+        columns.extend(c for c in trailing if c not in columns)
+        return columns[:max_columns]
+
+
+@dataclass
+class IndexRecommendation:
+    """A missing index and the workload it would serve"""
+
+    table: str
+    columns: List[str]
+    equality_count: int
+    where: Optional[str] = None
+    calls: int = 0
+    total_ms: float = 0.0
+    fingerprints: List[str] = field(default_factory=list)
+    source: str = "instrumentation"
+
+    @property
+    def key(self) -> Tuple[str, Tuple[str, ...], Optional[str]]:
+        return self.table, tuple(self.columns), self.where
+
+    @property
+    def name(self) -> str:
+        name = f"idx_{self.table}_{'_'.join(self.columns)}" + ("_partial" if self.where else "")
+        if len(name) <= _POSTGRES_IDENTIFIER_MAX:
+            return name
+        digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+        return f"{name[:_POSTGRES_IDENTIFIER_MAX - 9]}_{digest}"
+
+    def add_usage(self, calls: int, total_ms: float, fingerprint: str) -> None:
+        self.calls += calls
+        self.total_ms += total_ms
+        if len(self.fingerprints) < MAX_SAMPLE_FINGERPRINTS and fingerprint not in self.fingerprints:
+            self.fingerprints.append(fingerprint)
+
+    def covers(self, other: "IndexRecommendation") -> bool:
+        """True when this index also serves `other` (same table, `other`'s columns as a prefix)"""
+        if self.table != other.table or self.where not in (None, other.where):
+            return False
+        return index_serves(self.columns, other.columns, other.equality_count)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "table": self.table,
+            "columns": self.columns,
+            "where": self.where,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 2),
+            "source": self.source,
+            "sql": self.create_sql(),
+            "sample_queries": [fp[:_FINGERPRINT_PREVIEW] for fp in self.fingerprints],
+        }
+
+    def create_sql(self) -> str:
+        where = f" WHERE {self.where}" if self.where else ""
+        return f"CREATE INDEX CONCURRENTLY {self.name} ON {self.table} ({', '.join(self.columns)}){where};"
+
+
+def index_serves(index_columns: List[str], wanted: List[str], equality_count: int) -> bool:
+    """
+    Whether an index on `index_columns` serves a lookup needing `wanted`:
+    the equality columns may come in any order, the trailing ones must follow in order.
+    """
+    if len(index_columns) < len(wanted):
+        return False
+    if set(index_columns[:equality_count]) != set(wanted[:equality_count]):
+        return False
+    return index_columns[equality_count:len(wanted)] == wanted[equality_count:]
+
+
+def _split_conjuncts(clause: str) -> Optional[List[str]]:
+    """Split a WHERE clause on its top-level ANDs (None when parentheses do not balance)"""
+    clause = _BETWEEN.sub("BETWEEN ?", clause)
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(clause):
+        char = clause[i]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                return None
+        elif depth == 0:
+            match = _AND.match(clause, i)
+            if match:
+                parts.append(clause[start:i])
+                start = i = match.end()
+                continue
+        i += 1
+    parts.append(clause[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _strip_parentheses(term: str) -> str:
+    while term.startswith("(") and term.endswith(")"):
+        inner = term[1:-1]
+        depth = 0
+        for char in inner:
+            depth += char == "("
+            depth -= char == ")"
+            if depth < 0:
+                return term
+        term = inner.strip()
+    return term
+
+
+def parse_fingerprint(fingerprint: str) -> List[QueryShape]:
+    """
+    Extract the WHERE / ORDER BY columns of a statement fingerprint, per table.
+    Statements with subqueries, or in which a column cannot be attributed to a
+    table, yield nothing rather than a wrong guess.
+    """
+    statement = fingerprint.replace('"', "").strip()
+    head = statement[:7].upper()
+    if not (head.startswith("SELECT") or head.startswith("UPDATE") or head.startswith("DELETE")):
+        return []
+    if len(_SELECT.findall(statement)) > 1:
+        return []
+
+    aliases: Dict[str, str] = {}
+    for match in _TABLE_REFERENCE.finditer(statement):
+        table = match.group(1).split(".")[-1]
+        aliases[table] = table
+        if match.group(2):
+            aliases[match.group(2)] = table
+    if not aliases:
+        return []
+    only_table = next(iter(set(aliases.values()))) if len(set(aliases.values())) == 1 else None
+
+    shapes: Dict[str, QueryShape] = {}
+
+    def resolve(qualifier: Optional[str], column: str) -> Optional[QueryShape]:
+        if column.lower() in _SQL_KEYWORDS:
+            return None
+        table = aliases.get(qualifier) if qualifier else only_table
+        if table is None:
+            return None
+        if table not in shapes:
+            shapes[table] = QueryShape(table=table)
+        return shapes[table]
+
+    where = _WHERE.search(statement)
+    conjuncts = _split_conjuncts(where.group(1)) if where else []
+    for term in conjuncts or []:
+        term = _strip_parentheses(term)
+        if re.search(r"\bOR\b", term, re.IGNORECASE):
+            continue
+        match = _EQUALITY.match(term)
+        if match:
+            shape = resolve(match.group(1), match.group(2))
+            if shape and match.group(2) not in shape.equality:
+                shape.equality.append(match.group(2))
+            continue
+        match = _RANGE.match(term)
+        if match:
+            shape = resolve(match.group(1), match.group(2))
+            if shape and match.group(2) not in shape.ranges:
+                shape.ranges.append(match.group(2))
+            continue
+        match = _CONSTANT.match(term)
+        if match:
+            shape = resolve(match.group(2), match.group(3))
+            if shape:
+                condition = match.group(3)
+                if match.group(4):
+                    condition = f"{condition} {_normalize_condition(match.group(4))}"
+                elif match.group(1):
+                    condition = f"{condition} = false"
+                else:
+                    condition = f"{condition} = true"
+                shape.conditions.append(condition)
+
+    order = _ORDER_BY.search(statement)
+    if order:
+        order_columns: List[Tuple[Optional[QueryShape], str]] = []
+        for term in order.group(1).split(","):
+            match = _ORDER_TERM.match(term.strip())
+            if not match:
+                order_columns = []
+                break
+            order_columns.append((resolve(match.group(1), match.group(2)), match.group(2)))
+        targets = {id(shape) for shape, _ in order_columns}
+        # A sort can only be served by an index when it is on a single table
+        if order_columns and len(targets) == 1 and order_columns[0][0] is not None:
+            order_columns[0][0].order_by = [column for _, column in order_columns]
+
+    return [shape for shape in shapes.values() if shape.equality or shape.ranges or shape.order_by]
+
+
+def _normalize_condition(condition: str) -> str:
+    condition = re.sub(r"\s+", " ", condition.strip())
+    if condition.startswith("="):
+        return "= " + condition[1:].strip().lower()
+    return condition.upper()
+
+
+def collect_workload(registry: QueryStatsRegistry = query_stats_registry) -> Dict[str, Tuple[int, float]]:
+    """Fingerprint -> (calls, total_ms) from this worker's statement instrumentation"""
+    return {fp: (stats.count, stats.total_ms) for fp, stats in list(registry.fingerprints.items())}
+
+
+async def collect_pg_stat_statements(session: AsyncSession, limit: int = 500) -> Dict[str, Tuple[int, float]]:
+    """
+    Fingerprint -> (calls, total_ms) of the current database from pg_stat_statements.
+    Empty when not on PostgreSQL or when the extension is not enabled.
+    """
+    if session.bind is None or session.bind.dialect.name != "postgresql":
+        return {}
+    try:
+        enabled = (await session.execute(text(
+            "SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements')"
+        ))).scalar()
+        if not enabled:
+            return {}
+        # total_exec_time since PostgreSQL 13 (total_time before)
+        version = (await session.execute(text("SHOW server_version_num"))).scalar()
+        total_column = "total_exec_time" if int(version) >= 130000 else "total_time"
+        result = await session.execute(text(f"""
+            SELECT query, calls, {total_column}
+            FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+            ORDER BY {total_column} DESC
+            LIMIT :limit
+        """), {"limit": limit})
+    except Exception as e:
+        logger.warning(f"pg_stat_statements unavailable for the index advisor: {e}")
+        await session.rollback()
+        return {}
+
+    workload: Dict[str, Tuple[int, float]] = {}
+    for query, calls, total_ms in result:
+        fingerprint = fingerprint_statement(query)
+        previous_calls, previous_ms = workload.get(fingerprint, (0, 0.0))
+        workload[fingerprint] = (previous_calls + int(calls), previous_ms + float(total_ms))
+    return workload
+
+
+def build_candidates(
+    workloads: Iterable[Tuple[str, Dict[str, Tuple[int, float]]]],
+    min_calls: int = DEFAULT_MIN_CALLS,
+    max_columns: int = MAX_INDEX_COLUMNS,
+) -> List[IndexRecommendation]:
+    """
+    Merge the candidate indexes of every (source, workload), most expensive first.
+    A candidate whose columns are a prefix of another candidate is folded into it.
+    """
+    candidates: Dict[Tuple, IndexRecommendation] = {}
+    for source, workload in workloads:
+        for fingerprint, (calls, total_ms) in workload.items():
+            if calls < min_calls:
+                continue
+            for shape in parse_fingerprint(fingerprint):
+                columns = shape.index_columns(max_columns)
+                if not columns:
+                    continue
+                where = " AND ".join(sorted(set(shape.conditions))) or None
+                candidate = IndexRecommendation(
+                    table=shape.table,
+                    columns=columns,
+                    equality_count=min(len(shape.equality), len(columns)),
+                    where=where,
+                    source=source,
+                )
+                existing = candidates.setdefault(candidate.key, candidate)
+                if existing.source != source and source not in existing.source:
+                    existing.source = f"{existing.source}+{source}"
+                existing.add_usage(calls, total_ms, fingerprint)
+
+    ranked = sorted(candidates.values(), key=lambda c: (len(c.columns), c.total_ms), reverse=True)
+    merged: List[IndexRecommendation] = []
+    for candidate in ranked:
+        wider = next((m for m in merged if m.covers(candidate)), None)
+        if wider is None:
+            merged.append(candidate)
+            continue
+        for fingerprint in candidate.fingerprints:
+            wider.add_usage(0, 0.0, fingerprint)
+        wider.calls += candidate.calls
+        wider.total_ms += candidate.total_ms
+    return sorted(merged, key=lambda c: c.total_ms, reverse=True)
+
+
+def _existing_indexes(sync_connection, tables: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Columns and (single-column / partial) indexes of the tables that exist"""
+    inspector = inspect(sync_connection)
+    schema: Dict[str, Dict[str, Any]] = {}
+    for table in tables:
+        if not inspector.has_table(table):
+            continue
+        indexes = []
+        primary_key = inspector.get_pk_constraint(table).get("constrained_columns") or []
+        if primary_key:
+            indexes.append((list(primary_key), None))
+        for unique in inspector.get_unique_constraints(table):
+            indexes.append((list(unique["column_names"]), None))
+        for index in inspector.get_indexes(table):
+            columns = [c for c in index["column_names"] if c is not None]
+            where = (index.get("dialect_options") or {}).get("postgresql_where") or (
+                (index.get("dialect_options") or {}).get("sqlite_where")
+            )
+            indexes.append((columns, str(where) if where is not None else None))
+        schema[table] = {
+            "columns": {column["name"] for column in inspector.get_columns(table)},
+            "indexes": indexes,
+        }
+    return schema
+
+
+async def recommend_indexes(
+    session: AsyncSession,
+    registry: QueryStatsRegistry = query_stats_registry,
+    include_pg_stat_statements: bool = True,
+    min_calls: int = DEFAULT_MIN_CALLS,
+    limit: int = 20,
+) -> List[IndexRecommendation]:
+    """Missing indexes for the observed workload, most expensive first"""
+    workloads = [("instrumentation", collect_workload(registry))]
+    if include_pg_stat_statements:
+        workloads.append(("pg_stat_statements", await collect_pg_stat_statements(session)))
+    candidates = build_candidates(workloads, min_calls=min_calls)
+    if not candidates:
+        return []
+
+    connection = await session.connection()
+    schema = await connection.run_sync(_existing_indexes, {c.table for c in candidates})
+
+    missing = []
+    for candidate in candidates:
+        table = schema.get(candidate.table)
+        # Tables or columns unknown to the database come from a misattributed alias
+        if table is None or not set(candidate.columns) <= table["columns"]:
+            continue
+        served = any(
+            index_serves(columns, candidate.columns, candidate.equality_count)
+            and (where is None or where == candidate.where)
+            for columns, where in table["indexes"]
+        )
+        if not served:
+            missing.append(candidate)
+    return missing[:limit]
+
+
+async def find_unused_indexes(session: AsyncSession) -> Dict[str, Any]:
+    """
+    Non-unique indexes never scanned since PostgreSQL statistics were last reset,
+    largest first. Empty on other databases.
+    """
+    if session.bind is None or session.bind.dialect.name != "postgresql":
+        return {"supported": False, "indexes": []}
+    try:
+        stats_reset = (await session.execute(text(
+            "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()"
+        ))).scalar()
+        result = await session.execute(text("""
+            SELECT s.relname, s.indexrelname, pg_relation_size(s.indexrelid), pg_get_indexdef(s.indexrelid)
+            FROM pg_stat_user_indexes s
+            JOIN pg_index i ON i.indexrelid = s.indexrelid
+            WHERE s.idx_scan = 0
+            AND NOT i.indisunique
+            AND NOT i.indisprimary
+            ORDER BY pg_relation_size(s.indexrelid) DESC
+        """))
+    except Exception as e:
+        logger.error(f"Failed to list unused indexes: {e}")
+        await session.rollback()
+        return {"supported": True, "error": str(e), "indexes": []}
+
+    indexes = [
+        {"table": table, "index": index, "size_bytes": size, "definition": definition}
+        for table, index, size, definition in result
+    ]
+    return {
+        "supported": True,
+        "stats_since": stats_reset.isoformat() if stats_reset else None,
+        "total_bytes": sum(i["size_bytes"] for i in indexes),
+        "indexes": indexes,
+    }
+
+
+async def get_index_report(session: AsyncSession, min_calls: int = DEFAULT_MIN_CALLS, limit: int = 20) -> Dict[str, Any]:
+    """Missing index recommendations and unused indexes"""
+    recommendations = await recommend_indexes(session, min_calls=min_calls, limit=limit)
+    return {
+        "observed_fingerprints": len(query_stats_registry.fingerprints),
+        "recommendations": [r.to_dict() for r in recommendations],
+        "unused_indexes": await find_unused_indexes(session),
+    }
+
+
+_MIGRATION_TEMPLATE = '''"""Add indexes recommended by the index advisor
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {created}
+
+Generated by app/core/index_advisor.py from the observed query workload:
+{summary}
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "{revision}"
+down_revision: Union[str, None] = {down_revision_literal}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial index condition)
+ADVISED_INDEXES = [
+{indexes}
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    concurrently = conn.dialect.name == "postgresql"
+    for name, table, columns, where in ADVISED_INDEXES:
+        if not inspector.has_table(table):
+            continue
+        if name in {{i["name"] for i in inspector.get_indexes(table)}}:
+            continue
+        kwargs = {{}}
+        if where:
+            kwargs["postgresql_where"] = sa.text(where)
+            kwargs["sqlite_where"] = sa.text(where)
+        if concurrently:
+            # CREATE INDEX CONCURRENTLY cannot run inside the migration transaction
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+        else:
+            op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    for name, table, _, _ in reversed(ADVISED_INDEXES):
+        if inspector.has_table(table) and name in {{i["name"] for i in inspector.get_indexes(table)}}:
+            op.drop_index(name, table_name=table)
+'''
+
+
+def render_migration(
+    recommendations: List[IndexRecommendation],
+    revision: str,
+    down_revision: Optional[str],
+) -> str:
+    """Source of an Alembic migration creating the recommended indexes"""
+    summary = "\n".join(
+        f"- {r.name}: {r.calls} calls, {r.total_ms:.0f} ms ({r.source})" for r in recommendations
+    )
+    indexes = "\n".join(
+        f"    ({r.name!r}, {r.table!r}, {r.columns!r}, {r.where!r}),"
+        for r in recommendations
+    )
+    return _MIGRATION_TEMPLATE.format(
+        revision=revision,
+        down_revision=down_revision,
+        down_revision_literal=repr(down_revision),
+        created=date.today().isoformat(),
+        summary=summary,
+        indexes=indexes,
+    )
+
+
+def next_revision(versions_dir: Path, slug: str = "index_advisor") -> Tuple[str, Optional[str]]:
+    """(new revision id, current head) following the NNN_name numbering of alembic/versions"""
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory(str(versions_dir.parent))
+    head = script.get_current_head()
+    numbers = [int(m.group(1)) for p in versions_dir.glob("*.py") if (m := re.match(r"^(\d+)_", p.name))]
+    return f"{max(numbers, default=0) + 1:03d}_{slug}", head
+
+
+def write_migration(
+    recommendations: List[IndexRecommendation],
+    versions_dir: Optional[Path] = None,
+    slug: str = "index_advisor",
+) -> Optional[Path]:
+    """Write the migration for `recommendations` into alembic/versions (None when there is nothing to add)"""
+    if not recommendations:
+        return None
+    versions_dir = versions_dir or Path(__file__).resolve().parents[2] / "alembic" / "versions"
+    revision, head = next_revision(versions_dir, slug)
+    path = versions_dir / f"{revision}.py"
+    path.write_text(render_migration(recommendations, revision, head), encoding="utf-8")
+    logger.info(f"Index advisor migration written: {path}", context={"indexes": len(recommendations)})
+    return path
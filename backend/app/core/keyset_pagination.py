@@ -0,0 +1,200 @@
+"""
+Keyset Pagination
+Cursor-based pagination over (sort key..., id) for list endpoints
+
+OFFSET/LIMIT scans and discards every skipped row, and the separate count(*)
+re-runs the whole filter: both grow with the size of the list. Keyset
+pagination seeks directly past the last row of the previous page with a
+row-value comparison:
+
+    WHERE (created_at, id) < (:last_created_at, :last_id)
+    ORDER BY created_at DESC, id DESC LIMIT :limit + 1
+
+With an index on (filter columns..., sort key, id) every page costs the same
+as the first one. Cursors are opaque url-safe strings; they record the sort
+key so a cursor from one listing cannot be replayed against another.
+
+Counts are optional: estimated_count() reads the planner's row estimate
+(pg_class / pg_statistic, refreshed by ANALYZE) instead of counting rows.
+"""
+
+import base64
+import enum
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+CURSOR_VERSION = 1
+
+
+class InvalidCursor(ValueError):
+    """Cursor that cannot be decoded or does not belong to this listing"""
+
+
+@dataclass
+class KeysetPage(Generic[T]):
+    """One page of a keyset-paginated listing"""
+
+    items: List[T]
+    next_cursor: Optional[str]
+    has_more: bool
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, time):
+        return {"t": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    if isinstance(value, enum.Enum):
+        return {"e": value.name}
+    return value
+
+
+def _decode_value(value: Any, column: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    if "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    if "d" in value:
+        return date.fromisoformat(value["d"])
+    if "t" in value:
+        return time.fromisoformat(value["t"])
+    if "n" in value:
+        return Decimal(value["n"])
+    if "e" in value:
+        enum_class = getattr(getattr(column, "type", None), "enum_class", None)
+        if isinstance(column.type, SQLEnum) and enum_class is not None:
+            return enum_class[value["e"]]
+        return value["e"]
+    raise InvalidCursor("Unknown cursor value")
+
+
+def _key_name(columns: Sequence[Any], descending: bool) -> str:
+    names = ",".join(str(getattr(c, "key", None) or c) for c in columns)
+    return f"{names}:{'desc' if descending else 'asc'}"
+
+
+def encode_cursor(values: Sequence[Any], columns: Sequence[Any], descending: bool) -> str:
+    payload = {"v": CURSOR_VERSION, "k": _key_name(columns, descending), "p": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any], descending: bool) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload.get("v") != CURSOR_VERSION or payload.get("k") != _key_name(columns, descending):
+            raise InvalidCursor("Cursor does not match this listing")
+        values = payload["p"]
+        if len(values) != len(columns):
+            raise InvalidCursor("Cursor does not match this listing")
+        return [_decode_value(v, c) for v, c in zip(values, columns)]
+    except InvalidCursor:
+        raise
+    except Exception as e:
+        raise InvalidCursor(f"Malformed cursor: {e}") from e
+
+
+def _row_values(item: Any, columns: Sequence[Any]) -> List[Any]:
+    return [getattr(item, column.key) for column in columns]
+
+
+async def keyset_paginate(
+    session: AsyncSession,
+    query: Select,
+    sort_columns: Sequence[Any],
+    id_column: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> KeysetPage:
+    """
+    Fetch one page of `query` ordered by (*sort_columns, id_column).
+
+    Args:
+        session: Database session
+        query: Filtered select of a single ORM entity (its ORDER BY is replaced)
+        sort_columns: Non-nullable sort key columns (e.g. [Model.created_at])
+        id_column: Unique tie-breaker (primary key)
+        limit: Page size
+        cursor: next_cursor of the previous page (None for the first page)
+        descending: Sort direction applied to every key column
+
+    Raises:
+        HTTPException 400 if the cursor is invalid
+    """
+    columns = [*sort_columns, id_column]
+    if cursor:
+        try:
+            values = decode_cursor(cursor, columns, descending)
+        except InvalidCursor as e:
+            logger.warning(f"Rejected pagination cursor: {e}")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor") from e
+        key = tuple_(*columns)
+        # Bind each value with its column type (enums bind by name, like the column)
+        bound = tuple_(*(literal(v, c.type) for v, c in zip(values, columns)))
+        query = query.where(key < bound if descending else key > bound)
+
+    order = [c.desc() if descending else c.asc() for c in columns]
+    result = await session.execute(query.order_by(None).order_by(*order).limit(limit + 1))
+    items = list(result.scalars().all())
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_cursor(_row_values(items[-1], columns), columns, descending) if has_more else None
+    return KeysetPage(items=items, next_cursor=next_cursor, has_more=has_more)
+
+
+async def estimated_count(session: AsyncSession, query: Select) -> Optional[int]:
+    """
+    Planner row estimate of `query` (PostgreSQL only, None elsewhere or on failure).
+    Cheap regardless of the number of matching rows; as fresh as the last ANALYZE.
+    """
+    try:
+        conn = await session.connection()
+        if conn.dialect.name != "postgresql":
+            return None
+        compiled = query.order_by(None).compile(dialect=conn.dialect)
+        params = tuple(compiled.params[name] for name in (compiled.positiontup or ()))
+        result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, params)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Estimated count unavailable: {e}")
+        return None
+
+
+async def exact_count(session: AsyncSession, query: Select) -> int:
+    """count(*) over the filtered query (what the OFFSET listings used to run on every page)"""
+    result = await session.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar() or 0
+
+
+async def page_total(session: AsyncSession, query: Select, cursor: Optional[str]) -> int:
+    """
+    Total for a list response: exact on the first page, planner estimate on
+    cursor pages (exact when no estimate is available, e.g. SQLite).
+    """
+    if cursor:
+        estimate = await estimated_count(session, query)
+        if estimate is not None:
+            return estimate
+    return await exact_count(session, query)
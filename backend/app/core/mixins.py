@@ -4,13 +4,9 @@ SQLAlchemy Mixins
 Reusable mixins for SQLAlchemy models.
 """
 
-from typing import TYPE_CHECKING, Optional
 from sqlalchemy import Column, Integer, ForeignKey
 from sqlalchemy.orm import declared_attr, relationship
 
-if TYPE_CHECKING:
-    from sqlalchemy.orm import DeclarativeBase
-
 
 def _is_tenancy_enabled() -> bool:
     """Check if tenancy is enabled (lazy import to avoid circular dependencies)"""
@@ -39,7 +35,7 @@ class TenantMixin:
     __allow_unmapped__ = True  # allow legacy Column/declared_attr under SQLAlchemy 2.x
     
     @declared_attr
-    def team_id(cls) -> Optional[Column]:
+    def team_id(cls):
         """
         Add team_id column if tenancy is enabled
         
@@ -58,7 +54,7 @@ class TenantMixin:
         return None
     
     @declared_attr
-    def team(cls) -> Optional[relationship]:
+    def team(cls):
         """
         Add team relationship if tenancy is enabled
         
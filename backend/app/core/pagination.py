@@ -3,12 +3,14 @@ Pagination Utilities
 Provides pagination support for database queries
 """
 
-from typing import Generic, TypeVar, Optional, List, Annotated
+from typing import Any, Generic, TypeVar, Optional, List, Annotated, Sequence
 from pydantic import BaseModel, Field
 from fastapi import Query, Depends
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.keyset_pagination import keyset_paginate, page_total
+
 T = TypeVar('T')
 
 
@@ -16,6 +18,7 @@ class PaginationParams(BaseModel):
     """Pagination parameters"""
     page: int = Field(default=1, ge=1, description="Page number (1-indexed)")
     page_size: int = Field(default=20, ge=1, le=100, description="Items per page (max 100)")
+    cursor: Optional[str] = Field(default=None, description="Opaque keyset cursor (next_cursor of the previous page)")
     
     @property
     def offset(self) -> int:
@@ -31,6 +34,7 @@ class PaginationParams(BaseModel):
 def get_pagination_params(
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page (max 100)"),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor (replaces page)"),
 ) -> PaginationParams:
     """
     FastAPI dependency to extract pagination parameters from query string.
@@ -40,18 +44,19 @@ def get_pagination_params(
         async def list_items(pagination: PaginationParams = Depends(get_pagination_params)):
             ...
     """
-    return PaginationParams(page=page, page_size=page_size)
+    return PaginationParams(page=page, page_size=page_size, cursor=cursor)
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Paginated response model"""
     items: List[T] = Field(description="List of items for current page")
     total: int = Field(description="Total number of items")
-    page: int = Field(description="Current page number")
+    page: Optional[int] = Field(description="Current page number (null for cursor pages)")
     page_size: int = Field(description="Items per page")
     total_pages: int = Field(description="Total number of pages")
     has_next: bool = Field(description="Whether there is a next page")
-    has_previous: bool = Field(description="Whether there is a previous page")
+    has_previous: bool = Field(description="Whether there is a previous page (always true for cursor pages)")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page (keyset pagination)")
     
     @classmethod
     def create(
@@ -60,18 +65,23 @@ class PaginatedResponse(BaseModel, Generic[T]):
         total: int,
         page: int,
         page_size: int,
+        next_cursor: Optional[str] = None,
+        has_next: Optional[bool] = None,
+        cursor: Optional[str] = None,
     ) -> "PaginatedResponse[T]":
-        """Create paginated response"""
+        """Create paginated response (`cursor`: the cursor the page was read from, if any)"""
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
         
         return cls(
             items=items,
             total=total,
-            page=page,
+            # A cursor page has no page number; its cursor came from a previous page
+            page=None if cursor else page,
             page_size=page_size,
             total_pages=total_pages,
-            has_next=page < total_pages,
-            has_previous=page > 1,
+            has_next=page < total_pages if has_next is None else has_next,
+            has_previous=bool(cursor) or page > 1,
+            next_cursor=next_cursor,
         )
 
 
@@ -80,6 +90,7 @@ async def paginate_query(
     query: select,
     pagination: PaginationParams,
     count_query: Optional[select] = None,
+    keyset: Optional[Sequence[Any]] = None,
 ) -> PaginatedResponse:
     """
     Paginate a SQLAlchemy query
@@ -89,10 +100,37 @@ async def paginate_query(
         query: SQLAlchemy select query
         pagination: Pagination parameters
         count_query: Optional separate query for counting (for complex queries)
+        keyset: Optional (sort column..., id column) for keyset pagination, sorted
+            descending. The first page and cursor pages then seek instead of using
+            OFFSET, and cursor pages report the planner's estimated total.
     
     Returns:
         PaginatedResponse with items and metadata
     """
+    if keyset is not None and (pagination.cursor or pagination.page == 1):
+        *sort_columns, id_column = keyset
+        page = await keyset_paginate(
+            session,
+            query,
+            sort_columns,
+            id_column,
+            pagination.page_size,
+            cursor=pagination.cursor,
+        )
+        if count_query is not None and not pagination.cursor:
+            total = (await session.execute(count_query)).scalar_one() or 0
+        else:
+            total = await page_total(session, query, pagination.cursor)
+        return PaginatedResponse.create(
+            items=page.items,
+            total=total,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            next_cursor=page.next_cursor,
+            has_next=page.has_more,
+            cursor=pagination.cursor,
+        )
+    
     # Get total count
     if count_query is None:
         # Use a subquery for counting - create a simple count query
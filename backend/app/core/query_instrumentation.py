@@ -0,0 +1,266 @@
+"""
+Query Instrumentation
+Per-request SQL statement statistics and N+1 detection
+
+before/after_cursor_execute listeners on the engine (see app.core.database)
+time every statement and group it by a normalized fingerprint (literals and
+bound parameters replaced by "?"). QueryInstrumentationMiddleware opens a
+RequestQueryStats for each request and closes it when the last body chunk is
+sent, so statements run while a streamed (SSE) response is produced are counted;
+repeated SELECT fingerprints are flagged as N+1 candidates, logged and
+aggregated for the admin endpoint (GET /api/v1/admin/query-stats). In debug
+mode the X-DB-* headers report the statements run before the response started
+(the whole request unless the body is streamed).
+"""
+
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.slow_query_logger import log_slow_statement
+
+# Bounds of the process-wide aggregates exposed to admins
+MAX_TRACKED_FINGERPRINTS = 500
+MAX_RECENT_N_PLUS_ONE = 100
+_FINGERPRINT_PREVIEW = 500
+
+_START_TIMES_KEY = "query_instrumentation_start"
+
+_current_stats: ContextVar[Optional["RequestQueryStats"]] = ContextVar("db_query_stats", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PARAMETER = re.compile(r"%\([^)]+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint_statement(statement: str) -> str:
+    """
+    Normalize a SQL statement so that executions differing only by their
+    literal values or bound parameters share the same fingerprint.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _POSTCOMPILE.sub("(?)", normalized)
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (?...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _is_select(fingerprint: str) -> bool:
+    head = fingerprint[:10].upper()
+    return head.startswith("SELECT") or head.startswith("WITH")
+
+
+@dataclass
+class FingerprintStats:
+    """Executions of one statement fingerprint"""
+
+    count: int = 0
+    total_ms: float = 0.0
+
+    def add(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+
+
+@dataclass
+class RequestQueryStats:
+    """Statements executed while handling one request"""
+
+    statement_count: int = 0
+    total_ms: float = 0.0
+    fingerprints: Dict[str, FingerprintStats] = field(default_factory=dict)
+
+    def record(self, fingerprint: str, elapsed_ms: float) -> None:
+        self.statement_count += 1
+        self.total_ms += elapsed_ms
+        stats = self.fingerprints.get(fingerprint)
+        if stats is None:
+            stats = self.fingerprints[fingerprint] = FingerprintStats()
+        stats.add(elapsed_ms)
+
+    def n_plus_one_candidates(self, threshold: Optional[int] = None) -> List[Dict[str, Any]]:
+        """SELECT fingerprints executed at least `threshold` times, most repeated first"""
+        threshold = threshold or settings.DB_N_PLUS_ONE_THRESHOLD
+        candidates = [
+            {
+                "fingerprint": fp[:_FINGERPRINT_PREVIEW],
+                "occurrences": stats.count,
+                "total_ms": round(stats.total_ms, 2),
+            }
+            for fp, stats in self.fingerprints.items()
+            if stats.count >= threshold and _is_select(fp)
+        ]
+        return sorted(candidates, key=lambda c: c["occurrences"], reverse=True)
+
+
+class QueryStatsRegistry:
+    """Process-wide statement aggregates and recent N+1 reports"""
+
+    def __init__(self):
+        self.fingerprints: Dict[str, FingerprintStats] = {}
+        self.recent_n_plus_one: deque = deque(maxlen=MAX_RECENT_N_PLUS_ONE)
+        self.requests = 0
+
+    def record(self, fingerprint: str, elapsed_ms: float) -> None:
+        stats = self.fingerprints.get(fingerprint)
+        if stats is None:
+            if len(self.fingerprints) >= MAX_TRACKED_FINGERPRINTS:
+                # Drop the least executed fingerprint to stay bounded
+                del self.fingerprints[min(self.fingerprints, key=lambda fp: self.fingerprints[fp].count)]
+            stats = self.fingerprints[fingerprint] = FingerprintStats()
+        stats.add(elapsed_ms)
+
+    def finish_request(self, method: str, path: str, stats: RequestQueryStats) -> List[Dict[str, Any]]:
+        self.requests += 1
+        candidates = stats.n_plus_one_candidates()
+        if candidates:
+            self.recent_n_plus_one.append({
+                "method": method,
+                "path": path,
+                "at": time.time(),
+                "statement_count": stats.statement_count,
+                "total_ms": round(stats.total_ms, 2),
+                "candidates": candidates,
+            })
+        return candidates
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        top = sorted(self.fingerprints.items(), key=lambda item: item[1].total_ms, reverse=True)[:limit]
+        return {
+            "requests": self.requests,
+            "tracked_fingerprints": len(self.fingerprints),
+            "top_statements": [
+                {
+                    "fingerprint": fp[:_FINGERPRINT_PREVIEW],
+                    "count": s.count,
+                    "total_ms": round(s.total_ms, 2),
+                    "avg_ms": round(s.total_ms / s.count, 3) if s.count else 0.0,
+                }
+                for fp, s in top
+            ],
+            "recent_n_plus_one": list(self.recent_n_plus_one)[-limit:],
+        }
+
+    def reset(self) -> None:
+        self.fingerprints.clear()
+        self.recent_n_plus_one.clear()
+        self.requests = 0
+
+
+query_stats_registry = QueryStatsRegistry()
+
+
+def get_request_query_stats() -> Optional[RequestQueryStats]:
+    """Statistics of the current request (None outside QueryInstrumentationMiddleware)"""
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_TIMES_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    # Instrumentation must never fail the statement it observes
+    try:
+        elapsed_ms = elapsed * 1000
+        fingerprint = fingerprint_statement(statement)
+        query_stats_registry.record(fingerprint, elapsed_ms)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(fingerprint, elapsed_ms)
+        log_slow_statement(statement, elapsed)
+    except Exception as e:
+        logger.error(f"Query instrumentation failed: {e}")
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute: drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get(_START_TIMES_KEY):
+        conn.info[_START_TIMES_KEY].pop()
+
+
+def instrument_engine(engine: Any) -> None:
+    """Attach the statement listeners to an engine (AsyncEngine or Engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Collect per-request statement statistics and flag N+1 candidates.
+    In debug mode (or with expose_headers=True) adds X-DB-Query-Count,
+    X-DB-Time-Ms and X-DB-N-Plus-One to the response.
+
+    Pure ASGI middleware: the request is finished on the last
+    http.response.body message, after a streamed body has been produced.
+    """
+
+    def __init__(self, app, expose_headers: Optional[bool] = None):
+        self.app = app
+        self.expose_headers = settings.DEBUG if expose_headers is None else expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            if not finished:
+                finished = True
+                self._finish_request(scope, stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and self.expose_headers:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.statement_count)
+                headers["X-DB-Time-Ms"] = f"{stats.total_ms:.2f}"
+                headers["X-DB-N-Plus-One"] = str(len(stats.n_plus_one_candidates()))
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+            await send(message)
+
+        token = _current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            # Errors and client disconnects never send the last body chunk
+            finish()
+
+    @staticmethod
+    def _finish_request(scope, stats: RequestQueryStats) -> None:
+        method, path = scope["method"], scope["path"]
+        candidates = query_stats_registry.finish_request(method, path, stats)
+        if candidates:
+            logger.warning(
+                f"Possible N+1 queries on {method} {path}: "
+                f"{candidates[0]['occurrences']}x {candidates[0]['fingerprint'][:200]}",
+                context={"statement_count": stats.statement_count, "candidates": len(candidates)},
+            )
@@ -3,12 +3,14 @@ Advanced Query Optimization Utilities
 Query plan analysis, N+1 detection, and optimization helpers
 """
 
+from collections import Counter
 from typing import Any, Optional, List, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, inspect
 from sqlalchemy.engine import Result
 from app.core.logging import logger
 from app.core.cache_enhanced import cache_query
+from app.core.query_instrumentation import fingerprint_statement
 
 
 class QueryAnalyzer:
@@ -170,19 +172,17 @@ class QueryOptimizer:
             queries: List of query strings
             
         Returns:
-            List of detected N+1 patterns
+            List of detected N+1 patterns (one entry per statement fingerprint)
         """
+        # Group executions that only differ by their parameters (same fingerprint)
+        counts = Counter(fingerprint_statement(query) for query in queries)
         n_plus_one_patterns = []
-        
-        # Simple pattern detection
-        for i, query in enumerate(queries):
+        for fingerprint, count in counts.most_common():
             # Look for queries in loops (simplified detection)
-            if "SELECT" in query.upper() and "WHERE" in query.upper():
-                # Check if this query pattern appears multiple times
-                count = queries.count(query)
+            if "SELECT" in fingerprint.upper() and "WHERE" in fingerprint.upper():
                 if count > 5:  # Threshold for N+1 detection
                     n_plus_one_patterns.append({
-                        "query": query[:100],
+                        "query": fingerprint[:100],
                         "occurrences": count,
                         "suggestion": "Consider using JOIN or eager loading",
                     })
@@ -1,16 +1,34 @@
 """
-Rate Limiting Middleware
+Rate Limiting
 Comprehensive protection against abuse and denial-of-service attacks.
 
 Features:
 - Per-endpoint rate limiting with configurable limits
-- User-based rate limiting for authenticated users
+- User-based rate limiting for authenticated users (tier limits, see app.core.user_throttle)
 - IP-based rate limiting for anonymous users
-- Redis-backed storage for distributed rate limiting
-- Memory fallback when Redis is unavailable
+- Every limit of a request checked in a single Redis round-trip (GCRA Lua script, EVALSHA)
+- In-memory token buckets when Redis is unavailable
 - Automatic rate limit headers in responses
 - Configurable limits per endpoint category
 
+How it works:
+setup_rate_limiting adds enforce_rate_limits as a dependency of every API route.
+For each request it collects the limits that apply:
+- the endpoint limits declared with rate_limit_decorator, counted per user
+  (authenticated) or per IP (anonymous);
+- with RATE_LIMIT_GLOBAL_LIMITS only: the RATE_LIMITS limit matching the path for
+  undecorated routes, the user's tier limit (USER_THROTTLE_LIMITS) and the default
+  limit per IP for anonymous requests.
+The tier is read from the access token's "tier" claim (no database lookup). No
+token issuer sets that claim yet, so every user currently gets the "default" tier.
+All of them are checked and consumed atomically by one EVALSHA: either every
+limit has room and all are consumed, or the request is rejected with 429 and
+nothing is consumed.
+
+GCRA (generic cell rate algorithm) stores one timestamp per key (the theoretical
+arrival time): a limit of N per period allows bursts of N and refills at N/period,
+exactly like a token bucket, without a background refill.
+
 @example
 ```python
 from app.core.rate_limit import rate_limit_decorator
@@ -23,80 +41,421 @@ async def login():
 ```
 """
 
-from typing import Callable, Optional, Dict, Any
-from fastapi import Request, HTTPException, status, Response
+import hashlib
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Depends, Request, status
 from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from datetime import datetime, timedelta
+from jose import JWTError, jwt
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
 
 from app.core.config import settings
 from app.core.logging import logger
 from app.core.security_audit import SecurityAuditLogger, SecurityEventType
 from app.core.database import AsyncSessionLocal
+from app.core.user_throttle import get_user_throttle_limit
+
+RATE_LIMIT_KEY_PREFIX = "rl:"
+RATE_LIMITS_ATTRIBUTE = "__rate_limits__"
+
+# Never counted against the global per-IP / per-user limits (probes, third-party callbacks)
+GLOBAL_LIMIT_EXEMPT_PREFIXES = (
+    f"{settings.API_V1_STR}/health",
+    f"{settings.API_V1_STR}/db-health",
+    "/webhooks/",
+)
+
+# Seconds between two warnings about Redis falling back to memory
+_FALLBACK_WARNING_INTERVAL = 60.0
+
+# KEYS = one key per limit; ARGV = (emission interval ms, period ms) per key.
+# Every limit must allow the request, otherwise nothing is consumed.
+# Returns {allowed, index of the tightest (or rejecting) limit, reset / retry after ms, remaining}.
+_GCRA_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local new_tats = {}
+local tightest = 1
+local remaining = -1
+local reset = 0
+for i = 1, #KEYS do
+    local interval = tonumber(ARGV[2 * i - 1])
+    local period = tonumber(ARGV[2 * i])
+    local tat = tonumber(redis.call("GET", KEYS[i]) or now)
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    local allow_at = new_tat - period
+    if allow_at > now then
+        return {0, i, allow_at - now, 0}
+    end
+    new_tats[i] = new_tat
+    local left = math.floor((now - allow_at) / interval)
+    if remaining < 0 or left < remaining then
+        remaining = left
+        tightest = i
+        reset = new_tat - now
+    end
+end
+for i = 1, #KEYS do
+    redis.call("SET", KEYS[i], new_tats[i], "PX", new_tats[i] - now)
+end
+return {1, tightest, reset, remaining}
+"""
+
+_LIMIT_PATTERN = re.compile(
+    r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$",
+    re.IGNORECASE,
+)
+_PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A parsed limit: `amount` requests per `period` seconds"""
+
+    amount: int
+    period: float
+    text: str
+
+    @property
+    def emission_interval(self) -> float:
+        """Seconds between two requests at the sustained rate"""
+        return self.period / self.amount
 
-# Rate limit storage configuration
-def get_storage_uri() -> str:
+
+@lru_cache(maxsize=256)
+def parse_rate_limit(value: str) -> RateLimit:
     """
-    Get storage URI for rate limiter.
-    
-    Prioritizes Redis for distributed rate limiting across multiple instances.
-    Falls back to in-memory storage if Redis is unavailable.
-    
-    @returns Storage URI string (Redis URL or "memory://")
+    Parse a limit string ("5/minute", "1000/hour", "10 per 5 minutes").
+
+    @param value - Rate limit string
+    @returns RateLimit
+    @throws ValueError if the string is not a valid limit
     """
-    if settings.REDIS_URL:
-        try:
-            # Verify Redis is available
-            import redis
-            redis_client = redis.from_url(settings.REDIS_URL)
-            redis_client.ping()
-            logger.info("Using Redis for distributed rate limiting")
-            return settings.REDIS_URL
-        except Exception as e:
-            logger.warning(f"Redis not available for rate limiting, using memory: {e}")
-            return "memory://"
-    logger.info("Using in-memory rate limiting (Redis not configured)")
-    return "memory://"
+    match = _LIMIT_PATTERN.match(value)
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    multiplier = int(match.group(2) or 1)
+    return RateLimit(
+        amount=int(match.group(1)),
+        period=float(_PERIOD_SECONDS[match.group(3).lower()] * multiplier),
+        text=value.strip(),
+    )
+
+
+@dataclass(frozen=True)
+class RateLimitCheck:
+    """One limit applied to one bucket key"""
+
+    key: str
+    limit: RateLimit
+    scope: str
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of checking all the limits of a request"""
+
+    allowed: bool
+    limit: Optional[RateLimit] = None
+    remaining: int = 0
+    reset_after: float = 0.0
+    retry_after: float = 0.0
+    scope: Optional[str] = None
+    backend: str = "memory"
+
+    def headers(self) -> Dict[str, str]:
+        if self.limit is None:
+            return {}
+        headers = {
+            "X-RateLimit-Limit": str(self.limit.amount),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimitExceeded(Exception):
+    """Raised by enforce_rate_limits when a request exceeds one of its limits"""
+
+    def __init__(self, result: RateLimitResult):
+        super().__init__(f"Rate limit exceeded: {result.limit.text if result.limit else 'unknown'}")
+        self.result = result
+        self.limit = result.limit.text if result.limit else "unknown"
+        self.remaining = 0
+        self.retry_after = max(1, math.ceil(result.retry_after))
+
+
+class LocalTokenBuckets:
+    """
+    In-memory token buckets (per worker), used when Redis is unavailable.
+    Same all-or-nothing semantics as the Redis script; least recently used
+    buckets are dropped beyond `max_keys`.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def hit(self, checks: List[RateLimitCheck]) -> RateLimitResult:
+        now = self.clock()
+        levels = []
+        tightest: Optional[Tuple[RateLimitCheck, float]] = None
+        for check in checks:
+            limit = check.limit
+            rate = limit.amount / limit.period
+            tokens, updated = self._buckets.get(check.key, (float(limit.amount), now))
+            tokens = min(float(limit.amount), tokens + (now - updated) * rate)
+            if tokens < 1.0:
+                return RateLimitResult(
+                    allowed=False,
+                    limit=limit,
+                    retry_after=(1.0 - tokens) / rate,
+                    reset_after=(limit.amount - tokens) / rate,
+                    scope=check.scope,
+                )
+            levels.append((check, tokens - 1.0))
+            if tightest is None or tokens - 1.0 < tightest[1]:
+                tightest = (check, tokens - 1.0)
+
+        for check, tokens in levels:
+            self._buckets[check.key] = (tokens, now)
+            self._buckets.move_to_end(check.key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        if tightest is None:
+            return RateLimitResult(allowed=True)
+        check, tokens = tightest
+        return RateLimitResult(
+            allowed=True,
+            limit=check.limit,
+            remaining=int(tokens),
+            reset_after=(check.limit.amount - tokens) * check.limit.emission_interval,
+            scope=check.scope,
+        )
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+def client_ip(connection: HTTPConnection) -> str:
+    return connection.client.host if connection.client else "unknown"
+
+
+@lru_cache(maxsize=4096)
+def _token_claims(token: str) -> Optional[Tuple[str, Optional[str], float]]:
+    """(subject, tier, expiry) of a valid access token, decoded once per token"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    except Exception:
+        return None
+    if payload.get("type", "access") != "access" or not payload.get("sub"):
+        return None
+    return str(payload["sub"]), payload.get("tier"), float(payload.get("exp") or math.inf)
+
+
+def _hashed(value: str) -> str:
+    return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+def resolve_identity(connection: HTTPConnection) -> Tuple[str, Optional[str]]:
+    """
+    Identify the requester without touching the database.
+
+    Uses the user set on request.state by authentication middleware, then the
+    bearer access token (subject and "tier" claim), then the client IP.
+
+    @param connection - Request (or WebSocket)
+    @returns (identity key, tier) e.g. ("user:3f2a...", "pro") or ("ip:192.168.1.1", None)
+    """
+    user = getattr(connection.state, "user", None)
+    if user is not None and getattr(user, "id", None) is not None:
+        return f"user:{user.id}", getattr(user, "tier", None)
+
+    authorization = connection.headers.get("authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        claims = _token_claims(authorization[7:].strip())
+        if claims and claims[2] > time.time():
+            return f"user:{_hashed(claims[0])}", claims[1]
+
+    return f"ip:{client_ip(connection)}", None
 
 
 def get_rate_limit_key(request: Request) -> str:
     """
     Get rate limit key for identifying rate limit buckets.
-    
-    Uses user ID for authenticated users (more accurate per-user limits).
+
+    Uses the user for authenticated requests (more accurate per-user limits).
     Falls back to IP address for anonymous users.
-    
+
     @param request - FastAPI request object
     @returns Rate limit key string (e.g., "user:123" or "ip:192.168.1.1")
-    
-    @example
-    ```python
-    # Authenticated user
-    key = get_rate_limit_key(request)  # "user:550e8400-e29b-41d4-a716-446655440000"
-    
-    # Anonymous user
-    key = get_rate_limit_key(request)  # "ip:192.168.1.1"
-    ```
     """
-    # Try to get user from request state (set by auth middleware)
-    user = getattr(request.state, 'user', None)
-    if user and hasattr(user, 'id'):
-        return f"user:{user.id}"
-    
-    # Fallback to IP address
-    ip_address = get_remote_address(request)
-    return f"ip:{ip_address}"
-
-
-# Initialize rate limiter with enhanced key function
-limiter = Limiter(
-    key_func=get_rate_limit_key,
-    default_limits=["1000/hour"],  # Default limit: 1000 requests per hour
-    storage_uri=get_storage_uri(),  # Redis if available, otherwise memory
-    headers_enabled=True,  # Enable rate limit headers in responses
-)
+    return resolve_identity(request)[0]
+
+
+class RateLimiter:
+    """
+    Rate limiter checking all the limits of a request in one Redis round-trip.
+
+    Falls back to in-memory token buckets (per worker) when Redis is not
+    configured or fails; the check then never blocks on the network.
+    """
+
+    def __init__(
+        self,
+        default_limit: str = "1000/hour",
+        redis_client: Any = None,
+        key_prefix: str = RATE_LIMIT_KEY_PREFIX,
+        memory_max_keys: Optional[int] = None,
+        global_limits: Optional[bool] = None,
+    ):
+        parse_rate_limit(default_limit)
+        self.default_limit = default_limit
+        self.key_prefix = key_prefix
+        self.enabled = True
+        self.global_limits = settings.RATE_LIMIT_GLOBAL_LIMITS if global_limits is None else global_limits
+        self.local = LocalTokenBuckets(memory_max_keys or settings.RATE_LIMIT_MEMORY_MAX_KEYS)
+        self._redis_client = redis_client
+        self._script = None
+        self._last_fallback_warning = 0.0
+        self.stats = {"checks": 0, "rejected": 0, "redis": 0, "memory": 0, "redis_errors": 0}
+
+    def limit(self, limit: str) -> Callable:
+        """Decorator declaring an endpoint limit (checked by enforce_rate_limits)"""
+        parse_rate_limit(limit)
+
+        def decorator(func: Callable) -> Callable:
+            declared = list(getattr(func, RATE_LIMITS_ATTRIBUTE, ()))
+            declared.append(limit)
+            setattr(func, RATE_LIMITS_ATTRIBUTE, tuple(declared))
+            return func
+
+        return decorator
+
+    @property
+    def redis_client(self) -> Any:
+        if self._redis_client is None:
+            from app.core.cache import cache_backend
+
+            if cache_backend.use_redis and cache_backend.redis_client is not None:
+                self._redis_client = cache_backend.redis_client
+        return self._redis_client
+
+    def checks_for(self, connection: HTTPConnection) -> List[RateLimitCheck]:
+        """Limits that apply to a request, tightest scopes first"""
+        identity, tier = resolve_identity(connection)
+        checks: List[RateLimitCheck] = []
+
+        endpoint = connection.scope.get("endpoint")
+        declared = getattr(endpoint, RATE_LIMITS_ATTRIBUTE, None)
+        if declared is None and self.global_limits:
+            path_limit = get_rate_limit(connection.url.path)
+            declared = () if path_limit == RATE_LIMITS["default"] else (path_limit,)
+        if declared:
+            name = f"{endpoint.__module__}.{endpoint.__name__}" if endpoint is not None else connection.url.path
+            for limit in declared:
+                parsed = parse_rate_limit(limit)
+                checks.append(RateLimitCheck(f"{self.key_prefix}ep:{name}:{parsed.text}:{identity}", parsed, "endpoint"))
+
+        if self.global_limits and not connection.url.path.startswith(GLOBAL_LIMIT_EXEMPT_PREFIXES):
+            if identity.startswith("user:"):
+                checks.append(RateLimitCheck(
+                    f"{self.key_prefix}{identity}", parse_rate_limit(get_user_throttle_limit(tier)), "user"
+                ))
+            else:
+                checks.append(RateLimitCheck(
+                    f"{self.key_prefix}{identity}", parse_rate_limit(self.default_limit), "ip"
+                ))
+        return checks
+
+    async def hit(self, checks: List[RateLimitCheck]) -> RateLimitResult:
+        """Check and consume all `checks` atomically"""
+        self.stats["checks"] += 1
+        result = None
+        if checks and self.redis_client is not None:
+            result = await self._hit_redis(checks)
+        if result is None:
+            self.stats["memory"] += 1
+            result = self.local.hit(checks)
+        if not result.allowed:
+            self.stats["rejected"] += 1
+        return result
+
+    async def _hit_redis(self, checks: List[RateLimitCheck]) -> Optional[RateLimitResult]:
+        args: List[int] = []
+        for check in checks:
+            args.append(max(1, int(check.limit.emission_interval * 1000)))
+            args.append(int(check.limit.period * 1000))
+        try:
+            if self._script is None:
+                self._script = self.redis_client.register_script(_GCRA_SCRIPT)
+            allowed, index, after_ms, remaining = await self._script(keys=[c.key for c in checks], args=args)
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            now = time.monotonic()
+            if now - self._last_fallback_warning > _FALLBACK_WARNING_INTERVAL:
+                self._last_fallback_warning = now
+                logger.warning(f"Redis rate limiting failed, using in-memory buckets: {e}")
+            return None
+
+        self.stats["redis"] += 1
+        check = checks[int(index) - 1]
+        if int(allowed):
+            return RateLimitResult(
+                allowed=True,
+                limit=check.limit,
+                remaining=int(remaining),
+                reset_after=int(after_ms) / 1000,
+                scope=check.scope,
+                backend="redis",
+            )
+        return RateLimitResult(
+            allowed=False,
+            limit=check.limit,
+            retry_after=int(after_ms) / 1000,
+            reset_after=check.limit.period,
+            scope=check.scope,
+            backend="redis",
+        )
+
+    async def check(self, connection: HTTPConnection) -> Optional[RateLimitResult]:
+        """Check the request's limits; the result is stored on request.state.rate_limit"""
+        if not self.enabled:
+            return None
+        checks = self.checks_for(connection)
+        if not checks:
+            return None
+        result = await self.hit(checks)
+        connection.state.rate_limit = result
+        return result
+
+    def reset(self) -> None:
+        self.local.clear()
+        for key in self.stats:
+            self.stats[key] = 0
+
+
+# Initialize rate limiter (Redis from the shared cache backend, resolved lazily)
+limiter = RateLimiter(default_limit="1000/hour")
 
 # Comprehensive rate limits by endpoint category
 RATE_LIMITS: Dict[str, Dict[str, str]] = {
@@ -142,16 +501,17 @@ RATE_LIMITS: Dict[str, Dict[str, str]] = {
 }
 
 
+@lru_cache(maxsize=4096)
 def get_rate_limit(path: str) -> str:
     """
     Get rate limit for a given path.
-    
+
     Checks endpoint-specific limits first, then falls back to default.
     Supports path pattern matching with wildcards.
-    
+
     @param path - API endpoint path (e.g., "/api/v1/auth/login")
     @returns Rate limit string (e.g., "5/minute")
-    
+
     @example
     ```python
     limit = get_rate_limit("/api/v1/auth/login")  # "5/minute"
@@ -163,54 +523,96 @@ def get_rate_limit(path: str) -> str:
     for category, limits in RATE_LIMITS.items():
         if category == "default":
             continue
-        
+
         for pattern, limit in limits.items():
             # Exact match
             if pattern == path:
                 return limit
-            
+
             # Pattern matching (e.g., "/api/v1/users/{user_id}")
             if "{user_id}" in pattern:
                 pattern_base = pattern.replace("{user_id}", "")
                 if path.startswith(pattern_base):
                     return limit
-            
+
             if "{project_id}" in pattern:
                 pattern_base = pattern.replace("{project_id}", "")
                 if path.startswith(pattern_base):
                     return limit
-    
+
     # Return default limit
     return RATE_LIMITS["default"]
 
 
-def setup_rate_limiting(app) -> Any:
+async def enforce_rate_limits(connection: HTTPConnection) -> None:
+    """
+    Route dependency checking every limit of the request (one Redis call).
+
+    @throws RateLimitExceeded when one of the limits is exhausted
+    """
+    if connection.scope["type"] != "http":
+        return
+    active = getattr(connection.app.state, "limiter", None) or limiter
+    result = await active.check(connection)
+    if result is not None and not result.allowed:
+        raise RateLimitExceeded(result)
+
+
+class RateLimitHeadersMiddleware:
+    """Add X-RateLimit-* headers from request.state.rate_limit to responses"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                result = scope.get("state", {}).get("rate_limit")
+                if result is not None:
+                    headers = MutableHeaders(scope=message)
+                    for name, value in result.headers().items():
+                        if name not in headers:
+                            headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def setup_rate_limiting(app, rate_limiter: Optional[RateLimiter] = None) -> Any:
     """
     Configure rate limiting for the FastAPI application.
-    
-    Sets up the rate limiter middleware and exception handler.
-    Adds rate limit headers to all responses.
-    
+
+    Adds enforce_rate_limits to the routes included afterwards, the 429
+    exception handler and the rate limit headers middleware.
+
     @param app - FastAPI application instance
+    @param rate_limiter - Limiter to use (defaults to the shared `limiter`)
     @returns FastAPI app with rate limiting configured
-    
+
     @example
     ```python
     from fastapi import FastAPI
     from app.core.rate_limit import setup_rate_limiting
-    
+
     app = FastAPI()
     app = setup_rate_limiting(app)
+    app.include_router(api_router)
     ```
     """
-    app.state.limiter = limiter
-    
+    app.state.limiter = rate_limiter or limiter
+    app.router.dependencies.append(Depends(enforce_rate_limits))
+    app.add_middleware(RateLimitHeadersMiddleware)
+
     # Add custom exception handler with detailed error messages
     @app.exception_handler(RateLimitExceeded)
     async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
         """
         Custom rate limit exceeded handler.
-        
+
         Returns 429 Too Many Requests with rate limit information in headers.
         """
         # Log rate limit exceeded event
@@ -219,7 +621,7 @@ def setup_rate_limiting(app) -> Any:
             user = getattr(request.state, 'user', None)
             user_id = user.id if user and hasattr(user, 'id') else None
             user_email = user.email if user and hasattr(user, 'email') else None
-            
+
             # Create a separate session for audit logging
             db = AsyncSessionLocal()
             try:
@@ -236,9 +638,9 @@ def setup_rate_limiting(app) -> Any:
                     severity="warning",
                     success="failure",
                     metadata={
-                        "limit": str(getattr(exc, "limit", "unknown")),
-                        "remaining": str(getattr(exc, "remaining", 0)),
-                        "retry_after": str(getattr(exc, "retry_after", 60)),
+                        "limit": exc.limit,
+                        "scope": exc.result.scope,
+                        "retry_after": str(exc.retry_after),
                     }
                 )
             finally:
@@ -246,23 +648,17 @@ def setup_rate_limiting(app) -> Any:
         except Exception as e:
             # Don't fail the request if audit logging fails
             logger.warning(f"Failed to log rate limit exceeded event: {e}")
-        
-        response = JSONResponse(
+
+        return JSONResponse(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             content={
                 "error": "rate_limit_exceeded",
                 "message": "Too many requests. Please try again later.",
-                "retry_after": getattr(exc, "retry_after", None),
+                "retry_after": exc.retry_after,
             },
+            headers=exc.result.headers(),
         )
-        
-        # Add rate limit headers
-        response.headers["X-RateLimit-Limit"] = str(getattr(exc, "limit", "unknown"))
-        response.headers["X-RateLimit-Remaining"] = str(getattr(exc, "remaining", 0))
-        response.headers["Retry-After"] = str(getattr(exc, "retry_after", 60))
-        
-        return response
-    
+
     logger.info("Rate limiting configured with comprehensive endpoint limits")
     return app
 
@@ -270,14 +666,14 @@ def setup_rate_limiting(app) -> Any:
 def rate_limit_decorator(limit: str):
     """
     Decorator to apply rate limiting to an endpoint.
-    
+
     @param limit - Rate limit string (e.g., "5/minute", "100/hour")
     @returns Decorator function
-    
+
     @example
     ```python
     from app.core.rate_limit import rate_limit_decorator
-    
+
     @router.post("/api/v1/auth/login")
     @rate_limit_decorator("5/minute")
     async def login(credentials: LoginSchema):
@@ -291,27 +687,31 @@ def rate_limit_decorator(limit: str):
 def get_rate_limit_info(request: Request) -> Dict[str, Any]:
     """
     Get current rate limit information for a request.
-    
+
     Useful for displaying rate limit status to users.
-    
+
     @param request - FastAPI request object
     @returns Dictionary with rate limit information
-    
+
     @example
     ```python
     info = get_rate_limit_info(request)
     # {
     #   "limit": "100/hour",
     #   "remaining": 95,
-    #   "reset": "2025-01-25T12:00:00Z"
+    #   "reset": 36
     # }
     ```
     """
-    # This would require accessing the limiter's internal state
-    # Implementation depends on slowapi's internal API
+    result: Optional[RateLimitResult] = getattr(request.state, "rate_limit", None)
+    if result is None or result.limit is None:
+        return {
+            "limit": "unknown",
+            "remaining": "unknown",
+            "reset": "unknown",
+        }
     return {
-        "limit": "unknown",
-        "remaining": "unknown",
-        "reset": "unknown",
+        "limit": result.limit.text,
+        "remaining": max(result.remaining, 0),
+        "reset": math.ceil(result.reset_after),
     }
-
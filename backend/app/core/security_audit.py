@@ -1,14 +1,27 @@
 """
 Security Audit Logging
 Comprehensive security event logging for audit trails
+
+Events are queued in memory and written in batches (multi-row INSERT) by a
+background worker (AuditLogWriter), so requests no longer wait for an audit
+commit. Events the database cannot take are spilled to a local JSONL file and
+replayed on the next successful flush; the queue is drained at shutdown.
+Critical events (severity "critical" and SYNCHRONOUS_EVENT_TYPES) are still
+committed before log_event returns.
 """
 
-from datetime import datetime
-from typing import Optional, Dict, Any
+import asyncio
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, Dict, Any, List
 from enum import Enum
-from sqlalchemy import Column, DateTime, Integer, String, Text, JSON, Index, func
+from sqlalchemy import Column, DateTime, Integer, String, Text, JSON, Index, func, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import Base, AsyncSessionLocal
 from app.core.logging import logger
 
@@ -92,6 +105,224 @@ class SecurityAuditLog(Base):
         return f"<SecurityAuditLog(id={self.id}, event_type={self.event_type}, user_id={self.user_id}, timestamp={self.timestamp})>"
 
 
+# Events acknowledged synchronously (committed before log_event returns), whatever their severity
+SYNCHRONOUS_EVENT_TYPES = frozenset({
+    SecurityEventType.PASSWORD_CHANGE,
+    SecurityEventType.PASSWORD_RESET_COMPLETE,
+    SecurityEventType.API_KEY_CREATED,
+    SecurityEventType.API_KEY_ROTATED,
+    SecurityEventType.API_KEY_REVOKED,
+    SecurityEventType.ROLE_CHANGED,
+    SecurityEventType.ACCESS_GRANTED,
+    SecurityEventType.ACCESS_REVOKED,
+    SecurityEventType.CONFIGURATION_CHANGED,
+    SecurityEventType.SECURITY_SETTING_CHANGED,
+})
+
+
+class AuditLogWriter:
+    """
+    Batched, asynchronous writer of security audit events
+
+    submit() only appends to a bounded queue. A background task takes up to
+    batch_size events at a time (waiting flush_interval for a batch to fill)
+    and writes them with one multi-row INSERT in its own session. When the
+    insert fails, or the queue is full, events go to a JSONL spill file which
+    is replayed after the next successful insert. close() drains the queue.
+    """
+
+    def __init__(
+        self,
+        session_factory=None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        spill_path: Optional[str] = None,
+    ):
+        self._session_factory = session_factory or AsyncSessionLocal
+        self.queue_size = queue_size or settings.AUDIT_LOG_QUEUE_SIZE
+        self.batch_size = batch_size or settings.AUDIT_LOG_BATCH_SIZE
+        self.flush_interval = settings.AUDIT_LOG_FLUSH_INTERVAL_SEC if flush_interval is None else flush_interval
+        self.spill_path = Path(
+            spill_path
+            or settings.AUDIT_LOG_SPILL_PATH
+            or os.path.join(tempfile.gettempdir(), "immoassist_security_audit_spill.jsonl")
+        )
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        # Batch held by the worker until written (written by close() if the worker is cancelled)
+        self._batch: List[Dict[str, Any]] = []
+        self.stats = {"queued": 0, "written": 0, "batches": 0, "spilled": 0, "replayed": 0, "failures": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def submit(self, values: Dict[str, Any]) -> None:
+        """Queue one event (SecurityAuditLog column values); spills it when the queue is full"""
+        try:
+            self._queue.put_nowait(values)
+            self.stats["queued"] += 1
+        except asyncio.QueueFull:
+            self._spill([values])
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            self._batch = [await self._queue.get()]
+            self._batch += self._take(self.batch_size - 1)
+            if len(self._batch) < self.batch_size and self.flush_interval:
+                await asyncio.sleep(self.flush_interval)
+                self._batch += self._take(self.batch_size - len(self._batch))
+            await self._write(self._batch)
+            self._batch = []
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> None:
+        async with self._session_factory() as session:
+            await session.execute(insert(SecurityAuditLog.__table__), batch)
+            await session.commit()
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        async with self._write_lock:
+            try:
+                await self._insert(batch)
+            except Exception as e:
+                self.stats["failures"] += 1
+                logger.error(
+                    f"Security audit batch insert failed, spilling {len(batch)} events: {e}",
+                    context={"spill_path": str(self.spill_path)},
+                )
+                self._spill(batch)
+                return False
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+            if self.spill_path.exists():
+                await self._replay_spill()
+            return True
+
+    def _spill(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("a", encoding="utf-8") as spill:
+                for values in batch:
+                    spill.write(json.dumps(values, default=_json_default) + "\n")
+            self.stats["spilled"] += len(batch)
+        except OSError as e:
+            logger.critical(
+                f"❌ SECURITY AUDIT EVENTS LOST: cannot write spill file: {e}",
+                context={"spill_path": str(self.spill_path), "events": len(batch)},
+            )
+
+    async def _replay_spill(self) -> None:
+        """Insert spilled events (caller holds _write_lock); whatever fails stays spilled"""
+        replay_path = self.spill_path.with_name(self.spill_path.name + ".replay")
+        try:
+            self.spill_path.replace(replay_path)
+            with replay_path.open(encoding="utf-8") as spill:
+                events = [_load_spilled(line) for line in spill if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot read security audit spill file: {e}", context={"spill_path": str(self.spill_path)})
+            return
+        for start in range(0, len(events), self.batch_size):
+            try:
+                await self._insert(events[start:start + self.batch_size])
+            except Exception as e:
+                logger.error(f"Security audit spill replay failed: {e}")
+                self._spill(events[start:])
+                self.stats["spilled"] -= len(events) - start
+                break
+            self.stats["replayed"] += len(events[start:start + self.batch_size])
+        replay_path.unlink(missing_ok=True)
+        if self.stats["replayed"]:
+            logger.info(f"Security audit spill replayed ({self.stats['replayed']} events so far)")
+
+    async def flush(self) -> None:
+        """Write everything queued now (spilling what the database refuses)"""
+        while not self._queue.empty():
+            await self._write(self._take(self.batch_size))
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        if self._queue.empty():
+            # Bind the queue and lock to the running loop (the app may be restarted in another loop)
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._write_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="security-audit-writer")
+        # Events spilled by a previous process
+        if self.spill_path.exists():
+            async with self._write_lock:
+                await self._replay_spill()
+
+    async def close(self) -> None:
+        """Stop the worker and drain the queue"""
+        if self._task is not None:
+            # Let an in-flight batch finish before cancelling the worker
+            async with self._write_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._batch:
+            await self._write(self._batch)
+            self._batch = []
+        await self.flush()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+
+def _load_spilled(line: str) -> Dict[str, Any]:
+    values = json.loads(line)
+    timestamp = values.get("timestamp")
+    if isinstance(timestamp, dict) and "__datetime__" in timestamp:
+        values["timestamp"] = datetime.fromisoformat(timestamp["__datetime__"])
+    return values
+
+
+audit_log_writer = AuditLogWriter()
+
+
+def _model_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values -> SecurityAuditLog constructor arguments (the metadata column is event_metadata)"""
+    model_values = dict(values)
+    model_values["event_metadata"] = model_values.pop("metadata")
+    return model_values
+
+
+def _log_to_application(audit_log: SecurityAuditLog) -> None:
+    """Mirror the audit event to the application logger"""
+    log_context = {
+        "audit_log_id": audit_log.id,
+        "event_type": audit_log.event_type,
+        "user_id": audit_log.user_id,
+        "severity": audit_log.severity,
+    }
+    message = f"Security audit: {audit_log.description}"
+    if audit_log.severity == "critical":
+        logger.critical(message, context=log_context)
+    elif audit_log.severity == "error":
+        logger.error(message, context=log_context)
+    elif audit_log.severity == "warning":
+        logger.warning(message, context=log_context)
+    else:
+        logger.info(message, context=log_context)
+
+
 class SecurityAuditLogger:
     """Security audit logger"""
     
@@ -110,12 +341,18 @@ class SecurityAuditLogger:
         severity: str = "info",
         success: str = "unknown",
         metadata: Optional[Dict[str, Any]] = None,
+        acknowledge: bool = False,
     ) -> Optional[SecurityAuditLog]:
         """
         Log a security event
         
+        The event is queued for the background audit writer unless it is critical
+        (severity "critical", SYNCHRONOUS_EVENT_TYPES, acknowledge=True) or the
+        writer is not running: it is then committed before returning, in `db`
+        when given.
+        
         Args:
-            db: Database session
+            db: Database session (synchronous writes only)
             event_type: Type of security event
             description: Human-readable description
             user_id: User ID (if applicable)
@@ -128,10 +365,40 @@ class SecurityAuditLogger:
             severity: Event severity (info, warning, error, critical)
             success: Event result (success, failure, unknown)
             metadata: Additional structured data
+            acknowledge: Commit the event before returning
         
         Returns:
-            Created SecurityAuditLog record, or None if logging failed
+            SecurityAuditLog record (without id when queued), or None if logging failed
         """
+        values = {
+            "timestamp": datetime.now(timezone.utc),
+            "event_type": event_type.value,
+            "description": description,
+            "user_id": user_id,
+            "user_email": user_email,
+            "api_key_id": api_key_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "request_method": request_method,
+            "request_path": request_path,
+            "severity": severity,
+            "success": success,
+            "metadata": metadata or {},
+        }
+        
+        synchronous = (
+            acknowledge
+            or severity == "critical"
+            or event_type in SYNCHRONOUS_EVENT_TYPES
+            or not settings.AUDIT_LOG_ASYNC
+            or not audit_log_writer.running
+        )
+        if not synchronous:
+            audit_log_writer.submit(values)
+            audit_log = SecurityAuditLog(**_model_values(values))
+            _log_to_application(audit_log)
+            return audit_log
+        
         # Use provided session or create a new one for audit logging
         # Creating a separate session ensures the log is saved even if the main transaction fails
         use_separate_session = db is None
@@ -139,20 +406,7 @@ class SecurityAuditLogger:
             db = AsyncSessionLocal()
         
         try:
-            audit_log = SecurityAuditLog(
-                event_type=event_type.value,
-                description=description,
-                user_id=user_id,
-                user_email=user_email,
-                api_key_id=api_key_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_method=request_method,
-                request_path=request_path,
-                severity=severity,
-                success=success,
-                event_metadata=metadata or {},
-            )
+            audit_log = SecurityAuditLog(**_model_values(values))
             
             db.add(audit_log)
             # Commit immediately to ensure the audit log is saved
@@ -160,23 +414,7 @@ class SecurityAuditLogger:
             await db.commit()
             await db.refresh(audit_log)
             
-            # Also log to application logger
-            log_context = {
-                "audit_log_id": audit_log.id,
-                "event_type": event_type.value,
-                "user_id": user_id,
-                "severity": severity,
-            }
-            
-            if severity == "critical":
-                logger.critical(f"Security audit: {description}", context=log_context)
-            elif severity == "error":
-                logger.error(f"Security audit: {description}", context=log_context)
-            elif severity == "warning":
-                logger.warning(f"Security audit: {description}", context=log_context)
-            else:
-                logger.info(f"Security audit: {description}", context=log_context)
-            
+            _log_to_application(audit_log)
             return audit_log
         except Exception as e:
             # Rollback on error
@@ -5,7 +5,7 @@ Logs slow database queries for performance monitoring and optimization
 
 import time
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select
 
@@ -41,6 +41,28 @@ def log_slow_query(query: Select, execution_time: float, threshold: float = SLOW
         )
 
 
+def log_slow_statement(statement: str, execution_time: float, threshold: Optional[float] = None):
+    """
+    Log a slow raw SQL statement (called by the engine instrumentation, see app.core.query_instrumentation)
+    
+    Args:
+        statement: SQL statement as sent to the driver
+        execution_time: Statement execution time in seconds
+        threshold: Threshold in seconds to consider the statement slow (default: SLOW_QUERY_THRESHOLD)
+    """
+    if threshold is None:
+        threshold = SLOW_QUERY_THRESHOLD
+    if execution_time > threshold:
+        logger.warning(
+            f"Slow query detected ({execution_time:.3f}s > {threshold}s threshold)",
+            context={
+                "query": statement[:500],
+                "execution_time": execution_time,
+                "threshold": threshold,
+            }
+        )
+
+
 async def log_slow_query_async(query: Select, execution_time: float, threshold: float = SLOW_QUERY_THRESHOLD):
     """
     Async version of slow query logger
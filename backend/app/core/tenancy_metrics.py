@@ -143,6 +143,10 @@ class TenancyMetrics:
             "resources": {}
         }
         
+        if TenancyConfig.is_separate_db_mode():
+            from app.core.tenant_database_manager import tenant_engine_pool
+            stats["engine_pool"] = tenant_engine_pool.tenant_status(tenant_id)
+        
         # Count resources for each tenant-aware model
         from app.models.project import Project
         from app.models.form import Form
@@ -196,6 +200,22 @@ class TenancyMetrics:
         
         return statistics
     
+    @staticmethod
+    def get_engine_pool_statistics() -> Dict:
+        """
+        Get tenant engine pool occupancy (separate_db mode).
+        
+        Returns:
+            Dictionary with pool limits, open engines and per-tenant
+            connection usage (most recently used first)
+        """
+        if not TenancyConfig.is_separate_db_mode():
+            return {}
+        
+        from app.core.tenant_database_manager import tenant_engine_pool
+        
+        return tenant_engine_pool.status()
+    
     @staticmethod
     async def get_system_statistics(db: AsyncSession) -> Dict:
         """
@@ -232,7 +252,8 @@ class TenancyMetrics:
             "tenant_count": tenant_count,
             "total_users": total_users,
             "total_resources": total_resources,
-            "tenants": all_stats
+            "tenants": all_stats,
+            "engine_pool": TenancyMetrics.get_engine_pool_statistics()
         }
 
 
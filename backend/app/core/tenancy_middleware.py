@@ -15,6 +15,7 @@ from fastapi import Request, HTTPException, status
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.core.tenancy import TenancyConfig, set_current_tenant, get_current_tenant, clear_current_tenant
+from app.core.tenant_scoping import set_tenant_scope_bypass
 from app.core.logging import logger
 
 
@@ -44,6 +45,7 @@ class TenancyMiddleware(BaseHTTPMiddleware):
         """
         # Clear tenant context at start of request
         clear_current_tenant()
+        set_tenant_scope_bypass(False)
         
         # If tenancy is disabled, skip middleware logic
         if TenancyConfig.is_single_mode():
@@ -6,18 +6,327 @@ This module handles:
 - Creating new tenant databases
 - Getting database connections for tenants
 - Managing tenant database registry
+
+Tenant engines live in a bounded LRU pool (TenantEnginePool):
+- at most TENANT_ENGINE_MAX engines are open; opening one more disposes the
+  least recently used engine that is not in use (no checked-out connection and
+  no session leased by get_tenant_db, which may not have connected yet);
+- engines unused for TENANT_ENGINE_IDLE_TIMEOUT_SEC are disposed in the background;
+- a new engine's pool gets TENANT_DB_CONNECTION_BUDGET divided by the engines
+  open at that moment (itself included), capped at DB_POOL_SIZE + DB_MAX_OVERFLOW
+  and never below TENANT_ENGINE_MIN_CONNECTIONS: a handful of busy tenants get
+  real pools instead of budget // TENANT_ENGINE_MAX each;
+- the most active tenants (usage counts kept in the cache) are warmed up at startup.
 """
 
-from typing import Optional, Dict
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError, ProgrammingError, SQLAlchemyError
-import os
 
 from app.core.tenancy import TenancyConfig
 from app.core.config import settings
 from app.core.logging import logger
 
+ACTIVITY_CACHE_KEY = "tenancy:engine_activity"
+ACTIVITY_CACHE_TTL_SEC = 7 * 24 * 3600
+
+
+def _create_tenant_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if settings.DB_QUERY_INSTRUMENTATION:
+        from app.core.query_instrumentation import instrument_engine
+
+        instrument_engine(engine)
+    return engine
+
+
+@dataclass
+class TenantEngineEntry:
+    """An open tenant engine, its session factory and usage"""
+
+    tenant_id: int
+    engine: AsyncEngine
+    session_factory: async_sessionmaker
+    created_at: float
+    last_used: float
+    uses: int = 0
+    leases: int = 0
+
+    @property
+    def checked_out(self) -> int:
+        pool = self.engine.sync_engine.pool
+        return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+    @property
+    def in_use(self) -> bool:
+        """Leased sessions or checked-out connections: the engine must not be disposed"""
+        return self.leases > 0 or self.checked_out > 0
+
+    def occupancy(self, now: Optional[float] = None) -> Dict:
+        pool = self.engine.sync_engine.pool
+        now = time.monotonic() if now is None else now
+        return {
+            "tenant_id": self.tenant_id,
+            "pool_size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": self.checked_out,
+            "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "leases": self.leases,
+            "uses": self.uses,
+            "idle_sec": round(now - self.last_used, 1),
+            "age_sec": round(now - self.created_at, 1),
+        }
+
+
+class TenantEnginePool:
+    """LRU-bounded tenant engines sharing one connection budget (see module docstring)"""
+
+    def __init__(
+        self,
+        url_for: Callable[[int], str],
+        max_engines: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        connection_budget: Optional[int] = None,
+        min_connections: Optional[int] = None,
+        engine_factory: Callable[..., AsyncEngine] = _create_tenant_engine,
+    ):
+        self.url_for = url_for
+        self.max_engines = max_engines or settings.TENANT_ENGINE_MAX
+        self.idle_timeout = idle_timeout or settings.TENANT_ENGINE_IDLE_TIMEOUT_SEC
+        self.connection_budget = connection_budget or settings.TENANT_DB_CONNECTION_BUDGET
+        self.min_connections = min_connections or settings.TENANT_ENGINE_MIN_CONNECTIONS
+        self.engine_factory = engine_factory
+        self.evictions = 0
+        self._entries: "OrderedDict[int, TenantEngineEntry]" = OrderedDict()
+        self._activity: Counter = Counter()
+        self._disposals: set[asyncio.Task] = set()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def connection_share(self, open_engines: int) -> int:
+        """Connections (pool_size + max_overflow) for an engine opened next to `open_engines` - 1 others"""
+        share = min(self.connection_budget // max(1, open_engines), settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+        return max(self.min_connections, share)
+
+    @property
+    def per_engine_connections(self) -> int:
+        """Connections the next tenant engine may open (pool_size + max_overflow)"""
+        return self.connection_share(len(self._entries) + 1)
+
+    def __contains__(self, tenant_id: int) -> bool:
+        return tenant_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def acquire(self, tenant_id: int, record: bool = True) -> TenantEngineEntry:
+        """Engine entry of `tenant_id`, created (after making room) if needed"""
+        now = time.monotonic()
+        entry = self._entries.get(tenant_id)
+        if entry is None:
+            self._make_room()
+            entry = self._create(tenant_id, now)
+            self._entries[tenant_id] = entry
+        else:
+            self._entries.move_to_end(tenant_id)
+        entry.last_used = now
+        if record:
+            entry.uses += 1
+            self._activity[tenant_id] += 1
+        return entry
+
+    def _create(self, tenant_id: int, now: float) -> TenantEngineEntry:
+        limit = self.per_engine_connections
+        pool_size = min(settings.DB_POOL_SIZE, limit)
+        engine = self.engine_factory(self.url_for(tenant_id), pool_size=pool_size, max_overflow=limit - pool_size)
+        session_factory = async_sessionmaker(
+            engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+        logger.debug(f"Created engine for tenant {tenant_id}")
+        return TenantEngineEntry(tenant_id, engine, session_factory, created_at=now, last_used=now)
+
+    @asynccontextmanager
+    async def session(self, tenant_id: int) -> AsyncIterator[AsyncSession]:
+        """Session on the tenant engine, leased so the engine is not evicted while the session lives"""
+        entry = self.acquire(tenant_id)
+        entry.leases += 1
+        try:
+            async with entry.session_factory() as session:
+                yield session
+        finally:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+
+    def _make_room(self) -> None:
+        while len(self._entries) >= self.max_engines:
+            # Least recently used first; engines in use are kept
+            victim = next((e for e in self._entries.values() if not e.in_use), None)
+            if victim is None:
+                logger.warning(
+                    f"All {len(self._entries)} tenant engines are busy, exceeding TENANT_ENGINE_MAX",
+                    context={"max_engines": self.max_engines},
+                )
+                return
+            self._evict(victim.tenant_id)
+
+    def _evict(self, tenant_id: int) -> None:
+        entry = self._entries.pop(tenant_id, None)
+        if entry is None:
+            return
+        self.evictions += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop to close connections on: drop the pool, connections close when collected
+            entry.engine.sync_engine.dispose(close=False)
+            return
+        task = loop.create_task(entry.engine.dispose())
+        self._disposals.add(task)
+        task.add_done_callback(self._disposals.discard)
+        logger.debug(f"Evicted engine of tenant {tenant_id}")
+
+    async def remove(self, tenant_id: int) -> None:
+        """Dispose the engine of `tenant_id` now (e.g. before dropping its database)"""
+        entry = self._entries.pop(tenant_id, None)
+        if entry is not None:
+            await entry.engine.dispose()
+
+    async def sweep_idle(self) -> int:
+        """Dispose engines idle for longer than the idle timeout; returns how many"""
+        deadline = time.monotonic() - self.idle_timeout
+        idle = [e for e in self._entries.values() if e.last_used < deadline and not e.in_use]
+        for entry in idle:
+            self._entries.pop(entry.tenant_id, None)
+            self.evictions += 1
+            await entry.engine.dispose()
+        if idle:
+            logger.info(f"Disposed {len(idle)} idle tenant engines", context={"open": len(self._entries)})
+        return len(idle)
+
+    async def flush_activity(self) -> None:
+        """Merge usage counts into the cache (older counts halve at each flush)"""
+        from app.core.cache import cache_backend
+
+        if not self._activity or not cache_backend.use_redis:
+            return
+        counts, self._activity = self._activity, Counter()
+        stored = await cache_backend.get(ACTIVITY_CACHE_KEY) or {}
+        merged = {k: v / 2 for k, v in stored.items() if v >= 1}
+        for tenant_id, uses in counts.items():
+            merged[str(tenant_id)] = merged.get(str(tenant_id), 0) + uses
+        await cache_backend.set(ACTIVITY_CACHE_KEY, merged, expire=ACTIVITY_CACHE_TTL_SEC)
+
+    async def most_active_tenants(self, limit: int) -> List[int]:
+        """Tenants ranked by recorded usage, or most recently updated active teams"""
+        from app.core.cache import cache_backend
+
+        if limit <= 0:
+            return []
+        stored = await cache_backend.get(ACTIVITY_CACHE_KEY) if cache_backend.use_redis else None
+        if stored:
+            ranked = sorted(stored.items(), key=lambda item: item[1], reverse=True)
+            return [int(tenant_id) for tenant_id, _ in ranked[:limit]]
+
+        from sqlalchemy import select
+
+        from app.core.database import AsyncSessionLocal
+        from app.models.team import Team
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Team.id).where(Team.is_active.is_(True)).order_by(Team.updated_at.desc()).limit(limit)
+            )
+            return list(result.scalars().all())
+
+    async def warm_up(self, tenant_ids: List[int]) -> int:
+        """Open engines (one connection each) for `tenant_ids`; returns how many succeeded"""
+        warmed = 0
+        for tenant_id in tenant_ids[: self.max_engines]:
+            entry = self.acquire(tenant_id, record=False)
+            try:
+                async with entry.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                warmed += 1
+            except Exception as e:
+                logger.warning(f"Tenant {tenant_id} engine warm-up failed: {e}")
+                await self.remove(tenant_id)
+        return warmed
+
+    async def _sweep_loop(self) -> None:
+        interval = max(5.0, min(60.0, self.idle_timeout / 2))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep_idle()
+                await self.flush_activity()
+            except Exception as e:
+                logger.error(f"Tenant engine sweep failed: {e}")
+
+    async def start(self) -> None:
+        """Warm up the most active tenants, then sweep idle engines in the background"""
+        if self._sweeper is not None:
+            return
+        try:
+            tenant_ids = await self.most_active_tenants(settings.TENANT_ENGINE_WARMUP_COUNT)
+            warmed = await self.warm_up(tenant_ids)
+            logger.info(f"Warmed up {warmed} tenant engines", context={"candidates": len(tenant_ids)})
+        except Exception as e:
+            logger.warning(f"Tenant engine warm-up skipped: {e}")
+        self._sweeper = asyncio.create_task(self._sweep_loop(), name="tenant-engine-sweeper")
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        try:
+            await self.flush_activity()
+        except Exception as e:
+            logger.warning(f"Tenant engine activity not saved: {e}")
+        entries, self._entries = list(self._entries.values()), OrderedDict()
+        for entry in entries:
+            await entry.engine.dispose()
+        if self._disposals:
+            await asyncio.gather(*self._disposals, return_exceptions=True)
+
+    def tenant_status(self, tenant_id: int) -> Optional[Dict]:
+        entry = self._entries.get(tenant_id)
+        return entry.occupancy() if entry is not None else None
+
+    def status(self) -> Dict:
+        now = time.monotonic()
+        tenants = [entry.occupancy(now) for entry in reversed(self._entries.values())]
+        return {
+            "max_engines": self.max_engines,
+            "idle_timeout_sec": self.idle_timeout,
+            "connection_budget": self.connection_budget,
+            "per_engine_connections": self.per_engine_connections,
+            "open_engines": len(tenants),
+            "checked_out": sum(t["checked_out"] for t in tenants),
+            "evictions": self.evictions,
+            "tenants": tenants,
+        }
+
 
 class TenantDatabaseManager:
     """
@@ -27,9 +336,6 @@ class TenantDatabaseManager:
     Only active when TENANCY_MODE=separate_db.
     """
     
-    _engines: Dict[int, any] = {}
-    _sessions: Dict[int, async_sessionmaker] = {}
-    
     @classmethod
     def is_enabled(cls) -> bool:
         """Check if separate database mode is enabled"""
@@ -196,24 +502,12 @@ class TenantDatabaseManager:
             tenant_id: Tenant/team ID
         
         Returns:
-            SQLAlchemy async engine
+            SQLAlchemy async engine (from the bounded tenant engine pool)
         """
         if not cls.is_enabled():
             raise ValueError("Tenant engines only available in separate_db mode")
         
-        if tenant_id not in cls._engines:
-            db_url = cls.get_tenant_db_url(tenant_id)
-            cls._engines[tenant_id] = create_async_engine(
-                db_url,
-                echo=settings.DEBUG,
-                future=True,
-                pool_pre_ping=True,
-                pool_size=settings.DB_POOL_SIZE,
-                max_overflow=settings.DB_MAX_OVERFLOW,
-            )
-            logger.debug(f"Created engine for tenant {tenant_id}")
-        
-        return cls._engines[tenant_id]
+        return tenant_engine_pool.acquire(tenant_id).engine
     
     @classmethod
     def get_tenant_session_factory(cls, tenant_id: int) -> async_sessionmaker:
@@ -229,17 +523,7 @@ class TenantDatabaseManager:
         if not cls.is_enabled():
             raise ValueError("Tenant sessions only available in separate_db mode")
         
-        if tenant_id not in cls._sessions:
-            engine = cls.get_tenant_engine(tenant_id)
-            cls._sessions[tenant_id] = async_sessionmaker(
-                engine,
-                class_=AsyncSession,
-                expire_on_commit=False,
-                autocommit=False,
-                autoflush=False,
-            )
-        
-        return cls._sessions[tenant_id]
+        return tenant_engine_pool.acquire(tenant_id).session_factory
     
     @classmethod
     async def get_tenant_db(cls, tenant_id: int) -> AsyncSession:
@@ -257,8 +541,7 @@ class TenantDatabaseManager:
         if not cls.is_enabled():
             raise ValueError("Tenant databases only available in separate_db mode")
         
-        session_factory = cls.get_tenant_session_factory(tenant_id)
-        async with session_factory() as session:
+        async with tenant_engine_pool.session(tenant_id) as session:
             try:
                 yield session
             finally:
@@ -292,11 +575,7 @@ class TenantDatabaseManager:
         
         try:
             # Close and remove engine/session if exists
-            if tenant_id in cls._engines:
-                await cls._engines[tenant_id].dispose()
-                del cls._engines[tenant_id]
-            if tenant_id in cls._sessions:
-                del cls._sessions[tenant_id]
+            await tenant_engine_pool.remove(tenant_id)
             
             # Create async engine for admin connection
             admin_engine = create_async_engine(
@@ -352,3 +631,5 @@ class TenantDatabaseManager:
             logger.error(f"Unexpected error deleting tenant database {db_name}: {e}", exc_info=True)
             raise
 
+
+tenant_engine_pool = TenantEnginePool(url_for=TenantDatabaseManager.get_tenant_db_url)
@@ -0,0 +1,98 @@
+"""
+Automatic Tenant Scoping
+
+Adds the current tenant's team_id criteria to every ORM statement on tenant-aware
+models (models using TenantMixin), so endpoints no longer depend on calling
+apply_tenant_scope by hand. The explicit helpers stay valid: they add the same
+criteria.
+
+A do_orm_execute hook adds with_loader_criteria(TenantMixin, team_id == tenant)
+to ORM SELECTs and bulk UPDATE / DELETE statements. The criteria then also apply
+to joined, eager and lazy loads of the tenant-aware models involved. The criteria
+is a lambda: SQLAlchemy compiles it once per model and statement and caches it,
+and the tenant id is a bound parameter, so switching tenants recompiles nothing.
+
+Statements are left unscoped when:
+- tenancy is disabled, TENANT_AUTO_SCOPING is off or no tenant is set;
+- no tenant-aware model is mapped;
+- scoping is bypassed for the request (admin tools, see bypass_tenant_scope);
+- the statement has execution_options(skip_tenant_scope=True).
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper, Session, with_loader_criteria
+
+from app.core.config import settings
+from app.core.mixins import TenantMixin
+from app.core.tenancy import TenancyConfig, _current_tenant_id
+
+SKIP_TENANT_SCOPE_OPTION = "skip_tenant_scope"
+
+_tenant_scope_bypass: ContextVar[bool] = ContextVar("_tenant_scope_bypass", default=False)
+
+# Mapped TenantMixin models that have a team_id column
+_tenant_models: set[type] = set()
+
+
+def set_tenant_scope_bypass(bypass: bool) -> None:
+    """Disable (True) or restore (False) automatic scoping for the current request"""
+    _tenant_scope_bypass.set(bypass)
+
+
+def is_tenant_scope_bypassed() -> bool:
+    return _tenant_scope_bypass.get()
+
+
+@contextmanager
+def bypass_tenant_scope() -> Iterator[None]:
+    """Run cross-tenant queries (admin tools, maintenance jobs) without automatic scoping"""
+    token = _tenant_scope_bypass.set(True)
+    try:
+        yield
+    finally:
+        _tenant_scope_bypass.reset(token)
+
+
+def tenant_models() -> frozenset:
+    """Tenant-aware models seen so far (registered as mappers are configured)"""
+    return frozenset(_tenant_models)
+
+
+@lru_cache(maxsize=1024)
+def tenant_criteria(tenant_id: int):
+    """Loader criteria restricting every TenantMixin model to `tenant_id` (one option per tenant)"""
+    return with_loader_criteria(
+        TenantMixin,
+        lambda cls: cls.team_id == tenant_id,
+        include_aliases=True,
+    )
+
+
+@event.listens_for(Mapper, "mapper_configured")
+def _register_tenant_model(mapper: Mapper, cls: type) -> None:
+    if issubclass(cls, TenantMixin) and "team_id" in mapper.columns:
+        _tenant_models.add(cls)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_current_tenant(orm_execute_state: Any) -> None:
+    if not _tenant_models:
+        return
+    if not (orm_execute_state.is_select or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    # Lazy / deferred loads inherit the criteria of the statement that loaded the parent
+    if orm_execute_state.is_column_load or orm_execute_state.is_relationship_load:
+        return
+    tenant_id = _current_tenant_id.get()
+    if tenant_id is None or _tenant_scope_bypass.get():
+        return
+    if not settings.TENANT_AUTO_SCOPING or not TenancyConfig.is_enabled():
+        return
+    if orm_execute_state.execution_options.get(SKIP_TENANT_SCOPE_OPTION):
+        return
+    orm_execute_state.statement = orm_execute_state.statement.options(tenant_criteria(tenant_id))
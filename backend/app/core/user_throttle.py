@@ -1,40 +1,30 @@
 """
 User-Based Request Throttling
-Implements per-user request throttling (separate from IP-based rate limiting)
+Per-user tier limits, enforced by the shared limiter of app.core.rate_limit
+(one Redis round-trip per request for the IP, user, tier and endpoint limits).
+
+The tier comes from the "tier" claim of the access token (or request.state.user.tier),
+so resolving it never queries the database. Tiers are not wired yet: no token issuer
+sets the claim, so every authenticated user gets the "default" limit.
 """
 
 from typing import Optional
-from fastapi import Request, HTTPException, status
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-
-from app.core.config import settings
-from app.core.logging import logger
+from fastapi import Request
 
 
 def get_user_throttle_key(request: Request) -> str:
     """Get throttle key for user-based throttling"""
-    # Try to get user from request state (set by auth middleware)
-    user = getattr(request.state, 'user', None)
-    if user and hasattr(user, 'id'):
-        return f"user_throttle:{user.id}"
-    
-    # Fallback to IP if no user
-    return f"ip_throttle:{get_remote_address(request)}"
-
+    from app.core.rate_limit import resolve_identity
 
-# User-based throttler (separate from IP-based rate limiter)
-user_throttler = Limiter(
-    key_func=get_user_throttle_key,
-    default_limits=["1000/hour"],  # Default: 1000 requests per hour per user
-    storage_uri=settings.REDIS_URL if settings.REDIS_URL else "memory://",
-)
+    identity, _ = resolve_identity(request)
+    return identity.replace("user:", "user_throttle:", 1).replace("ip:", "ip_throttle:", 1)
 
 
 def user_throttle_decorator(limit: str):
     """Decorator for user-based throttling"""
-    return user_throttler.limit(limit)
+    from app.core.rate_limit import limiter
+
+    return limiter.limit(limit)
 
 
 # Per-user throttle limits
@@ -54,21 +44,12 @@ def get_user_throttle_limit(user_tier: Optional[str] = None) -> str:
 
 
 async def check_user_throttle(request: Request, limit: Optional[str] = None) -> bool:
-    """Check if user has exceeded throttle limit"""
-    # Get user from request state
-    user = getattr(request.state, 'user', None)
-    
-    # Determine limit based on user tier
-    if not limit:
-        user_tier = getattr(user, 'tier', None) if user else None
-        limit = get_user_throttle_limit(user_tier)
-    
-    # Check throttle
-    try:
-        # This would be called by the decorator, but we can also check manually
-        key = get_user_throttle_key(request)
-        # The actual checking is done by slowapi's Limiter
-        return True
-    except RateLimitExceeded:
-        return False
+    """Check (and consume) the user's throttle limit; False when it is exhausted"""
+    from app.core.rate_limit import RateLimitCheck, limiter, parse_rate_limit, resolve_identity
 
+    identity, tier = resolve_identity(request)
+    if not limit:
+        limit = get_user_throttle_limit(tier)
+    parsed = parse_rate_limit(limit)
+    result = await limiter.hit([RateLimitCheck(f"{limiter.key_prefix}throttle:{parsed.text}:{identity}", parsed, "user")])
+    return result.allowed
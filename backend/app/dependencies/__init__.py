@@ -8,17 +8,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
+from app.core.db_routing import set_request_subject
 from app.core.config import get_settings
 from app.models import User
 from app.core.security import decode_token
 from app.services.subscription_service import SubscriptionService
 from app.services.stripe_service import StripeService
+from app.services.principal_cache import UserPrincipal, principal_cache
 from app.core.tenancy import (
     TenancyConfig,
     get_current_tenant,
     set_current_tenant,
     get_user_tenant_id,
 )
+from app.core.tenant_scoping import set_tenant_scope_bypass
 
 security = HTTPBearer(auto_error=False)
 
@@ -37,20 +40,16 @@ def get_stripe_service(
     return StripeService(db)
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    """Get current authenticated user."""
+def _token_subject(credentials: HTTPAuthorizationCredentials | None) -> str:
+    """Validate the bearer access token and return its subject (the user's email)."""
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    token = credentials.credentials
 
-    payload = decode_token(token, token_type="access")
+    payload = decode_token(credentials.credentials, token_type="access")
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,6 +67,17 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    set_request_subject(email)
+    return email
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Get current authenticated user."""
+    email = _token_subject(credentials)
+
     # Fetch user from database by email
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
@@ -88,6 +98,37 @@ async def get_current_user(
     return user
 
 
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: AsyncSession = Depends(get_db),
+) -> UserPrincipal:
+    """
+    Get the authenticated user's cached principal.
+
+    Same checks as get_current_user, but resolved from the principal cache:
+    endpoints that only need the caller's identity (id, email, roles) do not
+    query the users table on every request. Use get_current_user when the
+    ORM row is needed (updates, relationships).
+    """
+    email = _token_subject(credentials)
+
+    principal = await principal_cache.resolve(db, email)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is inactive",
+        )
+
+    return principal
+
+
 # Token used by Next.js proxy in development when LEA_DEMO_TOKEN is not set
 DEV_LEA_DEMO_TOKEN = "dev-lea-demo-token"
 
@@ -120,6 +161,7 @@ async def get_lea_user(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="LEA demo user not found",
             )
+        set_request_subject(user.email)
         return user
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
@@ -129,20 +171,8 @@ async def get_lea_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     token = auth_header[7:].strip()
-    payload = decode_token(token, token_type="access")
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    email = payload.get("sub")
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # Also the read-your-writes key: the next Léa turn reads its history from the primary
+    email = _token_subject(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
     if not user:
@@ -289,6 +319,16 @@ async def require_admin_or_superadmin(
 # Tenancy Dependencies
 # ============================================================================
 
+async def bypass_tenant_scope_for_superadmin(
+    _: None = Depends(require_superadmin),
+) -> None:
+    """
+    Disable automatic tenant scoping for the request (cross-tenant admin tools).
+    Requires the superadmin role.
+    """
+    set_tenant_scope_bypass(True)
+
+
 async def get_tenant_scope(
     current_user: Optional[User] = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
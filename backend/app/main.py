@@ -89,6 +89,38 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         except:
             logger = None
         
+        # Read replicas: first lag check, then periodic checks (no-op without DATABASE_REPLICA_URLS).
+        # Until a replica passes its check, get_read_db reads from the primary.
+        try:
+            from app.core.db_routing import replica_pool
+
+            await replica_pool.start()
+        except Exception as e:
+            if logger:
+                logger.warning(f"Read replica health check not started: {e}")
+
+        # Tenant engines (separate_db mode): warm up the most active tenants, sweep idle engines
+        try:
+            from app.core.tenancy import TenancyConfig
+
+            if TenancyConfig.is_separate_db_mode():
+                from app.core.tenant_database_manager import tenant_engine_pool
+
+                await tenant_engine_pool.start()
+        except Exception as e:
+            if logger:
+                logger.warning(f"Tenant engine pool not started: {e}")
+
+        # Security audit events: batched writes from a background worker
+        try:
+            from app.core.security_audit import audit_log_writer
+
+            if settings.AUDIT_LOG_ASYNC:
+                await audit_log_writer.start()
+        except Exception as e:
+            if logger:
+                logger.warning(f"Security audit writer not started (audit events stay synchronous): {e}")
+
         # Startup - make database initialization resilient
         try:
             await init_db()
@@ -232,6 +264,42 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         if logger:
             logger.warning(f"Cache shutdown error: {e}")
+    try:
+        from app.services.lea_chat.geocoding import lea_geocoder
+
+        await lea_geocoder.aclose()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Lea geocoder shutdown error: {e}")
+    try:
+        from app.services.ai_clients import ai_client_registry
+
+        await ai_client_registry.aclose()
+    except Exception as e:
+        if logger:
+            logger.warning(f"AI client registry shutdown error: {e}")
+    try:
+        from app.core.db_routing import replica_pool
+
+        await replica_pool.close()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Read replica shutdown error: {e}")
+    try:
+        from app.core.tenant_database_manager import tenant_engine_pool
+
+        await tenant_engine_pool.close()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Tenant engine pool shutdown error: {e}")
+    try:
+        from app.core.security_audit import audit_log_writer
+
+        # Drain queued audit events before the engine is disposed
+        await audit_log_writer.close()
+    except Exception as e:
+        if logger:
+            logger.warning(f"Security audit writer shutdown error: {e}")
     try:
         await close_db()
     except Exception as e:
@@ -307,6 +375,11 @@ def create_app() -> FastAPI:
     # Cache Headers Middleware
     app.add_middleware(CacheHeadersMiddleware, default_max_age=300)
 
+    # Query instrumentation (per-request statement count, DB time, N+1 candidates)
+    if settings.DB_QUERY_INSTRUMENTATION:
+        from app.core.query_instrumentation import QueryInstrumentationMiddleware
+        app.add_middleware(QueryInstrumentationMiddleware)
+
     # Request Size Limits Middleware (before CSRF to prevent large request processing)
     app.add_middleware(
         RequestSizeLimitMiddleware,
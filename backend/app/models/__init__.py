@@ -42,7 +42,7 @@ from app.models.contact import Contact
 from app.models.company import Company
 from app.models.booking import Booking, Attendee, BookingPayment, BookingStatus, PaymentStatus, TicketType
 from app.models.city_event import CityEvent, EventStatus
-from app.models.lea_conversation import LeaConversation, LeaToolUsage, LeaSessionTransactionLink
+from app.models.lea_conversation import LeaConversation, LeaMessage, LeaToolUsage, LeaSessionTransactionLink
 try:
     from app.models.lea_knowledge_content import LeaKnowledgeContent
 except ModuleNotFoundError:
@@ -148,6 +148,7 @@ __all__ = [
     "CityEvent",
     "EventStatus",
     "LeaConversation",
+    "LeaMessage",
     "LeaToolUsage",
     "LeaSessionTransactionLink",
     "LeaKnowledgeContent",
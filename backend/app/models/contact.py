@@ -20,6 +20,7 @@ class Contact(Base):
         Index("idx_contacts_email", "email"),
         Index("idx_contacts_created_at", "created_at"),
         Index("idx_contacts_updated_at", "updated_at"),
+        Index("idx_contacts_created_id", "created_at", "id"),  # Keyset pagination
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -4,7 +4,7 @@ SQLAlchemy models for Léa AI assistant conversations
 """
 
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, JSON, Index, func, Text
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, JSON, Index, func, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 import uuid
@@ -24,7 +24,10 @@ class LeaConversation(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     session_id = Column(String(255), unique=True, nullable=False, index=True)
+    # Historique JSON d'origine : conservé pour les conversations non migrées (voir lea_messages)
     messages = Column(JSON, nullable=False, default=list)  # List of message objects
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")  # Messages dans lea_messages
+    summary = Column(Text, nullable=True)  # Résumé glissant des messages sortis de la fenêtre
     context = Column(JSON, nullable=True, default=dict)  # Additional context data
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(
@@ -42,6 +45,26 @@ class LeaConversation(Base):
         return f"<LeaConversation(id={self.id}, user_id={self.user_id}, session_id={self.session_id})>"
 
 
+class LeaMessage(Base):
+    """Message d'une conversation Léa (ajout seul, numéroté par conversation)."""
+    __tablename__ = "lea_messages"
+    __table_args__ = (
+        UniqueConstraint("conversation_id", "seq", name="uq_lea_messages_conversation_seq"),
+        Index("idx_lea_messages_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    conversation_id = Column(Integer, ForeignKey("lea_conversations.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # 1, 2, 3... dans la conversation
+    role = Column(String(20), nullable=False)  # user, assistant
+    content = Column(Text, nullable=False, default="")
+    meta = Column(JSON, nullable=True)  # timestamp, actions, model, provider, usage
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<LeaMessage(conversation_id={self.conversation_id}, seq={self.seq}, role={self.role})>"
+
+
 class LeaToolUsage(Base):
     """Léa AI tool usage tracking"""
     __tablename__ = "lea_tools_usage"
@@ -30,6 +30,7 @@ class Notification(Base):
         Index("idx_notifications_created_at", "created_at"),
         Index("idx_notifications_type", "notification_type"),
         Index("idx_notifications_user_read", "user_id", "read"),  # Composite index for common query
+        Index("idx_notifications_user_created_id", "user_id", "created_at", "id"),  # Keyset pagination
     )
     
     id = Column(Integer, primary_key=True, index=True)
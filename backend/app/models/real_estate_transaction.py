@@ -3,7 +3,7 @@ Real Estate Transaction Model
 Modèle pour les transactions immobilières au Québec
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Numeric, Boolean, JSON, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Numeric, Boolean, JSON, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,9 @@ from app.core.database import Base
 class RealEstateTransaction(Base):
     """Transaction immobilière complète"""
     __tablename__ = "real_estate_transactions"
+    __table_args__ = (
+        Index("idx_real_estate_transactions_user_created_id", "user_id", "created_at", "id"),  # Keyset pagination
+    )
 
     # 1. Identification de la transaction
     id = Column(Integer, primary_key=True, index=True)
@@ -30,6 +30,7 @@ class UserAvailability(Base):
         Index("idx_user_availabilities_day_of_week", "day_of_week"),
         Index("idx_user_availabilities_is_active", "is_active"),
         Index("idx_user_availabilities_user_day", "user_id", "day_of_week"),
+        Index("idx_user_availabilities_user_day_start_id", "user_id", "day_of_week", "start_time", "id"),  # Keyset pagination
     )
 
     id = Column(Integer, primary_key=True, index=True)
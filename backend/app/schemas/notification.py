@@ -89,6 +89,7 @@ class NotificationListResponse(BaseModel):
     unread_count: int
     skip: int = 0
     limit: int = 100
+    next_cursor: Optional[str] = None
 
 
 class NotificationUnreadCountResponse(BaseModel):
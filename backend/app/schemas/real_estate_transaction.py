@@ -319,3 +319,4 @@ class RealEstateTransactionListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
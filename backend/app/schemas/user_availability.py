@@ -65,3 +65,4 @@ class UserAvailabilityListResponse(BaseModel):
     """List response for user availabilities"""
     availabilities: list[UserAvailabilityResponse] = Field(..., description="List of availabilities")
     total: int = Field(..., description="Total count")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page")
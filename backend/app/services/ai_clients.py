@@ -0,0 +1,424 @@
+"""
+AI Provider Client Registry
+Process-wide pooled OpenAI/Anthropic clients with concurrency limits, retries and call metrics.
+
+Every AIService used to build its own AsyncOpenAI/AsyncAnthropic client (and its own HTTP
+connection pool) on each router call, PDF analysis or Léa turn. The registry keeps one client
+per (provider, API key) and per event loop, sharing its HTTP connection pool, and wraps calls with:
+- a per-provider semaphore (AI_OPENAI_MAX_CONCURRENCY / AI_ANTHROPIC_MAX_CONCURRENCY);
+- retries with full jitter on transient errors (429, 5xx, timeouts, connection errors),
+  honouring Retry-After; SDK built-in retries are disabled so there is a single retry policy;
+- per-call latency and token metrics (AI_CALL_STATS, debug log per call).
+A fake provider (AI_FAKE_PROVIDER=true) answers offline with the OpenAI response shape,
+for benchmarks and load tests without API keys or network.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    import openai
+    from openai import AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    openai = None
+    AsyncOpenAI = None
+    OPENAI_AVAILABLE = False
+
+try:
+    import anthropic
+    from anthropic import AsyncAnthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    anthropic = None
+    AsyncAnthropic = None
+    ANTHROPIC_AVAILABLE = False
+
+from app.core.config import get_settings
+from app.core.logging import logger
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+LATENCY_SAMPLES = 512
+
+_TRANSIENT_ERRORS: Tuple[type, ...] = (httpx.TransportError, asyncio.TimeoutError, ConnectionError)
+for _sdk in (openai, anthropic):
+    if _sdk is not None:
+        _TRANSIENT_ERRORS += tuple(
+            getattr(_sdk, name) for name in ("APIConnectionError", "APITimeoutError") if hasattr(_sdk, name)
+        )
+
+# provider -> counters (calls, errors, retries, latency, tokens)
+AI_CALL_STATS: Dict[str, Dict[str, float]] = {}
+_latencies: Dict[str, deque] = {}
+
+
+def fake_provider_enabled() -> bool:
+    """True when AI calls must be answered by the offline fake provider."""
+    return bool(get_settings().AI_FAKE_PROVIDER)
+
+
+def _usage_tokens(result: Any) -> Tuple[int, int]:
+    """(prompt, completion) tokens from an OpenAI or Anthropic response, 0 when unknown."""
+    usage = getattr(result, "usage", None)
+    if usage is None:
+        return 0, 0
+    prompt = getattr(usage, "prompt_tokens", None)
+    if prompt is None:
+        prompt = getattr(usage, "input_tokens", 0)
+    completion = getattr(usage, "completion_tokens", None)
+    if completion is None:
+        completion = getattr(usage, "output_tokens", 0)
+    return int(prompt or 0), int(completion or 0)
+
+
+def record_call(
+    provider: str,
+    operation: str,
+    latency_ms: float,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    retries: int = 0,
+    error: Optional[str] = None,
+) -> None:
+    """Record one provider call in AI_CALL_STATS."""
+    stats = AI_CALL_STATS.setdefault(
+        provider,
+        {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "latency_ms_total": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        },
+    )
+    stats["calls"] += 1
+    stats["retries"] += retries
+    stats["latency_ms_total"] += latency_ms
+    stats["prompt_tokens"] += prompt_tokens
+    stats["completion_tokens"] += completion_tokens
+    if error:
+        stats["errors"] += 1
+    _latencies.setdefault(provider, deque(maxlen=LATENCY_SAMPLES)).append(latency_ms)
+    logger.debug(
+        f"AI call {provider}.{operation} {latency_ms:.0f}ms",
+        context={
+            "provider": provider,
+            "operation": operation,
+            "latency_ms": round(latency_ms, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "retries": retries,
+            "error": error,
+        },
+    )
+
+
+def get_ai_call_stats() -> Dict[str, Dict[str, float]]:
+    """Snapshot of call metrics per provider, with p50/p95 latency over recent calls."""
+    snapshot = {}
+    for provider, stats in AI_CALL_STATS.items():
+        samples = sorted(_latencies.get(provider) or ())
+        entry = dict(stats)
+        if samples:
+            entry["latency_ms_p50"] = round(samples[len(samples) // 2], 1)
+            entry["latency_ms_p95"] = round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1)
+        snapshot[provider] = entry
+    return snapshot
+
+
+def reset_ai_call_stats() -> None:
+    """Reset call metrics (tests, benchmarks)."""
+    AI_CALL_STATS.clear()
+    _latencies.clear()
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for transient provider errors worth retrying."""
+    if isinstance(exc, _TRANSIENT_ERRORS):
+        return True
+    return getattr(exc, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Delay requested by the provider (Retry-After header, seconds), if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: Callable[[], float] = random.random) -> float:
+    """Full jitter backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return rng() * min(cap, base * (2 ** attempt))
+
+
+class FakeAIClient:
+    """
+    Offline stand-in for AsyncOpenAI (chat.completions.create, audio.speech.create).
+
+    Answers after AI_FAKE_LATENCY_MS with a deterministic reply built by `responder`
+    (default: echo of the last user message), usage estimated at ~4 characters per token.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        responder: Optional[Callable[[List[Dict[str, Any]]], str]] = None,
+        model: str = "fake-model",
+    ):
+        self.latency_ms = latency_ms
+        self.responder = responder or self._echo
+        self.model = model
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.audio = SimpleNamespace(speech=SimpleNamespace(create=self._speech))
+
+    @staticmethod
+    def _echo(messages: List[Dict[str, Any]]) -> str:
+        last = next((m for m in reversed(messages) if m.get("role") == "user"), None)
+        text = str((last or {}).get("content") or "")
+        return f"Réponse simulée : {text[:200]}"
+
+    async def _sleep(self) -> None:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+    async def _create(self, messages: List[Dict[str, Any]], model: Optional[str] = None, stream: bool = False, **kwargs):
+        await self._sleep()
+        content = self.responder(messages)
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        model = model or self.model
+        if stream:
+            return self._stream(content, model)
+        message = SimpleNamespace(role="assistant", content=content, tool_calls=None)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=message, finish_reason="stop")],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+    async def _stream(self, content: str, model: str):
+        for start in range(0, len(content), 16):
+            delta = SimpleNamespace(content=content[start:start + 16])
+            yield SimpleNamespace(model=model, choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+
+    async def _speech(self, input: str = "", **kwargs):
+        await self._sleep()
+        return SimpleNamespace(content=b"FAKEAUDIO" + input.encode("utf-8")[:64])
+
+    async def close(self) -> None:
+        return None
+
+
+@dataclass
+class ProviderPool:
+    """Shared client of one provider, with its concurrency limit."""
+
+    provider: str
+    client: Any
+    semaphore: asyncio.Semaphore
+    max_concurrency: int
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    http_client: Optional[Any] = field(default=None, repr=False)
+
+    async def aclose(self) -> None:
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AIClientRegistry:
+    """Process-wide registry of pooled provider clients."""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+        retry_max_delay: Optional[float] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        settings = get_settings()
+        self.max_retries = max_retries if max_retries is not None else settings.AI_MAX_RETRIES
+        self.retry_base_delay = (
+            retry_base_delay if retry_base_delay is not None else settings.AI_RETRY_BASE_DELAY_SEC
+        )
+        self.retry_max_delay = (
+            retry_max_delay if retry_max_delay is not None else settings.AI_RETRY_MAX_DELAY_SEC
+        )
+        self._sleep = sleep
+        self._pools: Dict[Tuple[str, str], ProviderPool] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+
+    # --- Pools ---
+
+    def get(self, provider: str) -> ProviderPool:
+        """
+        Shared pool for a provider ("openai", "anthropic" or "fake").
+
+        Rebuilt when the API key changes or when called from another event loop
+        (HTTP connections and semaphores are bound to the loop that created them);
+        the replaced client is closed so its connection pool is not leaked.
+        """
+        api_key = "" if provider == "fake" else os.getenv(f"{provider.upper()}_API_KEY", "")
+        key = (provider, api_key)
+        loop = _running_loop()
+        pool = self._pools.get(key)
+        if pool is not None and (pool.loop is None or loop is None or pool.loop is loop):
+            if pool.loop is None:
+                pool.loop = loop
+            return pool
+        for stale_key in [k for k in self._pools if k[0] == provider]:
+            self._retire(self._pools.pop(stale_key), loop)
+        pool = self._build(provider, api_key, loop)
+        self._pools[key] = pool
+        return pool
+
+    def _retire(self, pool: ProviderPool, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Close a replaced pool's client on the event loop that owns its connections."""
+        owner = pool.loop
+        if owner is not None and owner is not loop:
+            if owner.is_running() and not owner.is_closed():
+                asyncio.run_coroutine_threadsafe(self._close_pool(pool), owner)
+            else:
+                # Connections were bound to a loop that no longer runs: nothing can be awaited there
+                logger.debug(f"AI client pool for {pool.provider} dropped with its event loop")
+            return
+        if loop is None:
+            return
+        task = loop.create_task(self._close_pool(pool))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    @staticmethod
+    async def _close_pool(pool: ProviderPool) -> None:
+        try:
+            await pool.aclose()
+        except Exception as e:
+            logger.warning(f"AI client pool close error ({pool.provider}): {e}")
+
+    def _build(self, provider: str, api_key: str, loop: Optional[asyncio.AbstractEventLoop]) -> ProviderPool:
+        settings = get_settings()
+        if provider == "fake":
+            limit = settings.AI_OPENAI_MAX_CONCURRENCY
+            client = FakeAIClient(latency_ms=settings.AI_FAKE_LATENCY_MS)
+            return ProviderPool(provider, client, asyncio.Semaphore(limit), limit, loop)
+
+        if provider == "openai":
+            if not OPENAI_AVAILABLE:
+                raise ValueError("OpenAI library is not installed. Install it with: pip install openai")
+            sdk, factory, limit = openai, AsyncOpenAI, settings.AI_OPENAI_MAX_CONCURRENCY
+        elif provider == "anthropic":
+            if not ANTHROPIC_AVAILABLE:
+                raise ValueError("Anthropic library is not installed. Install it with: pip install anthropic")
+            sdk, factory, limit = anthropic, AsyncAnthropic, settings.AI_ANTHROPIC_MAX_CONCURRENCY
+        else:
+            raise ValueError(f"Unsupported provider: {provider}")
+
+        http_client = None
+        default_http_client = getattr(sdk, "DefaultAsyncHttpxClient", None)
+        if default_http_client is not None:
+            http_client = default_http_client(
+                timeout=httpx.Timeout(settings.AI_REQUEST_TIMEOUT_SEC, connect=10.0),
+                limits=httpx.Limits(max_connections=limit * 2, max_keepalive_connections=limit),
+            )
+        client = factory(api_key=api_key, http_client=http_client, max_retries=0)
+        logger.info(f"AI client pool created for {provider} (max concurrency {limit})")
+        return ProviderPool(provider, client, asyncio.Semaphore(limit), limit, loop, http_client)
+
+    # --- Calls ---
+
+    async def call(
+        self,
+        pool: ProviderPool,
+        operation: str,
+        request: Callable[[], Awaitable[Any]],
+        limit: bool = True,
+    ) -> Any:
+        """
+        Run `request()` under the pool's concurrency limit, retrying transient errors
+        with full jitter, and record latency/tokens.
+
+        limit=False when the caller already holds pool.semaphore (streaming).
+        """
+        if limit:
+            async with pool.semaphore:
+                return await self._call_with_retry(pool, operation, request)
+        return await self._call_with_retry(pool, operation, request)
+
+    async def _call_with_retry(
+        self, pool: ProviderPool, operation: str, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                result = await request()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    record_call(
+                        pool.provider,
+                        operation,
+                        (time.perf_counter() - start) * 1000,
+                        retries=attempt,
+                        error=type(e).__name__,
+                    )
+                    raise
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    delay = min(max(delay, retry_after), self.retry_max_delay)
+                attempt += 1
+                logger.warning(
+                    f"AI call {pool.provider}.{operation} failed ({type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await self._sleep(delay)
+                continue
+            prompt_tokens, completion_tokens = _usage_tokens(result)
+            record_call(
+                pool.provider,
+                operation,
+                (time.perf_counter() - start) * 1000,
+                prompt_tokens,
+                completion_tokens,
+                retries=attempt,
+            )
+            return result
+
+    async def aclose(self) -> None:
+        """Close all pooled clients (application shutdown)."""
+        pools = list(self._pools.values())
+        self._pools.clear()
+        for pool in pools:
+            await self._close_pool(pool)
+        if self._background_tasks:
+            await asyncio.gather(*list(self._background_tasks), return_exceptions=True)
+
+
+ai_client_registry = AIClientRegistry()
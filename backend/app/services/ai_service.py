@@ -1,6 +1,8 @@
 """
 Unified AI Service
-Supports both OpenAI and Anthropic (Claude) APIs with optional streaming
+Supports both OpenAI and Anthropic (Claude) APIs with optional streaming.
+Clients come from the process-wide registry (app/services/ai_clients.py): shared
+connection pools, per-provider concurrency limits, retries and call metrics.
 """
 
 import os
@@ -22,6 +24,7 @@ except ImportError:
     AsyncAnthropic = None
 
 from app.core.logging import logger
+from app.services.ai_clients import ai_client_registry, fake_provider_enabled
 
 
 class AIProvider(str, Enum):
@@ -29,6 +32,7 @@ class AIProvider(str, Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
     AUTO = "auto"  # Auto-select based on availability
+    FAKE = "fake"  # Offline fake provider (AI_FAKE_PROVIDER), OpenAI response shape
 
 
 class AIService:
@@ -46,6 +50,8 @@ class AIService:
     
     def _resolve_provider(self, provider: AIProvider) -> AIProvider:
         """Resolve provider, defaulting to available one"""
+        if fake_provider_enabled():
+            return AIProvider.FAKE
         if provider == AIProvider.AUTO:
             # Prefer OpenAI if both available, otherwise use what's available
             if OPENAI_AVAILABLE and self._is_openai_configured():
@@ -73,7 +79,7 @@ class AIService:
             if not self._is_openai_configured():
                 raise ValueError("OPENAI_API_KEY is not configured")
             
-            self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            self._pool = ai_client_registry.get("openai")
             self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
             self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", "1000"))
             self.temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
@@ -84,12 +90,35 @@ class AIService:
             if not self._is_anthropic_configured():
                 raise ValueError("ANTHROPIC_API_KEY is not configured")
             
-            self.client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            self._pool = ai_client_registry.get("anthropic")
             self.model = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
             self.max_tokens = int(os.getenv("ANTHROPIC_MAX_TOKENS", "1024"))
             self.temperature = float(os.getenv("ANTHROPIC_TEMPERATURE", "0.7"))
+
+        elif self.provider == AIProvider.FAKE:
+            self._pool = ai_client_registry.get("fake")
+            self.model = "fake-model"
+            self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", "1000"))
+            self.temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
+        self.client = self._pool.client
+
+    @property
+    def is_openai_compatible(self) -> bool:
+        """True when the client exposes the OpenAI API (OpenAI or the fake provider)"""
+        return self.provider in (AIProvider.OPENAI, AIProvider.FAKE)
+
+    async def call(self, operation: str, request):
+        """
+        Run a raw client call (e.g. tool calling) through the shared pool:
+        concurrency limit, retries on transient errors and call metrics.
+
+        Args:
+            operation: Operation name for metrics (e.g. "chat.tools")
+            request: Zero-argument callable returning the client coroutine
+        """
+        return await ai_client_registry.call(self._pool, operation, request)
     
     async def chat_completion(
         self,
@@ -112,7 +141,7 @@ class AIService:
         Returns:
             Response dict with 'content', 'model', 'usage', 'finish_reason', 'provider'
         """
-        if self.provider == AIProvider.OPENAI:
+        if self.is_openai_compatible:
             return await self._openai_chat_completion(
                 messages, model, temperature, max_tokens, system_prompt
             )
@@ -138,11 +167,14 @@ class AIService:
             if not messages or messages[0].get("role") != "system":
                 messages.insert(0, {"role": "system", "content": system_prompt})
         
-        response = await self.client.chat.completions.create(
-            model=model or self.model,
-            messages=messages,
-            temperature=temperature or self.temperature,
-            max_tokens=max_tokens or self.max_tokens,
+        response = await self.call(
+            "chat",
+            lambda: self.client.chat.completions.create(
+                model=model or self.model,
+                messages=messages,
+                temperature=temperature or self.temperature,
+                max_tokens=max_tokens or self.max_tokens,
+            ),
         )
         
         return {
@@ -154,7 +186,7 @@ class AIService:
                 "total_tokens": response.usage.total_tokens,
             },
             "finish_reason": response.choices[0].finish_reason,
-            "provider": "openai",
+            "provider": self.provider.value,
         }
     
     async def _anthropic_chat_completion(
@@ -190,12 +222,15 @@ class AIService:
         # Use system prompt parameter or the one from messages
         system = system_prompt or None
         
-        response = await self.client.messages.create(
-            model=model or self.model,
-            max_tokens=max_tokens or self.max_tokens,
-            temperature=temperature or self.temperature,
-            system=system,
-            messages=anthropic_messages,
+        response = await self.call(
+            "chat",
+            lambda: self.client.messages.create(
+                model=model or self.model,
+                max_tokens=max_tokens or self.max_tokens,
+                temperature=temperature or self.temperature,
+                system=system,
+                messages=anthropic_messages,
+            ),
         )
         
         # Extract content (Anthropic returns content as a list)
@@ -254,7 +289,7 @@ class AIService:
         Stream chat completion token by token.
         Yields content deltas (OpenAI). For Anthropic, yields full content when done.
         """
-        if self.provider == AIProvider.OPENAI:
+        if self.is_openai_compatible:
             async for delta in self._openai_stream(
                 messages, model, temperature, max_tokens, system_prompt
             ):
@@ -280,22 +315,32 @@ class AIService:
         if system_prompt:
             if not messages or messages[0].get("role") != "system":
                 messages = [{"role": "system", "content": system_prompt}] + list(messages)
-        stream = await self.client.chat.completions.create(
-            model=model or self.model,
-            messages=messages,
-            temperature=temperature or self.temperature,
-            max_tokens=max_tokens or self.max_tokens,
-            stream=True,
-        )
-        async for chunk in stream:
-            if chunk.choices and len(chunk.choices) > 0:
-                delta = chunk.choices[0].delta
-                if getattr(delta, "content", None):
-                    yield delta.content
+        # The concurrency slot is held for the whole stream, retries only cover the request
+        async with self._pool.semaphore:
+            stream = await ai_client_registry.call(
+                self._pool,
+                "chat.stream",
+                lambda: self.client.chat.completions.create(
+                    model=model or self.model,
+                    messages=messages,
+                    temperature=temperature or self.temperature,
+                    max_tokens=max_tokens or self.max_tokens,
+                    stream=True,
+                ),
+                limit=False,
+            )
+            async for chunk in stream:
+                if chunk.choices and len(chunk.choices) > 0:
+                    delta = chunk.choices[0].delta
+                    if getattr(delta, "content", None):
+                        yield delta.content
     
     @staticmethod
     def is_configured(provider: Optional[AIProvider] = None) -> bool:
         """Check if any AI provider is configured"""
+        if fake_provider_enabled():
+            return True
+
         if provider == AIProvider.OPENAI or provider is None:
             if OPENAI_AVAILABLE and bool(os.getenv("OPENAI_API_KEY")):
                 return True
@@ -311,6 +356,9 @@ class AIService:
         """Get list of available and configured providers"""
         providers = []
         
+        if fake_provider_enabled():
+            providers.append("fake")
+        
         if OPENAI_AVAILABLE and bool(os.getenv("OPENAI_API_KEY")):
             providers.append("openai")
         
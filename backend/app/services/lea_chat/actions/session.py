@@ -7,6 +7,7 @@ from typing import Optional, Tuple
 
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from app.core.logging import logger
 from app.models import RealEstateTransaction
@@ -76,10 +77,14 @@ async def link_lea_session_to_transaction(
 async def get_or_create_lea_conversation(
     db: AsyncSession, user_id: int, session_id: str | None
 ) -> Tuple[LeaConversation, str]:
-    """Retourne (conversation, session_id). Crée la conversation si besoin."""
+    """
+    Retourne (conversation, session_id). Crée la conversation si besoin.
+    L'historique JSON (messages) n'est pas chargé : voir message_store.
+    """
     if session_id:
         r = await db.execute(
             select(LeaConversation)
+            .options(defer(LeaConversation.messages))
             .where(LeaConversation.session_id == session_id)
             .where(LeaConversation.user_id == user_id)
         )
@@ -6,6 +6,7 @@ Fonctions selon le plan Domain-Intent-Entities (T1-T10).
 import re
 import unicodedata
 from decimal import Decimal
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -497,6 +498,7 @@ def _extract_sellers_and_buyers_from_creation_message(
     return sellers, buyers
 
 
+@lru_cache(maxsize=512)
 def _extract_address_from_message(message: str) -> Optional[str]:
     """Extrait une adresse du message."""
     if not message or len(message.strip()) < 5:
@@ -597,6 +599,18 @@ def _extract_address_from_message(message: str) -> Optional[str]:
     return None
 
 
+_PRICE_PILES_RE = re.compile(r"\bpiles\b", re.I)
+_PRICE_OFFERED_RE = re.compile(r"\bprix\s+offert\b")
+_PRICE_OFFERED_AMOUNT_RE = re.compile(r"\boffert\s*[:\s]*\d")
+_PRICE_DIGIT_RE = re.compile(r"\d")
+_PRICE_AMOUNT_RE = re.compile(r"(?:prix\s+)?(?:c'est\s+)?(?:est\s+)?(\d[\d\s]*)\s*(?:mille|k\b|k\s|000\b|millions?)?", re.I)
+_PRICE_AMOUNT_FALLBACK_RE = re.compile(r"(\d[\d\s]{2,})\s*(?:\$|dollars?|cad)?", re.I)
+_PRICE_THOUSANDS_RE = re.compile(r"(\d+)\s*mille", re.I)
+_PRICE_THOUSANDS_WORD_RE = re.compile(r"(\d+)\s*mille\b", re.I)
+_PRICE_MILLIONS_RE = re.compile(r"(\d+)\s*million", re.I)
+
+
+@lru_cache(maxsize=512)
 def _extract_price_from_message(message: str) -> Optional[Tuple[Decimal, str]]:
     """
     Extrait un prix du message.
@@ -605,28 +619,28 @@ def _extract_price_from_message(message: str) -> Optional[Tuple[Decimal, str]]:
     if not message or len(message.strip()) < 3:
         return None
     t = (message or "").strip().lower()
-    t = re.sub(r"\bpiles\b", "mille", t, flags=re.I)
+    t = _PRICE_PILES_RE.sub("mille", t)
     is_offered = bool(
-        re.search(r"\bprix\s+offert\b", t)
-        or re.search(r"\boffert\s*[:\s]*\d", t)
-        or "offre" in t and re.search(r"\d", t)
+        _PRICE_OFFERED_RE.search(t)
+        or _PRICE_OFFERED_AMOUNT_RE.search(t)
+        or "offre" in t and _PRICE_DIGIT_RE.search(t)
     )
     kind = "offered" if is_offered else "listing"
-    m = re.search(r"(?:prix\s+)?(?:c'est\s+)?(?:est\s+)?(\d[\d\s]*)\s*(?:mille|k\b|k\s|000\b|millions?)?", t, re.I)
+    m = _PRICE_AMOUNT_RE.search(t)
     if not m:
-        m = re.search(r"(\d[\d\s]{2,})\s*(?:\$|dollars?|cad)?", t, re.I)
+        m = _PRICE_AMOUNT_FALLBACK_RE.search(t)
     if not m:
         return None
     raw = m.group(1).replace(" ", "").strip()
     if not raw.isdigit():
         return None
     value = int(raw)
-    if re.search(r"(\d+)\s*mille\b", t, re.I):
-        mm = re.search(r"(\d+)\s*mille", t, re.I)
+    if _PRICE_THOUSANDS_WORD_RE.search(t):
+        mm = _PRICE_THOUSANDS_RE.search(t)
         if mm:
             value = int(mm.group(1)) * 1000
-    elif re.search(r"(\d+)\s*million", t, re.I):
-        mm = re.search(r"(\d+)\s*million", t, re.I)
+    elif _PRICE_MILLIONS_RE.search(t):
+        mm = _PRICE_MILLIONS_RE.search(t)
         if mm:
             value = int(mm.group(1)) * 1_000_000
     if value <= 0 or value > 999_999_999:
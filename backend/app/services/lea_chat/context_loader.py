@@ -15,6 +15,13 @@ from app.services.lea_chat.actions.session import (
     get_transaction_for_session,
 )
 
+# Phrases du résumé reconnues par la voie rapide du routeur (router._domain_from_context_summary)
+PA_FILLING_SUMMARY = "L'utilisateur est en cours de remplissage du formulaire PA (promesse d'achat)."
+TRANSACTION_CREATION_SUMMARY = "L'utilisateur est en cours de création d'un nouveau dossier (transaction)."
+GENERAL_SUMMARY = (
+    "Conversation générale. Pas de dossier en cours de création ni de formulaire PA en cours de remplissage."
+)
+
 
 async def load_active_conversation_context(
     db: AsyncSession,
@@ -77,12 +84,15 @@ async def load_active_conversation_context(
         ctx["pending_transaction"] = dict(pending)
         ctx["pending_transaction"].setdefault("stage", "type")
 
-    # Résumé pour le prompt
+    ctx["summary"] = summarize_active_context(ctx)
+    return ctx
+
+
+def summarize_active_context(ctx: dict[str, Any]) -> str:
+    """Résumé texte du contexte actif (pa_active, pending_transaction, transaction_active) pour le prompt."""
     summary_parts = []
-    if ctx["pa_active"]:
-        summary_parts.append(
-            "L'utilisateur est en cours de remplissage du formulaire PA (promesse d'achat)."
-        )
+    if ctx.get("pa_active"):
+        summary_parts.append(PA_FILLING_SUMMARY)
         if ctx["pa_active"].get("section_title"):
             summary_parts.append(
                 f"Section en cours : {ctx['pa_active']['section_title']}. "
@@ -91,21 +101,17 @@ async def load_active_conversation_context(
             summary_parts.append(
                 f"Champ attendu : {ctx['pa_active']['last_asked_field']}."
             )
-    elif ctx["pending_transaction"] and ctx["pending_transaction"].get("type"):
+    elif ctx.get("pending_transaction") and ctx["pending_transaction"].get("type"):
         stage = ctx["pending_transaction"].get("stage", "type")
         summary_parts.append(
-            f"L'utilisateur est en cours de création d'un nouveau dossier (transaction). "
-            f"Étape actuelle : {stage}."
+            f"{TRANSACTION_CREATION_SUMMARY} Étape actuelle : {stage}."
         )
-    elif ctx["transaction_active"]:
+    elif ctx.get("transaction_active"):
         addr = ctx["transaction_active"].get("property_address") or ctx["transaction_active"].get("property_city") or ""
         summary_parts.append(
             f"L'utilisateur a une transaction active (dossier {ctx['transaction_active'].get('dossier_number', '')}, {addr})."
         )
     else:
-        summary_parts.append(
-            "Conversation générale. Pas de dossier en cours de création ni de formulaire PA en cours de remplissage."
-        )
+        summary_parts.append(GENERAL_SUMMARY)
 
-    ctx["summary"] = " ".join(summary_parts).strip()
-    return ctx
+    return " ".join(summary_parts).strip()
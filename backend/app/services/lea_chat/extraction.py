@@ -0,0 +1,258 @@
+"""
+Extraction Léa : moteur précompilé pour les entités d'un message.
+
+- Automate Aho-Corasick sur les codes OACIQ et leurs mots-clés : un seul parcours du
+  message au lieu d'un `in` par code puis d'une boucle par groupe de mots-clés.
+- Motifs regex compilés au chargement du module (référence de transaction, code postal, dates).
+- extract_message_entities() retourne un résultat structuré, mis en cache par message :
+  les heuristiques appelées plusieurs fois dans un même tour réutilisent le même résultat.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Tuple
+import re
+
+from app.services.lea_chat.actions.transaction import (
+    _extract_address_from_message,
+    _extract_price_from_message,
+)
+
+# Codes OACIQ connus (alignés sur le guide expert et la table forms)
+LEA_KNOWN_OACIQ_CODES = frozenset({
+    "CCVE", "CCDE", "CCIE", "CCM", "CCVNE", "CCDNE", "CCINE", "CCA", "CCADI", "CCL",
+    "DV", "DVD", "PA", "PAD", "PAI", "PAM", "PAG", "CP", "CPCP", "MO",
+    "AVIS-CCA", "AVIS-CVAN", "AVIS-DAVP", "DR", "DRCOP", "PAC", "ACD", "ACI", "BOCP", "MOCP",
+    "AG", "AF", "AR", "EAU", "EXP", "D", "PL", "PLC", "PSL", "ML", "CVHP", "LD", "VI", "AS", "CM",
+    "DIA", "DIV-ENT", "DIV-PAR", "DESC-LOC", "DESC-RES",
+})
+
+LEA_OACIQ_KEYWORD_TO_CODE: list = [
+    (["promesse", "d'achat", "promesse d'achat", "d'achar", "promesse d'achar"], "PA"),
+    (["contre-proposition", "contre proposition"], "CP"),
+    (["modifications", "modification"], "MO"),
+    (["déclarations du vendeur", "déclaration vendeur", "déclarations vendeur"], "DV"),
+    (["déclarations vendeur copropriété", "dvd"], "DVD"),
+    (["contrat de courtage", "courtage exclusif vente", "ccve"], "CCVE"),
+    (["contrat courtage copropriété", "ccde"], "CCDE"),
+    (["contrat courtage achat", "cca"], "CCA"),
+    (["contrat courtage location", "ccl"], "CCL"),
+    (["avis réalisation conditions", "avis conditions", "lever les conditions", "aviscvan"], "AVIS-CVAN"),
+    (["annulation promesse", "avis-davp"], "AVIS-DAVP"),
+    (["annexe expertise", "expertise"], "EXP"),
+    (["annexe financement", "financement"], "AF"),
+    (["annexe générale", "ag"], "AG"),
+    (["annexe eau", "eau potable", "septique"], "EAU"),
+    (["déboursés", "rétribution", "dr "], "DR"),
+    (["demande renseignements syndicat", "drcop", "syndicat copropriété"], "DRCOP"),
+    (["promesse location", "pl "], "PL"),
+    (["vérification identité", "identité", "vi "], "VI"),
+]
+
+_AS_FALSE_POSITIVE_PREFIXES = ("as-t-on", "as-tu", "as-t-il", "as-t-elle", "as-t-ils", "as-t-elles")
+_CODE_BOUNDARY_BEFORE = " \t\n\r,;.?!»\"'(-"
+_CODE_BOUNDARY_AFTER = " \t\n\r,;.?!«\"')-"
+
+FRENCH_MONTHS = {
+    "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5,
+    "juin": 6, "juillet": 7, "août": 8, "aout": 8, "septembre": 9,
+    "octobre": 10, "novembre": 11, "décembre": 12, "decembre": 12,
+}
+
+# --- Motifs compilés ---
+_TX_REF_HASH_RE = re.compile(r"#\s*(\d+)", re.I)
+_TX_REF_TRANSACTION_RE = re.compile(r"(?:pour\s+|de\s+)?(?:la\s+)?transaction\s+#?\s*(\d+)", re.I)
+_TX_REF_DOSSIER_RE = re.compile(r"dossier\s+#?\s*(\d+)", re.I)
+_TX_REF_NUMERO_RE = re.compile(r"(?:la\s+)?transaction\s+numéro\s+#?\s*(\d+)", re.I)
+_TX_REF_BARE_RE = re.compile(r"^\s*#?\s*\d+\s*$")
+_DIGITS_RE = re.compile(r"\d+")
+_POSTAL_CODE_RE = re.compile(r"[A-Za-z]\d[A-Za-z]\s*\d[A-Za-z]\d")
+_WHITESPACE_RE = re.compile(r"\s+")
+_VOICE_ARTIFACT_RE = re.compile(r"\s+(?:vocal|local|locales?)\s+terminé.*$", re.I)
+_DATE_LONG_RE = re.compile(
+    r"(?:le\s+)?(\d{1,2})\s+(" + "|".join(FRENCH_MONTHS) + r")\s+(\d{4})", re.I
+)
+_DATE_SHORT_RE = re.compile(r"(?:le\s+)?(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})")
+
+
+class KeywordAutomaton:
+    """
+    Automate Aho-Corasick : trouve toutes les occurrences d'un ensemble de mots-clés
+    en un seul parcours du texte (O(len(texte) + nombre de correspondances)).
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[str, ...]] = [()]
+        for keyword in dict.fromkeys(k for k in keywords if k):
+            self._add(keyword)
+        self._build()
+
+    def _add(self, keyword: str) -> None:
+        state = 0
+        for char in keyword:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = self._out[state] + (keyword,)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Produit (position de début, mot-clé) pour chaque occurrence, par position de fin."""
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in out[state]:
+                yield end - len(keyword) + 1, keyword
+
+
+# Codes explicites : les plus longs d'abord (puis ordre alphabétique, pour un résultat stable)
+_OACIQ_CODES_BY_LENGTH = tuple(
+    (code, code.lower()) for code in sorted(LEA_KNOWN_OACIQ_CODES, key=lambda c: (-len(c), c))
+)
+# Mot-clé → rang du premier groupe qui le contient (le premier groupe trouvé l'emporte)
+_OACIQ_KEYWORD_RANK: dict[str, int] = {}
+for _rank, (_keywords, _code) in enumerate(LEA_OACIQ_KEYWORD_TO_CODE):
+    for _kw in _keywords:
+        _OACIQ_KEYWORD_RANK.setdefault(_kw, _rank)
+_OACIQ_CODE_SET = frozenset(lower for _, lower in _OACIQ_CODES_BY_LENGTH)
+OACIQ_AUTOMATON = KeywordAutomaton([*_OACIQ_CODE_SET, *_OACIQ_KEYWORD_RANK])
+
+
+def extract_oaciq_form_code(message: str) -> Optional[str]:
+    """
+    Code du formulaire OACIQ demandé : code explicite (délimité) d'abord, puis mots-clés.
+    Un seul parcours du message par l'automate.
+    """
+    if not message or not message.strip():
+        return None
+    t = message.strip().lower()
+    first_index: dict[str, int] = {}
+    best_rank: Optional[int] = None
+    for start, keyword in OACIQ_AUTOMATON.iter_matches(t):
+        if keyword in _OACIQ_CODE_SET and (keyword not in first_index or start < first_index[keyword]):
+            first_index[keyword] = start
+        rank = _OACIQ_KEYWORD_RANK.get(keyword)
+        if rank is not None and (best_rank is None or rank < best_rank):
+            best_rank = rank
+    for code, code_lower in _OACIQ_CODES_BY_LENGTH:
+        idx = first_index.get(code_lower)
+        if idx is None:
+            continue
+        end = idx + len(code_lower)
+        before_ok = idx == 0 or t[idx - 1] in _CODE_BOUNDARY_BEFORE
+        after_ok = end >= len(t) or t[end] in _CODE_BOUNDARY_AFTER
+        if not (before_ok and after_ok):
+            continue
+        rest = t[idx:]
+        if code == "D" and idx + 1 < len(t) and rest.startswith(("d'achat", "d’achat", "d'achar")):
+            continue
+        if code == "AS" and rest.startswith(_AS_FALSE_POSITIVE_PREFIXES):
+            continue
+        return code
+    if best_rank is not None:
+        return LEA_OACIQ_KEYWORD_TO_CODE[best_rank][1]
+    return None
+
+
+def extract_transaction_ref(message: str) -> Optional[str]:
+    """Référence de transaction (« transaction 4 », « #4 », « dossier 4 ») → "4" ou None."""
+    if not message or len(message.strip()) < 2:
+        return None
+    t = message.strip()
+    for pattern in (_TX_REF_HASH_RE, _TX_REF_TRANSACTION_RE, _TX_REF_DOSSIER_RE, _TX_REF_NUMERO_RE):
+        m = pattern.search(t)
+        if m:
+            return m.group(1)
+    if _TX_REF_BARE_RE.match(t):
+        m = _DIGITS_RE.search(t)
+        if m:
+            return m.group(0)
+    return None
+
+
+def extract_postal_code(message: str) -> Optional[str]:
+    """Code postal canadien au format A1A 1A1, ou None."""
+    if not message or len(message.strip()) < 5:
+        return None
+    m = _POSTAL_CODE_RE.search(message.strip())
+    if m:
+        raw = _WHITESPACE_RE.sub("", m.group(0).upper())
+        if len(raw) == 6 and raw[0].isalpha() and raw[1].isdigit() and raw[2].isalpha() and raw[3].isdigit() and raw[4].isalpha() and raw[5].isdigit():
+            return f"{raw[0:3]} {raw[3:6]}"
+    return None
+
+
+def extract_french_date(message: str) -> Optional[date]:
+    """Date explicite en français (« le 15 mars 2026 », « 15/03/2026 »), ou None."""
+    if not message or len(message.strip()) < 5:
+        return None
+    t = _VOICE_ARTIFACT_RE.sub("", message.strip()).strip()
+    if len(t) < 5:
+        return None
+    m = _DATE_LONG_RE.search(t)
+    if m:
+        day, month, year = int(m.group(1)), FRENCH_MONTHS.get(m.group(2).lower()), int(m.group(3))
+        if month and 1 <= day <= 31 and 2000 <= year <= 2100:
+            try:
+                return date(year, month, day)
+            except ValueError:
+                return None
+    m = _DATE_SHORT_RE.search(t)
+    if m:
+        day, month, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        if 1 <= day <= 31 and 1 <= month <= 12 and 2000 <= year <= 2100:
+            try:
+                return date(year, month, day)
+            except ValueError:
+                return None
+    return None
+
+
+@dataclass(frozen=True)
+class LeaMessageEntities:
+    """Entités extraites d'un message (résultat partagé par toutes les heuristiques du tour)."""
+
+    transaction_ref: Optional[str]
+    price: Optional[Tuple[Decimal, str]]
+    address: Optional[str]
+    postal_code: Optional[str]
+    form_code: Optional[str]
+    date: Optional[date]
+
+
+@lru_cache(maxsize=512)
+def extract_message_entities(message: str) -> LeaMessageEntities:
+    """Extrait toutes les entités du message en une fois ; résultat mis en cache par message."""
+    return LeaMessageEntities(
+        transaction_ref=extract_transaction_ref(message),
+        price=_extract_price_from_message(message),
+        address=_extract_address_from_message(message),
+        postal_code=extract_postal_code(message),
+        form_code=extract_oaciq_form_code(message),
+        date=extract_french_date(message),
+    )
@@ -0,0 +1,249 @@
+"""
+Géocodage Léa : client HTTP partagé, cache des résultats et regroupement des requêtes.
+
+Les flux d'adresse de Léa (_validate_address_via_geocode) interrogent geocoder.ca puis
+Nominatim pour plusieurs variantes d'une même adresse, souvent plusieurs fois par conversation.
+La validation complète et chaque appel fournisseur (_geocode_geocoder_ca, _geocode_geopy,
+_geocode_one) passent par LeaGeocoder.resolve.
+Ce module fournit :
+- un httpx.AsyncClient partagé (connexions réutilisées au lieu d'un client par appel) ;
+- un cache par adresse normalisée (mémoire LRU devant Redis, TTL ; résultats vides gardés
+  moins longtemps, erreurs réseau jamais mises en cache) ;
+- le regroupement des requêtes en cours : deux tours qui valident la même adresse attendent
+  le même calcul ;
+- un seau à jetons par fournisseur (Nominatim : 1 requête/s selon sa politique d'usage).
+Les URL des fournisseurs viennent de la configuration (LEA_NOMINATIM_URL, LEA_GEOCODER_CA_URL),
+ce qui permet de pointer vers un serveur local de test.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+from app.core.cache import CacheBackend, cache_backend
+from app.core.config import get_settings
+from app.core.logging import logger
+
+LEA_GEOCODE_USER_AGENT = "ImmoAssist-Lea/1.0 (contact@immoassist.com)"
+LEA_GEOCODE_MAX_ENTRIES = 2048
+
+_GEOCODE_KEY_PREFIX = "lea:geo:"
+_KEY_SEPARATORS_RE = re.compile(r"[\s,;]+")
+
+GEOCODE_STATS: dict[str, int] = {
+    "hit_memory": 0,
+    "hit_redis": 0,
+    "miss": 0,
+    "coalesced": 0,
+    "requests": 0,
+    "errors": 0,
+}
+
+# Erreurs réseau survenues pendant le calcul en cours (le résultat n'est alors pas mis en cache)
+_lookup_failures: ContextVar[Optional[list]] = ContextVar("lea_geocode_failures", default=None)
+
+
+def normalize_address_key(address: str) -> str:
+    """Forme canonique d'une adresse pour le cache (casse, accents, espaces et virgules)."""
+    t = unicodedata.normalize("NFKD", (address or "").strip().casefold())
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    return _KEY_SEPARATORS_RE.sub(" ", t).strip()
+
+
+class TokenBucket:
+    """Seau à jetons asynchrone : au plus `rate` acquisitions par seconde (rafale = capacity)."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Attend un jeton (les appelants sont servis dans l'ordre d'arrivée)."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LeaGeocoder:
+    """Client de géocodage partagé : pool HTTP, cache mémoire + Redis, coalescence, débit."""
+
+    def __init__(
+        self,
+        backend: CacheBackend = cache_backend,
+        max_entries: int = LEA_GEOCODE_MAX_ENTRIES,
+        ttl: Optional[int] = None,
+        negative_ttl: Optional[int] = None,
+        nominatim_rate: Optional[float] = None,
+        client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+    ):
+        settings = get_settings()
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl if ttl is not None else settings.LEA_GEOCODE_CACHE_TTL_SEC
+        self.negative_ttl = (
+            negative_ttl if negative_ttl is not None else settings.LEA_GEOCODE_NEGATIVE_TTL_SEC
+        )
+        self.nominatim_url = settings.LEA_NOMINATIM_URL
+        self.geocoder_ca_url = settings.LEA_GEOCODER_CA_URL
+        rate = nominatim_rate if nominatim_rate is not None else settings.LEA_NOMINATIM_MAX_RPS
+        self._buckets: dict[str, TokenBucket] = {"nominatim": TokenBucket(rate)}
+        self._client_factory = client_factory
+        self._client: Optional[httpx.AsyncClient] = None
+        self._entries: "OrderedDict[str, tuple[float, Optional[dict]]]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    # --- HTTP ---
+
+    def client(self) -> httpx.AsyncClient:
+        """Client HTTP partagé (créé au premier appel)."""
+        if self._client is None or self._client.is_closed:
+            if self._client_factory is not None:
+                self._client = self._client_factory()
+            else:
+                self._client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(10.0, connect=5.0),
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                    headers={"User-Agent": LEA_GEOCODE_USER_AGENT},
+                )
+        return self._client
+
+    async def throttle(self, provider: str) -> None:
+        """Respecte le débit du fournisseur (sans effet si aucun seau n'est défini)."""
+        bucket = self._buckets.get(provider)
+        if bucket is not None:
+            await bucket.acquire()
+
+    async def get_json(
+        self, provider: str, url: str, params: dict, headers: Optional[dict] = None
+    ) -> Any:
+        """GET JSON via le client partagé, après le seau à jetons du fournisseur. Lève en cas d'erreur."""
+        await self.throttle(provider)
+        GEOCODE_STATS["requests"] += 1
+        try:
+            r = await self.client().get(url, params=params, headers=headers)
+            r.raise_for_status()
+            return r.json()
+        except Exception:
+            self.note_failure()
+            raise
+
+    def note_failure(self) -> None:
+        """Signale une erreur réseau : le résultat du calcul en cours ne sera pas mis en cache."""
+        GEOCODE_STATS["errors"] += 1
+        failures = _lookup_failures.get()
+        if failures is not None:
+            failures.append(True)
+
+    # --- Cache et coalescence ---
+
+    @staticmethod
+    def key_for(kind: str, address: str) -> str:
+        digest = hashlib.sha256(normalize_address_key(address).encode("utf-8")).hexdigest()
+        return f"{_GEOCODE_KEY_PREFIX}{kind}:{digest}"
+
+    async def resolve(
+        self,
+        kind: str,
+        address: str,
+        compute: Callable[[], Awaitable[Optional[dict]]],
+    ) -> Optional[dict]:
+        """
+        Résultat en cache pour (kind, adresse normalisée), sinon calcul via compute().
+        Les appels concurrents pour la même clé partagent un seul calcul.
+        """
+        key = self.key_for(kind, address)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                GEOCODE_STATS["hit_memory"] += 1
+                return dict(result) if result else None
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            GEOCODE_STATS["coalesced"] += 1
+        else:
+            task = asyncio.create_task(self._load(key, compute), name=f"lea:geocode:{kind}")
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        result, failed = await asyncio.shield(task)
+        if failed:
+            # Un calcul englobant (ex. validation -> appel Nominatim) ne doit pas non plus être mis en cache
+            failures = _lookup_failures.get()
+            if failures is not None:
+                failures.append(True)
+        return dict(result) if result else None
+
+    async def _load(
+        self, key: str, compute: Callable[[], Awaitable[Optional[dict]]]
+    ) -> tuple[Optional[dict], bool]:
+        """(résultat, échec réseau) ; un résultat en échec n'est pas mis en cache."""
+        cached = await self.backend.get(key)
+        if isinstance(cached, dict) and "result" in cached:
+            result = cached["result"] or None
+            ttl = self.ttl if result else self.negative_ttl
+            self._remember(key, result, ttl)
+            GEOCODE_STATS["hit_redis"] += 1
+            return result, False
+
+        GEOCODE_STATS["miss"] += 1
+        failures: list = []
+        _lookup_failures.set(failures)
+        result = await compute()
+        if result is None and failures:
+            logger.debug(f"Lea geocode not cached after {len(failures)} request error(s)")
+            return None, True
+        ttl = self.ttl if result else self.negative_ttl
+        self._remember(key, result, ttl)
+        await self.backend.set(key, {"result": result}, expire=ttl)
+        return result, False
+
+    def _remember(self, key: str, result: Optional[dict], ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {**GEOCODE_STATS, "entries": len(self._entries), "inflight": len(self._inflight)}
+
+    async def aclose(self) -> None:
+        """Ferme le client partagé (arrêt de l'application)."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+lea_geocoder = LeaGeocoder()
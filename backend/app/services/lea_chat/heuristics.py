@@ -10,40 +10,11 @@ from app.services.lea_chat.actions.transaction import (
     _extract_address_from_message,
     _extract_price_from_message,
 )
-
-# Codes OACIQ connus (alignés sur le guide expert et la table forms)
-LEA_KNOWN_OACIQ_CODES = frozenset({
-    "CCVE", "CCDE", "CCIE", "CCM", "CCVNE", "CCDNE", "CCINE", "CCA", "CCADI", "CCL",
-    "DV", "DVD", "PA", "PAD", "PAI", "PAM", "PAG", "CP", "CPCP", "MO",
-    "AVIS-CCA", "AVIS-CVAN", "AVIS-DAVP", "DR", "DRCOP", "PAC", "ACD", "ACI", "BOCP", "MOCP",
-    "AG", "AF", "AR", "EAU", "EXP", "D", "PL", "PLC", "PSL", "ML", "CVHP", "LD", "VI", "AS", "CM",
-    "DIA", "DIV-ENT", "DIV-PAR", "DESC-LOC", "DESC-RES",
-})
-
-LEA_OACIQ_KEYWORD_TO_CODE: list = [
-    (["promesse", "d'achat", "promesse d'achat", "d'achar", "promesse d'achar"], "PA"),
-    (["contre-proposition", "contre proposition"], "CP"),
-    (["modifications", "modification"], "MO"),
-    (["déclarations du vendeur", "déclaration vendeur", "déclarations vendeur"], "DV"),
-    (["déclarations vendeur copropriété", "dvd"], "DVD"),
-    (["contrat de courtage", "courtage exclusif vente", "ccve"], "CCVE"),
-    (["contrat courtage copropriété", "ccde"], "CCDE"),
-    (["contrat courtage achat", "cca"], "CCA"),
-    (["contrat courtage location", "ccl"], "CCL"),
-    (["avis réalisation conditions", "avis conditions", "lever les conditions", "aviscvan"], "AVIS-CVAN"),
-    (["annulation promesse", "avis-davp"], "AVIS-DAVP"),
-    (["annexe expertise", "expertise"], "EXP"),
-    (["annexe financement", "financement"], "AF"),
-    (["annexe générale", "ag"], "AG"),
-    (["annexe eau", "eau potable", "septique"], "EAU"),
-    (["déboursés", "rétribution", "dr "], "DR"),
-    (["demande renseignements syndicat", "drcop", "syndicat copropriété"], "DRCOP"),
-    (["promesse location", "pl "], "PL"),
-    (["vérification identité", "identité", "vi "], "VI"),
-]
-
-_AS_FALSE_POSITIVE_PREFIXES = ("as-t-on", "as-tu", "as-t-il", "as-t-elle", "as-t-ils", "as-t-elles")
-
+from app.services.lea_chat.extraction import (
+    LEA_KNOWN_OACIQ_CODES,  # noqa: F401  (ré-export : tables définies ici avant extraction)
+    LEA_OACIQ_KEYWORD_TO_CODE,  # noqa: F401
+    extract_message_entities,
+)
 
 def _format_canadian_postal_code(raw: str) -> str:
     """Normalise un code postal canadien au format A1A 1A1 (espace au milieu)."""
@@ -63,24 +34,7 @@ def _extract_transaction_ref_from_message(message: str) -> Optional[str]:
     """
     if not message or len(message.strip()) < 2:
         return None
-    t = message.strip()
-    m = re.search(r"#\s*(\d+)", t, re.I)
-    if m:
-        return m.group(1)
-    m = re.search(r"(?:pour\s+|de\s+)?(?:la\s+)?transaction\s+#?\s*(\d+)", t, re.I)
-    if m:
-        return m.group(1)
-    m = re.search(r"dossier\s+#?\s*(\d+)", t, re.I)
-    if m:
-        return m.group(1)
-    m = re.search(r"(?:la\s+)?transaction\s+numéro\s+#?\s*(\d+)", t, re.I)
-    if m:
-        return m.group(1)
-    if re.match(r"^\s*#?\s*\d+\s*$", t):
-        m = re.search(r"\d+", t)
-        if m:
-            return m.group(0)
-    return None
+    return extract_message_entities(message).transaction_ref
 
 
 def _extract_address_hint_from_message(message: str) -> Optional[str]:
@@ -240,13 +194,7 @@ def _extract_postal_code_from_message(message: str) -> Optional[str]:
     """Extrait un code postal canadien (A1A 1A1) du message, s'il y en a un."""
     if not message or len(message.strip()) < 5:
         return None
-    t = message.strip()
-    m = re.search(r"[A-Za-z]\d[A-Za-z]\s*\d[A-Za-z]\d", t)
-    if m:
-        raw = re.sub(r"\s+", "", m.group(0).upper())
-        if len(raw) == 6 and raw[0].isalpha() and raw[1].isdigit() and raw[2].isalpha() and raw[3].isdigit() and raw[4].isalpha() and raw[5].isdigit():
-            return _format_canadian_postal_code(raw)
-    return None
+    return extract_message_entities(message).postal_code
 
 
 def _extract_city_correction_from_message(message: str) -> Optional[str]:
@@ -604,32 +552,7 @@ def _extract_oaciq_form_code_from_message(message: str) -> Optional[str]:
     """
     if not message or not message.strip():
         return None
-    t = (message or "").strip().lower()
-    for code in sorted(LEA_KNOWN_OACIQ_CODES, key=lambda c: -len(c)):
-        code_lower = code.lower()
-        if code_lower in t:
-            idx = t.find(code_lower)
-            before_ok = idx == 0 or t[idx - 1] in " \t\n\r,;.?!»\"'(-"
-            after_ok = idx + len(code_lower) >= len(t) or t[idx + len(code_lower)] in " \t\n\r,;.?!«\"')-"
-            if not (before_ok and after_ok):
-                continue
-            if code == "D" and idx + 1 < len(t):
-                rest = t[idx:]
-                if rest.startswith("d'achat") or rest.startswith("d\u2019achat") or rest.startswith("d'achar"):
-                    continue
-            if code == "AS" and idx == 0:
-                rest = t[idx:]
-                if any(rest.startswith(prefix) for prefix in _AS_FALSE_POSITIVE_PREFIXES):
-                    continue
-            if code == "AS" and idx > 0:
-                rest = t[idx:]
-                if any(rest.startswith(prefix) for prefix in _AS_FALSE_POSITIVE_PREFIXES):
-                    continue
-            return code
-    for keywords, code in LEA_OACIQ_KEYWORD_TO_CODE:
-        if any(kw in t for kw in keywords):
-            return code
-    return None
+    return extract_message_entities(message).form_code
 
 
 def _is_information_request_only(message: str) -> bool:
@@ -0,0 +1,255 @@
+"""
+Stockage des messages Léa : table lea_messages en ajout seul.
+
+Chaque tour ajoute deux lignes (utilisateur, assistant) numérotées par conversation (seq) au lieu
+de réécrire la liste JSON complète de LeaConversation.messages. L'historique envoyé au LLM est
+borné : les LEA_HISTORY_WINDOW derniers messages + un résumé glissant (LeaConversation.summary)
+des messages sortis de la fenêtre. Le coût d'un tour ne dépend plus de la longueur de la conversation.
+
+Migration : les conversations existantes gardent leur colonne JSON ; elles sont recopiées dans
+lea_messages au premier ajout (migrate_legacy_messages), et lues depuis le JSON d'ici là. Une
+conversation est migrée dès que message_count > 0 ; la colonne JSON n'est alors plus lue mais
+reste intacte (retour arrière de la migration 056).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.models.lea_conversation import LeaConversation, LeaMessage
+
+# 10 tours (utilisateur + assistant) envoyés tels quels au LLM
+LEA_HISTORY_WINDOW = 20
+LEA_SUMMARY_LINE_CHARS = 160
+LEA_SUMMARY_MAX_CHARS = 2000
+
+_SUMMARY_ROLE_LABELS = {"user": "Utilisateur", "assistant": "Léa"}
+
+
+@dataclass
+class LeaHistory:
+    """Historique borné d'une conversation : derniers messages + résumé des précédents."""
+
+    messages: list[dict] = field(default_factory=list)
+    summary: Optional[str] = None
+    total: int = 0
+
+
+def lea_message_to_dict(message: LeaMessage) -> dict:
+    """Message au format historique (celui de la colonne JSON) : role, content, timestamp, meta."""
+    out = {"role": message.role, "content": message.content or ""}
+    out.update(message.meta or {})
+    if "timestamp" not in out and message.created_at is not None:
+        out["timestamp"] = message.created_at.isoformat()
+    return out
+
+
+def fold_into_summary(summary: Optional[str], evicted: Iterable[dict]) -> Optional[str]:
+    """Ajoute au résumé une ligne courte par message sorti de la fenêtre (longueur bornée)."""
+    lines = [summary] if summary else []
+    for m in evicted:
+        if not isinstance(m, dict) or m.get("role") not in _SUMMARY_ROLE_LABELS:
+            continue
+        content = " ".join(str(m.get("content") or "").split())
+        if not content:
+            continue
+        if len(content) > LEA_SUMMARY_LINE_CHARS:
+            content = content[: LEA_SUMMARY_LINE_CHARS - 1].rstrip() + "…"
+        lines.append(f"{_SUMMARY_ROLE_LABELS[m['role']]} : {content}")
+    if not lines:
+        return None
+    text = "\n".join(lines)
+    if len(text) > LEA_SUMMARY_MAX_CHARS:
+        # Garder les échanges les plus récents, en coupant sur une ligne entière
+        text = text[-LEA_SUMMARY_MAX_CHARS:]
+        text = text[text.find("\n") + 1:] if "\n" in text else text
+    return text
+
+
+def _row_values(conversation_id: int, seq: int, message: dict) -> dict:
+    meta = {k: v for k, v in message.items() if k not in ("role", "content") and v is not None}
+    return {
+        "conversation_id": conversation_id,
+        "seq": seq,
+        "role": str(message.get("role") or "user")[:20],
+        "content": str(message.get("content") or ""),
+        "meta": meta or None,
+    }
+
+
+async def migrate_legacy_messages(db: AsyncSession, conversation_id: int) -> int:
+    """
+    Recopie une seule fois les messages JSON d'une conversation dans lea_messages.
+    Retourne le nombre de messages de la conversation. Ne fait pas de commit.
+    """
+    # La colonne JSON n'est lue que pour une conversation pas encore migrée
+    count = await _message_count(db, conversation_id)
+    if count:
+        return count
+    legacy = await _legacy_messages(db, conversation_id)
+    if not legacy:
+        return 0
+    # Réserver le numéro de séquence : un seul appelant migre la conversation
+    claimed = await db.execute(
+        update(LeaConversation)
+        .where(LeaConversation.id == conversation_id, LeaConversation.message_count == 0)
+        .values(
+            message_count=len(legacy),
+            summary=fold_into_summary(None, legacy[:-LEA_HISTORY_WINDOW]),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount == 0:
+        return await _message_count(db, conversation_id)
+    if legacy:
+        await db.execute(
+            insert(LeaMessage),
+            [_row_values(conversation_id, i, m) for i, m in enumerate(legacy, start=1)],
+        )
+    logger.info(f"Lea conversation {conversation_id} migrated to lea_messages ({len(legacy)} message(s))")
+    return len(legacy)
+
+
+async def _message_count(db: AsyncSession, conversation_id: int) -> int:
+    r = await db.execute(
+        select(LeaConversation.message_count).where(LeaConversation.id == conversation_id)
+    )
+    return r.scalar_one_or_none() or 0
+
+
+async def append_lea_messages(db: AsyncSession, conversation_id: int, messages: list[dict]) -> int:
+    """
+    Ajoute des messages à la conversation (numéros de séquence réservés de façon atomique) et
+    replie dans le résumé ceux qui sortent de la fenêtre. Retourne le nouveau total. Ne fait pas de commit.
+    """
+    if not messages:
+        return await _message_count(db, conversation_id)
+    await migrate_legacy_messages(db, conversation_id)
+    n = len(messages)
+    r = await db.execute(
+        update(LeaConversation)
+        .where(LeaConversation.id == conversation_id)
+        .values(
+            message_count=LeaConversation.message_count + n,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(LeaConversation.message_count, LeaConversation.summary)
+        .execution_options(synchronize_session=False)
+    )
+    total, summary = r.one()
+    first_seq = total - n + 1
+    await db.execute(
+        insert(LeaMessage),
+        [_row_values(conversation_id, first_seq + i, m) for i, m in enumerate(messages)],
+    )
+    # Messages qui sortent de la fenêtre avec cet ajout
+    evict_to = total - LEA_HISTORY_WINDOW
+    evict_from = max(1, first_seq - LEA_HISTORY_WINDOW)
+    if evict_to >= evict_from:
+        rows = await db.execute(
+            select(LeaMessage)
+            .where(
+                LeaMessage.conversation_id == conversation_id,
+                LeaMessage.seq >= evict_from,
+                LeaMessage.seq <= evict_to,
+            )
+            .order_by(LeaMessage.seq)
+        )
+        evicted = [lea_message_to_dict(m) for m in rows.scalars().all()]
+        await db.execute(
+            update(LeaConversation)
+            .where(LeaConversation.id == conversation_id)
+            .values(summary=fold_into_summary(summary, evicted))
+            .execution_options(synchronize_session=False)
+        )
+    return total
+
+
+async def load_lea_history(
+    db: AsyncSession, user_id: int, session_id: Optional[str], limit: int = LEA_HISTORY_WINDOW
+) -> LeaHistory:
+    """Historique borné (lecture seule) : les `limit` derniers messages + le résumé glissant."""
+    if not session_id:
+        return LeaHistory()
+    r = await db.execute(
+        select(LeaConversation.id, LeaConversation.message_count, LeaConversation.summary)
+        .where(LeaConversation.session_id == session_id)
+        .where(LeaConversation.user_id == user_id)
+    )
+    row = r.one_or_none()
+    if row is None:
+        return LeaHistory()
+    conversation_id, count, summary = row
+    if not count:
+        legacy = await _legacy_messages(db, conversation_id)
+        return LeaHistory(
+            messages=legacy[-limit:],
+            summary=fold_into_summary(None, legacy[:-limit]),
+            total=len(legacy),
+        )
+    rows = await db.execute(
+        select(LeaMessage)
+        .where(LeaMessage.conversation_id == conversation_id)
+        .order_by(LeaMessage.seq.desc())
+        .limit(limit)
+    )
+    recent = [lea_message_to_dict(m) for m in reversed(rows.scalars().all())]
+    return LeaHistory(messages=recent, summary=summary, total=count)
+
+
+async def load_all_lea_messages(db: AsyncSession, conversation_id: int) -> list[dict]:
+    """Tous les messages de la conversation (affichage complet côté frontend)."""
+    rows = await db.execute(
+        select(LeaMessage)
+        .where(LeaMessage.conversation_id == conversation_id)
+        .order_by(LeaMessage.seq)
+    )
+    messages = [lea_message_to_dict(m) for m in rows.scalars().all()]
+    if messages:
+        return messages
+    return await _legacy_messages(db, conversation_id)
+
+
+async def first_user_messages(db: AsyncSession, conversation_ids: list[int]) -> dict[int, str]:
+    """Premier message utilisateur de chaque conversation (titres de la liste des conversations)."""
+    if not conversation_ids:
+        return {}
+    rows = await db.execute(
+        select(LeaMessage.conversation_id, LeaMessage.content)
+        .where(
+            LeaMessage.conversation_id.in_(conversation_ids),
+            LeaMessage.seq <= 2,
+            LeaMessage.role == "user",
+        )
+        .order_by(LeaMessage.conversation_id, LeaMessage.seq)
+    )
+    out: dict[int, str] = {}
+    for conversation_id, content in rows.all():
+        out.setdefault(conversation_id, content or "")
+    missing = [cid for cid in conversation_ids if cid not in out]
+    if not missing:
+        return out
+    # Conversations pas encore migrées : une seule requête pour toutes
+    rows = await db.execute(
+        select(LeaConversation.id, LeaConversation.messages).where(
+            LeaConversation.id.in_(missing),
+            LeaConversation.message_count == 0,
+        )
+    )
+    for cid, legacy in rows.all():
+        for m in legacy or []:
+            if isinstance(m, dict) and m.get("role") == "user":
+                out[cid] = m.get("content") or ""
+                break
+    return out
+
+
+async def _legacy_messages(db: AsyncSession, conversation_id: int) -> list[dict]:
+    r = await db.execute(
+        select(LeaConversation.messages).where(LeaConversation.id == conversation_id)
+    )
+    return [m for m in (r.scalar_one_or_none() or []) if isinstance(m, dict)]
@@ -44,33 +44,56 @@ def _routing_decision_to_legacy(decision: dict) -> dict:
     }
 
 
+async def route_turn(
+    db: AsyncSession,
+    user_id: int,
+    message: str,
+    last_assistant_message: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Charge le contexte actif et route le message (Domain-Intent-Entities).
+    Retourne la décision au format legacy si la confiance est suffisante, sinon None
+    (l'executor bascule alors sur les heuristiques).
+    """
+    if not message or len((message or "").strip()) < 3:
+        return None
+    active_ctx = await load_active_conversation_context(
+        db, user_id, session_id, last_assistant_message=last_assistant_message
+    )
+    context_summary = active_ctx.get("summary", "") or (
+        "Conversation générale, pas de dossier en cours de création ni de formulaire PA en cours de remplissage."
+    )
+    decision: Optional[RoutingDecision] = await route_user_message(
+        message, last_assistant_message, context_summary
+    )
+    if decision and decision.get("confidence", 0) >= ROUTER_CONFIDENCE_THRESHOLD:
+        return _routing_decision_to_legacy(dict(decision))
+    return None
+
+
 async def run(
     db: AsyncSession,
     user_id: int,
     message: str,
     last_assistant_message: Optional[str] = None,
     session_id: Optional[str] = None,
+    *,
+    router_decision: Optional[dict] = None,
+    routed: bool = False,
 ) -> tuple[list, Optional[RealEstateTransaction]]:
     """
     Exécute les actions Léa (création transaction, mise à jour adresse, promesse d'achat).
-    1. Charge le contexte (load_active_conversation_context)
-    2. Route via route_user_message (Domain-Intent-Entities)
-    3. Délègue l'exécution à executor (router_decision passée pour éviter double routage)
+    1. Route via route_turn (contexte actif + Domain-Intent-Entities), sauf si routed=True :
+       la décision a alors déjà été calculée (ex. étape "route" du pipeline de tour) et est
+       passée dans router_decision
+    2. Délègue l'exécution à executor (router_decision passée pour éviter double routage)
     Retourne (liste de lignes pour « Action effectuée », transaction créée si création).
     """
-    router_decision: Optional[dict] = None
-    if message and len((message or "").strip()) >= 3:
-        active_ctx = await load_active_conversation_context(
-            db, user_id, session_id, last_assistant_message=last_assistant_message
-        )
-        context_summary = active_ctx.get("summary", "") or (
-            "Conversation générale, pas de dossier en cours de création ni de formulaire PA en cours de remplissage."
-        )
-        decision: Optional[RoutingDecision] = await route_user_message(
-            message, last_assistant_message, context_summary
+    if not routed:
+        router_decision = await route_turn(
+            db, user_id, message, last_assistant_message, session_id
         )
-        if decision and decision.get("confidence", 0) >= ROUTER_CONFIDENCE_THRESHOLD:
-            router_decision = _routing_decision_to_legacy(dict(decision))
     return await execute_actions(
         db,
         user_id,
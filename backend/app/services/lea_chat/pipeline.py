@@ -0,0 +1,145 @@
+"""
+Pipeline de tour Léa : exécution par étapes selon leurs dépendances.
+
+Chaque étape déclare ce dont elle dépend (requires) et la session qu'elle utilise :
+- "main" : la session de la requête (une seule étape à la fois, AsyncSession n'est pas concurrente) ;
+- "own" : une session dédiée (AsyncSessionLocal), donc exécutable en parallèle ;
+- "read" : une session dédiée en lecture seule, routée vers un réplica (app.core.db_routing) ;
+- None : pas d'accès base (ex. appel LLM, cache).
+Les étapes indépendantes démarrent ensemble ; le résultat de chaque étape est exposé sous
+son nom et sa durée est mesurée (timings_ms).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Literal, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+
+StageSession = Optional[Literal["main", "own", "read"]]
+StageFn = Callable[[Optional[AsyncSession], dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class TurnStage:
+    """Étape du tour : fn(db, results) -> valeur, publiée sous `name`."""
+
+    name: str
+    fn: StageFn
+    requires: tuple[str, ...] = ()
+    session: StageSession = "main"
+
+
+@dataclass
+class TurnResult:
+    """Sorties des étapes (par nom) et durée de chacune en millisecondes."""
+
+    outputs: dict[str, Any] = field(default_factory=dict)
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.outputs[name]
+
+
+class TurnPipeline:
+    """Exécuteur d'étapes avec dépendances (DAG), parallélisme sur sessions séparées."""
+
+    def __init__(
+        self,
+        stages: list[TurnStage],
+        session_factory: Optional[Callable[[], Any]] = None,
+        read_session_factory: Optional[Callable[[], Any]] = None,
+    ):
+        names = [s.name for s in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate stage names in Léa turn pipeline")
+        by_name = {s.name: s for s in stages}
+        for stage in stages:
+            unknown = [dep for dep in stage.requires if dep not in by_name]
+            if unknown:
+                raise ValueError(f"Stage {stage.name!r} requires unknown stage(s): {unknown}")
+        self._check_acyclic(by_name)
+        self.stages = stages
+        self._session_factory = session_factory
+        self._read_session_factory = read_session_factory
+
+    @staticmethod
+    def _check_acyclic(by_name: dict[str, TurnStage]) -> None:
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in Léa turn pipeline at stage {name!r}")
+            visiting.add(name)
+            for dep in by_name[name].requires:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in by_name:
+            visit(name)
+
+    def _factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from app.core.database import AsyncSessionLocal
+
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    def _read_factory(self) -> Callable[[], Any]:
+        if self._read_session_factory is None:
+            from app.core.db_routing import read_session
+
+            self._read_session_factory = read_session
+        return self._read_session_factory
+
+    async def execute(
+        self, db: Optional[AsyncSession], inputs: Optional[dict[str, Any]] = None
+    ) -> TurnResult:
+        """
+        Exécute toutes les étapes. `inputs` est fusionné dans les résultats visibles par les étapes.
+        Une exception dans une étape annule les étapes restantes et est relancée.
+        """
+        result = TurnResult(outputs=dict(inputs or {}))
+        main_lock = asyncio.Lock()
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: TurnStage) -> Any:
+            for dep in stage.requires:
+                await tasks[dep]
+            start = time.perf_counter()
+            try:
+                if stage.session == "main":
+                    async with main_lock:
+                        value = await stage.fn(db, result.outputs)
+                elif stage.session == "own":
+                    async with self._factory()() as own_db:
+                        value = await stage.fn(own_db, result.outputs)
+                elif stage.session == "read":
+                    async with self._read_factory()() as read_db:
+                        value = await stage.fn(read_db, result.outputs)
+                else:
+                    value = await stage.fn(None, result.outputs)
+            finally:
+                result.timings_ms[stage.name] = round((time.perf_counter() - start) * 1000, 1)
+            result.outputs[stage.name] = value
+            return value
+
+        for stage in self.stages:
+            tasks[stage.name] = asyncio.create_task(run_stage(stage), name=f"lea:{stage.name}")
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        logger.info("Léa turn stages", context={"timings_ms": result.timings_ms})
+        return result
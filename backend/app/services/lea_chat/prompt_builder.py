@@ -0,0 +1,235 @@
+"""
+Assemblage du prompt Léa : base de connaissance découpée en sections, sélection par budget de tokens.
+
+La base de connaissance (LEA_KNOWLEDGE.md + contenu DB + documents) était injectée en entier
+dans chaque prompt système. Ici elle est indexée en sections (titres « # » et documents uploadés),
+chaque section étiquetée par domaine/intention du router :
+- sections « core » (instructions centrales, cas transversaux, données plateforme) : toujours incluses ;
+- sections du domaine routé (transaction, purchase_offer, ...) : incluses dans la limite du budget ;
+- autres sections : seulement s'il reste du budget ; pour un tour routé vers un domaine métier,
+  les sections des autres domaines et celles de référence (routage) sont écartées.
+
+Le rendu est stable : les sections core forment un préfixe identique octet pour octet d'un tour
+à l'autre (cache de prompt côté fournisseur), les sections du domaine viennent ensuite dans
+l'ordre du document. Index et sélections sont mémoïsés par contenu.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.logging import logger
+
+_H1_RE = re.compile(r"^# (?!#)(.+)$", re.M)
+_DOCUMENT_MARKER = "--- Document : "
+
+TIER_CORE = 0
+TIER_DOMAIN = 1
+TIER_GENERAL = 2
+TIER_REFERENCE = 3
+
+# Domaines métier : un tour routé vers l'un d'eux n'a pas besoin des sections des autres
+_BUSINESS_DOMAINS = frozenset({"transaction", "purchase_offer"})
+
+# (motif du titre, tier de base, domaines, intentions) — le premier motif qui correspond l'emporte
+_SECTION_RULES: list[tuple[re.Pattern, int, frozenset, Optional[frozenset]]] = [
+    (
+        re.compile(r"^base de connaissance|instructions centrales|transversaux|données plateforme", re.I),
+        TIER_CORE,
+        frozenset(),
+        None,
+    ),
+    (re.compile(r"cas transaction", re.I), TIER_DOMAIN, frozenset({"transaction"}), None),
+    (re.compile(r"promesse d'achat", re.I), TIER_DOMAIN, frozenset({"purchase_offer"}), None),
+    (
+        re.compile(r"formulaire pa", re.I),
+        TIER_DOMAIN,
+        frozenset({"purchase_offer"}),
+        frozenset({"fill", "update", "ask_help", "resume"}),
+    ),
+    (re.compile(r"formulaires oaciq", re.I), TIER_DOMAIN, frozenset({"purchase_offer", "general_assistance"}), None),
+    (re.compile(r"architecture|règles de priorité|mapping", re.I), TIER_REFERENCE, frozenset(), None),
+]
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimation du nombre de tokens (≈ 4 caractères par token pour le français)."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / 4)
+
+
+@dataclass(frozen=True)
+class KnowledgeSection:
+    """Section indexée de la base de connaissance."""
+
+    index: int
+    title: str
+    text: str
+    tier: int
+    domains: frozenset
+    intents: Optional[frozenset]
+    tokens: int
+
+    def tier_for(self, domain: Optional[str], intent: Optional[str]) -> int:
+        """Priorité de la section pour le tour (0 = toujours incluse)."""
+        if self.tier != TIER_DOMAIN:
+            return self.tier
+        if domain not in _BUSINESS_DOMAINS:
+            return TIER_GENERAL
+        if domain in self.domains and (self.intents is None or intent in self.intents):
+            return TIER_DOMAIN
+        return TIER_GENERAL if domain in self.domains else TIER_REFERENCE
+
+
+@dataclass(frozen=True)
+class SelectedKnowledge:
+    """Connaissance retenue pour un tour : préfixe stable (core) + sections du domaine."""
+
+    stable: str
+    domain: str
+    stable_tokens: int
+    domain_tokens: int
+    sections: tuple[str, ...]
+    skipped: tuple[str, ...]
+
+    @property
+    def tokens(self) -> int:
+        return self.stable_tokens + self.domain_tokens
+
+
+def _classify(title: str) -> tuple[int, frozenset, Optional[frozenset]]:
+    for pattern, tier, domains, intents in _SECTION_RULES:
+        if pattern.search(title):
+            return tier, domains, intents
+    return TIER_GENERAL, frozenset(), None
+
+
+def _split_blocks(text: str) -> list[tuple[str, str]]:
+    """Découpe en (titre, texte) sur les titres « # » et les documents uploadés."""
+    blocks: list[tuple[str, str]] = []
+    for part_index, part in enumerate(text.split(f"\n\n{_DOCUMENT_MARKER}")):
+        if part_index > 0:
+            title = part.split(" ---", 1)[0].strip()
+            blocks.append((f"Document : {title}", f"{_DOCUMENT_MARKER}{part}".strip()))
+            continue
+        starts = [m.start() for m in _H1_RE.finditer(part)]
+        if not starts or starts[0] > 0:
+            starts.insert(0, 0)
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else len(part)
+            chunk = part[start:end].strip()
+            if not chunk:
+                continue
+            m = _H1_RE.match(chunk)
+            blocks.append((m.group(1).strip() if m else "", chunk))
+    return blocks
+
+
+@lru_cache(maxsize=4)
+def build_knowledge_index(text: str) -> tuple[KnowledgeSection, ...]:
+    """Index des sections de la base de connaissance (mémoïsé par contenu)."""
+    sections = []
+    for title, chunk in _split_blocks(text or ""):
+        tier, domains, intents = _classify(title)
+        # Le préambule sans titre (en-tête du document) fait partie du préfixe stable
+        if not title:
+            tier = TIER_CORE
+        sections.append(
+            KnowledgeSection(
+                index=len(sections),
+                title=title or "Préambule",
+                text=chunk,
+                tier=tier,
+                domains=domains,
+                intents=intents,
+                tokens=estimate_tokens(chunk),
+            )
+        )
+    return tuple(sections)
+
+
+@lru_cache(maxsize=64)
+def _select(
+    text: str, domain: Optional[str], intent: Optional[str], budget: int
+) -> SelectedKnowledge:
+    sections = build_knowledge_index(text)
+    core = [s for s in sections if s.tier == TIER_CORE]
+    used = sum(s.tokens for s in core)
+    chosen: list[KnowledgeSection] = []
+    skipped: list[str] = []
+    candidates = sorted(
+        (s for s in sections if s.tier != TIER_CORE),
+        key=lambda s: (s.tier_for(domain, intent), s.index),
+    )
+    for section in candidates:
+        tier = section.tier_for(domain, intent)
+        # Tour routé : les sections de référence (routage) ne servent pas à la réponse
+        if domain is not None and tier == TIER_REFERENCE:
+            skipped.append(section.title)
+            continue
+        if used + section.tokens > budget:
+            skipped.append(section.title)
+            continue
+        chosen.append(section)
+        used += section.tokens
+    chosen.sort(key=lambda s: s.index)
+    stable = "\n\n".join(s.text for s in core)
+    domain_text = "\n\n".join(s.text for s in chosen)
+    return SelectedKnowledge(
+        stable=stable,
+        domain=domain_text,
+        stable_tokens=estimate_tokens(stable),
+        domain_tokens=estimate_tokens(domain_text),
+        sections=tuple(s.title for s in core + chosen),
+        skipped=tuple(skipped),
+    )
+
+
+def select_lea_knowledge(
+    knowledge: Optional[str],
+    route: Optional[dict] = None,
+    budget: Optional[int] = None,
+) -> SelectedKnowledge:
+    """
+    Sélectionne les sections de la base de connaissance pour le tour.
+    route : décision du router (format legacy : domain, intent_verb) ou None si non routé.
+    """
+    if budget is None:
+        budget = get_settings().LEA_KNOWLEDGE_TOKEN_BUDGET
+    domain = (route or {}).get("domain") or None
+    intent = (route or {}).get("intent_verb") or None
+    return _select((knowledge or "").strip(), domain, intent, budget)
+
+
+def log_prompt_budget(
+    session_id: Optional[str],
+    knowledge: SelectedKnowledge,
+    history_messages: list,
+    conversation_summary: Optional[str],
+    user_context: Optional[str],
+    system_prompt: str,
+) -> None:
+    """Journalise la répartition des tokens du prompt (connaissance vs historique)."""
+    history_tokens = sum(
+        estimate_tokens(m.get("content")) for m in history_messages or [] if isinstance(m, dict)
+    )
+    logger.info(
+        "Léa prompt budget",
+        context={
+            "session_id": (session_id or "")[:8],
+            "prompt_tokens": {
+                "knowledge_stable": knowledge.stable_tokens,
+                "knowledge_domain": knowledge.domain_tokens,
+                "history": history_tokens,
+                "summary": estimate_tokens(conversation_summary),
+                "user_context": estimate_tokens(user_context),
+                "system_total": estimate_tokens(system_prompt),
+            },
+            "knowledge_sections": len(knowledge.sections),
+            "knowledge_skipped": list(knowledge.skipped),
+        },
+    )
@@ -12,11 +12,16 @@ def build_context(
     user_context: str,
     action_lines: List[str],
     knowledge: Optional[str] = None,
+    conversation_summary: Optional[str] = None,
+    domain_knowledge: Optional[str] = None,
 ) -> Tuple[str, str, List[str]]:
     """
     Prépare le contexte pour l'appel LLM final.
     Retourne (system_prompt, user_context, action_lines).
-    - system_prompt : base de connaissance + LEA_SYSTEM_PROMPT + infos utilisateur + action effectuée
+    - system_prompt : base de connaissance (préfixe stable) + LEA_SYSTEM_PROMPT + connaissance propre
+      au domaine du tour (domain_knowledge) + résumé des échanges précédents (messages sortis de la
+      fenêtre d'historique) + infos utilisateur + action effectuée.
+      Les parties variables viennent après les parties stables (cache de prompt côté fournisseur).
     - user_context : données plateforme (inchangé, peut déjà inclure action_lines)
     - action_lines : liste des actions (pour le frontend)
     """
@@ -25,6 +30,12 @@ def build_context(
         system_prompt += "--- Base de connaissance Léa (instructions, formulaires OACIQ, documents) ---\n"
         system_prompt += knowledge.strip() + "\n\n"
     system_prompt += "--- Règles système ---\n" + LEA_SYSTEM_PROMPT
+    if domain_knowledge and domain_knowledge.strip():
+        system_prompt += "\n\n--- Base de connaissance Léa : sections utiles pour cette demande ---\n"
+        system_prompt += domain_knowledge.strip()
+    if conversation_summary and conversation_summary.strip():
+        system_prompt += "\n\n--- Résumé des échanges précédents de cette conversation ---\n"
+        system_prompt += conversation_summary.strip()
     if user_context and user_context.strip():
         system_prompt += "\n\n--- Informations actuelles de l'utilisateur (plateforme) + Action effectuée ---\n"
         system_prompt += user_context.strip()
@@ -1,14 +1,31 @@
 """
 Router Léa : décision structurée (Domain-Intent-Entities).
 Appel unique au LLM avec LEA_ROUTING_KNOWLEDGE. Aucune écriture DB.
+
+Deux niveaux avant le LLM :
+1. voie rapide heuristique (confirmations / annulations triviales), sans appel réseau ;
+2. cache des décisions LLM (LRU en mémoire + Redis) par (message, dernier message, contexte) normalisés.
+Chaque décision incrémente un compteur de ROUTER_STATS et porte sa provenance (source).
 """
 
+import hashlib
 import json
 import re
+import time
+import unicodedata
+from collections import OrderedDict
 from typing import Optional
 
+from app.core.cache import CacheBackend, cache_backend
 from app.core.logging import logger
 from app.services.ai_service import AIService, AIProvider
+from app.services.lea_chat.heuristics import (
+    _last_message_asked_for_property_for_form,
+    _last_message_asked_to_confirm_pa_creation,
+    _wants_to_create_oaciq_form_for_transaction,
+    _wants_to_set_promise,
+)
+from app.services.lea_chat.context_loader import PA_FILLING_SUMMARY, TRANSACTION_CREATION_SUMMARY
 from app.services.lea_chat.knowledge import load_routing_knowledge
 from app.services.lea_chat.schemas import (
     LeaDomain,
@@ -19,6 +36,17 @@ from app.services.lea_chat.schemas import (
 )
 
 ROUTER_CONFIDENCE_THRESHOLD = 0.5
+ROUTER_FAST_PATH_CONFIDENCE = 0.95
+ROUTER_CACHE_TTL_SEC = 3600
+ROUTER_CACHE_MAX_ENTRIES = 512
+_ROUTER_CACHE_KEY_PREFIX = "lea:router:v1:"
+
+ROUTER_STATS: dict[str, int] = {
+    "fast_path": 0,
+    "cache_hit_memory": 0,
+    "cache_hit_redis": 0,
+    "cache_miss": 0,
+}
 
 
 async def _route_legacy_llm(
@@ -92,7 +120,7 @@ async def _route_legacy_llm(
             confidence=confidence,
         )
     except (json.JSONDecodeError, TypeError, ValueError, Exception) as e:
-        logger.debug("Router legacy LLM failed: %s", e)
+        logger.debug(f"Router legacy LLM failed: {e}")
         return None
 
 
@@ -139,7 +167,7 @@ async def _classify_legacy_minimal(
                 )
         return RoutingDecision(domain="other", intent="answer", entities=[], signals={}, confidence=0.5)
     except Exception as e:
-        logger.debug("Minimal classifier failed: %s", e)
+        logger.debug(f"Minimal classifier failed: {e}")
         return None
 
 
@@ -174,7 +202,7 @@ def _parse_router_response(content: str) -> Optional[RoutingDecision]:
         if not isinstance(parsed, dict):
             return None
     except (json.JSONDecodeError, TypeError, ValueError) as e:
-        logger.debug("Router JSON parse failed: %s", e)
+        logger.debug(f"Router JSON parse failed: {e}")
         return None
 
     # Nouveau format : domain + intent
@@ -242,18 +270,199 @@ def _parse_router_response(content: str) -> Optional[RoutingDecision]:
     )
 
 
+# Vocabulaire des confirmations sans contenu : celui de _is_short_confirmation_message (tout autre mot → LLM)
+_CONFIRM_WORDS = (
+    "oui", "ouais", "ouaip", "ok", "exact", "exactement", "c'est ça", "cest ca",
+    "d'accord", "daccord", "confirmé", "confirme", "vas-y", "vas y", "go", "yep", "yeah",
+)
+# Acceptés seulement après « oui » / « ok » (l'heuristique acceptait « oui … » et « ok … »)
+_CONFIRM_FOLLOW_UPS = (
+    "merci", "svp", "s'il vous plaît", "s'il vous plait", "s'il te plaît", "s'il te plait",
+    "enregistre", "enregistrez", "enregistrer", "c'est bon", "parfait", "super",
+)
+_CANCEL_PHRASES = (
+    "annule", "annuler", "annulez", "laisse tomber", "laissez tomber", "oublie ça", "oublie ca",
+    "oubliez ça", "oubliez ca", "on arrête", "on arrete", "stop",
+)
+
+
+def _phrase_alternation(phrases: tuple[str, ...]) -> str:
+    # Les plus longues d'abord pour que « c'est bon » l'emporte sur « c'est »
+    return "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+
+
+_CONFIRM_ALT = _phrase_alternation(_CONFIRM_WORDS)
+_CONFIRM_OR_FOLLOW_UP_ALT = _phrase_alternation(_CONFIRM_WORDS + _CONFIRM_FOLLOW_UPS)
+_FAST_CONFIRM_RE = re.compile(
+    rf"^(?:(?:{_CONFIRM_ALT})(?:[\s,.!]+(?:{_CONFIRM_ALT}))*"
+    rf"|(?:oui|ok)(?:[\s,.!]+(?:{_CONFIRM_OR_FOLLOW_UP_ALT}))+)[\s.!]*$"
+)
+_FAST_CANCEL_RE = re.compile(rf"^(?:{_phrase_alternation(_CANCEL_PHRASES)})[\s.!]*$")
+_WHITESPACE_RE = re.compile(r"\s+")
+_APOSTROPHES = str.maketrans({"’": "'", "`": "'", "´": "'"})
+
+
+def _normalize_for_routing(text: Optional[str], limit: int = 500) -> str:
+    """Minuscules, apostrophes et espaces normalisés (accents conservés)."""
+    t = unicodedata.normalize("NFC", (text or "").strip()[:limit]).lower().translate(_APOSTROPHES)
+    return _WHITESPACE_RE.sub(" ", t)
+
+
+def _domain_from_context_summary(context_summary: str) -> str:
+    # Phrases positives de context_loader (le résumé par défaut mentionne aussi « formulaire PA »)
+    if PA_FILLING_SUMMARY in (context_summary or ""):
+        return "purchase_offer"
+    if TRANSACTION_CREATION_SUMMARY in (context_summary or ""):
+        return "transaction"
+    return "other"
+
+
+def _fast_path_decision(
+    message: str,
+    last_assistant_message: Optional[str],
+    context_summary: str,
+) -> Optional[RoutingDecision]:
+    """
+    Classe sans LLM les messages triviaux (« oui », « ok enregistrez », « annule »).
+    Les signaux sont calculés par les mêmes heuristiques que le repli de run_lea_actions,
+    donc le comportement est identique à celui d'un routage LLM réussi sur ces messages.
+    """
+    normalized = _normalize_for_routing(message, limit=80)
+    if not normalized or len(normalized) > 60:
+        return None
+    if _FAST_CANCEL_RE.match(normalized):
+        return RoutingDecision(
+            domain=_domain_from_context_summary(context_summary),
+            intent="cancel",
+            entities=[],
+            signals={},
+            tx_type="",
+            confidence=ROUTER_FAST_PATH_CONFIDENCE,
+            source="fast_path",
+        )
+    if not _FAST_CONFIRM_RE.match(normalized):
+        return None
+    asked_to_confirm_pa = _last_message_asked_to_confirm_pa_creation(last_assistant_message)
+    signals: LeaSignals = {
+        "user_confirmed": True,
+        "last_message_asked_to_confirm_pa": asked_to_confirm_pa,
+        "asked_property_for_form": _last_message_asked_for_property_for_form(last_assistant_message),
+        "user_wants_set_promise": _wants_to_set_promise(message),
+        "user_wants_create_oaciq_form": _wants_to_create_oaciq_form_for_transaction(message),
+    }
+    domain = _domain_from_context_summary(context_summary)
+    intent = "confirm"
+    if asked_to_confirm_pa:
+        domain = "purchase_offer"
+    elif domain == "purchase_offer":
+        # Confirmation d'une valeur pendant le remplissage : fill_pa, pas create_pa
+        intent = "fill"
+    return RoutingDecision(
+        domain=domain,
+        intent=intent,
+        entities=[],
+        signals=signals,
+        tx_type="",
+        confidence=ROUTER_FAST_PATH_CONFIDENCE,
+        source="fast_path",
+    )
+
+
+class RoutingDecisionCache:
+    """Cache des décisions LLM : LRU/TTL en mémoire devant Redis (app.core.cache)."""
+
+    def __init__(
+        self,
+        backend: CacheBackend = cache_backend,
+        max_entries: int = ROUTER_CACHE_MAX_ENTRIES,
+        ttl: int = ROUTER_CACHE_TTL_SEC,
+    ):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    @staticmethod
+    def key_for(message: str, last_assistant_message: Optional[str], context_summary: str) -> str:
+        raw = "\x1f".join(
+            (
+                _normalize_for_routing(message),
+                _normalize_for_routing(last_assistant_message),
+                _normalize_for_routing(context_summary, limit=2000),
+            )
+        )
+        return _ROUTER_CACHE_KEY_PREFIX + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[RoutingDecision]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, decision = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                ROUTER_STATS["cache_hit_memory"] += 1
+                return RoutingDecision(**decision, source="cache")
+            del self._entries[key]
+        decision = await self.backend.get(key)
+        if isinstance(decision, dict) and decision.get("domain"):
+            self._remember(key, decision)
+            ROUTER_STATS["cache_hit_redis"] += 1
+            return RoutingDecision(**decision, source="cache")
+        return None
+
+    async def set(self, key: str, decision: RoutingDecision) -> None:
+        stored = {k: v for k, v in decision.items() if k != "source"}
+        self._remember(key, stored)
+        await self.backend.set(key, stored, expire=self.ttl)
+
+    def _remember(self, key: str, decision: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, decision)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+routing_decision_cache = RoutingDecisionCache()
+
+
 async def route_user_message(
     message: str,
     last_assistant_message: Optional[str],
     context_summary: str,
 ) -> Optional[RoutingDecision]:
     """
-    Analyse le message via le LLM et retourne une RoutingDecision.
+    Retourne une RoutingDecision : voie rapide heuristique, sinon cache, sinon LLM.
     Retourne None si le LLM échoue ou si le message est vide.
     """
     if not message or not message.strip():
         return None
 
+    fast = _fast_path_decision(message, last_assistant_message, context_summary)
+    if fast is not None:
+        ROUTER_STATS["fast_path"] += 1
+        return fast
+
+    key = RoutingDecisionCache.key_for(message, last_assistant_message, context_summary)
+    cached = await routing_decision_cache.get(key)
+    if cached is not None:
+        return cached
+
+    ROUTER_STATS["cache_miss"] += 1
+    decision = await _route_with_llm(message, last_assistant_message, context_summary)
+    if decision:
+        await routing_decision_cache.set(key, decision)
+        decision["source"] = "llm"
+    return decision
+
+
+async def _route_with_llm(
+    message: str,
+    last_assistant_message: Optional[str],
+    context_summary: str,
+) -> Optional[RoutingDecision]:
+    """Analyse le message via le LLM (Domain-Intent-Entities, puis legacy en repli)."""
     routing_knowledge = load_routing_knowledge()
     if not routing_knowledge:
         logger.warning("LEA_ROUTING_KNOWLEDGE not loaded, using minimal classifier")
@@ -288,7 +497,7 @@ async def route_user_message(
         if decision:
             return decision
     except Exception as e:
-        logger.debug("Router LLM failed: %s", e)
+        logger.debug(f"Router LLM failed: {e}")
 
     # Fallback : routeur legacy (format intent plat) si Domain-Intent-Entities échoue
     return await _route_legacy_llm(message, last_assistant_message, context_summary, routing_knowledge)
@@ -63,5 +63,6 @@ class RoutingDecision(TypedDict, total=False):
     transaction_ref: Optional[str]
     confidence: float
     rationale: Optional[str]
+    source: Literal["fast_path", "cache", "llm"]  # Provenance de la décision (router)
 
 
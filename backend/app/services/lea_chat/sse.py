@@ -0,0 +1,153 @@
+"""
+Écriture SSE Léa : regroupement des deltas en trames.
+
+Sans regroupement, chaque caractère d'une confirmation (et chaque token LLM) devient un
+événement `data:` avec son propre json.dumps. SSEFrameWriter regroupe les deltas par taille
+(LEA_SSE_COALESCE_BYTES) et par fenêtre de temps (LEA_SSE_COALESCE_MS), sérialise les trames
+une seule fois et compte les trames envoyées par réponse.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from app.core.config import get_settings
+from app.core.logging import logger
+
+# Trames constantes pré-sérialisées
+SSE_COMMENT_OK = ": ok\n\n"
+SSE_STATUS_CONNECTING = f"data: {json.dumps({'status': 'connecting'})}\n\n"
+
+
+def sse_event(payload: dict) -> str:
+    """Sérialise un événement SSE `data:` (JSON)."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+class SSEFrameWriter:
+    """
+    Regroupe les deltas texte en trames SSE `{"delta": ...}`.
+    Une trame part dès que le tampon atteint max_bytes, ou quand le premier delta en attente
+    a plus de max_delay secondes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        settings = get_settings()
+        self.max_bytes = max_bytes if max_bytes is not None else settings.LEA_SSE_COALESCE_BYTES
+        self.max_delay = (
+            max_delay if max_delay is not None else settings.LEA_SSE_COALESCE_MS / 1000.0
+        )
+        self._clock = clock
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        self._first_buffered_at: Optional[float] = None
+        self.frames = 0
+        self.deltas = 0
+        self.bytes_sent = 0
+
+    def _frame(self, text: str) -> str:
+        frame = 'data: {"delta": ' + json.dumps(text) + "}\n\n"
+        self.frames += 1
+        self.bytes_sent += len(frame.encode("utf-8"))
+        return frame
+
+    def event(self, payload: dict) -> str:
+        """Trame d'événement arbitraire (status, done, error), comptée dans les métriques."""
+        frame = sse_event(payload)
+        self.frames += 1
+        self.bytes_sent += len(frame.encode("utf-8"))
+        return frame
+
+    def push(self, delta: str) -> Optional[str]:
+        """Ajoute un delta ; retourne une trame si le seuil de taille ou de temps est atteint."""
+        if not delta:
+            return None
+        self.deltas += 1
+        if self._first_buffered_at is None:
+            self._first_buffered_at = self._clock()
+        self._buffer.append(delta)
+        self._buffered_bytes += len(delta.encode("utf-8"))
+        if self._buffered_bytes >= self.max_bytes or self._window_elapsed():
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Émet le tampon en attente (ou None s'il est vide)."""
+        if not self._buffer:
+            return None
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        self._first_buffered_at = None
+        return self._frame(text)
+
+    def _window_elapsed(self) -> bool:
+        return (
+            self._first_buffered_at is not None
+            and self._clock() - self._first_buffered_at >= self.max_delay
+        )
+
+    def _time_left(self) -> Optional[float]:
+        if self._first_buffered_at is None:
+            return None
+        return max(0.0, self.max_delay - (self._clock() - self._first_buffered_at))
+
+    def text_frames(self, text: str) -> Iterator[str]:
+        """Découpe un texte fixe (confirmation) en trames d'au plus ~max_bytes."""
+        for char in text:
+            self.deltas += 1
+            self._buffer.append(char)
+            self._buffered_bytes += len(char.encode("utf-8"))
+            if self._buffered_bytes >= self.max_bytes:
+                yield self.flush()
+        tail = self.flush()
+        if tail:
+            yield tail
+
+    async def stream(self, deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Regroupe un flux de deltas LLM. Si aucun nouveau delta n'arrive avant la fin de la
+        fenêtre de temps, le tampon est envoyé sans attendre le token suivant.
+        """
+        iterator = deltas.__aiter__()
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=self._time_left())
+                if not done:
+                    frame = self.flush()
+                    if frame:
+                        yield frame
+                    continue
+                task, pending = pending, None
+                try:
+                    delta = task.result()
+                except StopAsyncIteration:
+                    break
+                frame = self.push(delta)
+                if frame:
+                    yield frame
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+        tail = self.flush()
+        if tail:
+            yield tail
+
+    def metrics(self) -> dict[str, Any]:
+        return {"frames": self.frames, "deltas": self.deltas, "bytes": self.bytes_sent}
+
+    def log_metrics(self, session_id: Optional[str]) -> None:
+        """Journalise le nombre de trames pour la réponse (frames/réponse)."""
+        logger.info(
+            "Léa SSE response framed",
+            context={"sse": self.metrics(), "session_id": (session_id or "")[:8]},
+        )
@@ -0,0 +1,230 @@
+"""
+Cache du contexte utilisateur Léa (snapshot par utilisateur).
+
+get_lea_user_context reconstruit à chaque tour le même bloc de prompt (formulaires OACIQ,
+15 dernières transactions, dossiers portail). Ce module conserve un snapshot du texte rendu
+en mémoire et dans Redis (app.core.cache), validé par des tampons de version :
+- version « global » : incrémentée à chaque écriture sur Form (référentiel partagé) ;
+- version « user:{id} » : incrémentée à chaque écriture sur une transaction, une soumission
+  de formulaire ou un dossier portail de l'utilisateur.
+
+Les tampons sont incrémentés après commit via les hooks de commit (app.core.commit_hooks) : un tour
+sans écriture ne fait aucune requête SQL pour le contexte. Lors d'une reconstruction, seules
+les lignes des transactions dont updated_at a changé sont re-rendues.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.cache import CacheBackend, cache_backend
+from app.core.commit_hooks import CommitHook, register_commit_hook, run_in_background
+from app.core.logging import logger
+from app.models import PortailTransaction, RealEstateTransaction
+from app.models.form import Form, FormSubmission
+
+# Durée de vie max d'un snapshot (filet de sécurité si un tampon est manqué)
+LEA_CONTEXT_SNAPSHOT_TTL_SEC = 300
+# Sans Redis, les écritures des autres workers sont invisibles : TTL court
+LEA_CONTEXT_LOCAL_ONLY_TTL_SEC = 30
+LEA_CONTEXT_MAX_USERS = 1024
+
+_GLOBAL_SCOPE = "global"
+_VERSION_KEY_PREFIX = "lea:ctx:ver:"
+_SNAPSHOT_KEY_PREFIX = "lea:ctx:snapshot:"
+
+
+def _user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+@dataclass
+class _Snapshot:
+    """Snapshot rendu pour un utilisateur + mémo des lignes par transaction."""
+
+    stamp: tuple = ()
+    text: Optional[str] = None
+    stored_at: float = 0.0
+    # tx_id -> (empreinte, ligne rendue)
+    tx_lines: dict[int, tuple[Any, str]] = field(default_factory=dict)
+
+
+@dataclass
+class LeaContextLookup:
+    """Résultat d'une consultation du cache : texte si valide, sinon tampon à utiliser pour store()."""
+
+    user_id: int
+    stamp: tuple
+    text: Optional[str]
+    _previous_lines: dict[int, tuple[Any, str]]
+    _lines: dict[int, tuple[Any, str]] = field(default_factory=dict)
+    rendered: int = 0
+    reused: int = 0
+
+    def transaction_line(
+        self, tx: RealEstateTransaction, render: Callable[[RealEstateTransaction], str]
+    ) -> str:
+        """Retourne la ligne de la transaction, re-rendue seulement si updated_at a changé."""
+        fingerprint = tx.updated_at.isoformat() if getattr(tx, "updated_at", None) else None
+        previous = self._previous_lines.get(tx.id)
+        if fingerprint is not None and previous is not None and previous[0] == fingerprint:
+            line = previous[1]
+            self.reused += 1
+        else:
+            line = render(tx)
+            self.rendered += 1
+        self._lines[tx.id] = (fingerprint, line)
+        return line
+
+
+class LeaUserContextCache:
+    """Snapshot du contexte Léa par utilisateur (L1 mémoire + Redis), invalidé par tampons de version."""
+
+    def __init__(self, backend: CacheBackend = cache_backend, max_users: int = LEA_CONTEXT_MAX_USERS):
+        self.backend = backend
+        self.max_users = max_users
+        self._snapshots: "OrderedDict[int, _Snapshot]" = OrderedDict()
+        self._local_versions: dict[str, int] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
+    @property
+    def _redis_enabled(self) -> bool:
+        return bool(self.backend.use_redis and self.backend.redis_client)
+
+    async def _current_stamp(self, user_id: int) -> tuple:
+        scopes = (_GLOBAL_SCOPE, _user_scope(user_id))
+        local = tuple(self._local_versions.get(s, 0) for s in scopes)
+        remote: tuple = ()
+        if self._redis_enabled:
+            counters = await self.backend.get_counters(*(_VERSION_KEY_PREFIX + s for s in scopes))
+            remote = tuple(counters) if counters is not None else ()
+        return local + remote
+
+    def _ttl(self) -> int:
+        return LEA_CONTEXT_SNAPSHOT_TTL_SEC if self._redis_enabled else LEA_CONTEXT_LOCAL_ONLY_TTL_SEC
+
+    async def lookup(self, user_id: int) -> LeaContextLookup:
+        """Consulte le snapshot de l'utilisateur. Le tampon est lu avant toute requête SQL de reconstruction."""
+        stamp = await self._current_stamp(user_id)
+        snap = self._snapshots.get(user_id)
+        now = time.monotonic()
+        if snap is not None:
+            self._snapshots.move_to_end(user_id)
+            if snap.text is not None and snap.stamp == stamp and now - snap.stored_at < self._ttl():
+                self.stats["memory_hits"] += 1
+                return LeaContextLookup(user_id, stamp, snap.text, snap.tx_lines)
+        previous_lines = snap.tx_lines if snap is not None else {}
+
+        # Snapshot partagé par un autre worker : valide si les tampons Redis correspondent
+        remote_stamp = list(stamp[2:])
+        if remote_stamp:
+            data = await self.backend.get(_SNAPSHOT_KEY_PREFIX + str(user_id))
+            if isinstance(data, dict) and data.get("stamp") == remote_stamp and data.get("text"):
+                lines = {
+                    int(tx_id): (fingerprint, line)
+                    for tx_id, fingerprint, line in data.get("lines") or []
+                }
+                self._remember(user_id, _Snapshot(stamp, data["text"], now, lines))
+                self.stats["redis_hits"] += 1
+                return LeaContextLookup(user_id, stamp, data["text"], lines)
+
+        self.stats["misses"] += 1
+        return LeaContextLookup(user_id, stamp, None, previous_lines)
+
+    async def store(self, lookup: LeaContextLookup, text: str) -> None:
+        """Enregistre le texte reconstruit sous le tampon lu par lookup()."""
+        self._remember(lookup.user_id, _Snapshot(lookup.stamp, text, time.monotonic(), lookup._lines))
+        remote_stamp = list(lookup.stamp[2:])
+        if remote_stamp:
+            await self.backend.set(
+                _SNAPSHOT_KEY_PREFIX + str(lookup.user_id),
+                {
+                    "stamp": remote_stamp,
+                    "text": text,
+                    "lines": [[tx_id, fp, line] for tx_id, (fp, line) in lookup._lines.items()],
+                },
+                expire=LEA_CONTEXT_SNAPSHOT_TTL_SEC,
+            )
+        logger.debug(
+            f"Lea user context rebuilt for user {lookup.user_id}: "
+            f"{lookup.rendered} transaction line(s) rendered, {lookup.reused} reused"
+        )
+
+    def _remember(self, user_id: int, snap: _Snapshot) -> None:
+        self._snapshots[user_id] = snap
+        self._snapshots.move_to_end(user_id)
+        while len(self._snapshots) > self.max_users:
+            self._snapshots.popitem(last=False)
+
+    def bump(self, scopes: set[str]) -> None:
+        """Incrémente les tampons (mémoire immédiatement, Redis en tâche de fond)."""
+        for scope in scopes:
+            self._local_versions[scope] = self._local_versions.get(scope, 0) + 1
+        if scopes and self._redis_enabled:
+            run_in_background(self._background_tasks, self._bump_remote, scopes)
+
+    async def _bump_remote(self, scopes: set[str]) -> None:
+        for scope in scopes:
+            await self.backend.incr(_VERSION_KEY_PREFIX + scope)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.bump({_user_scope(user_id)})
+
+    def invalidate_all(self) -> None:
+        self.bump({_GLOBAL_SCOPE})
+
+    def clear(self) -> None:
+        """Vide la mémoire locale (tests)."""
+        self._snapshots.clear()
+        self._local_versions.clear()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
+
+lea_user_context_cache = LeaUserContextCache()
+
+
+def _loaded_value(obj: Any, attr: str) -> Any:
+    """Valeur d'attribut déjà chargée (sans lazy load, interdit en async)."""
+    return inspect(obj).dict.get(attr)
+
+
+def _scopes_for_object(session: Session, obj: Any) -> set[str]:
+    if isinstance(obj, RealEstateTransaction):
+        user_id = _loaded_value(obj, "user_id")
+        return {_user_scope(user_id)} if user_id else {_GLOBAL_SCOPE}
+    if isinstance(obj, PortailTransaction):
+        courtier_id = _loaded_value(obj, "courtier_id")
+        return {_user_scope(courtier_id)} if courtier_id else {_GLOBAL_SCOPE}
+    if isinstance(obj, Form):
+        return {_GLOBAL_SCOPE}
+    if isinstance(obj, FormSubmission):
+        tx_id = _loaded_value(obj, "transaction_id")
+        if not tx_id:
+            return set()
+        # Le statut affiché dépend du propriétaire de la transaction, pas de l'auteur de la soumission
+        tx = session.identity_map.get(identity_key(RealEstateTransaction, tx_id))
+        owner_id = _loaded_value(tx, "user_id") if tx is not None else None
+        return {_user_scope(owner_id)} if owner_id else {_GLOBAL_SCOPE}
+    return set()
+
+
+def _collect_lea_context_scopes(session: Session, obj: Any, is_new: bool) -> set[str]:
+    return _scopes_for_object(session, obj)
+
+
+def _bump_lea_context_versions(session: Session, scopes: set[str]) -> None:
+    lea_user_context_cache.bump(scopes)
+
+
+register_commit_hook(CommitHook(
+    name="lea_context_scopes",
+    collect=_collect_lea_context_scopes,
+    on_commit=_bump_lea_context_versions,
+))
@@ -10,10 +10,15 @@ from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import defer, selectinload
 
 from app.services.ai_service import AIService, AIProvider
 from app.models.lea_conversation import LeaConversation, LeaToolUsage
+from app.services.lea_chat.message_store import (
+    append_lea_messages,
+    first_user_messages,
+    load_lea_history,
+)
 from app.models.user import User
 from app.models.company import Company
 from app.models.contact import Contact
@@ -47,6 +52,7 @@ Règles importantes:
         """
         self.db = db
         self.user_id = user_id
+        self.conversation_summary: Optional[str] = None
         self.ai_service = AIService(provider=provider)
         self.tools = self._get_tools()
     
@@ -153,11 +159,18 @@ Règles importantes:
             },
         ]
     
+    def _system_prompt(self) -> str:
+        """System prompt, followed by the summary of messages outside the history window"""
+        if not self.conversation_summary:
+            return self.SYSTEM_PROMPT
+        return f"{self.SYSTEM_PROMPT}\n\nRésumé des échanges précédents :\n{self.conversation_summary}"
+    
     async def get_or_create_conversation(self, session_id: Optional[str] = None) -> LeaConversation:
         """Get or create a conversation session"""
         if session_id:
             result = await self.db.execute(
                 select(LeaConversation)
+                .options(defer(LeaConversation.messages))
                 .where(LeaConversation.session_id == session_id)
                 .where(LeaConversation.user_id == self.user_id)
             )
@@ -184,20 +197,19 @@ Règles importantes:
 
         result = await self.db.execute(
             select(LeaConversation)
+            .options(defer(LeaConversation.messages))
             .where(LeaConversation.user_id == self.user_id)
             .order_by(desc(LeaConversation.updated_at))
             .limit(limit)
         )
         rows = result.scalars().all()
+        first_messages = await first_user_messages(self.db, [conv.id for conv in rows])
         out = []
         for conv in rows:
             title = "Nouvelle conversation"
-            if conv.messages:
-                for m in conv.messages:
-                    if isinstance(m, dict) and m.get("role") == "user":
-                        content = m.get("content") or ""
-                        title = (content[:50] + "…") if len(content) > 50 else content or title
-                        break
+            content = first_messages.get(conv.id) or ""
+            if content:
+                title = (content[:50] + "…") if len(content) > 50 else content
             out.append({
                 "session_id": conv.session_id,
                 "title": title,
@@ -226,8 +238,14 @@ Règles importantes:
         if not conversation:
             conversation = await self.get_or_create_conversation(session_id)
         
-        # Build messages from conversation history
-        messages = conversation.messages.copy() if conversation.messages else []
+        # Build messages from conversation history (bounded window + rolling summary)
+        history = await load_lea_history(self.db, self.user_id, conversation.session_id)
+        self.conversation_summary = history.summary
+        messages = list(history.messages)
+        # A window starting inside a tool exchange would send orphan tool results
+        while messages and messages[0].get("role") == "tool":
+            messages.pop(0)
+        history_length = len(messages)
         
         # Add user message
         messages.append({
@@ -239,7 +257,7 @@ Règles importantes:
         # Call AI with tools
         try:
             # For OpenAI, we need to handle function calling
-            if self.ai_service.provider == AIProvider.OPENAI:
+            if self.ai_service.is_openai_compatible:
                 response = await self._chat_with_openai_tools(messages)
             else:
                 # For Anthropic, use tools parameter
@@ -268,7 +286,7 @@ Règles importantes:
                     })
                 
                 # Get final response
-                if self.ai_service.provider == AIProvider.OPENAI:
+                if self.ai_service.is_openai_compatible:
                     final_response = await self._chat_with_openai_tools(messages)
                 else:
                     final_response = await self._chat_with_anthropic_tools(messages)
@@ -282,9 +300,8 @@ Règles importantes:
                 "timestamp": datetime.utcnow().isoformat()
             })
             
-            # Update conversation
-            conversation.messages = messages
-            conversation.updated_at = datetime.utcnow()
+            # Update conversation (ajout des nouveaux messages seulement)
+            await append_lea_messages(self.db, conversation.id, messages[history_length:])
             await self.db.commit()
             
             return {
@@ -309,15 +326,18 @@ Règles importantes:
         
         # Add system prompt
         if not api_messages or api_messages[0].get("role") != "system":
-            api_messages.insert(0, {"role": "system", "content": self.SYSTEM_PROMPT})
+            api_messages.insert(0, {"role": "system", "content": self._system_prompt()})
         
-        response = await self.ai_service.client.chat.completions.create(
-            model=self.ai_service.model,
-            messages=api_messages,
-            tools=self.tools,
-            tool_choice="auto",
-            temperature=self.ai_service.temperature,
-            max_tokens=self.ai_service.max_tokens,
+        response = await self.ai_service.call(
+            "chat.tools",
+            lambda: self.ai_service.client.chat.completions.create(
+                model=self.ai_service.model,
+                messages=api_messages,
+                tools=self.tools,
+                tool_choice="auto",
+                temperature=self.ai_service.temperature,
+                max_tokens=self.ai_service.max_tokens,
+            ),
         )
         
         message = response.choices[0].message
@@ -338,7 +358,7 @@ Règles importantes:
             "content": message.content or "",
             "tool_calls": tool_calls,
             "model": response.model,
-            "provider": "openai",
+            "provider": self.ai_service.provider.value,
             "usage": {
                 "prompt_tokens": response.usage.prompt_tokens,
                 "completion_tokens": response.usage.completion_tokens,
@@ -376,13 +396,16 @@ Règles importantes:
         # Convert tools to Anthropic format
         anthropic_tools = [self._convert_tool_to_anthropic(tool) for tool in self.tools]
         
-        response = await self.ai_service.client.messages.create(
-            model=self.ai_service.model,
-            max_tokens=self.ai_service.max_tokens,
-            temperature=self.ai_service.temperature,
-            system=self.SYSTEM_PROMPT,
-            messages=anthropic_messages,
-            tools=anthropic_tools if anthropic_tools else None,
+        response = await self.ai_service.call(
+            "chat.tools",
+            lambda: self.ai_service.client.messages.create(
+                model=self.ai_service.model,
+                max_tokens=self.ai_service.max_tokens,
+                temperature=self.ai_service.temperature,
+                system=self._system_prompt(),
+                messages=anthropic_messages,
+                tools=anthropic_tools if anthropic_tools else None,
+            ),
         )
         
         content = ""
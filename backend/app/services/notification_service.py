@@ -9,6 +9,7 @@ from sqlalchemy import select, and_, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.notification import Notification, NotificationType
+from app.core.keyset_pagination import KeysetPage, keyset_paginate
 from app.core.logging import logger
 
 
@@ -69,6 +70,37 @@ class NotificationService:
         notification_type: Optional[NotificationType] = None
     ) -> List[Notification]:
         """Get notifications for a user with optional filters"""
+        query = self._user_notifications_query(user_id, read, notification_type)
+        query = query.order_by(desc(Notification.created_at)).offset(skip).limit(limit)
+        
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def get_user_notifications_page(
+        self,
+        user_id: int,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        read: Optional[bool] = None,
+        notification_type: Optional[NotificationType] = None
+    ) -> KeysetPage:
+        """Get a keyset page of notifications (newest first); pass next_cursor to continue"""
+        query = self._user_notifications_query(user_id, read, notification_type)
+        return await keyset_paginate(
+            self.db,
+            query,
+            [Notification.created_at],
+            Notification.id,
+            limit,
+            cursor=cursor,
+        )
+
+    def _user_notifications_query(
+        self,
+        user_id: int,
+        read: Optional[bool] = None,
+        notification_type: Optional[NotificationType] = None
+    ):
         query = select(Notification).where(Notification.user_id == user_id)
         
         if read is not None:
@@ -77,10 +109,7 @@ class NotificationService:
         if notification_type is not None:
             query = query.where(Notification.notification_type == notification_type.value)
         
-        query = query.order_by(desc(Notification.created_at)).offset(skip).limit(limit)
-        
-        result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return query
 
     async def get_unread_count(self, user_id: int) -> int:
         """Get count of unread notifications for a user"""
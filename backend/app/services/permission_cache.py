@@ -0,0 +1,285 @@
+"""
+Compiled RBAC permission cache
+
+RBACService.has_permission used to run the superadmin role check plus two join
+queries on every call, then scan the resulting set for wildcards. This module
+compiles a user's permissions once into a CompiledPermissions object (frozen set
+for exact names + prefix trie for "resource:*" wildcards) and keeps it:
+- per request, in the AsyncSession info dict (every require_permission /
+  check_permission_dependency call of a request shares the request session);
+- across requests, in process memory and in Redis under "rbac:perms:<user_id>",
+  validated by version stamps:
+  - "global": bumped after commit on writes to roles, permissions and
+    role/permission links (any user may be affected);
+  - "user:<id>": bumped after commit on writes to the user's role assignments
+    or custom permissions.
+"""
+
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheBackend, cache_backend
+from app.core.commit_hooks import CommitHook, pending_items, register_commit_hook, run_in_background
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models.role import Permission, Role, RolePermission, UserPermission, UserRole
+
+SUPERADMIN_PERMISSION = "admin:*"
+WILDCARD = "*"
+# Without Redis, writes from other workers are invisible: short in-process lifetime
+RBAC_LOCAL_ONLY_TTL_SEC = 30
+RBAC_CACHE_MAX_USERS = 4096
+
+_GLOBAL_SCOPE = "global"
+_VERSION_KEY_PREFIX = "rbac:ver:"
+_PERMISSIONS_KEY_PREFIX = "rbac:perms:"
+_HOOK_NAME = "rbac_scopes"
+_REQUEST_INFO_KEY = "rbac_compiled_permissions"
+
+
+def _user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class _TrieNode:
+    __slots__ = ("children", "wildcard")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        self.wildcard = False
+
+
+@dataclass(frozen=True)
+class CompiledPermissions:
+    """Immutable permission set of a user with wildcard matching"""
+
+    names: frozenset[str]
+    grants_all: bool = False
+    _trie: _TrieNode = field(default_factory=_TrieNode, compare=False, repr=False)
+
+    @classmethod
+    def compile(cls, names: Iterable[str]) -> "CompiledPermissions":
+        names = frozenset(names)
+        trie = _TrieNode()
+        for name in names:
+            segments = name.split(":")
+            if len(segments) < 2 or segments[-1] != WILDCARD:
+                continue
+            node = trie
+            for segment in segments[:-1]:
+                node = node.children.setdefault(segment, _TrieNode())
+            node.wildcard = True
+        return cls(names, SUPERADMIN_PERMISSION in names, trie)
+
+    def allows(self, permission: str) -> bool:
+        """
+        Exact name, admin:* (everything) or a wildcard on any prefix of the name
+        ("users:*" grants "users:read", "sales:*" grants "sales:view:orders").
+        """
+        if self.grants_all or permission in self.names:
+            return True
+        node = self._trie
+        for segment in permission.split(":")[:-1]:
+            node = node.children.get(segment)
+            if node is None:
+                return False
+            if node.wildcard:
+                return True
+        return False
+
+    def allows_any(self, permissions: Iterable[str]) -> bool:
+        return any(self.allows(p) for p in permissions)
+
+    def allows_all(self, permissions: Iterable[str]) -> bool:
+        return all(self.allows(p) for p in permissions)
+
+
+@dataclass
+class _Entry:
+    stamp: tuple
+    stored_at: float
+    compiled: CompiledPermissions
+
+
+class PermissionCache:
+    """Compiled permissions per user (memory + Redis), invalidated by version stamps"""
+
+    def __init__(self, backend: CacheBackend = cache_backend, max_users: int = RBAC_CACHE_MAX_USERS):
+        self.backend = backend
+        self.max_users = max_users
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._local_versions: dict[str, int] = {}
+        # Scopes bumped locally whose Redis INCR has not completed yet
+        self._pending_remote: Counter = Counter()
+        self._background_tasks: set[asyncio.Task] = set()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
+    @property
+    def _redis_enabled(self) -> bool:
+        return bool(self.backend.use_redis and self.backend.redis_client)
+
+    def _ttl(self) -> int:
+        if self._redis_enabled:
+            return get_settings().RBAC_PERMISSION_CACHE_TTL_SEC
+        return RBAC_LOCAL_ONLY_TTL_SEC
+
+    async def _current_stamp(self, user_id: int) -> tuple:
+        scopes = (_GLOBAL_SCOPE, _user_scope(user_id))
+        local = tuple(self._local_versions.get(s, 0) for s in scopes)
+        remote: tuple = ()
+        if self._redis_enabled:
+            counters = await self.backend.get_counters(*(_VERSION_KEY_PREFIX + s for s in scopes))
+            remote = tuple(counters) if counters is not None else ()
+        return local + remote
+
+    async def resolve(
+        self,
+        user_id: int,
+        load: Callable[[], Awaitable[Iterable[str]]],
+        share: bool = True,
+    ) -> CompiledPermissions:
+        """
+        Cached compiled permissions of the user, loaded with `load` on a miss.
+        The stamp is read before loading: a write committed meanwhile leaves the
+        stored entry stale-stamped, so it is never served. While a bump of this
+        worker has not reached Redis yet, the Redis copy (stamped with the old
+        counters) is neither read nor written.
+        share=False keeps the result out of the cache (uncommitted RBAC writes in the session).
+        """
+        stamp = await self._current_stamp(user_id)
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry.stamp == stamp and now - entry.stored_at < self._ttl():
+            self._entries.move_to_end(user_id)
+            self.stats["memory_hits"] += 1
+            return entry.compiled
+
+        remote_stamp = list(stamp[2:])
+        if remote_stamp and self._remote_bump_pending(user_id):
+            remote_stamp = []
+        if remote_stamp and share:
+            data = await self.backend.get(_PERMISSIONS_KEY_PREFIX + str(user_id))
+            if isinstance(data, dict) and data.get("stamp") == remote_stamp:
+                compiled = CompiledPermissions.compile(data.get("names") or ())
+                self._remember(user_id, _Entry(stamp, now, compiled))
+                self.stats["redis_hits"] += 1
+                return compiled
+
+        self.stats["misses"] += 1
+        compiled = CompiledPermissions.compile(await load())
+        if not share:
+            return compiled
+        self._remember(user_id, _Entry(stamp, now, compiled))
+        if remote_stamp:
+            await self.backend.set(
+                _PERMISSIONS_KEY_PREFIX + str(user_id),
+                {"stamp": remote_stamp, "names": sorted(compiled.names)},
+                expire=self._ttl(),
+                compress=False,
+            )
+        return compiled
+
+    def _remember(self, user_id: int, entry: _Entry) -> None:
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def _remote_bump_pending(self, user_id: int) -> bool:
+        return bool(self._pending_remote[_GLOBAL_SCOPE] or self._pending_remote[_user_scope(user_id)])
+
+    def bump(self, scopes: set[str]) -> None:
+        """Bump version stamps (in memory now, in Redis as a background task)"""
+        for scope in scopes:
+            self._local_versions[scope] = self._local_versions.get(scope, 0) + 1
+        if not scopes or not self._redis_enabled:
+            return
+        if run_in_background(self._background_tasks, self._bump_remote, scopes) is not None:
+            # Counted before the task runs: resolve() skips the stale Redis copy meanwhile
+            self._pending_remote.update(scopes)
+
+    async def _bump_remote(self, scopes: set[str]) -> None:
+        try:
+            for scope in scopes:
+                await self.backend.incr(_VERSION_KEY_PREFIX + scope)
+        finally:
+            for scope in scopes:
+                self._pending_remote[scope] -= 1
+                if self._pending_remote[scope] <= 0:
+                    del self._pending_remote[scope]
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.bump({_user_scope(user_id)})
+
+    def invalidate_all(self) -> None:
+        self.bump({_GLOBAL_SCOPE})
+
+    def clear(self) -> None:
+        """Drop in-process state (tests)"""
+        self._entries.clear()
+        self._local_versions.clear()
+        self._pending_remote.clear()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
+
+permission_cache = PermissionCache()
+
+
+def request_permissions(session: Any) -> dict[int, CompiledPermissions]:
+    """Per-request memo (user_id -> compiled permissions) attached to the session"""
+    return session.info.setdefault(_REQUEST_INFO_KEY, {})
+
+
+def has_pending_rbac_changes(session: Any) -> bool:
+    """True when the session flushed RBAC writes that are not committed yet"""
+    return bool(pending_items(session, _HOOK_NAME))
+
+
+def _scopes_for_object(obj: Any, is_new: bool) -> set[str]:
+    if isinstance(obj, (UserRole, UserPermission)):
+        user_id = inspect(obj).dict.get("user_id")
+        return {_user_scope(user_id)} if user_id is not None else {_GLOBAL_SCOPE}
+    if isinstance(obj, RolePermission):
+        return {_GLOBAL_SCOPE}
+    if isinstance(obj, (Role, Permission)):
+        # A new role or permission is not granted to anyone yet
+        return set() if is_new else {_GLOBAL_SCOPE}
+    return set()
+
+
+def _collect_rbac_scopes(session: Session, obj: Any, is_new: bool) -> set[str]:
+    return _scopes_for_object(obj, is_new)
+
+
+def _collect_rbac_bulk_changes(orm_execute_state: Any) -> set[str]:
+    if orm_execute_state.bind_mapper is None:
+        return set()
+    if orm_execute_state.bind_mapper.class_ in (Role, Permission, RolePermission, UserRole, UserPermission):
+        return {_GLOBAL_SCOPE}
+    return set()
+
+
+def _drop_request_permissions(session: Session, scopes: Any = None) -> None:
+    session.info.pop(_REQUEST_INFO_KEY, None)
+
+
+def _bump_rbac_versions(session: Session, scopes: set[str]) -> None:
+    logger.debug(f"Bumping RBAC permission versions: {sorted(scopes)}")
+    _drop_request_permissions(session)
+    permission_cache.bump(scopes)
+
+
+register_commit_hook(CommitHook(
+    name=_HOOK_NAME,
+    collect=_collect_rbac_scopes,
+    collect_statement=_collect_rbac_bulk_changes,
+    on_collect=_drop_request_permissions,
+    on_commit=_bump_rbac_versions,
+    on_rollback=_drop_request_permissions,
+))
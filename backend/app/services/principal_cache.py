@@ -0,0 +1,174 @@
+"""
+Authenticated principal cache
+
+get_current_principal resolves the JWT subject to a compact UserPrincipal
+(id, email, names, active flag, active role slugs) stored in the cache backend
+under "auth:principal:<sub>" (in-process L1 + Redis). Endpoints that only need
+the caller's identity skip the users lookup on every request.
+
+Entries are tagged per user (tag index, see CacheBackend.tag_keys) and dropped
+after commit when the user row, its role assignments or its custom permissions
+change; writes to roles themselves flush every principal.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheBackend, cache_backend, register_l1_prefix
+from app.core.commit_hooks import CommitHook, register_commit_hook, run_in_background
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models import User
+from app.models.role import Role, UserPermission, UserRole
+
+PRINCIPAL_KEY_PREFIX = "auth:principal:"
+_ALL = "*"
+
+# Short in-process copy; cross-worker invalidation goes through the L1 pub/sub channel
+register_l1_prefix(PRINCIPAL_KEY_PREFIX, ttl=30, shared=True)
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Compact identity of the authenticated user (not attached to a session)"""
+
+    id: int
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    avatar: Optional[str] = None
+    is_active: bool = True
+    client_invitation_id: Optional[int] = None
+    roles: tuple[str, ...] = ()
+
+    def has_role(self, slug: str) -> bool:
+        return slug in self.roles
+
+    @property
+    def is_superadmin(self) -> bool:
+        return "superadmin" in self.roles
+
+
+def principal_tag(user_id: int) -> str:
+    return f"principal:user:{user_id}"
+
+
+class PrincipalCache:
+    """Lookup/store of UserPrincipal by token subject"""
+
+    def __init__(self, backend: CacheBackend = cache_backend):
+        self.backend = backend
+        self._background_tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def key(subject: str) -> str:
+        return PRINCIPAL_KEY_PREFIX + subject
+
+    async def get(self, subject: str) -> Optional[UserPrincipal]:
+        data = await self.backend.get(self.key(subject))
+        if not isinstance(data, dict):
+            return None
+        try:
+            return UserPrincipal(**{**data, "roles": tuple(data.get("roles") or ())})
+        except TypeError:
+            # Entry written by a different principal layout
+            return None
+
+    async def store(self, subject: str, principal: UserPrincipal) -> None:
+        ttl = get_settings().AUTH_PRINCIPAL_CACHE_TTL_SEC
+        key = self.key(subject)
+        data = asdict(principal)
+        data["roles"] = list(principal.roles)
+        if await self.backend.set(key, data, expire=ttl, compress=False):
+            await self.backend.tag_keys(key, [principal_tag(principal.id)], ttl)
+
+    async def load(self, db: AsyncSession, subject: str) -> Optional[UserPrincipal]:
+        """Build the principal from the database (cache miss path)"""
+        result = await db.execute(select(User).where(User.email == subject))
+        user = result.scalar_one_or_none()
+        if user is None:
+            return None
+        roles = await db.execute(
+            select(Role.slug)
+            .join(UserRole, UserRole.role_id == Role.id)
+            .where(UserRole.user_id == user.id, Role.is_active == True)  # noqa: E712
+            .order_by(Role.slug)
+        )
+        return UserPrincipal(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            avatar=user.avatar,
+            is_active=bool(user.is_active),
+            client_invitation_id=user.client_invitation_id,
+            roles=tuple(roles.scalars().all()),
+        )
+
+    async def resolve(self, db: AsyncSession, subject: str) -> Optional[UserPrincipal]:
+        """Cached principal, loaded from the database on a miss"""
+        principal = await self.get(subject)
+        if principal is not None:
+            return principal
+        principal = await self.load(db, subject)
+        if principal is not None:
+            await self.store(subject, principal)
+        return principal
+
+    async def invalidate(self, user_ids: set[Any]) -> None:
+        if _ALL in user_ids:
+            await self.backend.clear_pattern(PRINCIPAL_KEY_PREFIX + "*")
+            return
+        await self.backend.invalidate_tags(sorted(principal_tag(uid) for uid in user_ids))
+
+    def invalidate_later(self, user_ids: set[Any]) -> None:
+        """Schedule invalidation from synchronous Session events"""
+        if user_ids and self.backend.use_redis:
+            run_in_background(self._background_tasks, self.invalidate, user_ids)
+
+principal_cache = PrincipalCache()
+
+
+def _user_ids_for_object(obj: Any) -> set[Any]:
+    if isinstance(obj, User):
+        user_id = inspect(obj).dict.get("id")
+        return {user_id} if user_id is not None else set()
+    if isinstance(obj, (UserRole, UserPermission)):
+        user_id = inspect(obj).dict.get("user_id")
+        return {user_id} if user_id is not None else {_ALL}
+    if isinstance(obj, Role):
+        return {_ALL}
+    return set()
+
+
+def _collect_principal_changes(session: Session, obj: Any, is_new: bool) -> set[Any]:
+    # New users and roles have no cached principal depending on them yet
+    if is_new and isinstance(obj, (User, Role)):
+        return set()
+    return _user_ids_for_object(obj)
+
+
+def _collect_principal_bulk_changes(orm_execute_state: Any) -> set[Any]:
+    if orm_execute_state.bind_mapper is None:
+        return set()
+    if orm_execute_state.bind_mapper.class_ in (User, UserRole, UserPermission, Role):
+        return {_ALL}
+    return set()
+
+
+def _invalidate_principals(session: Session, user_ids: set[Any]) -> None:
+    logger.debug(f"Invalidating cached principals: {sorted(map(str, user_ids))}")
+    principal_cache.invalidate_later(user_ids)
+
+
+register_commit_hook(CommitHook(
+    name="principals",
+    collect=_collect_principal_changes,
+    collect_statement=_collect_principal_bulk_changes,
+    on_commit=_invalidate_principals,
+))
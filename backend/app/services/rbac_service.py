@@ -9,6 +9,13 @@ from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
 from app.models import User, Role, Permission, RolePermission, UserRole, UserPermission, TeamMember
+from app.services.permission_cache import (
+    SUPERADMIN_PERMISSION,
+    CompiledPermissions,
+    has_pending_rbac_changes,
+    permission_cache,
+    request_permissions,
+)
 
 
 class RBACService:
@@ -27,9 +34,27 @@ class RBACService:
         )
         return list(result.scalars().all())
 
-    async def get_user_permissions(self, user_id: int) -> Set[str]:
+    async def get_compiled_permissions(self, user_id: int) -> CompiledPermissions:
+        """
+        Get the compiled permission set of a user.
+
+        Memoised on the session for the rest of the request and cached across
+        requests (see app.services.permission_cache).
         """
-        Get all permissions for a user (from roles + custom permissions).
+        memo = request_permissions(self.db)
+        compiled = memo.get(user_id)
+        if compiled is None:
+            compiled = await permission_cache.resolve(
+                user_id,
+                lambda: self._load_user_permissions(user_id),
+                share=not has_pending_rbac_changes(self.db),
+            )
+            memo[user_id] = compiled
+        return compiled
+
+    async def _load_user_permissions(self, user_id: int) -> Set[str]:
+        """
+        Load all permissions for a user (from roles + custom permissions).
         
         Custom permissions override role-based permissions.
         Superadmin role grants admin:* permission (all permissions).
@@ -37,7 +62,7 @@ class RBACService:
         # Check if user has superadmin role (has all permissions)
         has_superadmin = await self.has_role(user_id, "superadmin")
         if has_superadmin:
-            return {"admin:*"}
+            return {SUPERADMIN_PERMISSION}
         
         # Get permissions from roles
         role_permissions_result = await self.db.execute(
@@ -63,6 +88,10 @@ class RBACService:
         
         return permissions
 
+    async def get_user_permissions(self, user_id: int) -> Set[str]:
+        """Get all permissions for a user (from roles + custom permissions)"""
+        return set((await self.get_compiled_permissions(user_id)).names)
+
     async def has_permission(self, user_id: int, permission_name: str) -> bool:
         """
         Check if user has a specific permission.
@@ -71,39 +100,15 @@ class RBACService:
         - admin:* grants all permissions
         - resource:* grants all permissions for that resource
         """
-        permissions = await self.get_user_permissions(user_id)
-        
-        # Check for exact match
-        if permission_name in permissions:
-            return True
-        
-        # Check for wildcard permissions
-        if "admin:*" in permissions:
-            # admin:* grants all permissions
-            return True
-        
-        # Check for resource-level wildcards (e.g., "users:*" grants "users:read", "users:create", etc.)
-        if ":" in permission_name:
-            resource, action = permission_name.split(":", 1)
-            resource_wildcard = f"{resource}:*"
-            if resource_wildcard in permissions:
-                return True
-        
-        return False
+        return (await self.get_compiled_permissions(user_id)).allows(permission_name)
 
     async def has_any_permission(self, user_id: int, permission_names: List[str]) -> bool:
         """Check if user has any of the specified permissions"""
-        for permission_name in permission_names:
-            if await self.has_permission(user_id, permission_name):
-                return True
-        return False
+        return (await self.get_compiled_permissions(user_id)).allows_any(permission_names)
 
     async def has_all_permissions(self, user_id: int, permission_names: List[str]) -> bool:
         """Check if user has all of the specified permissions"""
-        for permission_name in permission_names:
-            if not await self.has_permission(user_id, permission_name):
-                return False
-        return True
+        return (await self.get_compiled_permissions(user_id)).allows_all(permission_names)
 
     async def has_role(self, user_id: int, role_slug: str) -> bool:
         """Check if user has a specific role"""
@@ -0,0 +1,51 @@
+"""
+Index Advisor Script
+Recommends missing composite / partial indexes from pg_stat_statements,
+reports unused indexes and optionally writes the Alembic migration.
+
+Usage:
+    python scripts/index_advisor.py [--min-calls 20] [--limit 20] [--write]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal
+from app.core.index_advisor import find_unused_indexes, recommend_indexes, write_migration
+
+
+async def main(min_calls: int, limit: int, write: bool) -> None:
+    async with AsyncSessionLocal() as session:
+        # A fresh process has no instrumented statements: pg_stat_statements is the workload
+        recommendations = await recommend_indexes(session, min_calls=min_calls, limit=limit)
+        unused = await find_unused_indexes(session)
+
+    print(f"Missing indexes ({len(recommendations)}):")
+    for recommendation in recommendations:
+        print(f"  {recommendation.create_sql()}")
+        print(f"      {recommendation.calls} calls, {recommendation.total_ms:.0f} ms")
+
+    if unused["supported"]:
+        print(f"\nUnused indexes since {unused.get('stats_since')} ({len(unused['indexes'])}):")
+        for index in unused["indexes"]:
+            print(f"  {index['table']}.{index['index']} ({index['size_bytes'] / 1024 / 1024:.1f} MB)")
+    else:
+        print("\nUnused index report requires PostgreSQL")
+
+    if write:
+        path = write_migration(recommendations)
+        print(f"\nMigration written: {path}" if path else "\nNothing to migrate")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recommend indexes from the observed query workload")
+    parser.add_argument("--min-calls", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--write", action="store_true", help="Write the Alembic migration to alembic/versions")
+    args = parser.parse_args()
+    asyncio.run(main(args.min_calls, args.limit, args.write))
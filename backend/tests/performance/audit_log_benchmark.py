@@ -0,0 +1,108 @@
+"""
+Latency benchmark of security audit logging (app.core.security_audit):
+per-event commits in the request (previous behaviour, still used for critical
+events) against the queue + batched background writer.
+
+Measured on a file-backed SQLite database so every commit pays a real fsync:
+- per_call_ms: time a request spends in SecurityAuditLogger.log_event;
+- total_sec: time until every event is stored (drain included for the writer).
+
+Usage:
+    python -m tests.performance.audit_log_benchmark --events 2000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import security_audit
+from app.core.security_audit import AuditLogWriter, SecurityAuditLog, SecurityAuditLogger, SecurityEventType
+
+
+async def _log(session, i: int, acknowledge: bool) -> None:
+    await SecurityAuditLogger.log_event(
+        db=session,
+        event_type=SecurityEventType.DATA_ACCESSED,
+        description=f"Listed pages ({i})",
+        user_id=i % 50,
+        ip_address="127.0.0.1",
+        request_method="GET",
+        request_path="/api/v1/pages",
+        severity="info",
+        success="success",
+        metadata={"resource_type": "pages", "count": i},
+        acknowledge=acknowledge,
+    )
+
+
+async def _run_mode(factory, events: int, acknowledge: bool, spill_path: str) -> dict:
+    writer = AuditLogWriter(factory, spill_path=spill_path)
+    previous_writer = security_audit.audit_log_writer
+    security_audit.audit_log_writer = writer
+    try:
+        await writer.start()
+        started = time.perf_counter()
+        async with factory() as session:
+            for i in range(events):
+                await _log(session, i, acknowledge)
+        in_requests = time.perf_counter() - started
+        await writer.close()
+        total = time.perf_counter() - started
+    finally:
+        security_audit.audit_log_writer = previous_writer
+    return {
+        "per_call_ms": in_requests / events * 1000,
+        "total_sec": total,
+        "batches": writer.stats["batches"],
+    }
+
+
+async def run_audit_log_benchmark(events: int = 1_000) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'audit.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SecurityAuditLog.__table__.create)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        spill_path = os.path.join(tmp, "spill.jsonl")
+
+        synchronous = await _run_mode(factory, events, True, spill_path)
+        queued = await _run_mode(factory, events, False, spill_path)
+
+        async with factory() as session:
+            stored = await session.scalar(select(func.count()).select_from(SecurityAuditLog))
+        await engine.dispose()
+
+    return {
+        "events": events,
+        "stored": stored,
+        "synchronous": synchronous,
+        "queued": queued,
+        "spilled": os.path.exists(spill_path),
+    }
+
+
+def format_report(report: dict) -> str:
+    sync, queued = report["synchronous"], report["queued"]
+    return "\n".join([
+        f"Security audit logging ({report['events']} events per mode)",
+        f"  in-request latency / event: commit {sync['per_call_ms']:.3f} ms   queued {queued['per_call_ms']:.3f} ms"
+        f"  (x{sync['per_call_ms'] / queued['per_call_ms']:.1f})",
+        f"  all events stored after   : commit {sync['total_sec']:.2f} s   queued {queued['total_sec']:.2f} s"
+        f"  ({queued['batches']} batches)",
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2_000)
+    args = parser.parse_args()
+    print(format_report(asyncio.run(run_audit_log_benchmark(args.events))))
+
+
+if __name__ == "__main__":
+    main()
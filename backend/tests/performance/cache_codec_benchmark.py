@@ -0,0 +1,216 @@
+"""
+Banc d'essai des codecs du cache (app.core.cache_codecs).
+
+Compare, pour des charges utiles représentatives des réponses mises en cache (liste de
+contacts, tableau de bord ERP, transactions immobilières, thème, fiches contact unitaires),
+la taille stockée et le débit d'encodage / décodage de chaque combinaison
+sérialiseur × compresseur disponible, plus le format historique (msgpack default=str + « zlib: »).
+zstd avec dictionnaire est mesuré si zstandard est installé (dictionnaire entraîné sur les
+fiches unitaires).
+
+Usage :
+    python -m tests.performance.cache_codec_benchmark --iterations 50 --json report.json
+    python -m tests.performance.cache_codec_benchmark --payload-file captured.json
+"""
+
+import argparse
+import json
+import random
+import time
+import uuid
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable
+
+import msgpack
+
+from app.core import cache_codecs
+from app.core.cache_codecs import decode, decompress, encode
+
+_CITIES = ["Montréal", "Québec", "Laval", "Gatineau", "Longueuil", "Sherbrooke", "Lévis"]
+_FIRST = ["Jean", "Marie", "Luc", "Sophie", "Émilie", "Marc", "Julie", "Pierre"]
+_LAST = ["Tremblay", "Gagnon", "Roy", "Côté", "Bouchard", "Gauthier", "Morin", "Lavoie"]
+
+
+def _contact(rng: random.Random, i: int) -> dict:
+    first, last = rng.choice(_FIRST), rng.choice(_LAST)
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=rng.randint(0, 500_000))
+    return {
+        "id": i,
+        "first_name": first,
+        "last_name": last,
+        "photo_url": f"https://spaces.example.com/contacts/photos/{uuid.UUID(int=rng.getrandbits(128))}.jpg",
+        "company_id": rng.randint(1, 80),
+        "company_name": f"{rng.choice(_LAST)} Immobilier inc.",
+        "circle": rng.choice(["client", "prospect", "partenaire", None]),
+        "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+        "phone": f"514-555-{rng.randint(1000, 9999)}",
+        "city": rng.choice(_CITIES),
+        "country": "Canada",
+        "birthday": None,
+        "language": rng.choice(["fr", "en"]),
+        "employee_id": rng.randint(1, 30),
+        "employee_name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+        "created_at": created,
+        "updated_at": created + timedelta(days=rng.randint(0, 90)),
+    }
+
+
+def _transaction(rng: random.Random, i: int) -> dict:
+    return {
+        "id": i,
+        "dossier_number": f"TX-2026-{i:05d}",
+        "status": rng.choice(["En cours", "Conditionnelle", "Ferme", "Conclue"]),
+        "property_address": f"{rng.randint(1, 9999)} rue Principale",
+        "property_city": rng.choice(_CITIES),
+        "property_postal_code": "H2X 1Y4",
+        "sellers": [{"name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"}],
+        "buyers": [{"name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"}],
+        "listing_price": Decimal(rng.randint(250, 1500) * 1000),
+        "offered_price": Decimal(rng.randint(250, 1500) * 1000) + Decimal("0.00"),
+        "promise_to_purchase_date": date(2026, 1, 1) + timedelta(days=rng.randint(0, 200)),
+        "closing_date": date(2026, 3, 1) + timedelta(days=rng.randint(0, 200)),
+        "user_id": rng.randint(1, 30),
+        "uuid": uuid.UUID(int=rng.getrandbits(128)),
+    }
+
+
+def build_payloads(seed: int = 7) -> dict[str, list[Any]]:
+    """Charges utiles nommées ; chacune est une liste de valeurs encodées séparément."""
+    rng = random.Random(seed)
+    contacts = [_contact(rng, i) for i in range(100)]
+    dashboard = {
+        "total_revenue": Decimal("1284533.17"),
+        "by_department": {
+            dept: {"count": rng.randint(10, 900), "amount": Decimal(rng.randint(1, 10**6)) / 100}
+            for dept in ("ventes", "location", "commercial", "gestion")
+        },
+        "monthly": [
+            {"month": date(2026, m, 1), "revenue": Decimal(rng.randint(1, 10**7)) / 100, "deals": rng.randint(0, 40)}
+            for m in range(1, 13)
+        ],
+        "generated_at": datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc),
+    }
+    theme = {
+        "id": 1,
+        "name": "ImmoAssist",
+        "config": {f"--color-{i}": f"#{rng.randint(0, 0xFFFFFF):06x}" for i in range(120)},
+        "css": ".btn{padding:8px 12px;border-radius:6px}" * 80,
+    }
+    return {
+        "contacts_list": [contacts],
+        "transactions_list": [[_transaction(rng, i) for i in range(50)]],
+        "erp_dashboard": [dashboard],
+        "theme": [theme],
+        "contact_records": [_contact(rng, 1000 + i) for i in range(300)],
+    }
+
+
+def _legacy_encode(value: Any) -> bytes:
+    # Compression sans seuil, comme les autres combinaisons mesurées (min_size=0)
+    return b"zlib:" + zlib.compress(msgpack.packb(value, default=str, use_bin_type=True))
+
+
+def _legacy_decode(stored: bytes) -> Any:
+    if stored.startswith(b"zlib:"):
+        stored = zlib.decompress(stored[5:])
+    return msgpack.unpackb(stored, raw=False)
+
+
+def available_codecs() -> dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    """Nom -> (encodeur, décodeur) pour chaque combinaison disponible."""
+    codecs: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+        "legacy msgpack+zlib": (_legacy_encode, _legacy_decode),
+    }
+    for serializer in cache_codecs.SERIALIZERS:
+        for compressor in cache_codecs.COMPRESSORS:
+            codecs[f"{serializer}+{compressor}"] = (
+                lambda value, s=serializer, c=compressor: encode(value, s, c, min_size=0)[1],
+                lambda stored: decode(decompress(stored)),
+            )
+    return codecs
+
+
+def _measure(encoder, decoder, values: list[Any], iterations: int) -> dict:
+    stored = [encoder(v) for v in values]
+    raw_size = sum(len(encode(v, "msgpack" if cache_codecs.MSGPACK_AVAILABLE else "json", "none")[0]) for v in values)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for v in values:
+            encoder(v)
+    encode_sec = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for s in stored:
+            decoder(s)
+    decode_sec = time.perf_counter() - started
+    mb = raw_size * iterations / 1_000_000
+    return {
+        "stored_bytes": sum(len(s) for s in stored),
+        "ratio": round(sum(len(s) for s in stored) / raw_size, 4) if raw_size else None,
+        "encode_mb_s": round(mb / encode_sec, 1) if encode_sec else None,
+        "decode_mb_s": round(mb / decode_sec, 1) if decode_sec else None,
+    }
+
+
+def run_codec_benchmark(iterations: int = 20, extra_payloads: dict[str, list[Any]] | None = None) -> dict:
+    payloads = build_payloads()
+    payloads.update(extra_payloads or {})
+    codecs = available_codecs()
+    report: dict[str, Any] = {"iterations": iterations, "payloads": {}}
+    trained_dictionary = None
+    if cache_codecs.ZSTD_AVAILABLE:
+        samples = [encode(v, compressor="none")[0][4:] for v in payloads["contact_records"][:200]]
+        trained_dictionary = cache_codecs.train_zstd_dictionary(samples, dict_size=8 * 1024)
+
+    for name, values in payloads.items():
+        results = {codec: _measure(enc, dec, values, iterations) for codec, (enc, dec) in codecs.items()}
+        if trained_dictionary is not None:
+            previous = cache_codecs._active_zstd_dictionary
+            cache_codecs.register_zstd_dictionary(trained_dictionary)
+            try:
+                results["msgpack+zstd-dict"] = _measure(
+                    lambda v: encode(v, "msgpack", "zstd", min_size=0)[1],
+                    lambda s: decode(decompress(s)),
+                    values,
+                    iterations,
+                )
+            finally:
+                cache_codecs._active_zstd_dictionary = previous
+        report["payloads"][name] = results
+    return report
+
+
+def format_report(report: dict) -> str:
+    """Rapport texte (une ligne par codec et charge utile)."""
+    lines = [f"Codecs du cache ({report['iterations']} itérations)"]
+    for name, results in report["payloads"].items():
+        lines.append(f"\n{name}")
+        for codec, r in sorted(results.items(), key=lambda item: item[1]["stored_bytes"]):
+            lines.append(
+                f"  {codec:<24} {r['stored_bytes']:>9} o  ratio {r['ratio']:<7} "
+                f"enc {r['encode_mb_s']} Mo/s  dec {r['decode_mb_s']} Mo/s"
+            )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Banc d'essai des codecs du cache")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--payload-file", help="JSON {nom: [valeurs]} de réponses réelles capturées")
+    parser.add_argument("--json", dest="json_path", help="Écrit le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+    extra = None
+    if args.payload_file:
+        with open(args.payload_file, encoding="utf-8") as f:
+            extra = json.load(f)
+    report = run_codec_benchmark(args.iterations, extra)
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+Banc d'essai Léa de bout en bout (sans clé OpenAI ni réseau).
+
+Rejoue des scénarios de courtier (création de transaction, remplissage de PA, correction
+d'adresse) contre POST /lea/chat et POST /lea/chat/stream, avec :
+- le fournisseur IA simulé (AI_FAKE_PROVIDER) : réponses déterministes, latence configurable ;
+- un géocodeur local (httpx.MockTransport pour Nominatim / geocoder.ca, geopy désactivé) ;
+- une base SQLite temporaire (toutes les tables du modèle).
+
+Mesures par endpoint : p50/p95 de chaque étape du pipeline de tour (LEA_TURN_PIPELINE),
+temps total, premier octet (TTFB) et premier delta LLM (stream), nombre de requêtes SQL par tour.
+
+Usage :
+    python -m tests.performance.lea_benchmark --iterations 5 --llm-latency-ms 150 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Scénarios : (nom, messages du courtier dans l'ordre)
+LEA_BENCH_SCENARIOS: dict[str, list[str]] = {
+    # Création stricte : type -> adresse (géocodée) -> vendeurs -> acheteurs -> prix
+    "creer_transaction": [
+        "Je veux créer une nouvelle transaction",
+        "C'est une vente",
+        "L'adresse est le 123 rue Principale, Montréal H2X 1Y4",
+        "Les vendeurs sont Jean Tremblay",
+        "L'acheteur est Marie Côté",
+        "Le prix est de 450 000 $",
+    ],
+    # Promesse d'achat sur la transaction créée par le scénario précédent
+    "remplir_pa": [
+        "Je veux faire une promesse d'achat pour cette transaction",
+        "Oui",
+        "Le prix offert est de 435 000 $",
+        "La date d'occupation est le 1er juillet 2026",
+    ],
+    "corriger_adresse": [
+        "Je veux créer une transaction d'achat",
+        "L'adresse est le 88 avenue des Pins, Montréal",
+        "Non, l'adresse est plutôt le 90 avenue des Pins Ouest, Montréal H2W 1R7",
+        "Oui c'est ça",
+    ],
+}
+
+LEA_BENCH_ENDPOINTS = ("/lea/chat", "/lea/chat/stream")
+
+_USER_LINE_RE = re.compile(r"Message utilisateur:\s*(.+)", re.S)
+
+
+def _route_for(message: str) -> dict:
+    """Décision de routage simulée (format Domain-Intent-Entities) selon les mots-clés."""
+    t = message.lower()
+    if "promesse" in t or "offert" in t or "occupation" in t:
+        domain, intent = "purchase_offer", ("create" if "promesse" in t else "fill")
+    elif "transaction" in t or "adresse" in t or "prix" in t or "vendeur" in t:
+        domain, intent = "transaction", ("create" if "transaction" in t else "update")
+    else:
+        domain, intent = "other", "answer"
+    return {"domain": domain, "intent": intent, "entities": [], "signals": {}, "confidence": 0.9}
+
+
+def scripted_llm(messages: list[dict]) -> str:
+    """Réponses du LLM simulé : JSON pour le routeur et les extractions, texte court sinon."""
+    system = ""
+    if messages and messages[0].get("role") == "system":
+        system = str(messages[0].get("content") or "")
+    user = next((str(m.get("content") or "") for m in reversed(messages) if m.get("role") == "user"), "")
+    if system.startswith("Tu es le routeur de Léa"):
+        m = _USER_LINE_RE.search(user)
+        return json.dumps(_route_for(m.group(1) if m else user))
+    if system.startswith("Tu es un classifieur"):
+        return "other"
+    if "JSON" in system:
+        return "{}"
+    return "Très bien, c'est noté. Voulez-vous que je continue avec la prochaine information ?"
+
+
+def geocode_stub(request: httpx.Request) -> httpx.Response:
+    """Géocodeur local : Nominatim (liste de résultats) et geocoder.ca (objet)."""
+    query = request.url.params.get("q") or request.url.params.get("locate") or ""
+    postcode = "H2X 1Y4"
+    if "geocoder" in request.url.host:
+        return httpx.Response(
+            200, json={"latt": "45.5", "longt": "-73.6", "postal": postcode, "city": "Montréal", "prov": "QC"}
+        )
+    number = (re.match(r"\s*(\d+)", query) or [None, "1"])[1]
+    return httpx.Response(
+        200,
+        json=[
+            {
+                "lat": "45.5",
+                "lon": "-73.6",
+                "display_name": f"{query}, Canada",
+                "address": {
+                    "house_number": number,
+                    "road": "rue Principale",
+                    "city": "Montréal",
+                    "state": "Québec",
+                    "postcode": postcode,
+                    "country_code": "ca",
+                },
+            }
+        ],
+    )
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Percentile par rang le plus proche (0 si vide)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[index], 1)
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95), "n": len(values)}
+
+
+class _Patches:
+    """Remplacements d'attributs, restaurés à la fin du banc d'essai."""
+
+    def __init__(self):
+        self._saved: list[tuple[Any, str, Any]] = []
+
+    def set(self, target: Any, name: str, value: Any) -> None:
+        self._saved.append((target, name, getattr(target, name)))
+        setattr(target, name, value)
+
+    def restore(self) -> None:
+        while self._saved:
+            target, name, value = self._saved.pop()
+            setattr(target, name, value)
+
+
+class TurnSample:
+    """Mesures d'un tour."""
+
+    def __init__(self, endpoint: str, scenario: str, status: int):
+        self.endpoint = endpoint
+        self.scenario = scenario
+        self.status = status
+        self.total_ms = 0.0
+        self.ttfb_ms: Optional[float] = None
+        self.first_delta_ms: Optional[float] = None
+        self.sql_statements = 0
+        self.stages_ms: dict[str, float] = {}
+        self.content = ""
+        self.actions: list[str] = []
+        self.error: Optional[str] = None
+
+
+class LeaBenchmark:
+    """Rejoue les scénarios Léa contre l'application ASGI et agrège les mesures."""
+
+    def __init__(
+        self,
+        llm_latency_ms: float = 0,
+        scenarios: Optional[dict[str, list[str]]] = None,
+        endpoints: tuple[str, ...] = LEA_BENCH_ENDPOINTS,
+        responder: Callable[[list[dict]], str] = scripted_llm,
+    ):
+        self.llm_latency_ms = llm_latency_ms
+        self.scenarios = scenarios or LEA_BENCH_SCENARIOS
+        self.endpoints = endpoints
+        self.responder = responder
+        self.samples: list[TurnSample] = []
+        self._patches = _Patches()
+        self._tmpdir: Optional[tempfile.TemporaryDirectory] = None
+        self._engine = None
+        self._sessionmaker = None
+        self._app: Optional[FastAPI] = None
+        self._sql_count = 0
+        self._stage_timings: dict[str, float] = {}
+
+    # --- Mise en place ---
+
+    async def setup(self) -> None:
+        from app.api.v1.endpoints import lea
+        from app.core.config import get_settings
+        from app.core.database import Base
+        from app.core.rate_limit import limiter
+        from app.dependencies import get_lea_user
+        from app.models.user import User
+        from app.services.ai_clients import ai_client_registry
+        from app.services.lea_chat.geocoding import LeaGeocoder
+        import app.database as app_database
+        import app.models  # noqa: F401 — enregistre toutes les tables
+
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="lea-bench-")
+        self._engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(self._tmpdir.name, 'lea.db')}",
+            connect_args={"timeout": 30},
+        )
+        event.listen(self._engine.sync_engine, "before_cursor_execute", self._count_statement)
+        async with self._engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self._sessionmaker = async_sessionmaker(self._engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with self._sessionmaker() as db:
+            user = User(
+                email="courtier.bench@example.com",
+                hashed_password="x",
+                first_name="Courtier",
+                last_name="Bench",
+                is_active=True,
+            )
+            db.add(user)
+            await db.commit()
+            await db.refresh(user)
+        self.user = user
+
+        settings = get_settings()
+        self._patches.set(settings, "AI_FAKE_PROVIDER", True)
+        self._patches.set(settings, "AI_FAKE_LATENCY_MS", int(self.llm_latency_ms))
+        self._patches.set(limiter, "enabled", False)
+        self._patches.set(lea.LEA_TURN_PIPELINE, "_session_factory", self._sessionmaker)
+        self._patches.set(lea.LEA_TURN_PIPELINE, "_read_session_factory", self._sessionmaker)
+        self._patches.set(app_database, "AsyncSessionLocal", self._sessionmaker)
+        self._patches.set(
+            lea,
+            "lea_geocoder",
+            LeaGeocoder(
+                nominatim_rate=0,
+                client_factory=lambda: httpx.AsyncClient(transport=httpx.MockTransport(geocode_stub)),
+            ),
+        )
+        self._patches.set(lea, "_geocode_geopy_sync", lambda *args, **kwargs: None)
+        original_execute = lea.LEA_TURN_PIPELINE.execute
+
+        async def _timed_execute(*args, **kwargs):
+            result = await original_execute(*args, **kwargs)
+            self._stage_timings = dict(result.timings_ms)
+            return result
+
+        self._patches.set(lea.LEA_TURN_PIPELINE, "execute", _timed_execute)
+        lea._invalidate_lea_knowledge_cache()
+
+        pool = ai_client_registry.get("fake")
+        pool.client.latency_ms = self.llm_latency_ms
+        self._patches.set(pool.client, "responder", self.responder)
+
+        app = FastAPI()
+        app.state.limiter = limiter
+        app.include_router(lea.router)
+
+        async def _db():
+            async with self._sessionmaker() as session:
+                yield session
+
+        app.dependency_overrides[app_database.get_db] = _db
+        app.dependency_overrides[get_lea_user] = lambda: self.user
+        self._app = app
+
+    async def teardown(self) -> None:
+        from app.api.v1.endpoints import lea
+        from app.services.lea_chat.router import routing_decision_cache
+        from app.services.lea_chat.user_context_cache import lea_user_context_cache
+
+        self._patches.restore()
+        # Caches mémoire alimentés par la base temporaire
+        lea._invalidate_lea_knowledge_cache()
+        routing_decision_cache.clear()
+        lea_user_context_cache.clear()
+        if self._engine is not None:
+            await self._engine.dispose()
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+
+    def _count_statement(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self._sql_count += 1
+
+    # --- Exécution ---
+
+    async def _post(self, path: str, payload: dict, sample: TurnSample) -> bytes:
+        """Appel ASGI direct : mesure le premier octet et le premier delta au fil de l'eau."""
+        body = json.dumps(payload).encode("utf-8")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("ascii"),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        request_sent = False
+        disconnected = asyncio.Event()
+        chunks: list[bytes] = []
+        start = time.perf_counter()
+
+        async def receive() -> dict:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                sample.status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                if not chunk:
+                    return
+                elapsed = (time.perf_counter() - start) * 1000
+                if sample.ttfb_ms is None:
+                    sample.ttfb_ms = round(elapsed, 1)
+                if sample.first_delta_ms is None and b'"delta"' in chunk:
+                    sample.first_delta_ms = round(elapsed, 1)
+                chunks.append(chunk)
+
+        try:
+            await self._app(scope, receive, send)
+        finally:
+            disconnected.set()
+        sample.total_ms = round((time.perf_counter() - start) * 1000, 1)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _parse_response(endpoint: str, raw: bytes, sample: TurnSample) -> None:
+        """Texte de la réponse de Léa, actions effectuées et erreur éventuelle."""
+        text = raw.decode("utf-8", errors="replace")
+        if not endpoint.endswith("/stream"):
+            try:
+                data = json.loads(text)
+            except ValueError:
+                sample.error = text[:200]
+                return
+            sample.content = data.get("content") or ""
+            sample.actions = list(data.get("actions") or [])
+            sample.error = data.get("detail")
+            return
+        parts = []
+        for line in text.splitlines():
+            if not line.startswith("data: "):
+                continue
+            payload = json.loads(line[6:])
+            if "delta" in payload:
+                parts.append(payload["delta"])
+            if payload.get("actions"):
+                sample.actions = list(payload["actions"])
+            if payload.get("error"):
+                sample.error = payload["error"]
+        sample.content = "".join(parts)
+
+    async def run_turn(
+        self, endpoint: str, scenario: str, session_id: str, message: str, last_assistant: Optional[str]
+    ) -> TurnSample:
+        sample = TurnSample(endpoint, scenario, 0)
+        self._sql_count = 0
+        self._stage_timings = {}
+        payload = {"message": message, "session_id": session_id}
+        if last_assistant:
+            payload["last_assistant_message"] = last_assistant
+        raw = await self._post(endpoint, payload, sample)
+        sample.sql_statements = self._sql_count
+        sample.stages_ms = dict(self._stage_timings)
+        self._parse_response(endpoint, raw, sample)
+        if sample.status != 200 and sample.error is None:
+            sample.error = f"HTTP {sample.status}"
+        self.samples.append(sample)
+        return sample
+
+    async def run(self, iterations: int = 1) -> dict:
+        """Rejoue chaque scénario sur chaque endpoint `iterations` fois ; retourne le rapport."""
+        for _ in range(iterations):
+            for endpoint in self.endpoints:
+                for scenario, messages in self.scenarios.items():
+                    session_id = str(uuid.uuid4())
+                    last_assistant = None
+                    for message in messages:
+                        sample = await self.run_turn(endpoint, scenario, session_id, message, last_assistant)
+                        last_assistant = sample.content or last_assistant
+        return self.report()
+
+    # --- Rapport ---
+
+    def report(self) -> dict:
+        report: dict[str, Any] = {"llm_latency_ms": self.llm_latency_ms, "endpoints": {}}
+        for endpoint in self.endpoints:
+            samples = [s for s in self.samples if s.endpoint == endpoint]
+            stage_names = sorted({name for s in samples for name in s.stages_ms})
+            sql = [s.sql_statements for s in samples]
+            report["endpoints"][endpoint] = {
+                "turns": len(samples),
+                "turns_with_actions": sum(1 for s in samples if s.actions),
+                "errors": [f"{s.scenario}: {s.error}" for s in samples if s.error],
+                "total_ms": _summary([s.total_ms for s in samples]),
+                "ttfb_ms": _summary([s.ttfb_ms for s in samples if s.ttfb_ms is not None]),
+                "first_delta_ms": _summary([s.first_delta_ms for s in samples if s.first_delta_ms is not None]),
+                "stages_ms": {
+                    name: _summary([s.stages_ms[name] for s in samples if name in s.stages_ms])
+                    for name in stage_names
+                },
+                "sql_per_turn": {
+                    "p50": percentile(sql, 50),
+                    "p95": percentile(sql, 95),
+                    "max": max(sql) if sql else 0,
+                },
+            }
+        return report
+
+
+def format_report(report: dict) -> str:
+    """Rapport texte (une ligne par mesure)."""
+    lines = [f"Léa benchmark (LLM simulé : {report['llm_latency_ms']} ms)"]
+    for endpoint, data in report["endpoints"].items():
+        lines.append(
+            f"\n{endpoint} — {data['turns']} tours ({data['turns_with_actions']} avec actions), "
+            f"{len(data['errors'])} erreur(s)"
+        )
+        rows = [("total", data["total_ms"]), ("ttfb", data["ttfb_ms"])]
+        if data["first_delta_ms"]["n"]:
+            rows.append(("premier delta", data["first_delta_ms"]))
+        rows += [(f"étape {name}", summary) for name, summary in data["stages_ms"].items()]
+        for label, summary in rows:
+            lines.append(f"  {label:<24} p50 {summary['p50']:>8.1f} ms   p95 {summary['p95']:>8.1f} ms")
+        sql = data["sql_per_turn"]
+        lines.append(f"  {'requêtes SQL / tour':<24} p50 {sql['p50']:>8.0f}      p95 {sql['p95']:>8.0f}      max {sql['max']}")
+        for error in data["errors"][:5]:
+            lines.append(f"  ! {error}")
+    return "\n".join(lines)
+
+
+async def run_lea_benchmark(iterations: int = 1, llm_latency_ms: float = 0) -> dict:
+    bench = LeaBenchmark(llm_latency_ms=llm_latency_ms)
+    await bench.setup()
+    try:
+        return await bench.run(iterations)
+    finally:
+        await bench.teardown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Banc d'essai Léa de bout en bout (LLM simulé)")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--llm-latency-ms", type=float, default=150)
+    parser.add_argument("--json", dest="json_path", help="Écrit le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+    report = asyncio.run(run_lea_benchmark(args.iterations, args.llm_latency_ms))
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
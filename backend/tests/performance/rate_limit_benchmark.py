@@ -0,0 +1,176 @@
+"""
+Throughput benchmark of the rate limiter (app.core.rate_limit) against the
+previous stack: two slowapi Limiters (endpoint limit + user throttle), each
+checking its limit separately.
+
+Two levels are measured, both with in-memory storage unless --redis-url is given:
+- limiter: the limit checks alone (2 limits per request);
+- http: requests per second through a FastAPI app (httpx ASGI transport),
+  authenticated with a bearer token carrying a "tier" claim.
+
+Usage:
+    python -m tests.performance.rate_limit_benchmark --requests 5000
+    python -m tests.performance.rate_limit_benchmark --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from jose import jwt
+from limits import parse as parse_limits
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded as SlowapiRateLimitExceeded
+
+from app.core.config import settings
+from app.core.rate_limit import RateLimitCheck, RateLimiter, parse_rate_limit, setup_rate_limiting
+
+ENDPOINT_LIMIT = "100000/minute"
+USER_LIMIT = "100000/hour"
+
+
+def _bearer() -> dict:
+    claims = {
+        "sub": "bench@example.com",
+        "type": "access",
+        "tier": "enterprise",
+        "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+    }
+    return {"Authorization": f"Bearer {jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)}"}
+
+
+def _redis_client(redis_url: Optional[str]):
+    if not redis_url:
+        return None
+    import redis.asyncio as redis
+
+    return redis.from_url(redis_url)
+
+
+def build_slowapi_app(storage_uri: str) -> FastAPI:
+    """The previous setup: rate_limit.limiter + user_throttle.user_throttler"""
+
+    def user_key(request: Request) -> str:
+        return f"user:{request.headers.get('authorization', '')[-16:]}"
+
+    def user_throttle_key(request: Request) -> str:
+        return f"user_throttle:{request.headers.get('authorization', '')[-16:]}"
+
+    limiter = Limiter(key_func=user_key, storage_uri=storage_uri, headers_enabled=True)
+    user_throttler = Limiter(key_func=user_throttle_key, storage_uri=storage_uri)
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(SlowapiRateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/items")
+    @limiter.limit(ENDPOINT_LIMIT)
+    @user_throttler.limit(USER_LIMIT)
+    async def items(request: Request, response: Response):
+        return {"ok": True}
+
+    return app
+
+
+def build_limiter_app(rate_limiter: RateLimiter) -> FastAPI:
+    app = FastAPI()
+    setup_rate_limiting(app, rate_limiter)
+
+    @app.get("/items")
+    @rate_limiter.limit(ENDPOINT_LIMIT)
+    async def items():
+        return {"ok": True}
+
+    return app
+
+
+async def _http_throughput(app: FastAPI, requests: int) -> float:
+    headers = _bearer()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/items", headers=headers)
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/items", headers=headers)
+            assert response.status_code == 200, response.status_code
+        return requests / (time.perf_counter() - started)
+
+
+async def _limiter_throughput(check, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await check()
+    return iterations / (time.perf_counter() - started)
+
+
+async def run_rate_limit_benchmark(requests: int = 2_000, iterations: int = 20_000, redis_url: Optional[str] = None) -> dict:
+    storage_uri = redis_url or "memory://"
+
+    slowapi_storage = storage_from_string(storage_uri)
+    fixed_window = FixedWindowRateLimiter(slowapi_storage)
+    endpoint_item, user_item = parse_limits(ENDPOINT_LIMIT), parse_limits(USER_LIMIT)
+
+    async def slowapi_checks():
+        # One storage call per limit and per Limiter, as the two slowapi instances did
+        fixed_window.hit(endpoint_item, "bench", "items")
+        fixed_window.hit(user_item, "bench")
+
+    rate_limiter = RateLimiter(redis_client=_redis_client(redis_url), global_limits=True)
+    checks = [
+        RateLimitCheck("rl:bench:ep", parse_rate_limit(ENDPOINT_LIMIT), "endpoint"),
+        RateLimitCheck("rl:bench:user", parse_rate_limit(USER_LIMIT), "user"),
+    ]
+
+    async def limiter_checks():
+        await rate_limiter.hit(checks)
+
+    limiter_results = {
+        "slowapi": await _limiter_throughput(slowapi_checks, iterations),
+        "gcra": await _limiter_throughput(limiter_checks, iterations),
+    }
+
+    http_limiter = RateLimiter(redis_client=_redis_client(redis_url), global_limits=True)
+    http_results = {
+        "slowapi": await _http_throughput(build_slowapi_app(storage_uri), requests),
+        "gcra": await _http_throughput(build_limiter_app(http_limiter), requests),
+    }
+    return {
+        "backend": "redis" if redis_url else "memory",
+        "requests": requests,
+        "iterations": iterations,
+        "limiter_per_sec": limiter_results,
+        "http_per_sec": http_results,
+        "round_trips_per_request": {"slowapi": 2, "gcra": 1},
+        "redis_calls": http_limiter.stats["redis"],
+    }
+
+
+def format_report(report: dict) -> str:
+    limiter, http = report["limiter_per_sec"], report["http_per_sec"]
+    return "\n".join([
+        f"Rate limiter throughput ({report['backend']} storage, 2 limits per request)",
+        f"  limit checks / s : slowapi {limiter['slowapi']:10.0f}   gcra {limiter['gcra']:10.0f}"
+        f"  (x{limiter['gcra'] / limiter['slowapi']:.2f})",
+        f"  http requests / s: slowapi {http['slowapi']:10.0f}   gcra {http['gcra']:10.0f}"
+        f"  (x{http['gcra'] / http['slowapi']:.2f})",
+        f"  storage round-trips per request: slowapi {report['round_trips_per_request']['slowapi']}, gcra 1",
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+    print(format_report(asyncio.run(run_rate_limit_benchmark(args.requests, args.iterations, args.redis_url))))
+
+
+if __name__ == "__main__":
+    main()
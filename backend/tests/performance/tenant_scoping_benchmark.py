@@ -0,0 +1,165 @@
+"""
+Benchmark of automatic tenant scoping (app.core.tenant_scoping).
+
+Runs the same tenant listing query two ways against an in-memory SQLite database:
+- manual: .where(Listing.team_id == tenant) written by hand, no tenant in context
+  (how endpoints filtered before the do_orm_execute hook);
+- auto: no filter in the query, the tenant set in context and the hook adding the criteria.
+
+Reports the median latency of both, checks they return the same rows, and shows
+the query plan of the automatically scoped statement (the composite
+(team_id, created_at) index must be used).
+
+Usage:
+    python -m tests.performance.tenant_scoping_benchmark --rows 20000 --iterations 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.mixins import TenantMixin
+from app.core.tenancy import TenancyConfig, clear_current_tenant, set_current_tenant
+from app.core.tenant_scoping import tenant_models
+
+TEAMS = 20
+PAGE_SIZE = 20
+COMPOSITE_INDEX = "idx_bench_listings_team_created"
+
+
+def build_models():
+    """Declare a Team and a TenantMixin model as in shared_db mode"""
+    previous = os.environ.get("TENANCY_MODE")
+    os.environ["TENANCY_MODE"] = "shared_db"
+    TenancyConfig.reset()
+    try:
+        Base = declarative_base()
+
+        class Team(Base):
+            __tablename__ = "teams"
+            id = Column(Integer, primary_key=True)
+            name = Column(String(100), nullable=False)
+
+        class Listing(TenantMixin, Base):
+            __tablename__ = "bench_listings"
+            __table_args__ = (Index(COMPOSITE_INDEX, "team_id", "created_at"),)
+            id = Column(Integer, primary_key=True)
+            title = Column(String(200), nullable=False)
+            created_at = Column(DateTime, nullable=False)
+
+        return Base, Team, Listing
+    finally:
+        if previous is None:
+            os.environ.pop("TENANCY_MODE", None)
+        else:
+            os.environ["TENANCY_MODE"] = previous
+        TenancyConfig.reset()
+
+
+async def _seed(factory, Team, Listing, rows: int) -> None:
+    base = datetime(2026, 1, 1)
+    async with factory() as session:
+        session.add_all(Team(id=t, name=f"team {t}") for t in range(1, TEAMS + 1))
+        session.add_all(
+            Listing(id=i, team_id=i % TEAMS + 1, title=f"listing {i}", created_at=base + timedelta(minutes=i))
+            for i in range(1, rows + 1)
+        )
+        await session.commit()
+
+
+async def _run(session, statement, tenant_id) -> tuple[list[int], float]:
+    set_current_tenant(tenant_id)
+    started = time.perf_counter()
+    ids = [row.id for row in (await session.execute(statement)).scalars()]
+    return ids, (time.perf_counter() - started) * 1_000_000
+
+
+async def _timed(session, manual, auto, tenant_id: int, iterations: int) -> dict:
+    """Alternate both variants so warm-up and cache effects hit them equally"""
+    timings = {"manual": [], "auto": []}
+    ids = {}
+    for _ in range(iterations):
+        ids["manual"], elapsed = await _run(session, manual, None)
+        timings["manual"].append(elapsed)
+        ids["auto"], elapsed = await _run(session, auto, tenant_id)
+        timings["auto"].append(elapsed)
+    clear_current_tenant()
+    return {"ids": ids, **{name: statistics.median(values) for name, values in timings.items()}}
+
+
+async def run_tenant_scoping_benchmark(rows: int = 5_000, iterations: int = 300, tenant_id: int = 7) -> dict:
+    Base, Team, Listing = build_models()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM bench_listings" in statement:
+            statements.append((statement, parameters))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.exec_driver_sql("ANALYZE")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await _seed(factory, Team, Listing, rows)
+    assert Listing in tenant_models()
+
+    page = select(Listing).order_by(Listing.created_at.desc()).limit(PAGE_SIZE)
+    previous = os.environ.get("TENANCY_MODE")
+    os.environ["TENANCY_MODE"] = "shared_db"
+    TenancyConfig.reset()
+    try:
+        async with factory() as session:
+            timed = await _timed(session, page.where(Listing.team_id == tenant_id), page, tenant_id, iterations)
+            scoped_sql, params = statements[-1]
+            conn = await session.connection()
+            plan_rows = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + scoped_sql, params)).all()
+    finally:
+        if previous is None:
+            os.environ.pop("TENANCY_MODE", None)
+        else:
+            os.environ["TENANCY_MODE"] = previous
+        TenancyConfig.reset()
+        await engine.dispose()
+
+    return {
+        "rows": rows,
+        "iterations": iterations,
+        "manual_us": timed["manual"],
+        "auto_us": timed["auto"],
+        "overhead_ratio": timed["auto"] / timed["manual"],
+        "same_rows": timed["ids"]["manual"] == timed["ids"]["auto"],
+        "returned": len(timed["ids"]["auto"]),
+        "scoped_sql": scoped_sql,
+        "plan": [row[-1] for row in plan_rows],
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Tenant listing ({report['rows']} rows, {report['iterations']} iterations, median per query)",
+        f"  manual filter : {report['manual_us']:8.1f} us",
+        f"  auto scoping  : {report['auto_us']:8.1f} us  (x{report['overhead_ratio']:.2f})",
+        f"  same rows     : {report['same_rows']} ({report['returned']} returned)",
+        "  plan          : " + " | ".join(report["plan"]),
+    ]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    args = parser.parse_args()
+    print(format_report(asyncio.run(run_tenant_scoping_benchmark(args.rows, args.iterations))))
+
+
+if __name__ == "__main__":
+    main()
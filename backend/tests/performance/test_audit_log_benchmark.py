@@ -0,0 +1,26 @@
+"""
+Performance Tests for the batched security audit writer
+"""
+
+import logging
+
+import pytest
+
+from tests.performance.audit_log_benchmark import format_report, run_audit_log_benchmark
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+class TestAuditLogBenchmark:
+    """Compare per-event audit commits with the queued batch writer"""
+
+    @pytest.mark.asyncio
+    async def test_queued_events_leave_the_request_path(self):
+        report = await run_audit_log_benchmark(events=300)
+        logger.info(format_report(report))
+        assert report["stored"] == 600
+        assert not report["spilled"]
+        # Requests no longer wait for a commit per event
+        assert report["queued"]["per_call_ms"] * 3 < report["synchronous"]["per_call_ms"]
+        assert report["queued"]["total_sec"] < report["synchronous"]["total_sec"]
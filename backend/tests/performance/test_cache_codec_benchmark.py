@@ -0,0 +1,30 @@
+"""
+Performance Tests for cache value codecs
+"""
+
+import logging
+
+import pytest
+
+from app.core.cache_codecs import decode, decompress, encode
+from tests.performance.cache_codec_benchmark import build_payloads, format_report, run_codec_benchmark
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+class TestCacheCodecBenchmark:
+    """Compare stored size and throughput across codecs"""
+
+    def test_payloads_round_trip_with_types(self):
+        for values in build_payloads().values():
+            for value in values:
+                assert decode(decompress(encode(value)[1])) == value
+
+    def test_compression_beats_raw_and_legacy_keeps_pace(self):
+        report = run_codec_benchmark(iterations=2)
+        logger.info(format_report(report))
+        for name, results in report["payloads"].items():
+            assert results["msgpack+zlib"]["ratio"] < 1, name
+            # Typed ext values must not cost more than ~10% over the legacy string fallback
+            assert results["msgpack+zlib"]["stored_bytes"] <= results["legacy msgpack+zlib"]["stored_bytes"] * 1.1, name
@@ -0,0 +1,104 @@
+"""
+Performance Tests for Léa message extraction
+"""
+
+import time
+
+import pytest
+
+from app.services.lea_chat.extraction import (
+    LEA_KNOWN_OACIQ_CODES,
+    LEA_OACIQ_KEYWORD_TO_CODE,
+    OACIQ_AUTOMATON,
+    extract_message_entities,
+    extract_oaciq_form_code,
+)
+
+# Messages représentatifs de courtiers (dictée vocale comprise)
+BROKER_MESSAGES = [
+    "Bonjour Léa, je veux créer une promesse d'achat pour la transaction #42",
+    "Peux-tu remplir le formulaire PA pour le 123 rue Principale à Laval H7N 2B3 ?",
+    "Le prix offert est de 450 000 $ et la clôture est prévue le 15 mars 2026",
+    "as-tu reçu la contre-proposition des acheteurs pour le dossier 17 ?",
+    "l'adresse du bien est le 4500 boulevard Saint-Laurent à Montréal vocal terminé",
+    "Ajoute une annexe financement et une annexe expertise à la promesse",
+    "Il faut lever les conditions avant le 01/07/2026 pour la transaction numéro 8",
+    "Les déclarations du vendeur sont signées, on passe au contrat de courtage",
+    "Quel est le statut de mes transactions en cours ?",
+    "Change le prix pour 525 mille piles",
+    "vérification identité du vendeur Jean Tremblay, code postal G1R 4P5",
+    "Crée le formulaire DRCOP pour le syndicat copropriété du 88 avenue des Pins",
+]
+
+
+def _legacy_extract_oaciq_form_code(message):
+    """Implémentation historique (boucle par code puis par groupe de mots-clés), pour comparaison."""
+    t = message.strip().lower()
+    for code in sorted(LEA_KNOWN_OACIQ_CODES, key=lambda c: (-len(c), c)):
+        code_lower = code.lower()
+        if code_lower in t:
+            idx = t.find(code_lower)
+            before_ok = idx == 0 or t[idx - 1] in " \t\n\r,;.?!»\"'(-"
+            after_ok = idx + len(code_lower) >= len(t) or t[idx + len(code_lower)] in " \t\n\r,;.?!«\"')-"
+            if not (before_ok and after_ok):
+                continue
+            rest = t[idx:]
+            if code == "D" and rest.startswith(("d'achat", "d’achat", "d'achar")):
+                continue
+            if code == "AS" and rest.startswith(("as-t-on", "as-tu", "as-t-il", "as-t-elle", "as-t-ils", "as-t-elles")):
+                continue
+            return code
+    for keywords, code in LEA_OACIQ_KEYWORD_TO_CODE:
+        if any(kw in t for kw in keywords):
+            return code
+    return None
+
+
+@pytest.mark.performance
+class TestLeaExtractionPerformance:
+    """Test Léa extraction engine performance"""
+
+    def test_engine_matches_legacy(self):
+        """The automaton returns the same form code as the legacy loops"""
+        for message in BROKER_MESSAGES:
+            assert extract_oaciq_form_code(message) == _legacy_extract_oaciq_form_code(message), message
+
+    def test_form_code_extraction_is_single_pass(self, monkeypatch):
+        """The automaton does O(len(message)) transitions, the legacy loops one scan per pattern"""
+
+        class CountingStates(dict):
+            lookups = 0
+
+            def __contains__(self, char):
+                CountingStates.lookups += 1
+                return super().__contains__(char)
+
+            def get(self, char, default=None):
+                CountingStates.lookups += 1
+                return super().get(char, default)
+
+        monkeypatch.setattr(OACIQ_AUTOMATON, "_goto", [CountingStates(state) for state in OACIQ_AUTOMATON._goto])
+        patterns = len(LEA_KNOWN_OACIQ_CODES) + sum(len(keywords) for keywords, _ in LEA_OACIQ_KEYWORD_TO_CODE)
+        for message in BROKER_MESSAGES:
+            CountingStates.lookups = 0
+            code = extract_oaciq_form_code(message)
+            assert code == _legacy_extract_oaciq_form_code(message), message
+            length = len(message.strip())
+            # goto lookup per character + amortized failure transitions (each bounded by the depth gained)
+            assert CountingStates.lookups <= 3 * length, message
+            # The legacy loops scan the whole message once per code or keyword when nothing matches
+            assert CountingStates.lookups < patterns * length, message
+
+    def test_entities_cached_per_turn(self):
+        """Repeated heuristics calls in a turn hit the cache"""
+        extract_message_entities.cache_clear()
+        for message in BROKER_MESSAGES:
+            extract_message_entities(message)
+        start = time.perf_counter()
+        for _ in range(100):
+            for message in BROKER_MESSAGES:
+                extract_message_entities(message)
+        elapsed = time.perf_counter() - start
+        info = extract_message_entities.cache_info()
+        assert info.hits >= 100 * len(BROKER_MESSAGES)
+        assert elapsed < 0.5
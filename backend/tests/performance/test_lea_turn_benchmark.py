@@ -0,0 +1,46 @@
+"""
+Performance Tests for Léa chat turns (end-to-end, simulated LLM)
+"""
+
+import logging
+
+import pytest
+
+from tests.performance.lea_benchmark import LEA_BENCH_ENDPOINTS, LeaBenchmark, format_report
+
+logger = logging.getLogger(__name__)
+
+# Budgets de régression (SQLite locale, LLM simulé)
+MAX_SQL_STATEMENTS_PER_TURN = 40
+MIN_TURNS_WITH_ACTIONS = 8
+SIMULATED_LLM_LATENCY_MS = 20
+
+
+@pytest.mark.performance
+class TestLeaTurnBenchmark:
+    """Drive /lea/chat and /lea/chat/stream through broker scenarios"""
+
+    @pytest.fixture
+    async def report(self):
+        bench = LeaBenchmark(llm_latency_ms=SIMULATED_LLM_LATENCY_MS)
+        await bench.setup()
+        try:
+            report = await bench.run(iterations=1)
+        finally:
+            await bench.teardown()
+        logger.info(format_report(report))
+        return report
+
+    @pytest.mark.asyncio
+    async def test_scenarios_complete_within_budgets(self, report):
+        for endpoint in LEA_BENCH_ENDPOINTS:
+            data = report["endpoints"][endpoint]
+            assert data["errors"] == [], data["errors"]
+            assert data["turns_with_actions"] >= MIN_TURNS_WITH_ACTIONS
+            assert data["sql_per_turn"]["max"] <= MAX_SQL_STATEMENTS_PER_TURN
+            assert {"route", "history", "knowledge", "actions", "user_context"} <= set(data["stages_ms"])
+
+        stream = report["endpoints"]["/lea/chat/stream"]
+        # Premier octet envoyé avant le pipeline de tour, premier delta après l'appel LLM simulé
+        assert stream["ttfb_ms"]["p50"] < stream["first_delta_ms"]["p50"]
+        assert stream["first_delta_ms"]["p50"] >= SIMULATED_LLM_LATENCY_MS
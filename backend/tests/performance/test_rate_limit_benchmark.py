@@ -0,0 +1,25 @@
+"""
+Performance Tests for the rate limiter
+"""
+
+import logging
+
+import pytest
+
+from tests.performance.rate_limit_benchmark import format_report, run_rate_limit_benchmark
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.mark.performance
+class TestRateLimitBenchmark:
+    """Compare the single-call limiter against the two slowapi Limiters"""
+
+    @pytest.mark.asyncio
+    async def test_limiter_keeps_pace_with_slowapi(self):
+        report = await run_rate_limit_benchmark(requests=300, iterations=5_000)
+        logger.info(format_report(report))
+        assert report["round_trips_per_request"]["gcra"] == 1
+        # In memory both stacks are CPU bound: the new limiter must not be slower
+        assert report["limiter_per_sec"]["gcra"] > report["limiter_per_sec"]["slowapi"] * 0.8
+        assert report["http_per_sec"]["gcra"] > report["http_per_sec"]["slowapi"] * 0.8
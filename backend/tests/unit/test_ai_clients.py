@@ -0,0 +1,188 @@
+"""
+Unit tests for the pooled AI provider client registry
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import get_settings
+from app.services import ai_clients
+from app.services.ai_clients import (
+    AIClientRegistry,
+    FakeAIClient,
+    ProviderPool,
+    backoff_delay,
+    get_ai_call_stats,
+    is_retryable,
+    reset_ai_call_stats,
+)
+from app.services.ai_service import AIProvider, AIService
+
+
+class _ClosingClient:
+    def __init__(self):
+        self.closed = threading.Event()
+
+    async def close(self):
+        self.closed.set()
+
+
+def _pool(provider, loop):
+    return ProviderPool(provider, _ClosingClient(), asyncio.Semaphore(1), 1, loop)
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+@pytest.fixture
+def fake_provider(monkeypatch):
+    monkeypatch.setattr(get_settings(), "AI_FAKE_PROVIDER", True)
+    monkeypatch.setattr(get_settings(), "AI_FAKE_LATENCY_MS", 0)
+    registry = AIClientRegistry(max_retries=2, retry_base_delay=0, retry_max_delay=0)
+    monkeypatch.setattr(ai_clients, "ai_client_registry", registry)
+    monkeypatch.setattr("app.services.ai_service.ai_client_registry", registry)
+    reset_ai_call_stats()
+    yield registry
+    reset_ai_call_stats()
+
+
+class TestRetryPolicy:
+    """Tests for retry classification and backoff"""
+
+    def test_retryable_errors(self):
+        assert is_retryable(_StatusError(429))
+        assert is_retryable(_StatusError(503))
+        assert is_retryable(asyncio.TimeoutError())
+        assert not is_retryable(_StatusError(400))
+        assert not is_retryable(ValueError("bad"))
+
+    def test_backoff_is_bounded_full_jitter(self):
+        assert backoff_delay(0, 0.5, 8.0, rng=lambda: 1.0) == 0.5
+        assert backoff_delay(10, 0.5, 8.0, rng=lambda: 1.0) == 8.0
+        assert backoff_delay(3, 0.5, 8.0, rng=lambda: 0.0) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_call_retries_transient_then_succeeds(self, fake_provider):
+        delays = []
+
+        async def _sleep(delay):
+            delays.append(delay)
+
+        registry = AIClientRegistry(max_retries=3, retry_base_delay=0.1, retry_max_delay=5, sleep=_sleep)
+        pool = registry.get("fake")
+        attempts = []
+
+        async def request():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise _StatusError(429, retry_after=2)
+            return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=7, completion_tokens=3))
+
+        await registry.call(pool, "chat", request)
+        assert len(attempts) == 3
+        assert delays == [2.0, 2.0]  # Retry-After wins over jitter
+        stats = get_ai_call_stats()["fake"]
+        assert stats["calls"] == 1 and stats["retries"] == 2
+        assert stats["prompt_tokens"] == 7 and stats["completion_tokens"] == 3
+
+    @pytest.mark.asyncio
+    async def test_call_does_not_retry_client_errors(self, fake_provider):
+        pool = fake_provider.get("fake")
+        attempts = []
+
+        async def request():
+            attempts.append(1)
+            raise _StatusError(400)
+
+        with pytest.raises(_StatusError):
+            await fake_provider.call(pool, "chat", request)
+        assert len(attempts) == 1
+        assert get_ai_call_stats()["fake"]["errors"] == 1
+
+
+class TestRegistry:
+    """Tests for pooled clients and concurrency limits"""
+
+    @pytest.mark.asyncio
+    async def test_client_is_shared_across_services(self, fake_provider):
+        first, second = AIService(), AIService(provider=AIProvider.OPENAI)
+        assert first.provider == AIProvider.FAKE
+        assert first.client is second.client
+
+    @pytest.mark.asyncio
+    async def test_semaphore_limits_concurrency(self, fake_provider, monkeypatch):
+        monkeypatch.setattr(get_settings(), "AI_OPENAI_MAX_CONCURRENCY", 2)
+        registry = AIClientRegistry()
+        pool = registry.get("fake")
+        running, peak = 0, 0
+
+        async def request():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await asyncio.gather(*(registry.call(pool, "chat", request) for _ in range(6)))
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_replaced_client_is_closed_when_api_key_changes(self, monkeypatch):
+        registry = AIClientRegistry()
+        monkeypatch.setattr(registry, "_build", lambda provider, api_key, loop: _pool(provider, loop))
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-old")
+        old = registry.get("openai")
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-new")
+        new = registry.get("openai")
+
+        assert new is not old
+        assert list(registry._pools) == [("openai", "sk-new")]
+        await asyncio.sleep(0)
+        assert old.client.closed.is_set()
+        assert not new.client.closed.is_set()
+
+    @pytest.mark.asyncio
+    async def test_replaced_client_is_closed_on_its_own_loop(self, fake_provider):
+        owner = asyncio.new_event_loop()
+        thread = threading.Thread(target=owner.run_forever, daemon=True)
+        thread.start()
+        try:
+            old = _pool("fake", owner)
+            fake_provider._pools[("fake", "")] = old
+
+            new = fake_provider.get("fake")
+
+            assert new is not old and new.loop is asyncio.get_running_loop()
+            assert await asyncio.to_thread(old.client.closed.wait, 2)
+        finally:
+            owner.call_soon_threadsafe(owner.stop)
+            thread.join()
+            owner.close()
+
+
+class TestFakeProvider:
+    """Tests for the offline fake provider"""
+
+    @pytest.mark.asyncio
+    async def test_chat_completion_and_stream(self, fake_provider):
+        service = AIService()
+        result = await service.chat_completion([{"role": "user", "content": "Bonjour Léa"}])
+        assert result["provider"] == "fake"
+        assert "Bonjour Léa" in result["content"]
+        assert result["usage"]["total_tokens"] > 0
+
+        chunks = [c async for c in service.stream_chat_completion([{"role": "user", "content": "x" * 40}])]
+        assert "".join(chunks) == FakeAIClient._echo([{"role": "user", "content": "x" * 40}])
+        assert get_ai_call_stats()["fake"]["calls"] == 2
+
+    def test_fake_provider_reports_configured(self, fake_provider):
+        assert AIService.is_configured()
+        assert "fake" in AIService.get_available_providers()
@@ -0,0 +1,163 @@
+"""
+Unit tests for the batched security audit writer (AuditLogWriter)
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import security_audit
+from app.core.security_audit import (
+    AuditLogWriter,
+    SecurityAuditLog,
+    SecurityAuditLogger,
+    SecurityEventType,
+)
+
+
+@pytest.fixture
+async def factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SecurityAuditLog.__table__.create)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _event(i: int) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc),
+        "event_type": SecurityEventType.DATA_ACCESSED.value,
+        "description": f"event {i}",
+        "user_id": i,
+        "user_email": None,
+        "api_key_id": None,
+        "ip_address": "127.0.0.1",
+        "user_agent": None,
+        "request_method": "GET",
+        "request_path": "/api/v1/pages",
+        "severity": "info",
+        "success": "success",
+        "metadata": {"i": i},
+    }
+
+
+async def _count(factory) -> int:
+    async with factory() as session:
+        return await session.scalar(select(func.count()).select_from(SecurityAuditLog))
+
+
+def _broken_factory():
+    raise ConnectionError("database is down")
+
+
+async def test_events_are_written_in_batches(factory, tmp_path):
+    writer = AuditLogWriter(factory, batch_size=10, flush_interval=0.01, spill_path=str(tmp_path / "spill.jsonl"))
+    await writer.start()
+    for i in range(25):
+        writer.submit(_event(i))
+    await asyncio.sleep(0.1)
+
+    assert await _count(factory) == 25
+    assert writer.stats["batches"] == 3
+    async with factory() as session:
+        row = await session.scalar(select(SecurityAuditLog).where(SecurityAuditLog.user_id == 7))
+    assert row.event_metadata == {"i": 7}
+    await writer.close()
+
+
+async def test_close_drains_the_queue(factory, tmp_path):
+    writer = AuditLogWriter(factory, batch_size=100, flush_interval=30, spill_path=str(tmp_path / "spill.jsonl"))
+    await writer.start()
+    for i in range(5):
+        writer.submit(_event(i))
+    await asyncio.sleep(0)
+
+    await writer.close()
+
+    assert not writer.running
+    assert await _count(factory) == 5
+
+
+async def test_spills_when_database_is_down_and_replays(factory, tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    writer = AuditLogWriter(_broken_factory, batch_size=10, flush_interval=0, spill_path=str(spill_path))
+    for i in range(3):
+        writer.submit(_event(i))
+    await writer.flush()
+
+    assert writer.stats["spilled"] == 3
+    assert len(spill_path.read_text().splitlines()) == 3
+
+    writer._session_factory = factory
+    writer.submit(_event(3))
+    await writer.flush()
+
+    assert await _count(factory) == 4
+    assert writer.stats["replayed"] == 3
+    assert not spill_path.exists()
+    async with factory() as session:
+        timestamps = (await session.scalars(select(SecurityAuditLog.timestamp))).all()
+    assert all(isinstance(ts, datetime) for ts in timestamps)
+
+
+async def test_full_queue_spills_instead_of_blocking(factory, tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    writer = AuditLogWriter(factory, queue_size=2, batch_size=10, spill_path=str(spill_path))
+    for i in range(5):
+        writer.submit(_event(i))
+
+    assert writer.stats["queued"] == 2
+    assert writer.stats["spilled"] == 3
+
+    # Spill left by a previous process is replayed at start
+    await writer.start()
+    await writer.close()
+    assert await _count(factory) == 5
+    assert not spill_path.exists()
+
+
+async def test_log_event_queues_routine_events(factory, tmp_path, monkeypatch):
+    writer = AuditLogWriter(factory, flush_interval=0, spill_path=str(tmp_path / "spill.jsonl"))
+    monkeypatch.setattr(security_audit, "audit_log_writer", writer)
+    await writer.start()
+
+    audit_log = await SecurityAuditLogger.log_event(
+        event_type=SecurityEventType.PERMISSION_DENIED,
+        description="Permission denied: pages:write",
+        user_id=1,
+        severity="warning",
+        success="failure",
+    )
+
+    assert audit_log.id is None
+    assert writer.stats["queued"] == 1
+    await writer.close()
+    assert await _count(factory) == 1
+
+
+async def test_log_event_acknowledges_critical_events_synchronously(factory, tmp_path, monkeypatch):
+    writer = AuditLogWriter(factory, flush_interval=0, spill_path=str(tmp_path / "spill.jsonl"))
+    monkeypatch.setattr(security_audit, "audit_log_writer", writer)
+    await writer.start()
+
+    async with factory() as session:
+        revoked = await SecurityAuditLogger.log_api_key_event(
+            db=session,
+            event_type=SecurityEventType.API_KEY_REVOKED,
+            api_key_id=3,
+            description="API key revoked",
+        )
+        critical = await SecurityAuditLogger.log_event(
+            db=session,
+            event_type=SecurityEventType.SUSPICIOUS_ACTIVITY,
+            description="Token reuse detected",
+            severity="critical",
+        )
+
+    assert revoked.id is not None and critical.id is not None
+    assert writer.stats["queued"] == 0
+    await writer.close()
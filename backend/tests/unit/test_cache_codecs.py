@@ -0,0 +1,82 @@
+"""
+Unit tests for cache value codecs
+"""
+
+import json
+import uuid
+import zlib
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+import msgpack
+import pytest
+
+from app.core import cache_codecs
+from app.core.cache import CacheBackend, L1Cache
+from app.core.cache_codecs import CodecError, Compressor, decode, decompress, encode
+
+
+class TestCodecs:
+    """Tests for encode/decompress/decode"""
+
+    def test_typed_values_round_trip(self):
+        value = {
+            "created_at": datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc),
+            "naive": datetime(2026, 3, 1, 9, 30),
+            "closing_date": date(2026, 6, 30),
+            "visit": time(14, 15),
+            "price": Decimal("549900.00"),
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "tags": ["a", 1, None],
+        }
+        payload, stored = encode(value)
+        assert stored is payload
+        assert decode(decompress(stored)) == value
+
+    def test_large_values_compressed_with_header(self):
+        value = {"rows": [{"name": f"Contact {i}", "city": "Montréal"} for i in range(200)]}
+        payload, stored = encode(value, compressor="zlib", min_size=1024)
+        assert stored[:4] == bytes([0xC1, cache_codecs.CODEC_VERSION, 1, 1])
+        assert len(stored) < len(payload)
+        assert decompress(stored) == payload
+        assert decode(payload) == value
+
+    def test_json_serializer(self):
+        payload, _ = encode({"price": Decimal("10.5")}, serializer="json")
+        assert payload[2] == 2
+        assert decode(payload) == {"price": "10.5"}
+
+    def test_legacy_values_still_readable(self):
+        legacy_msgpack = msgpack.packb({"a": 1}, use_bin_type=True)
+        legacy_zlib = b"zlib:" + zlib.compress(msgpack.packb(["x"] * 500, use_bin_type=True))
+        legacy_json = json.dumps({"b": [1, 2]}).encode()
+        assert decode(decompress(legacy_msgpack)) == {"a": 1}
+        assert decode(decompress(legacy_zlib)) == ["x"] * 500
+        assert decode(decompress(legacy_json)) == {"b": [1, 2]}
+
+    def test_unknown_codec_ids_raise(self):
+        payload, _ = encode("x")
+        with pytest.raises(CodecError):
+            decompress(payload[:3] + bytes([99]) + payload[4:])
+        with pytest.raises(CodecError):
+            decompress(bytes([0xC1, 99, 1, 0]))
+
+    def test_registered_compressor(self, monkeypatch):
+        monkeypatch.setitem(cache_codecs.COMPRESSORS, "rev", Compressor(42, "rev", lambda b: b[::-1], lambda b: b[::-1]))
+        monkeypatch.setitem(cache_codecs._COMPRESSORS_BY_ID, 42, cache_codecs.COMPRESSORS["rev"])
+        payload, stored = encode("y" * 2000, compressor="rev")
+        assert stored[3] == 42
+        assert decode(decompress(stored)) == "y" * 2000
+
+    def test_unavailable_compressor_falls_back_to_zlib(self):
+        assert cache_codecs.resolve_compressor("brotli-9000") == "zlib"
+
+
+class TestBackendCodecs:
+    """Tests for CacheBackend with codecs"""
+
+    def test_backend_round_trip_keeps_types(self):
+        backend = CacheBackend(l1=L1Cache(10, 10_000))
+        value = {"amount": Decimal("1.10"), "at": datetime(2026, 1, 2, 3, 4, 5)}
+        payload, stored = backend._encode("k", value, compress=True)
+        assert backend._deserialize(backend._payload(stored)) == value
@@ -2,9 +2,23 @@
 Unit tests for enhanced cache utilities
 """
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from app.core.cache_enhanced import EnhancedCache, cache_query, enhanced_cache
+from sqlalchemy import Column, Integer, String, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core import cache_enhanced
+from app.core.cache_enhanced import (
+    EnhancedCache,
+    cache_query,
+    enhanced_cache,
+    model_cache_tags,
+    register_model_tags,
+    resolve_tags,
+)
 
 
 class TestEnhancedCache:
@@ -17,6 +31,8 @@ class TestEnhancedCache:
         backend.get = AsyncMock(return_value=None)
         backend.set = AsyncMock(return_value=True)
         backend.delete = AsyncMock(return_value=True)
+        backend.tag_keys = AsyncMock(return_value=True)
+        backend.invalidate_tags = AsyncMock(return_value=0)
         return backend
     
     @pytest.fixture
@@ -91,3 +107,117 @@ class TestEnhancedCache:
         assert results["key1"] is True
         assert results["key2"] is True
 
+
+class TagIndexBackend:
+    """In-memory backend with set-based tag indexes"""
+
+    def __init__(self):
+        self.use_redis = True
+        self.data = {}
+        self.tags = {}
+        self.invalidated = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, expire=300, compress=True):
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def tag_keys(self, key, tags, expire):
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(key)
+        return True
+
+    async def invalidate_tags(self, tags):
+        self.invalidated.append(list(tags))
+        deleted = 0
+        for tag in tags:
+            for key in self.tags.pop(tag, set()):
+                deleted += self.data.pop(key, None) is not None
+        return deleted
+
+
+WidgetBase = declarative_base()
+
+
+class Widget(WidgetBase):
+    __tablename__ = "widgets"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class TestTagIndex:
+    """Tests for set-based tag indexes and model auto-tagging"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tagging_keeps_every_query(self):
+        cache = EnhancedCache(TagIndexBackend())
+        await asyncio.gather(
+            *(cache.cache_query_result(f"h{i}", {"i": i}, tags=["contacts"]) for i in range(20))
+        )
+        assert len(cache.cache.tags["contacts"]) == 20
+        assert await cache.invalidate_by_tags(["contacts"]) == 20
+        assert cache.cache.data == {}
+
+    def test_model_tags(self, monkeypatch):
+        monkeypatch.setattr(cache_enhanced, "QUERY_CACHE_TAGS", set())
+        register_model_tags(Widget, "dashboards")
+        try:
+            assert model_cache_tags(Widget) == {"widgets", "dashboards"}
+            assert resolve_tags([Widget, "users", "widgets"]) == ["dashboards", "widgets", "users"]
+        finally:
+            cache_enhanced.MODEL_CACHE_TAGS.pop(Widget, None)
+
+    @pytest.mark.asyncio
+    async def test_commits_invalidate_touched_tables_only(self, monkeypatch):
+        backend = TagIndexBackend()
+        monkeypatch.setattr(enhanced_cache, "cache", backend)
+        monkeypatch.setattr(cache_enhanced, "QUERY_CACHE_TAGS", set())
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(WidgetBase.metadata.create_all)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with session_factory() as session:
+                # No cached query uses the table yet: nothing to invalidate
+                session.add(Widget(id=3, name="z"))
+                await session.commit()
+                assert not cache_enhanced._background_invalidations
+                assert backend.invalidated == []
+
+                cache_query(expire=60, tags=[Widget])(AsyncMock())
+                session.add(Widget(id=1, name="a"))
+                await session.commit()
+                await asyncio.gather(*list(cache_enhanced._background_invalidations))
+                assert backend.invalidated == [["widgets"]]
+
+                await session.execute(update(Widget).where(Widget.id == 1).values(name="b"))
+                await session.commit()
+                await asyncio.gather(*list(cache_enhanced._background_invalidations))
+                assert backend.invalidated[-1] == ["widgets"]
+
+                session.add(Widget(id=2, name="c"))
+                await session.flush()
+                await session.rollback()
+                await session.commit()
+                assert len(backend.invalidated) == 2
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_background_invalidation_errors_are_logged(self, monkeypatch):
+        backend = TagIndexBackend()
+        backend.invalidate_tags = AsyncMock(side_effect=RuntimeError("redis down"))
+        monkeypatch.setattr(enhanced_cache, "cache", backend)
+        errors = []
+        monkeypatch.setattr(cache_enhanced.logger, "error", lambda message, context=None: errors.append(context))
+
+        cache_enhanced._invalidate_model_cache_tags(None, {"widgets"})
+        await asyncio.gather(*list(cache_enhanced._background_invalidations))
+
+        assert errors == [{"tags": ["widgets"]}]
@@ -0,0 +1,280 @@
+"""
+Unit tests for the two-tier (L1 in-process + Redis) cache backend
+"""
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import CACHE_STATS, CacheBackend, L1Cache, L1Policy, get_cache_stats, l1_policy_for
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args))
+
+        return queue
+
+    async def execute(self):
+        round_trips = self.redis.round_trips
+        self.redis.commands += 1
+        out = []
+        for name, args in self.calls:
+            if name == "pttl":
+                key = args[0]
+                out.append(self.redis.ttls.get(key, -1) * 1000 if key in self.redis.data else -2)
+            else:
+                out.append(await getattr(self.redis, name)(*args))
+        self.redis.round_trips = round_trips + 1
+        return out
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in (get/mget/setex/delete/unlink/scan/pipeline/publish)."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.published = []
+        self.round_trips = 0
+        self.commands = 0
+        self.deletes = 0
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(k) for k in keys]
+
+    async def setex(self, key, expire, value):
+        self.data[key] = value
+        self.ttls[key] = expire
+
+    async def delete(self, *keys):
+        self.deletes += 1
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    async def unlink(self, *keys):
+        self.round_trips += 1
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    async def scan(self, cursor=0, match=None, count=100):
+        from fnmatch import fnmatchcase
+
+        return 0, [k for k in list(self.data) if fnmatchcase(k, match)]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+def _backend(redis=None, max_entries=100, max_bytes=1_000_000):
+    backend = CacheBackend(l1=L1Cache(max_entries, max_bytes))
+    backend.use_redis = True
+    backend.redis_client = redis or FakeRedis()
+    return backend
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    for k in CACHE_STATS:
+        CACHE_STATS[k] = 0
+    yield
+
+
+class TestL1Policy:
+    """Tests for prefix policies"""
+
+    def test_longest_prefix_wins(self, monkeypatch):
+        monkeypatch.setitem(cache_module.L1_PREFIX_POLICIES, "flags:", L1Policy(ttl=10))
+        monkeypatch.setitem(cache_module.L1_PREFIX_POLICIES, "flags:hot:", L1Policy(ttl=99))
+        assert l1_policy_for("flags:hot:x").ttl == 99
+        assert l1_policy_for("flags:x").ttl == 10
+        assert l1_policy_for("query:abc") is None
+
+
+class TestL1Cache:
+    """Tests for L1Cache"""
+
+    def test_lru_and_byte_budget(self):
+        l1 = L1Cache(max_entries=10, max_bytes=100)
+        l1.set("a", b"x" * 40, 40, 60, False)
+        l1.set("b", b"x" * 40, 40, 60, False)
+        l1.get("a")  # "a" becomes the most recently used entry
+        l1.set("c", b"x" * 40, 40, 60, False)
+        assert l1.get("b") is None and l1.get("a") is not None
+        assert l1.size_bytes == 80
+        assert CACHE_STATS["l1_evictions"] == 1
+
+    def test_ttl_expiry(self):
+        now = [0.0]
+        l1 = L1Cache(10, 1000, clock=lambda: now[0])
+        l1.set("k", b"v", 1, 5, False)
+        now[0] = 6
+        assert l1.get("k") is None and l1.size_bytes == 0
+
+    def test_delete_matching(self):
+        l1 = L1Cache(10, 1000)
+        for key in ("theme:get_theme:1", "theme:get_theme:2", "themes:list"):
+            l1.set(key, b"v", 1, 60, False)
+        assert l1.delete_matching("theme:*") == 2
+        assert len(l1) == 1
+
+
+class TestTwoTierBackend:
+    """Tests for CacheBackend with L1"""
+
+    @pytest.mark.asyncio
+    async def test_hot_key_served_from_l1(self):
+        redis = FakeRedis()
+        backend = _backend(redis)
+        await backend.set("theme:active", {"primary": "#123456"}, expire=600)
+        redis.round_trips = 0
+
+        for _ in range(5):
+            assert await backend.get("theme:active") == {"primary": "#123456"}
+        assert redis.round_trips == 0
+        assert get_cache_stats()["l1_hits"] == 5
+
+    @pytest.mark.asyncio
+    async def test_l2_hit_populates_l1_and_non_eligible_keys_bypass(self):
+        redis = FakeRedis()
+        writer, reader = _backend(redis), _backend(redis)
+        await writer.set("plans:list", [1, 2, 3], expire=600)
+        await writer.set("query:abc", {"rows": 1}, expire=600)
+        redis.round_trips = 0
+
+        assert await reader.get("plans:list") == [1, 2, 3]
+        assert await reader.get("plans:list") == [1, 2, 3]
+        assert redis.round_trips == 1
+        assert await reader.get("query:abc") == {"rows": 1}
+        assert await reader.get("query:abc") == {"rows": 1}
+        assert redis.round_trips == 3
+        stats = get_cache_stats()
+        assert stats["l2_hits"] == 3 and stats["l1_hit_ratio"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_unshared_values_are_decoded_per_read(self, monkeypatch):
+        monkeypatch.setitem(cache_module.L1_PREFIX_POLICIES, "flags:", L1Policy(ttl=30))
+        backend = _backend()
+        await backend.set("flags:all", {"beta": True}, expire=60)
+        first = await backend.get("flags:all")
+        first["beta"] = False
+        assert await backend.get("flags:all") == {"beta": True}
+
+    @pytest.mark.asyncio
+    async def test_compressed_values_cached_uncompressed(self):
+        backend = _backend()
+        big = {"css": "x" * 5000}
+        await backend.set("theme:big", big, expire=600)
+        assert backend.redis_client.data["theme:big"][:4] == bytes([0xC1, 1, 1, 1])  # msgpack + zlib
+        assert await backend.get("theme:big") == big
+
+    @pytest.mark.asyncio
+    async def test_invalidation_broadcast_between_workers(self):
+        redis = FakeRedis()
+        worker_a, worker_b = _backend(redis), _backend(redis)
+        await worker_a.set("theme:active", {"v": 1}, expire=600)
+        assert await worker_b.get("theme:active") == {"v": 1}
+
+        await worker_a.set("theme:active", {"v": 2}, expire=600)
+        # Deliver the pub/sub messages; each worker ignores its own
+        for _, message in redis.published:
+            worker_a.apply_invalidation(message)
+            worker_b.apply_invalidation(message)
+        assert await worker_a.get("theme:active") == {"v": 2}
+        assert await worker_b.get("theme:active") == {"v": 2}
+
+        await worker_a.clear_pattern("theme:*")
+        worker_b.apply_invalidation(redis.published[-1][1])
+        assert len(worker_b.l1) == 0
+        assert await worker_b.get("theme:active") is None
+
+    @pytest.mark.asyncio
+    async def test_clear_pattern_not_refilled_during_scan(self):
+        redis = FakeRedis()
+        backend = _backend(redis)
+        await backend.set("theme:active", {"v": 1}, expire=600)
+        backend.l1.clear()
+        scan = redis.scan
+
+        async def scan_with_concurrent_read(*args, **kwargs):
+            # Another coroutine reads the key while the SCAN is running
+            assert await backend.get("theme:active") == {"v": 1}
+            return await scan(*args, **kwargs)
+
+        redis.scan = scan_with_concurrent_read
+        await backend.clear_pattern("theme:*")
+        assert len(backend.l1) == 0
+        assert await backend.get("theme:active") is None
+
+    @pytest.mark.asyncio
+    async def test_l1_ttl_bounded_by_redis_ttl(self):
+        redis = FakeRedis()
+        writer, reader = _backend(redis), _backend(redis)
+        await writer.set("plans:short", [1], expire=2)
+        await reader.get("plans:short")
+        expires_at = reader.l1._entries["plans:short"][0]
+        assert expires_at - reader.l1._clock() <= 2
+
+
+class TestBatchOperations:
+    """Tests for get_many/set_many/delete_many"""
+
+    @pytest.mark.asyncio
+    async def test_set_many_and_get_many_single_round_trip(self):
+        redis = FakeRedis()
+        writer, reader = _backend(redis), _backend(redis)
+        values = {f"contact:url:{i}": f"https://cdn/{i}" for i in range(50)}
+        values["theme:active"] = {"css": "x" * 5000}
+        assert await writer.set_many(values, expire=300)
+        assert redis.commands == 1
+        assert redis.data["theme:active"][3] == 1  # zlib
+        assert [m for _, m in redis.published] == [f"{writer.instance_id}|k|theme:active"]
+
+        redis.round_trips = 0
+        found = await reader.get_many([*values, "contact:url:missing"])
+        assert found == values
+        assert redis.round_trips == 1
+        # Eligible key now served from L1, the others still come from Redis
+        assert await reader.get_many(["theme:active", "contact:url:1"]) == {
+            "theme:active": values["theme:active"],
+            "contact:url:1": "https://cdn/1",
+        }
+        assert redis.round_trips == 2
+        assert get_cache_stats()["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_many_unlinks_and_evicts_l1(self):
+        redis = FakeRedis()
+        backend = _backend(redis)
+        await backend.set_many({"theme:a": 1, "query:b": 2}, expire=60)
+        redis.round_trips = 0
+        assert await backend.delete_many(["theme:a", "query:b", "query:none"]) == 2
+        assert redis.round_trips == 1 and redis.deletes == 0
+        assert len(backend.l1) == 0
+        assert await backend.get_many(["theme:a", "query:b"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_clear_pattern_uses_unlink(self):
+        redis = FakeRedis()
+        backend = _backend(redis)
+        await backend.set_many({f"projects:list:{i}": i for i in range(10)}, expire=60)
+        assert await backend.clear_pattern("projects:*") == 10
+        assert redis.deletes == 0 and redis.data == {}
+
+    @pytest.mark.asyncio
+    async def test_without_redis(self):
+        backend = CacheBackend(l1=L1Cache(10, 1000))
+        backend.use_redis = False
+        assert await backend.get_many(["a"]) == {}
+        assert await backend.set_many({"a": 1}) is False
+        assert await backend.delete_many(["a"]) == 0
@@ -0,0 +1,202 @@
+"""
+Unit tests for cache stampede protection (single-flight, Redis lock, XFetch, SWR)
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import CACHE_STATS, cached, get_or_compute
+from app.core.cache_enhanced import EnhancedCache
+
+
+class MemoryBackend:
+    """In-memory stand-in for CacheBackend (values, expirations and locks)"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.locks = {}
+        self.sets = 0
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, expire=300, compress=True):
+        self.sets += 1
+        self.data[key] = value
+        self.expires[key] = expire
+        return True
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def acquire_lock(self, key, ttl):
+        if key in self.locks:
+            return None
+        self.locks[key] = f"token-{key}"
+        return self.locks[key]
+
+    async def release_lock(self, key, token):
+        if self.locks.get(key) == token:
+            del self.locks[key]
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    for k in CACHE_STATS:
+        CACHE_STATS[k] = 0
+    yield
+
+
+def _counting(value="v", delay=0.02):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+
+    return compute, calls
+
+
+class TestSingleFlight:
+    """Tests for miss coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self):
+        backend = MemoryBackend()
+        compute, calls = _counting({"total": 42})
+
+        results = await asyncio.gather(
+            *(get_or_compute("dash:1", compute, 60, backend=backend) for _ in range(20))
+        )
+        assert all(r == {"total": 42} for r in results)
+        assert len(calls) == 1 and backend.sets == 1
+        assert CACHE_STATS["coalesced"] == 19
+        assert backend.locks == {}
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_not_cached(self):
+        backend = MemoryBackend()
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(
+            *(get_or_compute("dash:err", boom, 60, backend=backend) for _ in range(3)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert "dash:err" not in backend.data and backend.locks == {}
+
+    @pytest.mark.asyncio
+    async def test_waits_for_value_computed_by_other_process(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "STAMPEDE_POLL_INTERVAL", 0.005)
+        backend = MemoryBackend()
+        backend.locks["dash:2"] = "other-process"
+        compute, calls = _counting("mine")
+
+        async def other_process_finishes():
+            await asyncio.sleep(0.02)
+            backend.data["dash:2"] = "theirs"
+
+        result, _ = await asyncio.gather(
+            get_or_compute("dash:2", compute, 60, backend=backend), other_process_finishes()
+        )
+        assert result == "theirs" and calls == []
+        assert CACHE_STATS["lock_waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_computes_anyway_after_lock_wait_timeout(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "STAMPEDE_POLL_INTERVAL", 0.005)
+        backend = MemoryBackend()
+        backend.locks["dash:3"] = "stuck-process"
+        compute, calls = _counting("mine", delay=0)
+
+        assert await get_or_compute("dash:3", compute, 60, backend=backend, lock_timeout=0.02) == "mine"
+        assert len(calls) == 1
+        assert backend.locks == {"dash:3": "stuck-process"}
+
+
+class TestEarlyExpiration:
+    """Tests for XFetch and stale-while-revalidate"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_value_far_from_expiry_is_served(self):
+        backend = MemoryBackend()
+        compute, calls = _counting("v1", delay=0)
+        await get_or_compute("k:fresh", compute, 600, backend=backend, beta=1.0)
+        assert backend.data["k:fresh"]["v"] == "v1"
+        assert await get_or_compute("k:fresh", compute, 600, backend=backend, beta=1.0) == "v1"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_expensive_value_near_expiry_is_recomputed_early(self, monkeypatch):
+        backend = MemoryBackend()
+        now = 1_000_000.0
+        monkeypatch.setattr(cache_module.time, "time", lambda: now)
+        monkeypatch.setattr(cache_module.random, "random", lambda: 0.5)
+        # Computed in 10s, expires in 2s: -10 * ln(0.5) ≈ 6.9s > 2s
+        backend.data["k:hot"] = {"__swr__": 1, "v": "old", "d": 10.0, "x": now + 2}
+        compute, calls = _counting("new", delay=0)
+
+        assert await get_or_compute("k:hot", compute, 60, backend=backend, beta=1.0) == "new"
+        assert len(calls) == 1 and CACHE_STATS["early_refreshes"] == 1
+        assert backend.expires["k:hot"] == 60
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_one_background_refresh_runs(self):
+        backend = MemoryBackend()
+        backend.data["k:swr"] = {"__swr__": 1, "v": "old", "d": 0.01, "x": 0}
+        compute, calls = _counting("new", delay=0.02)
+
+        results = await asyncio.gather(
+            *(get_or_compute("k:swr", compute, 60, backend=backend, stale_ttl=30) for _ in range(5))
+        )
+        assert results == ["old"] * 5
+        assert CACHE_STATS["stale_served"] == 5
+        await asyncio.gather(*list(cache_module._background_refreshes))
+        assert len(calls) == 1
+        assert backend.data["k:swr"]["v"] == "new"
+        assert backend.expires["k:swr"] == 90
+
+
+class TestIntegrations:
+    """Tests for @cached and EnhancedCache.get_or_set"""
+
+    @pytest.mark.asyncio
+    async def test_cached_decorator_coalesces(self, monkeypatch):
+        backend = MemoryBackend()
+        monkeypatch.setattr(cache_module, "cache_backend", backend)
+        calls = []
+
+        @cached(expire=300, key_prefix="erp_dashboard")
+        async def dashboard(department=None):
+            calls.append(department)
+            await asyncio.sleep(0.02)
+            return {"department": department}
+
+        results = await asyncio.gather(*(dashboard(department="sales") for _ in range(10)))
+        assert results == [{"department": "sales"}] * 10
+        assert calls == ["sales"]
+        assert await dashboard(department="sales") == {"department": "sales"}
+        assert calls == ["sales"]
+        # No XFetch / SWR opt-in: the value is stored in the historical format
+        assert list(backend.data.values()) == [{"department": "sales"}]
+
+    @pytest.mark.asyncio
+    async def test_get_or_set_coalesces_sync_callables(self):
+        backend = MemoryBackend()
+        cache = EnhancedCache(backend)
+        calls = []
+
+        def compute(x):
+            calls.append(x)
+            return x * 2
+
+        results = await asyncio.gather(*(cache.get_or_set("k:sync", compute, 60, True, 21) for _ in range(5)))
+        assert results == [42] * 5 and calls == [21]
+        assert backend.data["k:sync"] == 42
@@ -0,0 +1,97 @@
+"""
+Unit tests for the shared Session commit hooks (app.core.commit_hooks)
+"""
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core import commit_hooks
+from app.core.commit_hooks import CommitHook, pending_items, register_commit_hook
+from app.core.database import Base
+from app.models import User
+
+
+@pytest.fixture
+async def factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    monkeypatch.setattr(commit_hooks, "_hooks", list(commit_hooks._hooks))
+    calls = {"commit": [], "rollback": [], "collected": 0}
+
+    def collect(session, obj, is_new):
+        return {(type(obj).__name__, is_new)} if isinstance(obj, User) else set()
+
+    def collect_statement(orm_execute_state):
+        return {"bulk"}
+
+    def on_collect(session):
+        calls["collected"] += 1
+
+    register_commit_hook(CommitHook(
+        name="test_recorder",
+        collect=collect,
+        collect_statement=collect_statement,
+        on_collect=on_collect,
+        on_commit=lambda session, items: calls["commit"].append(set(items)),
+        on_rollback=lambda session, items: calls["rollback"].append(set(items)),
+    ))
+    return calls
+
+
+def _user(email):
+    return User(email=email, hashed_password="x", is_active=True)
+
+
+class TestCommitHooks:
+    """Tests for the collect / dispatch cycle"""
+
+    @pytest.mark.asyncio
+    async def test_flushed_objects_dispatched_after_commit(self, factory, recorder):
+        async with factory() as session:
+            session.add(_user("a@example.com"))
+            await session.flush()
+            assert pending_items(session, "test_recorder") == {("User", True)}
+            assert recorder["commit"] == []
+            await session.commit()
+
+        assert recorder["commit"] == [{("User", True)}]
+        assert recorder["collected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_statements_and_rollback(self, factory, recorder):
+        async with factory() as session:
+            await session.execute(update(User).values(is_active=False))
+            assert pending_items(session, "test_recorder") == {"bulk"}
+            await session.rollback()
+            assert pending_items(session, "test_recorder") == set()
+
+        assert recorder["commit"] == []
+        assert recorder["rollback"] == [{"bulk"}]
+
+    @pytest.mark.asyncio
+    async def test_failing_hook_does_not_starve_the_others(self, factory, recorder):
+        def explode(session, items):
+            raise RuntimeError("cache down")
+
+        register_commit_hook(CommitHook(name="broken", collect=lambda s, o, n: {1}, on_commit=explode))
+        commit_hooks._hooks.insert(0, commit_hooks._hooks.pop())
+
+        async with factory() as session:
+            session.add(_user("b@example.com"))
+            await session.commit()
+
+        assert recorder["commit"] == [{("User", True)}]
+
+    def test_registration_replaces_hooks_with_the_same_name(self, recorder):
+        names = [hook.name for hook in commit_hooks._hooks]
+        register_commit_hook(CommitHook(name="test_recorder", collect=lambda s, o, n: (), on_commit=print))
+
+        assert [hook.name for hook in commit_hooks._hooks] == names
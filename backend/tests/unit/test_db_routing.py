@@ -0,0 +1,143 @@
+"""
+Unit tests for read replica routing (two SQLite databases stand in for primary / replica)
+"""
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import db_routing
+from app.core.database import get_db
+from app.core.db_routing import (
+    ReadYourWrites,
+    ReplicaPool,
+    RoutingSession,
+    parse_replica_urls,
+    set_request_subject,
+)
+from app.core.security import create_access_token
+from app.dependencies import get_lea_user
+from app.models import User
+
+
+class _NoRedisBackend:
+    use_redis = False
+
+
+async def _engine_with_marker(path, marker):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE node (name TEXT)"))
+        await conn.execute(text("INSERT INTO node (name) VALUES (:name)"), {"name": marker})
+    return engine
+
+
+@pytest.fixture
+async def env(tmp_path, monkeypatch):
+    primary = await _engine_with_marker(tmp_path / "primary.db", "primary")
+    replica = await _engine_with_marker(tmp_path / "replica.db", "replica")
+    pool = ReplicaPool([replica])
+    await pool.check_health()
+    monkeypatch.setattr(db_routing, "replica_pool", pool)
+    monkeypatch.setattr(db_routing, "read_your_writes", ReadYourWrites(_NoRedisBackend()))
+    factory = async_sessionmaker(primary, class_=AsyncSession, sync_session_class=RoutingSession)
+    monkeypatch.setattr(db_routing, "ReadSessionLocal", factory)
+    try:
+        yield pool, primary, factory
+    finally:
+        await primary.dispose()
+        await replica.dispose()
+
+
+async def _node(session):
+    return (await session.execute(text("SELECT name FROM node"))).scalar()
+
+
+class TestReadRouting:
+    """Tests for statement routing"""
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_healthy_replica(self, env):
+        pool, _, factory = env
+        assert pool.status()[0]["healthy"] and pool.status()[0]["lag_sec"] == 0.0
+        async with factory() as session:
+            assert await _node(session) == "replica"
+
+        pool.replicas[0].healthy = False
+        async with factory() as session:
+            assert await _node(session) == "primary"
+
+    @pytest.mark.asyncio
+    async def test_session_stays_on_primary_after_a_write(self, env):
+        _, _, factory = env
+        async with factory() as session:
+            assert await _node(session) == "replica"
+            await session.execute(text("UPDATE node SET name = 'primary-updated'"))
+            assert await _node(session) == "primary-updated"
+            await session.commit()
+
+    @pytest.mark.asyncio
+    async def test_read_your_writes_window_after_commit(self, env):
+        _, primary, _ = env
+        write_factory = async_sessionmaker(primary, class_=AsyncSession)
+        set_request_subject("broker@example.com")
+        async with write_factory() as session:
+            await session.execute(text("INSERT INTO node (name) VALUES ('new')"))
+            await session.commit()
+
+        async with db_routing.read_session() as session:
+            assert await _node(session) == "primary"
+        async with db_routing.read_session("other@example.com") as session:
+            assert await _node(session) == "replica"
+
+    @pytest.mark.asyncio
+    async def test_lea_turn_pins_next_history_read_to_primary(self, env):
+        _, primary, _ = env
+        write_factory = async_sessionmaker(primary, class_=AsyncSession, expire_on_commit=False)
+        async with primary.begin() as conn:
+            await conn.run_sync(User.__table__.create)
+        async with write_factory() as session:
+            session.add(User(email="lea@example.com", hashed_password="x", is_active=True))
+            await session.commit()
+
+        async def primary_db():
+            async with write_factory() as session:
+                yield session
+
+        app = FastAPI()
+        app.dependency_overrides[get_db] = primary_db
+
+        @app.post("/lea/chat")
+        async def chat(user: User = Depends(get_lea_user), db: AsyncSession = Depends(get_db)):
+            await db.execute(text("INSERT INTO node (name) VALUES ('turn')"))
+            await db.commit()
+            return {"ok": True}
+
+        @app.get("/lea/history")
+        async def history(user: User = Depends(get_lea_user)):
+            async with db_routing.read_session() as session:
+                return {"node": await _node(session)}
+
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'lea@example.com', 'type': 'access'})}"}
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/lea/history", headers=headers)).json() == {"node": "replica"}
+            assert (await client.post("/lea/chat", headers=headers)).status_code == 200
+            assert (await client.get("/lea/history", headers=headers)).json() == {"node": "primary"}
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_is_skipped(self, tmp_path):
+        broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/replica.db")
+        pool = ReplicaPool([broken])
+        await pool.check_health()
+        assert pool.pick() is None
+        assert pool.status()[0]["error"]
+        await broken.dispose()
+
+    def test_parse_replica_urls(self):
+        assert parse_replica_urls(" postgresql://r1/db, ,postgresql+asyncpg://r2/db") == [
+            "postgresql+asyncpg://r1/db",
+            "postgresql+asyncpg://r2/db",
+        ]
+        assert parse_replica_urls("") == []
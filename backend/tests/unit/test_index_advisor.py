@@ -0,0 +1,129 @@
+"""
+Unit tests for the workload-driven index advisor
+"""
+
+import pytest
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, MetaData, String, Table
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.index_advisor import (
+    IndexRecommendation,
+    build_candidates,
+    find_unused_indexes,
+    index_serves,
+    parse_fingerprint,
+    recommend_indexes,
+    render_migration,
+)
+from app.core.query_instrumentation import QueryStatsRegistry, fingerprint_statement
+
+TRANSACTIONS = (
+    "SELECT real_estate_transactions.id, real_estate_transactions.name FROM real_estate_transactions "
+    "WHERE real_estate_transactions.user_id = ? ORDER BY real_estate_transactions.updated_at DESC LIMIT ? OFFSET ?"
+)
+APPOINTMENTS = (
+    "SELECT appointments.id FROM appointments JOIN users AS users_1 ON users_1.id = appointments.broker_id "
+    "WHERE appointments.broker_id = ? AND appointments.start_time >= ?::TIMESTAMP WITH TIME ZONE "
+    "AND appointments.deleted_at IS NULL ORDER BY appointments.start_time"
+)
+
+
+@pytest.fixture
+async def session():
+    metadata = MetaData()
+    Table(
+        "real_estate_transactions", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("user_id", Integer),
+        Column("name", String(50)),
+        Column("updated_at", DateTime),
+        Index("idx_transactions_user", "user_id"),
+    )
+    Table(
+        "appointments", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("broker_id", Integer),
+        Column("start_time", DateTime),
+        Column("deleted_at", DateTime),
+        Index("idx_appointments_broker_start", "broker_id", "start_time"),
+    )
+    Table("users", metadata, Column("id", Integer, primary_key=True), Column("is_active", Boolean))
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+        yield session
+    await engine.dispose()
+
+
+def _registry(workload):
+    registry = QueryStatsRegistry()
+    for statement, calls in workload.items():
+        for _ in range(calls):
+            registry.record(fingerprint_statement(statement), 2.0)
+    return registry
+
+
+class TestIndexAdvisor:
+    """Tests for fingerprint parsing, candidate ranking and migration rendering"""
+
+    def test_parse_equality_sort_and_partial_conditions(self):
+        (transactions,) = parse_fingerprint(TRANSACTIONS)
+        assert transactions.table == "real_estate_transactions"
+        assert transactions.index_columns() == ["user_id", "updated_at"]
+
+        (appointments,) = parse_fingerprint(APPOINTMENTS)
+        assert appointments.index_columns() == ["broker_id", "start_time"]
+        assert appointments.conditions == ["deleted_at IS NULL"]
+
+        (users,) = parse_fingerprint("SELECT u.id FROM users u WHERE u.is_active = true AND u.email IN (?...)")
+        assert users.table == "users" and users.equality == ["email"] and users.conditions == ["is_active = true"]
+
+    def test_unparseable_statements_yield_nothing(self):
+        assert parse_fingerprint("SELECT count(*) FROM (SELECT x.id FROM x) AS anon_1") == []
+        assert parse_fingerprint("SELECT c.id FROM contacts c WHERE c.name = ? OR c.email = ?") == []
+        assert parse_fingerprint("INSERT INTO contacts (name) VALUES (?)") == []
+
+    def test_prefix_candidates_are_merged_and_ranked(self):
+        workload = {
+            "SELECT t.id FROM t WHERE t.a = ? AND t.b = ?": (30, 90.0),
+            "SELECT t.id FROM t WHERE t.b = ? ORDER BY t.id": (40, 10.0),
+            "SELECT t.id FROM t WHERE t.a = ?": (100, 50.0),
+            "SELECT t.id FROM t WHERE t.c = ?": (5, 500.0),
+        }
+        candidates = build_candidates([("instrumentation", workload)], min_calls=20)
+        assert [c.columns for c in candidates] == [["a", "b"], ["b", "id"]]
+        assert candidates[0].calls == 130
+
+    def test_index_serves_prefix_with_unordered_equality_columns(self):
+        assert index_serves(["b", "a", "created_at"], ["a", "b", "created_at"], 2)
+        assert index_serves(["a", "created_at", "id"], ["a", "created_at"], 1)
+        assert not index_serves(["created_at", "a"], ["a", "created_at"], 1)
+        assert not index_serves(["a"], ["a", "created_at"], 1)
+
+    @pytest.mark.asyncio
+    async def test_recommend_skips_served_and_unknown_columns(self, session):
+        registry = _registry({
+            TRANSACTIONS: 25,
+            APPOINTMENTS: 25,
+            "SELECT real_estate_transactions.id FROM real_estate_transactions WHERE real_estate_transactions.missing = ?": 25,
+        })
+        recommendations = await recommend_indexes(session, registry=registry, min_calls=20)
+        assert [(r.table, r.columns) for r in recommendations] == [
+            ("real_estate_transactions", ["user_id", "updated_at"])
+        ]
+        assert recommendations[0].calls == 25
+        assert (await find_unused_indexes(session)) == {"supported": False, "indexes": []}
+
+    def test_render_migration_is_valid_python(self):
+        recommendation = IndexRecommendation(
+            table="appointments", columns=["broker_id", "start_time"], equality_count=1,
+            where="deleted_at IS NULL", calls=10, total_ms=5.0,
+        )
+        source = render_migration([recommendation], "058_index_advisor", "057_keyset_pagination_indexes")
+        namespace = {}
+        exec(compile(source, "058_index_advisor.py", "exec"), namespace)
+        assert namespace["down_revision"] == "057_keyset_pagination_indexes"
+        assert namespace["ADVISED_INDEXES"] == [
+            ("idx_appointments_broker_id_start_time_partial", "appointments", ["broker_id", "start_time"], "deleted_at IS NULL")
+        ]
@@ -4,7 +4,15 @@ Tests unitaires pour le module lea_chat : router, heuristics, schemas, response_
 
 import pytest
 
-from app.services.lea_chat.router import _parse_router_response
+from unittest.mock import AsyncMock, patch
+
+from app.services.lea_chat import router as lea_router
+from app.services.lea_chat.router import (
+    RoutingDecisionCache,
+    _fast_path_decision,
+    _parse_router_response,
+    route_user_message,
+)
 from app.services.lea_chat.heuristics import (
     _format_canadian_postal_code,
     _is_short_confirmation_message,
@@ -12,6 +20,7 @@ from app.services.lea_chat.heuristics import (
     _last_message_asked_to_confirm_pa_creation,
 )
 from app.services.lea_chat.actions.transaction import _wants_to_create_transaction
+from app.services.lea_chat.context_loader import summarize_active_context
 from app.services.lea_chat.response_composer import build_context
 
 
@@ -59,6 +68,105 @@ class TestRouterParse:
         assert result.get("domain") == "other"
 
 
+class TestRouterFastPath:
+    """Tests pour la voie rapide heuristique et le cache du routeur."""
+
+    PA_QUESTION = "Souhaitez-vous créer la promesse d'achat pour la transaction au 229 Dufferin ?"
+
+    def test_confirmation_after_pa_question(self):
+        """« oui » après la question PA → purchase_offer/confirm sans LLM."""
+        decision = _fast_path_decision("Oui, c'est ça !", self.PA_QUESTION, "")
+        assert decision["domain"] == "purchase_offer"
+        assert decision["intent"] == "confirm"
+        assert decision["signals"]["user_confirmed"] is True
+        assert decision["signals"]["last_message_asked_to_confirm_pa"] is True
+        assert decision["source"] == "fast_path"
+
+    def test_confirmation_with_save_verb(self):
+        """« ok enregistrez » est une confirmation triviale."""
+        decision = _fast_path_decision("ok enregistrez", "Les vendeurs sont Paul et Marie ?", "")
+        assert decision is not None
+        assert decision["intent"] == "confirm"
+
+    def test_messages_with_content_go_to_llm(self):
+        """Un message portant une information n'emprunte pas la voie rapide."""
+        assert _fast_path_decision("oui c'est une vente", None, "") is None
+        assert _fast_path_decision("oui 500 000", None, "") is None
+        assert _fast_path_decision("Je veux créer une transaction", None, "") is None
+
+    def test_cancel(self):
+        """« annule » pendant un PA → intent cancel sur le domaine en cours."""
+        summary = "L'utilisateur est en cours de remplissage du formulaire PA (promesse d'achat)."
+        decision = _fast_path_decision("Annule", None, summary)
+        assert decision["intent"] == "cancel"
+        assert decision["domain"] == "purchase_offer"
+
+    @staticmethod
+    def _summary(pa_active=None, pending_transaction=None, transaction_active=None):
+        return summarize_active_context(
+            {
+                "pa_active": pa_active,
+                "pending_transaction": pending_transaction,
+                "transaction_active": transaction_active,
+            }
+        )
+
+    def test_general_conversation_confirmation_is_not_a_pa(self):
+        """Le résumé par défaut mentionne « formulaire PA » sans qu'un PA soit actif."""
+        for summary in (self._summary(), self._summary(transaction_active={"dossier_number": "D-1"})):
+            decision = _fast_path_decision("oui", None, summary)
+            assert decision["domain"] == "other"
+            assert decision["intent"] == "confirm"
+
+    def test_confirmation_while_filling_pa_fills_the_form(self):
+        """« ok » pendant le remplissage du PA → fill (fill_pa), pas create_pa."""
+        summary = self._summary(pa_active={"submission_id": 3, "section_title": "Prix", "last_asked_field": "price"})
+        decision = _fast_path_decision("ok", "Le prix est-il de 500 000 $ ?", summary)
+        assert decision["domain"] == "purchase_offer"
+        assert decision["intent"] == "fill"
+
+    def test_confirmation_during_transaction_creation(self):
+        summary = self._summary(pending_transaction={"type": "vente", "stage": "address"})
+        decision = _fast_path_decision("d'accord", None, summary)
+        assert decision["domain"] == "transaction"
+
+    def test_pa_question_wins_over_context(self):
+        decision = _fast_path_decision("oui", self.PA_QUESTION, self._summary())
+        assert (decision["domain"], decision["intent"]) == ("purchase_offer", "confirm")
+
+    def test_politeness_alone_is_not_a_confirmation(self):
+        """Même vocabulaire que _is_short_confirmation_message : « merci » seul → LLM."""
+        for message in ("merci", "super", "parfait", "svp", "c'est bon"):
+            assert _fast_path_decision(message, self.PA_QUESTION, "") is None
+            assert _is_short_confirmation_message(message) is False
+        assert _fast_path_decision("oui merci", None, "")["intent"] == "confirm"
+
+    def test_cache_key_normalization(self):
+        """Casse et espaces n'influencent pas la clé ; le dernier message oui."""
+        k1 = RoutingDecisionCache.key_for("Créer  une VENTE", "Bonjour", "ctx")
+        k2 = RoutingDecisionCache.key_for("créer une vente ", "Bonjour", "ctx")
+        k3 = RoutingDecisionCache.key_for("créer une vente", "Autre question", "ctx")
+        assert k1 == k2
+        assert k1 != k3
+
+    @pytest.mark.asyncio
+    async def test_llm_decision_is_cached(self):
+        """Le deuxième message identique est servi par le cache (un seul appel LLM)."""
+        backend = AsyncMock()
+        backend.get = AsyncMock(return_value=None)
+        backend.set = AsyncMock(return_value=True)
+        llm_decision = {"domain": "transaction", "intent": "create", "confidence": 0.9, "entities": []}
+        with patch.object(lea_router, "routing_decision_cache", RoutingDecisionCache(backend=backend)), patch.object(
+            lea_router, "_route_with_llm", AsyncMock(side_effect=lambda *a: dict(llm_decision))
+        ) as llm:
+            first = await route_user_message("Créer une transaction de vente", None, "ctx")
+            second = await route_user_message("créer une transaction de vente", None, "ctx")
+        assert llm.await_count == 1
+        assert first["source"] == "llm"
+        assert second["source"] == "cache"
+        assert second["domain"] == "transaction"
+
+
 class TestHeuristics:
     """Tests pour les heuristiques (fallback)."""
 
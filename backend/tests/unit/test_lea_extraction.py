@@ -0,0 +1,73 @@
+"""
+Tests unitaires pour le moteur d'extraction Léa (automate de mots-clés, entités du message).
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from app.services.lea_chat.extraction import (
+    KeywordAutomaton,
+    extract_message_entities,
+    extract_oaciq_form_code,
+)
+
+
+class TestKeywordAutomaton:
+    """Tests pour KeywordAutomaton."""
+
+    def test_finds_overlapping_keywords(self):
+        """Toutes les occurrences sont trouvées, y compris imbriquées."""
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+        matches = sorted(automaton.iter_matches("ushers"))
+        assert matches == [(1, "she"), (2, "he"), (2, "hers")]
+
+    def test_no_match(self):
+        automaton = KeywordAutomaton(["promesse"])
+        assert list(automaton.iter_matches("bonjour")) == []
+
+
+class TestExtractOaciqFormCode:
+    """Tests pour extract_oaciq_form_code."""
+
+    def test_explicit_code_preferred_over_keywords(self):
+        assert extract_oaciq_form_code("Je veux créer un formulaire CCVE pour la promesse") == "CCVE"
+
+    def test_longest_code_wins(self):
+        assert extract_oaciq_form_code("formulaire AVIS-CVAN svp") == "AVIS-CVAN"
+
+    def test_code_needs_boundaries(self):
+        """« pa » dans « papier » n'est pas un code ; les mots-clés prennent le relais."""
+        assert extract_oaciq_form_code("le papier de la promesse d'achat") == "PA"
+
+    def test_false_positives_skipped(self):
+        assert extract_oaciq_form_code("as-tu reçu le document ?") is None
+        assert extract_oaciq_form_code("d'achat") == "PA"
+
+    def test_first_keyword_group_wins(self):
+        """Plusieurs groupes : le premier de la table l'emporte (ordre historique)."""
+        assert extract_oaciq_form_code("vérification identité et expertise") == "EXP"
+
+    def test_empty(self):
+        assert extract_oaciq_form_code("") is None
+        assert extract_oaciq_form_code("   ") is None
+
+
+class TestExtractMessageEntities:
+    """Tests pour extract_message_entities."""
+
+    def test_all_entities(self):
+        entities = extract_message_entities(
+            "Pour la transaction #12, le prix est 450 000 $ au 123 rue Principale à Laval H7N 2B3, clôture le 15 mars 2026"
+        )
+        assert entities.transaction_ref == "12"
+        assert entities.postal_code == "H7N 2B3"
+        assert entities.date == date(2026, 3, 15)
+        assert entities.price is not None and entities.price[0] > Decimal("0")
+
+    def test_short_date_format(self):
+        assert extract_message_entities("clôture le 01/07/2026").date == date(2026, 7, 1)
+        assert extract_message_entities("le 31/02/2026").date is None
+
+    def test_result_is_cached(self):
+        message = "dossier 7 à Montréal"
+        assert extract_message_entities(message) is extract_message_entities(message)
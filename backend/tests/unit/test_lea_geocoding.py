@@ -0,0 +1,197 @@
+"""
+Tests unitaires pour le géocodage Léa (client partagé, cache, coalescence, débit).
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.services.lea_chat.geocoding import LeaGeocoder, TokenBucket, normalize_address_key
+
+
+class _MemoryBackend:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, expire=None, compress=False):
+        self.data[key] = value
+        return True
+
+
+def _nominatim_stub(calls):
+    """Serveur Nominatim local : un résultat à Montréal pour toute recherche."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params.get("q"))
+        return httpx.Response(
+            200,
+            json=[{"address": {"postcode": "H2K 1E1", "city": "Montréal", "state": "Québec", "country_code": "ca"}}],
+        )
+
+    return handler
+
+
+def _geocoder(backend=None, calls=None, rate=0.0):
+    transport = httpx.MockTransport(_nominatim_stub(calls if calls is not None else []))
+    return LeaGeocoder(
+        backend=backend or _MemoryBackend(),
+        ttl=60,
+        negative_ttl=10,
+        nominatim_rate=rate,
+        client_factory=lambda: httpx.AsyncClient(transport=transport),
+    )
+
+
+class TestLeaGeocoder:
+    """Tests pour LeaGeocoder."""
+
+    def test_normalized_key(self):
+        assert normalize_address_key(" 2643 Sherbrooke Est,  MONTRÉAL ") == "2643 sherbrooke est montreal"
+        assert LeaGeocoder.key_for("validate", "2643 sherbrooke est, Montreal") == LeaGeocoder.key_for(
+            "validate", "2643 Sherbrooke Est Montréal"
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_json_uses_shared_client(self):
+        calls = []
+        geocoder = _geocoder(calls=calls)
+        data = await geocoder.get_json("nominatim", geocoder.nominatim_url, {"q": "2643 Sherbrooke Est"})
+        await geocoder.get_json("nominatim", geocoder.nominatim_url, {"q": "7236 rue Waverly"})
+        assert data[0]["address"]["city"] == "Montréal"
+        assert calls == ["2643 Sherbrooke Est", "7236 rue Waverly"]
+        client = geocoder.client()
+        assert geocoder.client() is client
+        await geocoder.aclose()
+
+    @pytest.mark.asyncio
+    async def test_resolve_caches_in_memory_and_redis(self):
+        backend = _MemoryBackend()
+        geocoder = _geocoder(backend=backend)
+        computed = []
+
+        async def compute():
+            computed.append(1)
+            return {"city": "Montréal", "country_code": "CA"}
+
+        assert await geocoder.resolve("validate", "2643 Sherbrooke Est", compute) == {"city": "Montréal", "country_code": "CA"}
+        assert await geocoder.resolve("validate", "2643 SHERBROOKE EST", compute) is not None
+        assert computed == [1]
+
+        # Autre worker : mémoire vide, résultat relu depuis Redis
+        other = _geocoder(backend=backend)
+        assert (await other.resolve("validate", "2643 Sherbrooke Est", compute))["city"] == "Montréal"
+        assert computed == [1]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_are_coalesced(self):
+        geocoder = _geocoder()
+        computed = []
+
+        async def compute():
+            computed.append(1)
+            await asyncio.sleep(0.02)
+            return {"city": "Laval", "country_code": "CA"}
+
+        results = await asyncio.gather(*(geocoder.resolve("validate", "12 rue A, Laval", compute) for _ in range(5)))
+        assert computed == [1]
+        assert all(r == {"city": "Laval", "country_code": "CA"} for r in results)
+
+    @pytest.mark.asyncio
+    async def test_request_errors_are_not_cached(self):
+        def failing(request):
+            return httpx.Response(503)
+
+        geocoder = LeaGeocoder(
+            backend=_MemoryBackend(),
+            nominatim_rate=0,
+            client_factory=lambda: httpx.AsyncClient(transport=httpx.MockTransport(failing)),
+        )
+        attempts = []
+
+        async def compute():
+            attempts.append(1)
+            try:
+                await geocoder.get_json("nominatim", geocoder.nominatim_url, {"q": "x"})
+            except httpx.HTTPError:
+                return None
+            return {"city": "x"}
+
+        assert await geocoder.resolve("validate", "12 rue A", compute) is None
+        assert await geocoder.resolve("validate", "12 rue A", compute) is None
+        assert attempts == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_nested_request_errors_are_not_cached(self):
+        geocoder = _geocoder()
+        outer_attempts = []
+
+        async def provider():
+            geocoder.note_failure()
+            return None
+
+        async def validate():
+            outer_attempts.append(1)
+            return await geocoder.resolve("nominatim:5", "12 rue A", provider)
+
+        assert await geocoder.resolve("validate", "12 rue A", validate) is None
+        assert await geocoder.resolve("validate", "12 rue A", validate) is None
+        assert outer_attempts == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached(self):
+        geocoder = _geocoder()
+        attempts = []
+
+        async def compute():
+            attempts.append(1)
+            return None
+
+        await geocoder.resolve("validate", "adresse inconnue", compute)
+        await geocoder.resolve("validate", "adresse inconnue", compute)
+        assert attempts == [1]
+
+    @pytest.mark.parametrize("name", ["LEA_GEOCODE_CACHE_TTL_SEC", "LEA_GEOCODE_NEGATIVE_TTL_SEC"])
+    def test_cache_ttl_settings_must_be_positive(self, name):
+        """Un TTL nul ou négatif n'expirerait jamais (ou effacerait l'entrée aussitôt)."""
+        with pytest.raises(ValidationError):
+            Settings(**{name: 0})
+
+
+class TestTokenBucket:
+    """Tests pour TokenBucket."""
+
+    @pytest.mark.asyncio
+    async def test_spaces_requests(self):
+        bucket = TokenBucket(rate=50.0)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(3):
+            await bucket.acquire()
+        # 1 jeton initial puis 2 attentes de ~20 ms
+        assert loop.time() - start >= 0.035
+
+
+class TestLeaProviderCalls:
+    """Les appels fournisseur de lea.py passent par le cache partagé."""
+
+    @pytest.mark.asyncio
+    async def test_nominatim_lookup_is_cached_and_coalesced(self, monkeypatch):
+        from app.api.v1.endpoints import lea
+
+        calls = []
+        monkeypatch.setattr(lea, "lea_geocoder", _geocoder(calls=calls))
+
+        results = await asyncio.gather(
+            *(lea._geocode_one("2643 Sherbrooke Est, Montréal") for _ in range(3))
+        )
+        again = await lea._geocode_one("2643 SHERBROOKE EST MONTREAL")
+
+        assert calls == ["2643 Sherbrooke Est, Montréal"]
+        assert all(r["postcode"] == "H2K 1E1" for r in results)
+        assert again["city"] == "Montréal"
@@ -0,0 +1,188 @@
+"""
+Tests unitaires pour le stockage des messages Léa (table lea_messages en ajout seul).
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.lea_conversation import LeaConversation, LeaMessage
+from app.services.lea_chat import message_store
+from app.services.lea_chat.message_store import (
+    append_lea_messages,
+    first_user_messages,
+    fold_into_summary,
+    load_all_lea_messages,
+    load_lea_history,
+)
+
+
+def _migration_056():
+    path = Path(__file__).resolve().parents[2] / "alembic" / "versions" / "056_lea_messages_append_only.py"
+    spec = importlib.util.spec_from_file_location("migration_056_lea_messages", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            LeaConversation.metadata.create_all,
+            tables=[LeaConversation.__table__, LeaMessage.__table__],
+        )
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _conversation(db, messages=None, session_id="s1"):
+    conv = LeaConversation(user_id=1, session_id=session_id, messages=messages or [], context={})
+    db.add(conv)
+    await db.commit()
+    return conv
+
+
+def _turn(i):
+    return [
+        {"role": "user", "content": f"question {i}", "timestamp": "2026-03-01T10:00:00"},
+        {"role": "assistant", "content": f"réponse {i}", "actions": ["a"]},
+    ]
+
+
+class TestLeaMessageStore:
+    """Tests pour message_store."""
+
+    @pytest.mark.asyncio
+    async def test_append_numbers_messages(self, db):
+        conv = await _conversation(db)
+        assert await append_lea_messages(db, conv.id, _turn(1)) == 2
+        assert await append_lea_messages(db, conv.id, _turn(2)) == 4
+        await db.commit()
+
+        seqs = (await db.execute(select(LeaMessage.seq).order_by(LeaMessage.seq))).scalars().all()
+        assert seqs == [1, 2, 3, 4]
+        messages = await load_all_lea_messages(db, conv.id)
+        assert messages[1] == {"role": "assistant", "content": "réponse 1", "actions": ["a"], "timestamp": messages[1]["timestamp"]}
+        assert messages[0]["timestamp"] == "2026-03-01T10:00:00"
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded_with_rolling_summary(self, db, monkeypatch):
+        monkeypatch.setattr(message_store, "LEA_HISTORY_WINDOW", 4)
+        conv = await _conversation(db)
+        for i in range(1, 6):
+            await append_lea_messages(db, conv.id, _turn(i))
+        await db.commit()
+
+        history = await load_lea_history(db, 1, "s1", limit=4)
+        assert history.total == 10
+        assert [m["content"] for m in history.messages] == ["question 4", "réponse 4", "question 5", "réponse 5"]
+        assert history.summary.splitlines() == [
+            "Utilisateur : question 1", "Léa : réponse 1",
+            "Utilisateur : question 2", "Léa : réponse 2",
+            "Utilisateur : question 3", "Léa : réponse 3",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_append_writes_constant_rows(self, db):
+        """Un ajout n'écrit que les nouveaux messages, quelle que soit la longueur de la conversation."""
+        conv = await _conversation(db)
+        for i in range(30):
+            await append_lea_messages(db, conv.id, _turn(i))
+        await db.commit()
+
+        statements = []
+        engine = db.bind.sync_engine
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            await append_lea_messages(db, conv.id, _turn(99))
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+        inserted = [p for s, p in statements if s.lstrip().upper().startswith("INSERT")]
+        assert len(inserted) == 1 and len(inserted[0]) == 2
+        assert all("lea_conversations.messages" not in s for s, _ in statements if s.lstrip().upper().startswith("UPDATE"))
+        # La colonne JSON n'est plus lue une fois la conversation migrée
+        assert all("lea_conversations.messages" not in s for s, _ in statements)
+
+    @pytest.mark.asyncio
+    async def test_legacy_json_read_then_migrated(self, db):
+        legacy = _turn(1) + _turn(2)
+        conv = await _conversation(db, messages=legacy)
+
+        history = await load_lea_history(db, 1, "s1")
+        assert [m["content"] for m in history.messages] == [m["content"] for m in legacy]
+
+        assert await append_lea_messages(db, conv.id, _turn(3)) == 6
+        await db.commit()
+        count = (await db.execute(select(func.count()).select_from(LeaMessage))).scalar_one()
+        assert count == 6
+        messages = await load_all_lea_messages(db, conv.id)
+        assert [m["content"] for m in messages][:4] == [m["content"] for m in legacy]
+        # Colonne JSON intacte : la migration 056 reste réversible
+        legacy_column = (await db.execute(select(LeaConversation.messages))).scalar_one()
+        assert legacy_column == legacy
+
+    @pytest.mark.asyncio
+    async def test_downgrade_restores_json_history(self, db):
+        conv = await _conversation(db, messages=_turn(1))
+        await append_lea_messages(db, conv.id, _turn(2))
+        await db.commit()
+
+        await db.run_sync(lambda session: _migration_056()._restore_json_messages(session.connection()))
+        await db.commit()
+
+        db.expire_all()
+        restored = (await db.execute(select(LeaConversation.messages))).scalar_one()
+        assert [m["content"] for m in restored] == ["question 1", "réponse 1", "question 2", "réponse 2"]
+        assert all(m.get("timestamp") for m in restored)
+
+    @pytest.mark.asyncio
+    async def test_first_user_messages_batches_legacy_conversations(self, db):
+        migrated = await _conversation(db, session_id="m")
+        await append_lea_messages(db, migrated.id, _turn(1))
+        legacy_ids = [(await _conversation(db, messages=_turn(i), session_id=f"l{i}")).id for i in range(2, 6)]
+        await db.commit()
+
+        statements = []
+        engine = db.bind.sync_engine
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            titles = await first_user_messages(db, [migrated.id, *legacy_ids])
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+        assert titles == {migrated.id: "question 1", **{cid: f"question {i}" for i, cid in enumerate(legacy_ids, start=2)}}
+        assert len(statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_session(self, db):
+        history = await load_lea_history(db, 1, "inconnue")
+        assert history.messages == [] and history.summary is None
+
+
+class TestFoldIntoSummary:
+    """Tests pour fold_into_summary."""
+
+    def test_truncates_lines_and_total(self):
+        long = {"role": "user", "content": "x" * 500}
+        summary = None
+        for _ in range(30):
+            summary = fold_into_summary(summary, [long])
+        assert len(summary) <= message_store.LEA_SUMMARY_MAX_CHARS
+        assert all(len(line) <= message_store.LEA_SUMMARY_LINE_CHARS + 20 for line in summary.splitlines())
+
+    def test_ignores_tool_messages(self):
+        assert fold_into_summary(None, [{"role": "tool", "content": "{}"}]) is None
@@ -0,0 +1,114 @@
+"""
+Tests unitaires pour le pipeline de tour Léa (exécution par étapes avec dépendances).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services.lea_chat.pipeline import TurnPipeline, TurnStage
+
+
+@asynccontextmanager
+async def _fake_session():
+    yield object()
+
+
+def _factory():
+    return _fake_session()
+
+
+class TestTurnPipeline:
+    """Tests pour TurnPipeline."""
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self):
+        """Les étapes sans dépendance (sessions dédiées ou sans base) démarrent ensemble."""
+
+        async def slow(db, r):
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        pipeline = TurnPipeline(
+            [
+                TurnStage("a", slow, session="own"),
+                TurnStage("b", slow, session="own"),
+                TurnStage("c", slow, session=None),
+            ],
+            session_factory=_factory,
+        )
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await pipeline.execute(None)
+        assert loop.time() - start < 0.12
+        assert result.outputs["a"] == result["b"] == result["c"] == "ok"
+        assert set(result.timings_ms) == {"a", "b", "c"}
+
+    @pytest.mark.asyncio
+    async def test_dependencies_and_inputs(self):
+        """Une étape voit les entrées et les sorties des étapes dont elle dépend."""
+        order = []
+
+        async def first(db, r):
+            order.append("first")
+            return r["x"] + 1
+
+        async def second(db, r):
+            order.append("second")
+            return r["first"] * 10
+
+        pipeline = TurnPipeline(
+            [TurnStage("second", second, requires=("first",)), TurnStage("first", first)]
+        )
+        result = await pipeline.execute(object(), {"x": 1})
+        assert order == ["first", "second"]
+        assert result["second"] == 20
+
+    @pytest.mark.asyncio
+    async def test_main_session_stages_are_serialized(self):
+        """Deux étapes sur la session de la requête ne s'exécutent jamais en même temps."""
+        active = []
+        overlaps = []
+
+        async def use_main(db, r):
+            active.append(1)
+            if len(active) > 1:
+                overlaps.append(True)
+            await asyncio.sleep(0.01)
+            active.pop()
+
+        pipeline = TurnPipeline([TurnStage("a", use_main), TurnStage("b", use_main)])
+        await pipeline.execute(object())
+        assert overlaps == []
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_pending_stages(self):
+        """Une exception est relancée et les étapes en cours sont annulées."""
+        cancelled = []
+
+        async def boom(db, r):
+            raise RuntimeError("boom")
+
+        async def long(db, r):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        pipeline = TurnPipeline([TurnStage("boom", boom, session=None), TurnStage("long", long, session=None)])
+        with pytest.raises(RuntimeError):
+            await pipeline.execute(None)
+        assert cancelled == [True]
+
+    def test_invalid_graphs_rejected(self):
+        """Dépendance inconnue ou cycle : erreur à la construction."""
+
+        async def noop(db, r):
+            return None
+
+        with pytest.raises(ValueError):
+            TurnPipeline([TurnStage("a", noop, requires=("missing",))])
+        with pytest.raises(ValueError):
+            TurnPipeline([TurnStage("a", noop, requires=("b",)), TurnStage("b", noop, requires=("a",))])
@@ -0,0 +1,81 @@
+"""
+Tests unitaires pour l'assemblage du prompt Léa (sections de connaissance, budget de tokens).
+"""
+
+from app.services.lea_chat.prompt_builder import (
+    build_knowledge_index,
+    estimate_tokens,
+    select_lea_knowledge,
+)
+from app.services.lea_chat.response_composer import build_context
+
+KNOWLEDGE = "\n\n".join(
+    [
+        "# Base de connaissance Léa – Document unique\n\nIntro.",
+        "# Partie 1 — Instructions centrales\n\n" + "Toujours répondre en français. " * 5,
+        "# Partie 2 — Architecture : Domain, Intent\n\nRoutage interne.",
+        "# Partie 3 — Cas TRANSACTION (T1 à T10)\n\n" + "Création de transaction. " * 10,
+        "# Partie 4 — Cas PROMESSE D'ACHAT (P1 à P14)\n\n" + "Promesse d'achat. " * 10,
+        "# Partie 6 — Formulaire PA : champs et explications\n\n" + "Champ prix offert. " * 40,
+        "# Partie 10 — Données plateforme\n\nDonnées.",
+        "--- Document : guide.pdf ---\nContenu du guide.",
+    ]
+)
+
+TX_ROUTE = {"domain": "transaction", "intent_verb": "create"}
+PA_FILL_ROUTE = {"domain": "purchase_offer", "intent_verb": "fill"}
+
+
+class TestKnowledgeIndex:
+    """Tests pour build_knowledge_index."""
+
+    def test_sections_split_on_titles_and_documents(self):
+        titles = [s.title for s in build_knowledge_index(KNOWLEDGE)]
+        assert titles[0] == "Base de connaissance Léa – Document unique"
+        assert "Partie 6 — Formulaire PA : champs et explications" in titles
+        assert titles[-1] == "Document : guide.pdf"
+
+    def test_index_is_memoized(self):
+        assert build_knowledge_index(KNOWLEDGE) is build_knowledge_index(KNOWLEDGE)
+
+
+class TestSelectLeaKnowledge:
+    """Tests pour select_lea_knowledge."""
+
+    def test_transaction_turn_skips_other_domains(self):
+        selected = select_lea_knowledge(KNOWLEDGE, TX_ROUTE, budget=10_000)
+        assert "Création de transaction" in selected.domain
+        assert "Promesse d'achat" not in selected.domain
+        assert "Routage interne" not in selected.domain
+        assert "Contenu du guide" in selected.domain
+
+    def test_pa_fill_turn_includes_form_fields(self):
+        selected = select_lea_knowledge(KNOWLEDGE, PA_FILL_ROUTE, budget=10_000)
+        assert "Champ prix offert" in selected.domain
+        assert "Création de transaction" not in selected.domain
+
+    def test_budget_keeps_core_and_domain_first(self):
+        core_tokens = select_lea_knowledge(KNOWLEDGE, TX_ROUTE, budget=0).stable_tokens
+        budget = core_tokens + estimate_tokens("# Partie 3 — Cas TRANSACTION (T1 à T10)\n\n" + "Création de transaction. " * 10)
+        selected = select_lea_knowledge(KNOWLEDGE, TX_ROUTE, budget=budget)
+        assert "Création de transaction" in selected.domain
+        assert "Contenu du guide" not in selected.domain
+        assert "Document : guide.pdf" in selected.skipped
+
+    def test_stable_prefix_identical_across_domains(self):
+        """Les sections core forment le même préfixe quel que soit le domaine (cache de prompt)."""
+        tx = select_lea_knowledge(KNOWLEDGE, TX_ROUTE, budget=10_000)
+        pa = select_lea_knowledge(KNOWLEDGE, PA_FILL_ROUTE, budget=10_000)
+        assert tx.stable == pa.stable
+        assert "Toujours répondre en français" in tx.stable
+
+        system_tx, _, _ = build_context("ctx 1", [], knowledge=tx.stable, domain_knowledge=tx.domain)
+        system_pa, _, _ = build_context("ctx 2", [], knowledge=pa.stable, domain_knowledge=pa.domain)
+        prefix = system_tx.split("--- Base de connaissance Léa : sections utiles")[0]
+        assert system_pa.startswith(prefix)
+
+    def test_unrouted_turn_gets_everything_within_budget(self):
+        selected = select_lea_knowledge(KNOWLEDGE, None, budget=10_000)
+        assert "Création de transaction" in selected.domain
+        assert "Promesse d'achat" in selected.domain
+        assert "Routage interne" in selected.domain
@@ -0,0 +1,73 @@
+"""
+Tests unitaires pour l'écriture SSE Léa (regroupement des deltas en trames).
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.lea_chat.sse import SSEFrameWriter, sse_event
+
+
+def _deltas(frames):
+    out = []
+    for frame in frames:
+        assert frame.startswith("data: ") and frame.endswith("\n\n")
+        out.append(json.loads(frame[len("data: "):])["delta"])
+    return out
+
+
+class TestSSEFrameWriter:
+    """Tests pour SSEFrameWriter."""
+
+    def test_text_frames_coalesce_by_size(self):
+        """Une confirmation de 200 caractères ne produit plus 200 trames."""
+        writer = SSEFrameWriter(max_bytes=32, max_delay=0.015)
+        text = "C'est fait ! " * 15 + "Fin."
+        frames = list(writer.text_frames(text))
+
+        assert "".join(_deltas(frames)) == text
+        assert len(frames) == -(-len(text.encode("utf-8")) // 32)
+        assert writer.metrics()["deltas"] == len(text)
+
+    def test_text_frames_keep_accents(self):
+        """Les caractères multi-octets ne sont jamais coupés."""
+        writer = SSEFrameWriter(max_bytes=4, max_delay=0.015)
+        text = "Léa a créé"
+        frames = list(writer.text_frames(text))
+        assert "".join(_deltas(frames)) == text
+        assert writer.metrics()["bytes"] == sum(len(frame.encode("utf-8")) for frame in frames)
+
+    def test_push_flushes_when_window_elapsed(self):
+        """Un delta reste en attente jusqu'à la fin de la fenêtre de temps."""
+        now = [0.0]
+        writer = SSEFrameWriter(max_bytes=1000, max_delay=0.015, clock=lambda: now[0])
+
+        assert writer.push("Bon") is None
+        now[0] = 0.020
+        frame = writer.push("jour")
+        assert _deltas([frame]) == ["Bonjour"]
+        assert writer.flush() is None
+
+    @pytest.mark.asyncio
+    async def test_stream_flushes_on_idle_source(self):
+        """Si le LLM marque une pause, le tampon part sans attendre le token suivant."""
+        writer = SSEFrameWriter(max_bytes=1000, max_delay=0.01)
+
+        async def source():
+            yield "Bon"
+            yield "jour"
+            await asyncio.sleep(0.05)
+            yield " !"
+
+        frames = [frame async for frame in writer.stream(source())]
+        assert _deltas(frames) == ["Bonjour", " !"]
+        assert writer.frames == 2
+
+    def test_event_counts_frames(self):
+        """Les événements done/error sont comptés dans les métriques."""
+        writer = SSEFrameWriter(max_bytes=32, max_delay=0.015)
+        frame = writer.event({"done": True, "session_id": "abc"})
+        assert frame == sse_event({"done": True, "session_id": "abc"})
+        assert writer.frames == 1
@@ -0,0 +1,97 @@
+"""
+Tests unitaires pour le cache de contexte utilisateur Léa (snapshot + tampons de version).
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.lea_chat.user_context_cache import LeaUserContextCache
+
+
+class _NoRedisBackend:
+    use_redis = False
+    redis_client = None
+
+
+def _tx(tx_id: int, updated_at: datetime, name: str = "Dossier"):
+    return SimpleNamespace(id=tx_id, updated_at=updated_at, name=name)
+
+
+@pytest.fixture
+def cache():
+    return LeaUserContextCache(backend=_NoRedisBackend())
+
+
+class TestLeaUserContextCache:
+    """Tests pour LeaUserContextCache."""
+
+    @pytest.mark.asyncio
+    async def test_miss_then_memory_hit(self, cache):
+        """Un snapshot stocké est resservi sans reconstruction."""
+        lookup = await cache.lookup(1)
+        assert lookup.text is None
+        await cache.store(lookup, "contexte")
+
+        again = await cache.lookup(1)
+        assert again.text == "contexte"
+        assert cache.stats["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_user_bump_invalidates_only_that_user(self, cache):
+        """Une écriture sur les transactions d'un utilisateur n'invalide que son snapshot."""
+        for user_id in (1, 2):
+            await cache.store(await cache.lookup(user_id), f"ctx {user_id}")
+
+        cache.invalidate_user(1)
+
+        assert (await cache.lookup(1)).text is None
+        assert (await cache.lookup(2)).text == "ctx 2"
+
+    @pytest.mark.asyncio
+    async def test_global_bump_invalidates_everyone(self, cache):
+        """Une écriture sur Form (référentiel partagé) invalide tous les snapshots."""
+        for user_id in (1, 2):
+            await cache.store(await cache.lookup(user_id), f"ctx {user_id}")
+
+        cache.invalidate_all()
+
+        assert (await cache.lookup(1)).text is None
+        assert (await cache.lookup(2)).text is None
+
+    @pytest.mark.asyncio
+    async def test_only_changed_transaction_lines_are_rendered(self, cache):
+        """Après invalidation, seules les transactions dont updated_at a changé sont re-rendues."""
+        t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rendered = []
+
+        def render(tx):
+            rendered.append(tx.id)
+            return f"- {tx.id}: {tx.name}"
+
+        lookup = await cache.lookup(1)
+        lines = [lookup.transaction_line(tx, render) for tx in (_tx(10, t0), _tx(11, t0))]
+        await cache.store(lookup, "\n".join(lines))
+        assert rendered == [10, 11]
+
+        cache.invalidate_user(1)
+        rendered.clear()
+        lookup = await cache.lookup(1)
+        t1 = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        lookup.transaction_line(_tx(10, t0), render)
+        line = lookup.transaction_line(_tx(11, t1, name="Renommé"), render)
+
+        assert rendered == [11]
+        assert line == "- 11: Renommé"
+        assert lookup.reused == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_bound(self):
+        """Le nombre de snapshots en mémoire est borné."""
+        cache = LeaUserContextCache(backend=_NoRedisBackend(), max_users=2)
+        for user_id in (1, 2, 3):
+            await cache.store(await cache.lookup(user_id), "ctx")
+
+        assert (await cache.lookup(1)).text is None
+        assert (await cache.lookup(3)).text == "ctx"
@@ -0,0 +1,184 @@
+"""
+Unit tests for compiled RBAC permissions and their cache
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models import User
+from app.models.role import Permission, Role, RolePermission, UserPermission, UserRole
+from app.services import permission_cache as permission_module
+from app.services.permission_cache import CompiledPermissions, PermissionCache
+from app.services.rbac_service import RBACService
+
+
+class _NoRedisBackend:
+    use_redis = False
+    redis_client = None
+
+
+@pytest.fixture
+async def env(monkeypatch):
+    cache = PermissionCache(_NoRedisBackend())
+    monkeypatch.setattr(permission_module, "permission_cache", cache)
+    monkeypatch.setattr("app.services.rbac_service.permission_cache", cache)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with factory() as session:
+        role = Role(name="Manager", slug="manager", is_active=True)
+        user = User(email="manager@example.com", hashed_password="x", is_active=True)
+        perms = [
+            Permission(resource="users", action="read", name="users:read"),
+            Permission(resource="teams", action="*", name="teams:*"),
+            Permission(resource="roles", action="delete", name="roles:delete"),
+        ]
+        session.add_all([role, user, *perms])
+        await session.flush()
+        session.add_all([
+            UserRole(user_id=user.id, role_id=role.id),
+            RolePermission(role_id=role.id, permission_id=perms[0].id),
+            RolePermission(role_id=role.id, permission_id=perms[1].id),
+        ])
+        await session.commit()
+        ids = {"user": user.id, "role": role.id, **{p.name: p.id for p in perms}}
+    statements.clear()
+    try:
+        yield cache, factory, statements, ids
+    finally:
+        await engine.dispose()
+
+
+class TestCompiledPermissions:
+    """Tests for exact and wildcard matching"""
+
+    def test_exact_and_resource_wildcards(self):
+        compiled = CompiledPermissions.compile(["users:read", "teams:*", "sales:view:*"])
+        assert compiled.allows("users:read")
+        assert not compiled.allows("users:delete")
+        assert compiled.allows("teams:create")
+        assert compiled.allows("sales:view:orders")
+        assert not compiled.allows("sales:manage:orders")
+        assert not compiled.allows("teams")
+        assert compiled.allows_any(["users:delete", "teams:list"])
+        assert not compiled.allows_all(["users:read", "users:delete"])
+
+    def test_admin_wildcard_grants_everything(self):
+        compiled = CompiledPermissions.compile(["admin:*"])
+        assert compiled.grants_all
+        assert compiled.allows("users:delete") and compiled.allows("anything")
+
+
+class TestPermissionCache:
+    """Tests for per-request memoisation and version-stamp invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_checks_in_a_request_share_one_load(self, env):
+        cache, factory, statements, ids = env
+        async with factory() as db:
+            service = RBACService(db)
+            assert await service.has_permission(ids["user"], "users:read")
+            assert await service.has_permission(ids["user"], "teams:update")
+            assert not await RBACService(db).has_permission(ids["user"], "roles:delete")
+            assert await service.has_all_permissions(ids["user"], ["users:read", "teams:list"])
+        assert len(statements) == 3
+        assert cache.stats["misses"] == 1
+
+        statements.clear()
+        async with factory() as db:
+            assert await RBACService(db).has_permission(ids["user"], "users:read")
+        assert statements == []
+        assert cache.stats["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_user_role_and_custom_permission_writes_invalidate(self, env):
+        cache, factory, _, ids = env
+        async with factory() as db:
+            service = RBACService(db)
+            assert not await service.has_permission(ids["user"], "roles:delete")
+            db.add(UserPermission(user_id=ids["user"], permission_id=ids["roles:delete"]))
+            await db.commit()
+            # Same session, after the commit: the request memo was dropped
+            assert await service.has_permission(ids["user"], "roles:delete")
+
+        async with factory() as db:
+            assert await RBACService(db).has_permission(ids["user"], "roles:delete")
+
+    @pytest.mark.asyncio
+    async def test_role_permission_changes_invalidate_everyone(self, env):
+        cache, factory, _, ids = env
+        async with factory() as db:
+            assert await RBACService(db).has_permission(ids["user"], "teams:update")
+        async with factory() as db:
+            await db.execute(
+                delete(RolePermission).where(RolePermission.permission_id == ids["teams:*"])
+            )
+            await db.commit()
+        async with factory() as db:
+            assert not await RBACService(db).has_permission(ids["user"], "teams:update")
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_changes_are_not_shared(self, env):
+        cache, factory, _, ids = env
+        async with factory() as db:
+            superadmin = Role(name="Super", slug="superadmin", is_active=True)
+            db.add(superadmin)
+            await db.flush()
+            db.add(UserRole(user_id=ids["user"], role_id=superadmin.id))
+            await db.flush()
+            assert await RBACService(db).has_permission(ids["user"], "roles:delete")
+            await db.rollback()
+
+        async with factory() as db:
+            assert not await RBACService(db).has_permission(ids["user"], "roles:delete")
+
+    @pytest.mark.asyncio
+    async def test_redis_copy_skipped_until_remote_bump_lands(self):
+        class SlowRedisBackend:
+            use_redis = True
+            redis_client = object()
+
+            def __init__(self):
+                self.counters, self.data = {}, {}
+                self.release = asyncio.Event()
+
+            async def get_counters(self, *keys):
+                return [self.counters.get(k, 0) for k in keys]
+
+            async def incr(self, key):
+                await self.release.wait()
+                self.counters[key] = self.counters.get(key, 0) + 1
+
+            async def get(self, key):
+                return self.data.get(key)
+
+            async def set(self, key, value, expire=300, compress=True):
+                self.data[key] = value
+
+        backend = SlowRedisBackend()
+        cache = PermissionCache(backend)
+
+        async def before():
+            return {"roles:delete"}
+
+        async def after():
+            return set()
+
+        assert (await cache.resolve(1, before)).allows("roles:delete")
+        cache.invalidate_user(1)
+        # INCR still pending: the Redis copy carries the old counters and must not be served
+        assert not (await cache.resolve(1, after)).allows("roles:delete")
+
+        backend.release.set()
+        await asyncio.gather(*cache._background_tasks)
+        assert not cache._pending_remote
+        assert not (await cache.resolve(1, after)).allows("roles:delete")
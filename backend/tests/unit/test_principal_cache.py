@@ -0,0 +1,169 @@
+"""
+Unit tests for the authenticated principal cache
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.core.security import create_access_token
+from app.dependencies import get_current_principal
+from app.models import User
+from app.models.role import Role, UserRole
+from app.services import principal_cache as principal_module
+from app.services.principal_cache import PrincipalCache, UserPrincipal, principal_tag
+
+
+class MemoryBackend:
+    """In-memory cache backend with tag indexes"""
+
+    def __init__(self):
+        self.use_redis = True
+        self.data = {}
+        self.tags = {}
+        self.cleared = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, expire=300, compress=True):
+        self.data[key] = value
+        return True
+
+    async def tag_keys(self, key, tags, expire):
+        for tag in tags:
+            self.tags.setdefault(tag, set()).add(key)
+        return True
+
+    async def invalidate_tags(self, tags):
+        deleted = 0
+        for tag in tags:
+            for key in self.tags.pop(tag, set()):
+                deleted += self.data.pop(key, None) is not None
+        return deleted
+
+    async def clear_pattern(self, pattern):
+        self.cleared.append(pattern)
+        prefix = pattern.rstrip("*")
+        for key in [k for k in self.data if k.startswith(prefix)]:
+            del self.data[key]
+        return 0
+
+
+@pytest.fixture
+async def env(monkeypatch):
+    backend = MemoryBackend()
+    cache = PrincipalCache(backend)
+    monkeypatch.setattr(principal_module, "principal_cache", cache)
+    monkeypatch.setattr("app.dependencies.principal_cache", cache)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with factory() as session:
+        role = Role(name="Admin", slug="admin", is_active=True)
+        user = User(email="broker@example.com", hashed_password="x", first_name="Marie", is_active=True)
+        session.add_all([role, user])
+        await session.flush()
+        session.add(UserRole(user_id=user.id, role_id=role.id))
+        await session.commit()
+    statements.clear()
+    try:
+        yield backend, cache, factory, statements
+    finally:
+        await engine.dispose()
+
+
+async def _drain(cache):
+    await asyncio.gather(*list(cache._background_tasks))
+
+
+def _credentials(email):
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": email}))
+
+
+class TestPrincipalCache:
+    """Tests for principal resolution and invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_second_request_skips_database(self, env):
+        backend, cache, factory, statements = env
+        async with factory() as db:
+            first = await get_current_principal(_credentials("broker@example.com"), db)
+        assert first.email == "broker@example.com" and first.roles == ("admin",)
+        assert len(statements) == 2
+        assert backend.tags[principal_tag(first.id)] == {"auth:principal:broker@example.com"}
+
+        statements.clear()
+        async with factory() as db:
+            second = await get_current_principal(_credentials("broker@example.com"), db)
+        assert second == first and isinstance(second, UserPrincipal)
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_deactivation_invalidates_principal(self, env):
+        backend, cache, factory, _ = env
+        async with factory() as db:
+            principal = await cache.resolve(db, "broker@example.com")
+            user = await db.get(User, principal.id)
+            user.is_active = False
+            await db.commit()
+        await _drain(cache)
+        assert backend.data == {}
+
+        async with factory() as db:
+            with pytest.raises(HTTPException) as exc:
+                await get_current_principal(_credentials("broker@example.com"), db)
+        assert exc.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_role_changes_invalidate(self, env):
+        backend, cache, factory, _ = env
+        async with factory() as db:
+            principal = await cache.resolve(db, "broker@example.com")
+            superadmin = Role(name="Super", slug="superadmin", is_active=True)
+            db.add(superadmin)
+            await db.flush()
+            db.add(UserRole(user_id=principal.id, role_id=superadmin.id))
+            await db.commit()
+        await _drain(cache)
+        async with factory() as db:
+            refreshed = await cache.resolve(db, "broker@example.com")
+        assert refreshed.is_superadmin and refreshed.roles == ("admin", "superadmin")
+
+        async with factory() as db:
+            await db.execute(update(Role).where(Role.slug == "superadmin").values(is_active=False))
+            await db.commit()
+        await _drain(cache)
+        assert backend.cleared == ["auth:principal:*"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_is_rejected_and_not_cached(self, env):
+        backend, _, factory, _ = env
+        async with factory() as db:
+            with pytest.raises(HTTPException) as exc:
+                await get_current_principal(_credentials("ghost@example.com"), db)
+        assert exc.value.status_code == 401
+        assert backend.data == {}
+
+    @pytest.mark.asyncio
+    async def test_rollback_discards_pending_invalidation(self, env):
+        backend, cache, factory, _ = env
+        async with factory() as db:
+            principal = await cache.resolve(db, "broker@example.com")
+            user = await db.get(User, principal.id)
+            user.first_name = "Autre"
+            await db.flush()
+            await db.rollback()
+            await db.commit()
+        await _drain(cache)
+        assert "auth:principal:broker@example.com" in backend.data
@@ -0,0 +1,173 @@
+"""
+Unit tests for per-request query instrumentation and N+1 detection
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import query_instrumentation, slow_query_logger
+from app.core.query_instrumentation import (
+    QueryInstrumentationMiddleware,
+    QueryStatsRegistry,
+    RequestQueryStats,
+    fingerprint_statement,
+    get_request_query_stats,
+    instrument_engine,
+)
+from app.core.query_optimization_advanced import QueryOptimizer
+
+
+@pytest.fixture
+async def engine(monkeypatch):
+    monkeypatch.setattr(query_instrumentation, "query_stats_registry", QueryStatsRegistry())
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        await conn.execute(text("INSERT INTO items (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+def _app(engine, expose_headers=True):
+    app = FastAPI()
+    app.add_middleware(QueryInstrumentationMiddleware, expose_headers=expose_headers)
+
+    @app.get("/loop")
+    async def loop():
+        async with engine.connect() as conn:
+            for item_id in range(1, 7):
+                await conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+        return {"ok": True}
+
+    @app.get("/batched")
+    async def batched():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT name FROM items WHERE id IN (1, 2, 3, 4, 5, 6)"))
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            async with engine.connect() as conn:
+                for item_id in range(1, 7):
+                    await conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+                    yield f"data: {item_id}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+class TestFingerprints:
+    """Tests for statement normalization"""
+
+    def test_parameters_and_literals_are_normalized(self):
+        assert fingerprint_statement("SELECT * FROM users WHERE id = $1::INTEGER") == (
+            "SELECT * FROM users WHERE id = ?::INTEGER"
+        )
+        assert fingerprint_statement("SELECT *  FROM t WHERE a = 'x''y'\n AND b = 42") == (
+            "SELECT * FROM t WHERE a = ? AND b = ?"
+        )
+        assert fingerprint_statement("SELECT * FROM t WHERE id IN (1, 2, 3)") == fingerprint_statement(
+            "SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s)"
+        )
+
+    def test_detect_n_plus_one_groups_by_fingerprint(self):
+        queries = [f"SELECT * FROM contacts WHERE id = {i}" for i in range(8)]
+        queries.append("SELECT * FROM companies WHERE id = 1")
+        patterns = QueryOptimizer.detect_n_plus_one(queries)
+        assert len(patterns) == 1
+        assert patterns[0]["occurrences"] == 8
+
+
+class TestRequestStats:
+    """Tests for engine listeners and the middleware"""
+
+    @pytest.mark.asyncio
+    async def test_statements_recorded_in_current_context(self, engine):
+        stats = RequestQueryStats()
+        token = query_instrumentation._current_stats.set(stats)
+        try:
+            assert get_request_query_stats() is stats
+            async with engine.connect() as conn:
+                for item_id in (1, 2):
+                    await conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+        finally:
+            query_instrumentation._current_stats.reset(token)
+        assert stats.statement_count == 2
+        assert list(stats.fingerprints) == ["SELECT name FROM items WHERE id = ?"]
+        assert stats.total_ms > 0
+        assert stats.n_plus_one_candidates(threshold=2)[0]["occurrences"] == 2
+
+    @pytest.mark.asyncio
+    async def test_middleware_flags_repeated_selects(self, engine):
+        registry = query_instrumentation.query_stats_registry
+        async with AsyncClient(transport=ASGITransport(app=_app(engine)), base_url="http://test") as client:
+            looped = await client.get("/loop")
+            batched = await client.get("/batched")
+
+        assert looped.headers["X-DB-Query-Count"] == "6"
+        assert looped.headers["X-DB-N-Plus-One"] == "1"
+        assert batched.headers["X-DB-Query-Count"] == "1"
+        assert batched.headers["X-DB-N-Plus-One"] == "0"
+
+        snapshot = registry.snapshot()
+        assert snapshot["requests"] == 2
+        assert [r["path"] for r in snapshot["recent_n_plus_one"]] == ["/loop"]
+        counts = {s["fingerprint"]: s["count"] for s in snapshot["top_statements"]}
+        assert counts["SELECT name FROM items WHERE id = ?"] == 6
+
+    @pytest.mark.asyncio
+    async def test_streamed_statements_are_counted(self, engine):
+        registry = query_instrumentation.query_stats_registry
+        async with AsyncClient(transport=ASGITransport(app=_app(engine)), base_url="http://test") as client:
+            response = await client.get("/stream")
+
+        assert response.text.count("data:") == 6
+        # Headers leave before the stream runs; the request is finished after the last chunk
+        assert response.headers["X-DB-Query-Count"] == "0"
+        snapshot = registry.snapshot()
+        assert snapshot["requests"] == 1
+        assert snapshot["recent_n_plus_one"][0]["path"] == "/stream"
+        assert snapshot["recent_n_plus_one"][0]["statement_count"] == 6
+
+    @pytest.mark.asyncio
+    async def test_headers_hidden_outside_debug(self, engine):
+        app = _app(engine, expose_headers=False)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/loop")
+        assert "X-DB-Query-Count" not in response.headers
+        assert len(query_instrumentation.query_stats_registry.recent_n_plus_one) == 1
+
+
+class TestSlowStatements:
+    """Tests for the slow statement path of the engine listener"""
+
+    @pytest.mark.asyncio
+    async def test_slow_statement_is_logged(self, engine, monkeypatch):
+        monkeypatch.setattr(slow_query_logger, "SLOW_QUERY_THRESHOLD", -1)
+        warnings = []
+        monkeypatch.setattr(slow_query_logger.logger, "warning", lambda message, context=None: warnings.append(context))
+
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+
+        assert warnings[-1]["query"] == "SELECT 1"
+        assert warnings[-1]["threshold"] == -1
+
+    @pytest.mark.asyncio
+    async def test_instrumentation_errors_never_fail_the_statement(self, engine, monkeypatch):
+        def broken(*args, **kwargs):
+            raise RuntimeError("recorder bug")
+
+        monkeypatch.setattr(query_instrumentation.query_stats_registry, "record", broken)
+
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
@@ -0,0 +1,205 @@
+"""
+Unit tests for the GCRA / token bucket rate limiter
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core.config import settings
+from app.core.rate_limit import (
+    LocalTokenBuckets,
+    RateLimitCheck,
+    RateLimiter,
+    parse_rate_limit,
+    rate_limit_decorator,
+    setup_rate_limiting,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeScript:
+    """Stands in for redis-py's registered script (EVALSHA)"""
+
+    def __init__(self, reply=None, error=None):
+        self.calls = []
+        self.reply = reply
+        self.error = error
+
+    async def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        if self.error:
+            raise self.error
+        return self.reply
+
+
+class FakeRedis:
+    def __init__(self, script):
+        self.script = script
+
+    def register_script(self, source):
+        assert "redis.call(\"TIME\")" in source
+        return self.script
+
+
+def _token(subject, tier=None):
+    claims = {"sub": subject, "type": "access", "exp": datetime.now(timezone.utc) + timedelta(minutes=5)}
+    if tier:
+        claims["tier"] = tier
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    setup_rate_limiting(app, RateLimiter(default_limit="4/minute", global_limits=True))
+
+    @app.get("/login")
+    @rate_limit_decorator("2/minute")
+    async def login():
+        return {"ok": True}
+
+    @app.get("/items")
+    async def items():
+        return {"ok": True}
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"ok": True}
+
+    @app.post("/webhooks/stripe")
+    async def stripe_webhook():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestRateLimitParsing:
+    """Tests for limit strings"""
+
+    def test_parse_rate_limit(self):
+        assert parse_rate_limit("5/minute").period == 60
+        assert parse_rate_limit("1000 per hour").amount == 1000
+        assert parse_rate_limit("10/5 minutes").period == 300
+        with pytest.raises(ValueError):
+            parse_rate_limit("often")
+
+
+class TestLocalTokenBuckets:
+    """Tests for the in-memory fallback"""
+
+    def test_all_or_nothing_and_refill(self):
+        clock = FakeClock()
+        buckets = LocalTokenBuckets(clock=clock)
+        tight = RateLimitCheck("a", parse_rate_limit("2/minute"), "endpoint")
+        loose = RateLimitCheck("b", parse_rate_limit("10/minute"), "user")
+
+        assert buckets.hit([tight, loose]).remaining == 1
+        assert buckets.hit([tight, loose]).allowed
+        rejected = buckets.hit([tight, loose])
+        assert not rejected.allowed and rejected.scope == "endpoint"
+        assert rejected.retry_after == pytest.approx(30)
+        # The rejected request consumed nothing from the other limit
+        assert buckets.hit([loose]).remaining == 7
+
+        clock.now += 30
+        assert buckets.hit([tight]).allowed
+
+    def test_bucket_count_is_bounded(self):
+        buckets = LocalTokenBuckets(max_keys=3)
+        for i in range(5):
+            buckets.hit([RateLimitCheck(f"k{i}", parse_rate_limit("1/minute"), "ip")])
+        assert len(buckets) == 3
+
+
+class TestRedisRateLimiter:
+    """Tests for the single EVALSHA round-trip"""
+
+    @pytest.mark.asyncio
+    async def test_all_limits_in_one_script_call(self):
+        script = FakeScript(reply=[1, 2, 1500, 7])
+        limiter = RateLimiter(redis_client=FakeRedis(script))
+        checks = [
+            RateLimitCheck("rl:ep:x", parse_rate_limit("10/minute"), "endpoint"),
+            RateLimitCheck("rl:user:y", parse_rate_limit("1000/hour"), "user"),
+        ]
+        result = await limiter.hit(checks)
+        assert script.calls == [(["rl:ep:x", "rl:user:y"], [6000, 60000, 3600, 3600000])]
+        assert result.allowed and result.backend == "redis"
+        assert result.scope == "user" and result.remaining == 7 and result.reset_after == 1.5
+
+        script.reply = [0, 1, 2500, 0]
+        rejected = await limiter.hit(checks)
+        assert not rejected.allowed and rejected.scope == "endpoint"
+        assert rejected.headers()["Retry-After"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_back_to_memory(self):
+        limiter = RateLimiter(redis_client=FakeRedis(FakeScript(error=ConnectionError("down"))))
+        result = await limiter.hit([RateLimitCheck("k", parse_rate_limit("1/minute"), "ip")])
+        assert result.allowed and result.backend == "memory"
+        assert limiter.stats["redis_errors"] == 1
+        assert not (await limiter.hit([RateLimitCheck("k", parse_rate_limit("1/minute"), "ip")])).allowed
+
+
+class TestRateLimitDependency:
+    """Tests for enforce_rate_limits on a FastAPI app"""
+
+    def test_endpoint_limit_returns_429_with_headers(self, client):
+        first = client.get("/login")
+        assert first.status_code == 200
+        assert first.headers["X-RateLimit-Limit"] == "2"
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+        client.get("/login")
+        rejected = client.get("/login")
+        assert rejected.status_code == 429
+        assert rejected.json()["error"] == "rate_limit_exceeded"
+        assert int(rejected.headers["Retry-After"]) >= 1
+
+    def test_anonymous_ip_default_limit(self, client):
+        statuses = [client.get("/items").status_code for _ in range(5)]
+        assert statuses == [200, 200, 200, 200, 429]
+
+    def test_health_and_webhooks_exempt_from_global_limits(self, client):
+        assert all(client.get("/api/v1/health").status_code == 200 for _ in range(6))
+        assert all(client.post("/webhooks/stripe").status_code == 200 for _ in range(6))
+        assert "X-RateLimit-Limit" not in client.get("/api/v1/health").headers
+
+    def test_global_limits_off_by_default(self):
+        assert RateLimiter().global_limits is False
+
+    def test_undecorated_routes_unlimited_without_global_limits(self):
+        app = FastAPI()
+        setup_rate_limiting(app, RateLimiter(default_limit="1/minute", global_limits=False))
+
+        @app.get("/api/v1/projects/{project_id}")
+        async def project(project_id: int):
+            return {"ok": True}
+
+        with TestClient(app) as plain:
+            responses = [plain.get("/api/v1/projects/1") for _ in range(3)]
+        assert all(r.status_code == 200 for r in responses)
+        assert "X-RateLimit-Limit" not in responses[0].headers
+
+    def test_tier_from_token_claim(self, client):
+        free = {"Authorization": f"Bearer {_token('free@example.com', 'free')}"}
+        response = client.get("/items", headers=free)
+        assert response.headers["X-RateLimit-Limit"] == "500"
+        pro = {"Authorization": f"Bearer {_token('pro@example.com', 'pro')}"}
+        assert client.get("/items", headers=pro).headers["X-RateLimit-Limit"] == "5000"
+        # Authenticated users are not counted against the anonymous IP limit
+        assert all(client.get("/items", headers=free).status_code == 200 for _ in range(6))
+
+    def test_disabled_limiter_skips_checks(self, client):
+        client.app.state.limiter.enabled = False
+        assert all(client.get("/login").status_code == 200 for _ in range(4))
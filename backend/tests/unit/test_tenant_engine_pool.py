@@ -0,0 +1,132 @@
+"""
+Unit tests for the bounded tenant engine pool (SQLite files stand in for tenant databases)
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import tenant_database_manager
+from app.core.tenancy import TenancyConfig
+from app.core.tenancy_metrics import TenancyMetrics
+from app.core.tenant_database_manager import TenantEnginePool
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    created = []
+
+    def factory(url, pool_size, max_overflow):
+        created.append((url, pool_size, max_overflow))
+        return create_async_engine(url, pool_size=pool_size, max_overflow=max_overflow)
+
+    pools = []
+
+    def make(**kwargs):
+        pool = TenantEnginePool(
+            url_for=lambda tenant_id: f"sqlite+aiosqlite:///{tmp_path}/tenant_{tenant_id}.db",
+            engine_factory=factory,
+            **kwargs,
+        )
+        pools.append(pool)
+        return pool
+
+    make.created = created
+    yield make
+    for pool in pools:
+        for entry in list(pool._entries.values()):
+            entry.engine.sync_engine.dispose(close=False)
+
+
+async def _select_one(entry):
+    async with entry.session_factory() as session:
+        return (await session.execute(text("SELECT 1"))).scalar()
+
+
+class TestTenantEnginePool:
+    """Tests for LRU eviction, idle sweeping and the connection budget"""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_keeps_busy_engines(self, make_pool):
+        pool = make_pool(max_engines=2, connection_budget=10)
+        first = pool.acquire(1)
+        pool.acquire(2)
+        async with first.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            # Tenant 1 is least recently used but holds a connection: tenant 2 goes
+            pool.acquire(3)
+            assert 1 in pool and 2 not in pool and 3 in pool
+        pool.acquire(3)
+        pool.acquire(4)
+        assert list(pool._entries) == [3, 4]
+        assert pool.evictions == 2
+        await pool.close()
+        assert len(pool) == 0
+
+    @pytest.mark.asyncio
+    async def test_leased_sessions_keep_their_engine(self, make_pool):
+        pool = make_pool(max_engines=1, connection_budget=10, idle_timeout=30)
+        async with pool.session(1) as session:
+            # No query yet: the session holds no connection, only the lease
+            assert pool._entries[1].checked_out == 0 and pool._entries[1].leases == 1
+            pool._entries[1].last_used -= 60
+            assert await pool.sweep_idle() == 0
+            pool.acquire(2)
+            assert 1 in pool and pool.evictions == 0
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1
+        assert pool._entries[1].leases == 0
+        pool.acquire(3)
+        assert 1 not in pool
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_connection_budget_is_split_between_open_engines(self, make_pool):
+        pool = make_pool(max_engines=4, connection_budget=10, min_connections=1)
+        assert pool.per_engine_connections == 10
+        entry = pool.acquire(7)
+        assert await _select_one(entry) == 1
+        pool.acquire(8)
+        pool.acquire(9)
+        assert [pool_size + overflow for _, pool_size, overflow in make_pool.created] == [10, 5, 3]
+        assert pool.per_engine_connections == 2
+        await pool.close()
+
+    def test_engine_share_is_capped_and_has_a_floor(self, make_pool, monkeypatch):
+        monkeypatch.setattr(tenant_database_manager.settings, "DB_POOL_SIZE", 4)
+        monkeypatch.setattr(tenant_database_manager.settings, "DB_MAX_OVERFLOW", 2)
+        pool = make_pool(max_engines=50, connection_budget=100, min_connections=3)
+        assert pool.connection_share(1) == 6
+        assert pool.connection_share(20) == 5
+        assert pool.connection_share(50) == 3
+
+    @pytest.mark.asyncio
+    async def test_idle_engines_are_swept(self, make_pool):
+        pool = make_pool(max_engines=5, idle_timeout=30)
+        pool.acquire(1)
+        pool.acquire(2)
+        pool._entries[1].last_used -= 60
+        assert await pool.sweep_idle() == 1
+        assert list(pool._entries) == [2]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_warm_up_and_occupancy_metrics(self, make_pool, monkeypatch):
+        pool = make_pool(max_engines=3, connection_budget=9, min_connections=1)
+        assert await pool.warm_up([5, 6]) == 2
+        assert pool._entries[5].uses == 0
+        assert pool.status()["tenants"][0]["checked_in"] == 1
+
+        pool.acquire(5)
+        monkeypatch.setattr(tenant_database_manager, "tenant_engine_pool", pool)
+        monkeypatch.setenv("TENANCY_MODE", "separate_db")
+        TenancyConfig.reset()
+        try:
+            stats = TenancyMetrics.get_engine_pool_statistics()
+        finally:
+            monkeypatch.delenv("TENANCY_MODE")
+            TenancyConfig.reset()
+        assert stats["open_engines"] == 2
+        assert stats["per_engine_connections"] == 3
+        assert [t["tenant_id"] for t in stats["tenants"]] == [5, 6]
+        assert stats["tenants"][0]["uses"] == 1
+        await pool.close()
@@ -0,0 +1,105 @@
+"""
+Unit tests for automatic tenant scoping (do_orm_execute hook)
+"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.mixins import TenantMixin
+from app.core.tenancy import TenancyConfig, clear_current_tenant, set_current_tenant
+from app.core.tenant_scoping import (
+    SKIP_TENANT_SCOPE_OPTION,
+    bypass_tenant_scope,
+    set_tenant_scope_bypass,
+    tenant_criteria,
+    tenant_models,
+)
+
+
+@pytest.fixture
+def shared_db(monkeypatch):
+    monkeypatch.setenv("TENANCY_MODE", "shared_db")
+    TenancyConfig.reset()
+    yield
+    clear_current_tenant()
+    set_tenant_scope_bypass(False)
+    monkeypatch.delenv("TENANCY_MODE")
+    TenancyConfig.reset()
+
+
+@pytest.fixture
+async def scoped(shared_db):
+    Base = declarative_base()
+
+    class Team(Base):
+        __tablename__ = "teams"
+        id = Column(Integer, primary_key=True)
+
+    class Note(TenantMixin, Base):
+        __tablename__ = "scoping_notes"
+        id = Column(Integer, primary_key=True)
+        body = Column(String(50), nullable=False)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([Team(id=1), Team(id=2)])
+        session.add_all(Note(id=i, team_id=1 if i <= 3 else 2, body=f"note {i}") for i in range(1, 6))
+        await session.commit()
+    async with factory() as session:
+        yield session, Note
+    await engine.dispose()
+
+
+async def _ids(session, statement, **options):
+    result = await session.execute(statement.execution_options(**options) if options else statement)
+    return sorted(note.id for note in result.scalars())
+
+
+class TestTenantScoping:
+    """Tests for criteria injection, bypass and opt-out"""
+
+    @pytest.mark.asyncio
+    async def test_select_is_scoped_to_current_tenant(self, scoped):
+        session, Note = scoped
+        assert Note in tenant_models()
+        set_current_tenant(2)
+        assert await _ids(session, select(Note)) == [4, 5]
+        set_current_tenant(1)
+        assert await _ids(session, select(Note).where(Note.id > 1)) == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_no_tenant_leaves_statement_unscoped(self, scoped):
+        session, Note = scoped
+        clear_current_tenant()
+        assert await _ids(session, select(Note)) == [1, 2, 3, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_and_delete_are_scoped(self, scoped):
+        session, Note = scoped
+        set_current_tenant(1)
+        await session.execute(update(Note).values(body="edited"))
+        await session.execute(delete(Note).where(Note.id.in_([3, 4])))
+        clear_current_tenant()
+        notes = {note.id: note.body for note in (await session.execute(select(Note))).scalars()}
+        assert sorted(notes) == [1, 2, 4, 5]
+        assert notes[1] == "edited" and notes[5] == "note 5"
+
+    @pytest.mark.asyncio
+    async def test_bypass_and_skip_option(self, scoped):
+        session, Note = scoped
+        set_current_tenant(1)
+        with bypass_tenant_scope():
+            assert await _ids(session, select(Note)) == [1, 2, 3, 4, 5]
+        assert await _ids(session, select(Note)) == [1, 2, 3]
+        assert await _ids(session, select(Note), **{SKIP_TENANT_SCOPE_OPTION: True}) == [1, 2, 3, 4, 5]
+        set_tenant_scope_bypass(True)
+        assert await _ids(session, select(Note)) == [1, 2, 3, 4, 5]
+
+    def test_criteria_option_is_reused_per_tenant(self):
+        assert tenant_criteria(3) is tenant_criteria(3)
+        assert tenant_criteria(3) is not tenant_criteria(4)